@@ -0,0 +1,149 @@
+# --- ★ フレームごとのメモリ確保のチェック (tracemalloc) ---
+# フレームループの中で Rect / Surface / リストなどを作っていないかを確かめる。
+# 測る区間 (begin() から end() まで) で「一時的に増えたメモリの最大値」と「区間の前後で増えたメモリ」を
+# tracemalloc で1フレームずつ記録し、ウォームアップ後の平均が上限を超えたら失敗にする。
+# カメラの読み込みや MediaPipe のように毎フレーム配列を作る処理は区間の外に置くこと。
+#
+# 使い方:
+#   alloc_check = AllocationCheck(enabled="--alloc-check" in sys.argv)
+#   hands = alloc_check.wrap_hands(hands) # 手が映っていなくても、仮の手でカーソルや掴む処理を通す
+#   while running:
+#       ... カメラ / 手の検出 ...
+#       alloc_check.begin()
+#       ... ゲームの更新と描画 ...
+#       alloc_check.end()
+#       if alloc_check.done: running = False
+#   print(alloc_check.report())
+#   sys.exit(0 if alloc_check.ok else 1)
+
+import math
+import tracemalloc
+
+# ★ 1フレームの区間で一時的に確保してよいメモリ (判定は平均で行う)。Python のコードが何も作らなくても、
+#   pygame の関数が返す Rect (Surface.fill / blit、40-80 B)、256 を超える int (get_ticks() の時刻や
+#   ホールドの番号、約 32 B)、パネルの内容キーのタプルの分は確保され、newgoal では平均 165-168 B
+#   (実行ごとのぶれは数 B、最大は毎回 224 B) になる。上限はそこから 200 B 以上離し、毎フレームの
+#   f-string + font.render (約 250 B) や Rect のリスト (5個で約 460 B)、ホールドのリストのコピー (約 800 B) は
+#   超えるようにしてある。
+DEFAULT_TRANSIENT_LIMIT_BYTES = 384
+DEFAULT_GROWTH_LIMIT_BYTES = 64 # 1フレームあたり増え続けてよいメモリ (リークの検出)
+SYNTHETIC_PHASE_FRAMES = 60 # 仮の手は パー → グー → 手なし をこのフレーム数ずつ繰り返す
+
+
+class AllocationCheck:
+    """測定区間ごとの tracemalloc の増分を集計し、定常状態でほぼゼロかを判定する"""
+
+    def __init__(self, enabled=False, warmup_frames=120, frames=600,
+                 transient_limit=DEFAULT_TRANSIENT_LIMIT_BYTES, growth_limit=DEFAULT_GROWTH_LIMIT_BYTES):
+        self.enabled = enabled
+        self.warmup_frames = warmup_frames
+        self.frames = frames
+        self.transient_limit = transient_limit
+        self.growth_limit = growth_limit
+        self.frame_count = 0
+        # 各フレームの「区間内のピーク - 区間の開始時」の合計と最大 (チェック自身がリストを伸ばさないように集計だけ持つ)
+        self.measured_frames = 0
+        self.transient_total = 0
+        self.transient_max = 0
+        self._start_bytes = 0
+        self._measure_start_bytes = 0
+        self._measure_end_bytes = 0
+        self._active = False
+        if enabled:
+            tracemalloc.start()
+
+    @property
+    def done(self):
+        return self.enabled and self.frame_count >= self.warmup_frames + self.frames
+
+    @property
+    def ok(self):
+        if not self.enabled:
+            return True
+        return self._transient_avg() <= self.transient_limit and self._growth_per_frame() <= self.growth_limit
+
+    def begin(self):
+        """測定区間の開始 (同じフレームで2回呼ぶと、その時点から測り直す)"""
+        if not self.enabled:
+            return
+        self._active = True
+        self._start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak() # ★ 開始の値を読んだ後でピークを戻す (読む時に作るタプルをピークに入れない)
+
+    def end(self):
+        if not self.enabled or not self._active:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self._active = False
+        self.frame_count += 1
+        if self.frame_count == self.warmup_frames:
+            self._measure_start_bytes = current # 定常状態になった時のメモリ
+        elif self.frame_count > self.warmup_frames:
+            transient = peak - self._start_bytes
+            self.measured_frames += 1
+            self.transient_total += transient
+            if transient > self.transient_max:
+                self.transient_max = transient
+            self._measure_end_bytes = current
+
+    def wrap_hands(self, hands):
+        """有効なら、hands の結果に手が無い時に仮の手を返す SyntheticHands で包む (無効ならそのまま)"""
+        return SyntheticHands(hands) if self.enabled else hands
+
+    def _transient_avg(self):
+        return self.transient_total / self.measured_frames if self.measured_frames else 0.0
+
+    def _growth_per_frame(self):
+        if not self.measured_frames:
+            return 0.0
+        return (self._measure_end_bytes - self._measure_start_bytes) / self.measured_frames
+
+    def report(self):
+        if not self.enabled:
+            return ""
+        result = "OK" if self.ok else "FAILED"
+        return (f"[alloc-check] {result}: {self.measured_frames} frames after {self.warmup_frames} warm-up frames,"
+                f" transient avg {self._transient_avg():.0f} B (max {self.transient_max} B, limit {self.transient_limit} B),"
+                f" growth {self._growth_per_frame():.1f} B/frame (limit {self.growth_limit} B)")
+
+
+class SyntheticHands:
+    """チェック用の手の検出器。hands が手を見つけられなかった画像には、画面を回る両手の結果を返す。
+    パー (カーソル) → グー (掴む) → 手なし (本物の結果のまま) を SYNTHETIC_PHASE_FRAMES ずつ繰り返すので、
+    手がある時と無い時の両方のフレームが測られる。結果はゲームの手の判定と同じ形 (multi_hand_landmarks / multi_handedness)"""
+
+    # 中指の付け根 (MCP) からのずれ。指先は PIP より上 (パー) / 下 (グー)
+    TIP_IDS = (4, 8, 12, 16, 20)
+    PIP_IDS = (3, 6, 10, 14, 18)
+
+    def __init__(self, hands):
+        from mediapipe.framework.formats import classification_pb2, landmark_pb2
+        self.hands = hands
+        self.frame = 0
+        self.multi_hand_landmarks = [landmark_pb2.NormalizedLandmarkList(
+            landmark=[landmark_pb2.NormalizedLandmark() for _ in range(21)]) for _ in range(2)]
+        self.multi_handedness = [classification_pb2.ClassificationList(
+            classification=[classification_pb2.Classification(index=index, score=1.0, label=label)])
+            for index, label in enumerate(("Left", "Right"))]
+
+    def process(self, image_rgb):
+        results = self.hands.process(image_rgb)
+        self.frame += 1
+        phase = self.frame // SYNTHETIC_PHASE_FRAMES % 3
+        if phase == 2 or results.multi_hand_landmarks:
+            return results
+        angle = self.frame * 0.05
+        center_x = 0.25 + 0.15 * math.cos(angle)
+        center_y = 0.5 + 0.3 * math.sin(angle)
+        tip_dy = -0.10 if phase == 0 else 0.02
+        for hand, x in zip(self.multi_hand_landmarks, (center_x, 1.0 - center_x)):
+            for index, point in enumerate(hand.landmark):
+                point.x = x + (index % 5 - 2) * 0.02
+                point.y = center_y + (0.08 if index == 0 else 0.0)
+            for tip, pip in zip(self.TIP_IDS, self.PIP_IDS):
+                hand.landmark[pip].y = center_y - 0.05
+                hand.landmark[tip].y = center_y + tip_dy
+        return self
+
+    def close(self):
+        self.hands.close()
@@ -0,0 +1,114 @@
+# --- ★ 画像 (と変形済み画像) のキャッシュ ---
+# 「画像ファイル + 変形 (拡大縮小 / 色の乗算 / 反転 / 回転)」をキーにして Surface を覚えておき、
+# 同じ変形は2回目から辞書を引くだけにする。ダンサー画像や goaliceclimb.png のように
+# 複数のゲームで同じ読み込み・拡大縮小をしている画像も、同じプロセス内なら1回で済む。
+# 使用メモリが budget_bytes を超えたら、最後に使ったのが一番古いものから捨てる (LRU)。
+#
+# 使い方:
+#   from assetcache import assets
+#   img = assets.get("image/ball.png", (50, 50))          # 読み込み + 拡大縮小
+#   small = assets.get(img, (30, 30))                      # 読み込み済みの Surface からも変形できる
+#   dark = assets.get(img, tint=(255, 255, 255, 128))      # BLEND_RGBA_MULT で色を乗算
+#
+# 返した Surface は共有されるので、書き換える時は .copy() してから使うこと。
+
+from collections import OrderedDict
+import pygame
+from assetmanager import asset_manager
+
+DEFAULT_BUDGET_BYTES = 128 * 1024 * 1024
+
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def convert(image, alpha):
+    """画面のピクセル形式に変換する (★ sdl2 レンダラーのように画面の Surface が無い時はコピーだけ)"""
+    if pygame.display.get_surface() is None:
+        return image.copy()
+    return image.convert_alpha() if alpha else image.convert()
+
+
+class AssetCache:
+    """元画像 (パス or Surface) と変形の組み合わせごとに Surface を覚える LRU キャッシュ"""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict() # {キー: Surface} (後ろほど最近使った)
+        self.sheets = {} # ★ {アトラスのシートのパス: convert 済みの Surface} (LRU では捨てない)
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, source, size=None, tint=None, flip_x=False, flip_y=False, angle=0, alpha=True):
+        """source (画像パス or Surface) に変形をかけた Surface を返す。
+        ファイルが無い時は FileNotFoundError (キャッシュはしない)"""
+        size = tuple(int(v) for v in size) if size else None
+        tint = tuple(tint) if tint else None
+        key = (source, size, tint, bool(flip_x), bool(flip_y), angle % 360, alpha)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self._build(source, size, tint, flip_x, flip_y, angle, alpha)
+        self._store(key, surface)
+        return surface
+
+    def _build(self, source, size, tint, flip_x, flip_y, angle, alpha):
+        if size or tint or flip_x or flip_y or angle % 360:
+            # 変形前の画像もキャッシュから取る (同じ画像の別サイズを作る時に再読み込みしない)
+            surface = self.get(source, alpha=alpha)
+            if size and size != surface.get_size():
+                surface = pygame.transform.scale(surface, size)
+            if flip_x or flip_y:
+                surface = pygame.transform.flip(surface, flip_x, flip_y)
+            if angle % 360:
+                surface = pygame.transform.rotate(surface, angle)
+            if tint:
+                surface = surface.copy()
+                tint_surface = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+                tint_surface.fill(tint)
+                surface.blit(tint_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            return surface
+
+        if isinstance(source, pygame.Surface):
+            return source
+        placement = asset_manager.atlas.get(source)
+        if placement is not None:
+            # ★ アトラスにある画像はシートの subsurface を返す (シートは1回だけ読んで convert する)
+            sheet_path, rect = placement
+            sheet = self.sheets.get(sheet_path)
+            if sheet is None:
+                sheet = self.sheets[sheet_path] = convert(asset_manager.load_raw(sheet_path), True)
+            image = sheet.subsurface(rect)
+            return image if alpha else convert(image, False)
+        # ★ PNG のデコードはアセットマネージャーに任せる (先読み・デコード済みキャッシュ)
+        image = asset_manager.load_raw(source)
+        return convert(image, alpha)
+
+    def _store(self, key, surface):
+        self.entries[key] = surface
+        self.used_bytes += surface_bytes(surface)
+        # 予算を超えたら古いものから捨てる (今入れたものは残す)
+        while self.used_bytes > self.budget_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.used_bytes -= surface_bytes(old)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.sheets.clear()
+        self.used_bytes = 0
+
+    def stats(self):
+        return (f"assets: {len(self.entries)} surfaces, {self.used_bytes / (1024 * 1024):.1f}MB"
+                f" / {self.budget_bytes / (1024 * 1024):.0f}MB, hits={self.hits} misses={self.misses} evictions={self.evictions}")
+
+
+# プロセス全体で共有するキャッシュ
+assets = AssetCache()
@@ -0,0 +1,232 @@
+# --- ★ アセットマネージャー (画像の一覧・並列プリロード・デコード済みキャッシュ) ---
+# ゲームごとに使う画像を ASSET_MANIFEST にまとめておき、起動直後にワーカースレッドで
+# 先読みする。PNG のデコード結果 (RGBA の生ピクセル) は .assetcache/ に
+# 「ファイル内容のハッシュ」を名前にして保存し、次回からは mmap して
+# そのまま Surface にする (PNG のデコードをしない)。画像を差し替えればハッシュが変わるので
+# 古いキャッシュが使われることはない。
+#
+# 使い方 (各ゲームの先頭、display.set_mode より前でよい):
+#   from assetmanager import asset_manager
+#   asset_manager.preload("newgoal")
+#   ... assets.get("image/enemy.png") などで普通に読み込む (先読み済みなら待つだけ) ...
+#   print(asset_manager.finish_startup("newgoal"))   # メインループの直前
+#
+# コールド/ウォーム起動の比較: python pygame/assetmanager.py
+
+import hashlib
+import io
+import mmap
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from atlas import ATLAS_INDEX, load_atlas_index
+
+DANCER_IMAGES = [f"image/c-dancer-{i}.png" for i in range(1, 6)]
+FIGHTER_IMAGES = [
+    "image/kihon.png", "image/rightattack.png", "image/leftattack.png", "image/kikouha.png",
+    "image/hissatuhado.png", "image/gard.png", "image/damager.png", "image/ball.png",
+    "image/kidan1.png", "image/kidan2.png", "image/kidan3.png",
+    "image/hado1.png", "image/hado2.png", "image/hado4.png",
+    "image/dagekidm.png", "image/kidandm.png", "image/hadodm.png",
+]
+
+# ゲームごとに使う画像の一覧
+ASSET_MANIFEST = {
+    "newgoal": ["image/enemy.png", "image/goaliceclimb.png", "image/goalhold.png",
+                "image/backsnow.png", "image/blockcatch.png"] + DANCER_IMAGES,
+    "timeattackclimb": ["image/goaliceclimb.png", "image/goalhold.png",
+                        "image/backsnow.png", "image/blockcatch.png"] + DANCER_IMAGES,
+    "oneminuterace": ["image/goaliceclimb.png", "image/backsnow.png", "image/blockcatch.png"] + DANCER_IMAGES,
+    "rulercatch": ["image/turara.png"] + DANCER_IMAGES,
+    "fightingame": FIGHTER_IMAGES + ["image/hado3.png", "image/goaliceclimb.png"] + DANCER_IMAGES,
+    "spmove": FIGHTER_IMAGES + ["image/goaliceclimb.png"] + DANCER_IMAGES,
+    "dekopin": ["image/enemy.png", "image/enemy_red.png", "image/dekoenemy.png"] + DANCER_IMAGES,
+}
+
+CACHE_DIR = ".assetcache"
+CACHE_MAGIC = b"ICRAW1\0\0"
+CACHE_HEADER = struct.Struct("<8sII") # マジック, 幅, 高さ (この後に RGBA のピクセルが続く)
+
+
+class AssetManager:
+    """画像の並列プリロードと、デコード済みピクセルのディスクキャッシュ"""
+
+    def __init__(self, cache_dir=CACHE_DIR, workers=4, atlas_index=ATLAS_INDEX):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.atlas = load_atlas_index(atlas_index) if atlas_index else {} # ★ {画像パス: (シートのパス, 矩形)} (アトラスが無ければ空)
+        self._executor = None
+        self._futures = {} # {パス: Future}
+        self._raw = {} # {パス: (Surface, mmap)} デコード済み (convert 前) の画像
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.preload_start = None
+        self._lock = threading.Lock() # ★ シーンの load() はランチャーのワーカースレッドからも呼ばれる
+
+    def preload(self, game):
+        """ASSET_MANIFEST[game] の画像をワーカースレッドで読み始める (すぐ戻る)"""
+        with self._lock:
+            if self.preload_start is None:
+                self.preload_start = time.perf_counter()
+            for path in ASSET_MANIFEST.get(game, []):
+                path = self.atlas[path][0] if path in self.atlas else path # ★ アトラスにある画像はシートを読む
+                if path not in self._futures and path not in self._raw:
+                    self._submit(path)
+
+    def _submit(self, path):
+        """(self._lock の中で呼ぶ) path のデコードをワーカースレッドに頼み、その Future を返す"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="asset")
+        future = self._futures[path] = self._executor.submit(self._decode, path)
+        return future
+
+    def restart_clock(self):
+        """★ 起動時間の計測をやり直す (ランチャーでゲームを起動する直前に呼ぶ)"""
+        self.preload_start = None
+
+    def is_loaded(self, path):
+        """★ 先読みが終わっているか (ランチャーの待ち時間に、終わった画像から convert する)"""
+        path = self.atlas[path][0] if path in self.atlas else path
+        future = self._futures.get(path)
+        return path in self._raw or (future is not None and future.done())
+
+    def _decode(self, path):
+        """(ワーカースレッド) PNG を読み、ディスクキャッシュがあれば mmap、無ければデコードして保存"""
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        cache_path = os.path.join(self.cache_dir, digest + ".raw")
+        try:
+            with open(cache_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, width, height = CACHE_HEADER.unpack_from(mapped)
+            if magic == CACHE_MAGIC and len(mapped) == CACHE_HEADER.size + width * height * 4:
+                pixels = memoryview(mapped)[CACHE_HEADER.size:]
+                return pygame.image.frombuffer(pixels, (width, height), "RGBA"), mapped, True
+            mapped.close()
+        except (OSError, ValueError, struct.error):
+            pass # キャッシュが無い/壊れている時はデコードし直す
+
+        image = pygame.image.load(io.BytesIO(data), path)
+        width, height = image.get_size()
+        pixels = pygame.image.tobytes(image, "RGBA")
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, width, height))
+                f.write(pixels)
+            os.replace(tmp_path, cache_path) # 書きかけのファイルを読まないように入れ替える
+        except OSError as e:
+            print(f"警告: アセットキャッシュを書き込めません。 {e}")
+            try:
+                os.remove(tmp_path) # ★ 書きかけのファイルを残さない
+            except OSError:
+                pass
+        return pygame.image.frombuffer(pixels, (width, height), "RGBA"), None, False
+
+    def load_raw(self, path):
+        """デコード済み (convert 前) の Surface を返す。先読み中なら終わるまで待つ
+        ★ 先読みしていない画像もワーカースレッドで読む (同じ画像を同時に読みに来たスレッドは同じ Future を待つ)"""
+        with self._lock:
+            entry = self._raw.get(path)
+            if entry is not None:
+                return entry[0]
+            future = self._futures.get(path) or self._submit(path)
+        try:
+            surface, mapped, hit = future.result()
+        except Exception:
+            with self._lock:
+                if self._futures.get(path) is future:
+                    del self._futures[path] # 次に読む時はやり直す
+            raise
+        with self._lock:
+            if self._futures.get(path) is future: # 最初に受け取ったスレッドだけが登録して数える
+                del self._futures[path]
+                self._raw[path] = (surface, mapped)
+                if hit:
+                    self.disk_hits += 1
+                else:
+                    self.disk_misses += 1
+        return surface
+
+    def load_unconverted(self, path):
+        """★ convert 前の画像 (アトラスにあればシートの subsurface)。画面が無くても (シーンの load() からでも) 使える"""
+        if path in self.atlas:
+            sheet_path, rect = self.atlas[path]
+            return self.load_raw(sheet_path).subsurface(rect)
+        return self.load_raw(path)
+
+    def image_size(self, path):
+        """★ 画像の大きさ (幅, 高さ)。convert しないので、画面が無くても (シーンの load() からでも) 使える"""
+        if path in self.atlas:
+            return tuple(self.atlas[path][1][2:4])
+        return self.load_raw(path).get_size()
+
+    def release(self):
+        """convert 済みになった生ピクセルを手放す (参照が無くなれば mmap も閉じられる)"""
+        self._raw.clear()
+
+    def finish_startup(self, game):
+        """起動時の読み込みが終わった所で呼ぶ。生ピクセルを手放し、起動時間のレポートを返す"""
+        self.release()
+        loaded = self.disk_hits + self.disk_misses
+        elapsed_ms = (time.perf_counter() - self.preload_start) * 1000 if self.preload_start else 0.0
+        if not loaded:
+            start = "cached" # ★ ランチャーで前に遊んだ/変換済みで、読み込む画像が無かった
+        else:
+            start = "warm" if self.disk_misses == 0 else "cold"
+        report = (f"[assets] {game}: {start} start, {elapsed_ms:.1f}ms since preload"
+                  f" (decoded-cache hits {self.disk_hits}/{loaded})")
+        # ★ ランチャーから次のゲームを起動した時に、そのゲームの分だけを数え直せるようにする
+        self.preload_start = None
+        self.disk_hits = self.disk_misses = 0
+        return report
+
+
+# プロセス全体で共有するマネージャー
+asset_manager = AssetManager()
+
+
+# --- コールド/ウォーム起動の比較 ---
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+    def load_direct(paths):
+        # 今までのゲームのように1枚ずつ PNG をデコード
+        for path in paths:
+            pygame.image.load(path).convert_alpha()
+
+    def load_managed(paths, cache_dir, game):
+        manager = AssetManager(cache_dir=cache_dir, atlas_index=None) # 1枚ずつの PNG で比べる
+        manager.preload(game)
+        for path in paths:
+            manager.load_raw(path).convert_alpha()
+        manager.release()
+        manager._executor.shutdown()
+
+    print(f"{'game':>16} {'images':>7} {'direct':>9} {'cold':>9} {'warm':>9}  (ms)")
+    for game, paths in ASSET_MANIFEST.items():
+        cache_dir = tempfile.mkdtemp(prefix="assetcache-")
+        try:
+            start = time.perf_counter()
+            load_direct(paths)
+            direct_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            load_managed(paths, cache_dir, game) # キャッシュ無し (初回起動)
+            cold_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            load_managed(paths, cache_dir, game) # キャッシュ有り (2回目以降)
+            warm_ms = (time.perf_counter() - start) * 1000
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        print(f"{game:>16} {len(paths):>7} {direct_ms:>9.1f} {cold_ms:>9.1f} {warm_ms:>9.1f}")
@@ -0,0 +1,116 @@
+# --- ★ スプライトシート (アトラス) ---
+# image/ の PNG を数枚の大きなシートに詰め込み、どの画像がどのシートのどこにあるかを
+# image/atlas/atlas.json に書き出す。ゲーム側は assets.get("image/hado1.png") のまま使え、
+# アトラスがあればシートの subsurface を返す (ファイルを開く回数とデコード回数が減り、
+# 同じゲームの画像が同じシートに並ぶので blit の局所性も良くなる)。
+#
+# 作り方 (リポジトリのルートで実行、生成物はコミットしない):
+#   python pygame/atlas.py [--sheet-size 2048] [--padding 2]
+#
+# 元の PNG を書き換えた場合、その画像だけアトラスを使わずに元ファイルから読む
+# (ファイルサイズと更新時刻で判定)。作り直せばまたアトラスから読まれる。
+
+import json
+import os
+import pygame
+
+ATLAS_DIR = "image/atlas"
+ATLAS_INDEX = os.path.join(ATLAS_DIR, "atlas.json")
+
+
+def load_atlas_index(index_path=ATLAS_INDEX):
+    """{画像パス: (シートのパス, (x, y, w, h))} を返す。アトラスが無ければ空の辞書"""
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    sheets = [os.path.join(os.path.dirname(index_path), name) for name in index.get("sheets", [])]
+    placements = {}
+    for path, entry in index.get("images", {}).items():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_size != entry["bytes"] or stat.st_mtime_ns != entry["mtime_ns"]:
+            continue # アトラスを作った後に書き換えられた画像は元ファイルから読む
+        placements[path] = (sheets[entry["sheet"]], tuple(entry["rect"]))
+    return placements
+
+
+def pack_shelves(sizes, sheet_size, padding):
+    """棚詰め (shelf packing)。sizes の順に置いていき [(シート番号, x, y) or None] を返す"""
+    placements = []
+    sheet, x, y, shelf_height = 0, 0, 0, 0
+    for w, h in sizes:
+        if w + padding > sheet_size or h + padding > sheet_size or min(w, h) > sheet_size // 2:
+            placements.append(None) # 1枚でシートを埋めてしまう大きな画像は詰めない (元ファイルのまま読む)
+            continue
+        if x + w + padding > sheet_size: # 棚がいっぱいなら次の棚へ
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + h + padding > sheet_size: # シートがいっぱいなら次のシートへ
+            sheet, x, y, shelf_height = sheet + 1, 0, 0, 0
+        placements.append((sheet, x, y))
+        x += w + padding
+        shelf_height = max(shelf_height, h + padding)
+    return placements
+
+
+def build_atlas(image_dir="image", out_dir=ATLAS_DIR, sheet_size=2048, padding=2):
+    """image_dir の PNG をシートに詰めて out_dir に PNG と atlas.json を書き出す"""
+    from assetmanager import ASSET_MANIFEST
+
+    # 同じゲームで使う画像が同じシートに並ぶように、マニフェストの順でグループ分けする
+    all_paths = sorted(os.path.join(image_dir, name).replace(os.sep, "/")
+                       for name in os.listdir(image_dir) if name.lower().endswith(".png"))
+    groups, seen = [], set()
+    for paths in list(ASSET_MANIFEST.values()) + [all_paths]:
+        group = [p for p in paths if p in all_paths and p not in seen]
+        seen.update(group)
+        if group:
+            groups.append(group)
+
+    images = {path: pygame.image.load(path) for path in all_paths}
+    order = []
+    for group in groups:
+        order += sorted(group, key=lambda p: images[p].get_height(), reverse=True) # 棚ごとの無駄を減らす
+    placements = pack_shelves([images[p].get_size() for p in order], sheet_size, padding)
+
+    sheet_count = max((pl[0] for pl in placements if pl), default=-1) + 1
+    sheets = [pygame.Surface((sheet_size, sheet_size), pygame.SRCALPHA) for _ in range(sheet_count)]
+    index = {"version": 1, "sheet_size": sheet_size, "sheets": [], "images": {}}
+    for path, placement in zip(order, placements):
+        if placement is None:
+            print(f"{path}: 大きいのでアトラスに入れません。")
+            continue
+        sheet_no, x, y = placement
+        image = images[path]
+        # 透明な下地にそのまま写す (アルファ合成で縁が暗くならないように MAX でコピー)
+        sheets[sheet_no].blit(image, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        stat = os.stat(path)
+        index["images"][path] = {"sheet": sheet_no, "rect": [x, y, image.get_width(), image.get_height()],
+                                 "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    os.makedirs(out_dir, exist_ok=True)
+    for i, sheet in enumerate(sheets):
+        # 使っていない下の部分は切り詰める
+        rects = [entry["rect"] for entry in index["images"].values() if entry["sheet"] == i]
+        height = max(y + h for _, y, _, h in rects)
+        name = f"atlas-{i}.png"
+        pygame.image.save(sheet.subsurface((0, 0, sheet_size, height)), os.path.join(out_dir, name))
+        index["sheets"].append(name)
+        print(f"{name}: {len(rects)} images, {sheet_size}x{height}")
+    with open(os.path.join(out_dir, "atlas.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, ensure_ascii=False)
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="image/ の PNG をスプライトシートにまとめる")
+    parser.add_argument("--sheet-size", type=int, default=2048)
+    parser.add_argument("--padding", type=int, default=2)
+    args = parser.parse_args()
+    result = build_atlas(sheet_size=args.sheet_size, padding=args.padding)
+    print(f"{len(result['images'])} images -> {len(result['sheets'])} sheets ({ATLAS_INDEX})")
@@ -4,6 +4,7 @@ import pygame
 import math
 import random
 import numpy as np # カメラ映像変換に必要
+from capturedaemon import open_capture # ★ cv2.VideoCapture の代わり
 
 # --- 初期設定 ---
 
@@ -148,7 +149,7 @@ right_flick_detected = False
 
 
 # Webカメラの準備
-cap = cv2.VideoCapture(0)
+cap = open_capture(0) # ★ カメラ共有デーモンが動いていれば共有メモリから読む
 if not cap.isOpened():
     print("エラー: カメラを起動できません。")
     running = False
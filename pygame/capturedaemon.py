@@ -0,0 +1,381 @@
+# --- ★ カメラ共有デーモン (1台のカメラを複数のプロセスで同時に読む) ---
+# Linux では /dev/video0 を確実に開けるのは1つのプロセスだけなので、ゲームと録画と観客用のプレビューが
+# 同じカメラを同時に読めない。このデーモンがカメラを1人で開き、撮った画像を時刻付きで共有メモリに書き、
+# 読む側 (サブスクライバー) はいくつでもそこから最新の1枚を読む。
+#   ・共有メモリには SLOTS 枚分の置き場 (スロット) があり、デーモンは毎回「最新の次」のスロットに書く
+#   ・スロットごとに通し番号 (seq) を持ち、書いている間は奇数、書き終わったら偶数にする (seqlock)。
+#     読む側は seq → 画像 → seq の順に読み、前後で seq が変わっていたら読み直す
+#   ・ロックも読む側の登録も無いので、遅い読み手 (録画など) がいてもデーモンとゲームは待たされない
+#     (遅い読み手は途中の画像を飛ばして、いつも最新の1枚を読む)
+#
+# 使い方 (リポジトリのルートで):
+#   python pygame/capturedaemon.py                   # カメラ 0 を共有する (Ctrl+C で終了)
+#   python pygame/capturedaemon.py --camera 1        # 別のカメラ
+#   python pygame/capturedaemon.py --preview         # 観客用のプレビュー (デーモンから読むだけ)
+#   python pygame/capturedaemon.py --record out.mp4  # 録画 (デーモンから読むだけ)
+# デーモンが動いていれば、ゲームは gameruntime.runtime.open_camera(0) (= open_capture(0)) で
+# 自動的に共有メモリから読む。動いていなければ今までどおり cv2.VideoCapture(0) を開く。
+
+import os
+import signal
+import sys
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+
+SLOTS = 3 # 画像の置き場の数 (読んでいる途中のスロットに追いつかれないように3枚)
+HEADER_BYTES = 128
+SLOT_HEADER_BYTES = 64
+MAGIC = 0x46455354_43414D31 # "FESTCAM1"
+STALE_S = 2.0 # これだけ新しい画像が来なければ、デーモンは止まっているとみなす
+READ_TIMEOUT_S = 1.0 # read() が新しい画像を待つ最大の時間
+POLL_S = 0.001 # 新しい画像を待つ間隔
+REOPEN_AFTER_FAILURES = 30 # カメラの読み込みにこれだけ続けて失敗したら開き直す
+
+# ヘッダー (int64 x 8, float64 x 8)
+H_MAGIC, H_WIDTH, H_HEIGHT, H_CHANNELS, H_SLOTS, H_LATEST, H_PID = range(7)
+F_PUBLISHED, F_FPS = range(2) # 最後に書いた時刻 (time.monotonic())、カメラの FPS
+# スロットのヘッダー (int64 x 2, float64 x 1)
+S_SEQ, S_FRAME = range(2)
+
+
+def segment_name(index):
+    """カメラ番号ごとの共有メモリの名前"""
+    return f"festival_camera{index}"
+
+
+def camera_index_from_argv(argv=None, default=0):
+    """--camera 1 で指定されたカメラ番号"""
+    argv = sys.argv if argv is None else argv
+    if "--camera" in argv:
+        index = argv.index("--camera") + 1
+        if index < len(argv) and argv[index].isdigit():
+            return int(argv[index])
+    return default
+
+
+def attach(name):
+    """既存の共有メモリを開く。読む側が終わった時に共有メモリを消されないよう、後始末の登録はしない"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False) # Python 3.13 以降
+    except TypeError:
+        segment = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def unlink_segment(segment):
+    """★ attach() で開いた共有メモリを消す。attach() で後始末の登録を外してあるので、segment.unlink() で
+    もう一度外さないように直接消す (Python 3.12 以前では resource_tracker が KeyError を表示する)"""
+    if os.name == "posix": # Windows では最後のハンドルを閉じた時に消える
+        import _posixshmem
+        _posixshmem.shm_unlink(segment._name)
+
+
+class FrameRing:
+    """共有メモリの上のヘッダーと SLOTS 枚分のスロット (デーモンと読む側の両方で使う)"""
+
+    def __init__(self, segment):
+        self.segment = segment
+        buf = segment.buf
+        self.header = np.ndarray(8, np.int64, buf, 0)
+        self.header_f = np.ndarray(8, np.float64, buf, 64)
+        height, width, channels = (int(v) for v in self.header[[H_HEIGHT, H_WIDTH, H_CHANNELS]])
+        self.shape = (height, width, channels)
+        slot_bytes = SLOT_HEADER_BYTES + height * width * channels
+        self.slot_headers = []
+        self.slot_times = []
+        self.slot_frames = []
+        for i in range(int(self.header[H_SLOTS])):
+            offset = HEADER_BYTES + i * slot_bytes
+            self.slot_headers.append(np.ndarray(2, np.int64, buf, offset))
+            self.slot_times.append(np.ndarray(1, np.float64, buf, offset + 16))
+            self.slot_frames.append(np.ndarray(self.shape, np.uint8, buf, offset + SLOT_HEADER_BYTES))
+
+    @staticmethod
+    def size(shape, slots=SLOTS):
+        height, width, channels = shape
+        return HEADER_BYTES + slots * (SLOT_HEADER_BYTES + height * width * channels)
+
+    @classmethod
+    def create(cls, name, shape, slots=SLOTS):
+        """(デーモン) 共有メモリを作ってヘッダーを書く"""
+        segment = shared_memory.SharedMemory(name=name, create=True, size=cls.size(shape, slots))
+        header = np.ndarray(8, np.int64, segment.buf, 0)
+        header[:] = 0
+        header[H_WIDTH], header[H_HEIGHT], header[H_CHANNELS] = shape[1], shape[0], shape[2]
+        header[H_SLOTS] = slots
+        header[H_LATEST] = -1
+        header[H_PID] = os.getpid()
+        np.ndarray(8, np.float64, segment.buf, 64)[:] = 0.0
+        ring = cls(segment)
+        header[H_MAGIC] = MAGIC # 最後に書く (読む側はこれを見てから中身を読む)
+        return ring
+
+    def alive(self):
+        """デーモンが STALE_S 以内に画像を書いているか"""
+        return time.monotonic() - self.header_f[F_PUBLISHED] < STALE_S
+
+    def publish(self, frame, timestamp, frame_number):
+        """(デーモン) 最新の次のスロットに画像を書く。読む側は待たない"""
+        slot = (int(self.header[H_LATEST]) + 1) % len(self.slot_frames)
+        slot_header = self.slot_headers[slot]
+        seq = int(slot_header[S_SEQ])
+        slot_header[S_SEQ] = seq + 1 # 奇数: 書いている途中
+        self.slot_frames[slot][...] = frame
+        self.slot_times[slot][0] = timestamp
+        slot_header[S_FRAME] = frame_number
+        slot_header[S_SEQ] = seq + 2 # 偶数: 書き終わった
+        self.header[H_LATEST] = slot
+        self.header_f[F_PUBLISHED] = time.monotonic()
+
+    def latest_frame_number(self):
+        slot = int(self.header[H_LATEST])
+        return -1 if slot < 0 else int(self.slot_headers[slot][S_FRAME])
+
+    def read_latest(self, out):
+        """(読む側) 最新の画像を out にコピーし、(通し番号, 撮った時刻) を返す。まだ無ければ None"""
+        for _ in range(len(self.slot_frames) + 1):
+            slot = int(self.header[H_LATEST])
+            if slot < 0:
+                return None
+            slot_header = self.slot_headers[slot]
+            seq = int(slot_header[S_SEQ])
+            if seq % 2: # 書いている途中 (デーモンに追いつかれた)
+                continue
+            np.copyto(out, self.slot_frames[slot])
+            frame_number = int(slot_header[S_FRAME])
+            timestamp = float(self.slot_times[slot][0])
+            if int(slot_header[S_SEQ]) == seq: # 読んでいる間に書き換えられていない
+                return frame_number, timestamp
+        return None
+
+    def close(self):
+        # ndarray が共有メモリを参照したままだと閉じられない
+        self.header = self.header_f = None
+        self.slot_headers = self.slot_times = self.slot_frames = []
+        self.segment.close()
+
+
+class CaptureClient:
+    """cv2.VideoCapture の代わりに、デーモンの共有メモリから読む (read() は新しい画像が来るまで待つ)"""
+
+    from_daemon = True # ★ frame_age_ms() が撮った時刻を使ってよい印
+
+    def __init__(self, ring, index=0):
+        self.ring = ring
+        self.index = index
+        self.last_frame_number = -1
+        self.last_timestamp = 0.0 # ★ 最後に読んだ画像を撮った時刻 (time.monotonic() の秒)
+        self.opened = True
+
+    def isOpened(self):
+        return self.opened
+
+    def grab(self):
+        """新しい画像が来るまで待つ (cv2.VideoCapture.read() と同じくカメラの速さで待たされる)"""
+        if not self.opened:
+            return False
+        deadline = time.monotonic() + READ_TIMEOUT_S
+        while self.ring.latest_frame_number() <= self.last_frame_number:
+            if time.monotonic() > deadline:
+                return False # デーモンが止まった (抜けたカメラと同じく read() が失敗する)
+            time.sleep(POLL_S)
+        return True
+
+    def retrieve(self):
+        if not self.opened:
+            return False, None
+        frame = np.empty(self.ring.shape, np.uint8) # 呼んだ側が持っておけるように毎回新しい配列
+        result = self.ring.read_latest(frame)
+        if result is None:
+            return False, None
+        self.last_frame_number, self.last_timestamp = result
+        return True, frame
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.ring.shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.ring.shape[0])
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.ring.header_f[F_FPS])
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.last_timestamp * 1000
+        return 0.0
+
+    def set(self, prop, value):
+        return False # カメラの設定はデーモンだけが変えられる
+
+    def release(self):
+        if self.opened:
+            self.opened = False
+            self.ring.close()
+
+
+def open_capture(index=0):
+    """デーモンがカメラ index を共有していれば CaptureClient、いなければ cv2.VideoCapture(index)"""
+    try:
+        segment = attach(segment_name(index))
+    except (FileNotFoundError, OSError):
+        return cv2.VideoCapture(index)
+    if np.ndarray(1, np.int64, segment.buf, 0)[0] != MAGIC:
+        segment.close() # 作っている途中か、別物
+        return cv2.VideoCapture(index)
+    ring = FrameRing(segment)
+    if not ring.alive():
+        ring.close() # 前のデーモンが残した共有メモリ
+        return cv2.VideoCapture(index)
+    return CaptureClient(ring, index)
+
+
+def frame_age_ms(capture):
+    """★ 最後に read() した画像を撮ってから経った時間 (ms)。デーモンから読んでいる時だけ分かる
+    (CaptureClient の CAP_PROP_POS_MSEC は time.monotonic() の時刻)。分からなければ 0"""
+    if not getattr(capture, "from_daemon", False):
+        return 0.0 # cv2.VideoCapture の CAP_PROP_POS_MSEC はバックエンドによって意味が違うので使わない
+    timestamp_ms = capture.get(cv2.CAP_PROP_POS_MSEC)
+    if timestamp_ms <= 0:
+        return 0.0
+    return max(0.0, time.monotonic() * 1000 - timestamp_ms)
+
+
+def serve(index):
+    """(デーモン) カメラを開いて、撮った画像を共有メモリに書き続ける"""
+    name = segment_name(index)
+    try:
+        old = attach(name)
+    except FileNotFoundError:
+        old = None
+    if old is not None:
+        ring = FrameRing(old) if np.ndarray(1, np.int64, old.buf, 0)[0] == MAGIC else None
+        if ring is not None and ring.alive():
+            print(f"エラー: カメラ {index} はすでに別のデーモン (pid {int(ring.header[H_PID])}) が共有しています。")
+            ring.close()
+            return 1
+        if ring is not None:
+            ring.close()
+        else:
+            old.close()
+        unlink_segment(old) # 止まったデーモンが残した共有メモリ
+        print(f"[capture] removed stale shared memory {name}")
+
+    capture = cv2.VideoCapture(index)
+    success, frame = capture.read()
+    if not success:
+        print(f"エラー: カメラ {index} を起動できません。")
+        capture.release()
+        return 1
+    ring = FrameRing.create(name, frame.shape)
+    ring.header_f[F_FPS] = capture.get(cv2.CAP_PROP_FPS)
+    print(f"[capture] camera {index} {frame.shape[1]}x{frame.shape[0]} shared as {name}")
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, stack: stopping.append(signum))
+    timestamp = time.monotonic()
+    frame_number = 0
+    failures = 0
+    report_at = timestamp + 5
+    report_frames = 0
+    try:
+        while not stopping:
+            if success and frame.shape == ring.shape:
+                ring.publish(frame, timestamp, frame_number)
+                frame_number += 1
+                report_frames += 1
+            success, frame = capture.read()
+            timestamp = time.monotonic() # この画像を撮った時刻
+            if not success:
+                failures += 1
+                if failures >= REOPEN_AFTER_FAILURES: # 抜けたカメラを開き直す
+                    capture.release()
+                    capture = cv2.VideoCapture(index)
+                    failures = 0
+                    print(f"[capture] camera {index} reopened")
+                time.sleep(0.01)
+                continue
+            failures = 0
+            if timestamp > report_at:
+                print(f"[capture] {report_frames / 5:.1f} fps")
+                report_at = timestamp + 5
+                report_frames = 0
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture.release()
+        segment = ring.segment
+        ring.close()
+        segment.unlink()
+        print(f"[capture] stopped, {name} removed")
+    return 0
+
+
+def preview(index):
+    """(読む側) 観客用のプレビューウィンドウ。ESC で閉じる"""
+    capture = open_capture(index)
+    if not isinstance(capture, CaptureClient):
+        capture.release()
+        print(f"エラー: カメラ {index} の共有デーモンが動いていません。")
+        return 1
+    while True:
+        success, frame = capture.read()
+        if not success:
+            print("Warning: Failed to read frame from capture daemon.")
+            break
+        cv2.imshow("Festival Camera Preview", cv2.flip(frame, 1))
+        if cv2.waitKey(1) & 0xFF == 27:
+            break
+    capture.release()
+    cv2.destroyAllWindows()
+    return 0
+
+
+def record(index, path):
+    """(読む側) デーモンの画像を動画に保存する。Ctrl+C で終了"""
+    capture = open_capture(index)
+    if not isinstance(capture, CaptureClient):
+        capture.release()
+        print(f"エラー: カメラ {index} の共有デーモンが動いていません。")
+        return 1
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    frames = 0
+    try:
+        while True:
+            success, frame = capture.read()
+            if not success:
+                print("Warning: Failed to read frame from capture daemon.")
+                break
+            writer.write(frame) # 書き込みが遅れた分の画像は飛ばされる (デーモンは待たない)
+            frames += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.release()
+        capture.release()
+    print(f"[capture] recorded {frames} frames to {path}")
+    return 0
+
+
+def main():
+    index = camera_index_from_argv()
+    if "--preview" in sys.argv:
+        return preview(index)
+    if "--record" in sys.argv:
+        position = sys.argv.index("--record") + 1
+        path = sys.argv[position] if position < len(sys.argv) else "capture.mp4"
+        return record(index, path)
+    return serve(index)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
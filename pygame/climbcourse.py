@@ -0,0 +1,55 @@
+# --- ★ クライミングのコース (壁とホールド) の生成 ---
+# newgoal / timeattackclimb / oneminuterace で同じ形のコースを作っていたのをまとめる。
+# 画面が無くても動く (convert しない) ので、シーンの load() からランチャーのワーカースレッドで
+# 先に作っておける (メニューで選んでいる間にコースができあがる)。
+#
+# 使い方 (シーンの load() で):
+#   tile = asset_manager.load_unconverted("image/backsnow.png")
+#   wall = build_wall(tile, GAME_PANEL_WIDTH, TOTAL_CLIMB_PIXELS)
+#   holds = generate_holds(asset_manager.image_size("image/blockcatch.png"), TOTAL_CLIMB_PIXELS,
+#                          GAME_PANEL_WIDTH, GAME_HEIGHT, PIXELS_PER_METER, min_hold_y, spacing=PIXELS_PER_METER)
+
+import random
+import pygame
+
+
+def opaque_copy(image):
+    """アルファを捨てたコピー (convert() と同じ見た目。壁のように透明部分の無い画像用)"""
+    return pygame.image.frombytes(pygame.image.tobytes(image, "RGB"), image.get_size(), "RGB")
+
+
+def build_wall(tile, width, height):
+    """tile を縦に並べた width x height の壁の画像"""
+    tile = opaque_copy(tile)
+    wall = pygame.Surface((width, height))
+    tile_height = tile.get_height()
+    for y in range(0, height, tile_height):
+        wall.blit(tile, (0, y))
+    return wall
+
+
+def generate_holds(hold_size, total_pixels, game_width, game_height, pixels_per_meter, min_hold_y, spacing, scale=1.0):
+    """壁の下 (スタート地点) から min_hold_y まで、左右交互に spacing 間隔でホールドを置く。
+    ずらし幅 (10-50px, ±80px) は 1280x720 基準の値に scale (内部解像度の倍率) をかけて使う"""
+    hold_width, hold_height = hold_size
+    holds = []
+    current_y = total_pixels - (game_height // 2)
+    side = 0
+    while current_y > min_hold_y:
+        y_variation = random.randint(-pixels_per_meter // 4, pixels_per_meter // 4)
+        h_y = current_y + y_variation
+        if h_y < min_hold_y:
+            h_y = min_hold_y + random.randint(int(10 * scale), int(50 * scale))
+        if h_y > total_pixels - hold_height:
+             h_y = total_pixels - hold_height - random.randint(int(10 * scale), int(50 * scale))
+
+        x_variation = random.randint(-int(80 * scale), int(80 * scale))
+        if side == 0:
+            h_x = (game_width / 4) - (hold_width / 2) + x_variation
+        else:
+            h_x = (game_width * 3 / 4) - (hold_width / 2) + x_variation
+
+        holds.append(pygame.Rect(h_x, h_y, hold_width, hold_height))
+        current_y -= spacing
+        side = 1 - side
+    return holds
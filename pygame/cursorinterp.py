@@ -0,0 +1,91 @@
+# --- ★ 手のカーソルの補間 (ランドマークのサンプルの間を埋める) ---
+# 手のランドマークはカメラの速さ (15-30Hz) でしか届かないが、画面は 60Hz で描くので、
+# 最後の位置のまま描くとカーソルがカクカク動き、つかむ判定も古い位置で行われる。
+# CursorTrack は直近 2-3 個のサンプル (時刻, x, y) から、描画する時刻の位置を推定する。
+#   ・render_delay_ms = 0 (既定): 最後のサンプルから速度で先読みする (遅れが無い、急に止まると少し行き過ぎる)
+#   ・render_delay_ms > 0: その分だけ過去の時刻を、サンプルの間の直線補間で描く (滑らか、その分遅れる)
+# 先読みは max_extrapolate_ms までで止める (手が止まった/見えなくなった時に飛んでいかないように)。
+#
+# 使い方:
+#   left_track = CursorTrack()
+#   (新しいカメラ画像で手が見つかった時)   left_track.add_sample(frame_time_ms, x, y)
+#   (新しいカメラ画像で手が無かった時)     left_track.clear()
+#   (毎フレーム)
+#   if left_track.position(now_ms, left_cursor_pos):   # 補間した位置をリストに書き込む
+#       ... left_cursor_pos で描画、left_track.measured (最後に測った位置) でも判定できる ...
+
+HISTORY = 3 # 覚えておくサンプルの数
+
+
+class CursorTrack:
+    """1つのカーソルの直近のサンプルを持ち、任意の時刻の位置を補間/先読みする"""
+
+    def __init__(self, render_delay_ms=0.0, max_extrapolate_ms=50.0):
+        self.render_delay_ms = render_delay_ms
+        self.max_extrapolate_ms = max_extrapolate_ms
+        # 古い順に並べたサンプル (リストは作り直さずに値だけ書き換える)
+        self.times = [0.0] * HISTORY
+        self.xs = [0.0] * HISTORY
+        self.ys = [0.0] * HISTORY
+        self.count = 0
+        self.measured = [-100, -100] # 最後に測った位置 (整数)
+
+    def clear(self):
+        """手が見えなくなった時に呼ぶ"""
+        self.count = 0
+        self.measured[0] = self.measured[1] = -100
+
+    @property
+    def active(self):
+        return self.count > 0
+
+    def add_sample(self, t_ms, x, y):
+        """カメラ画像の時刻 t_ms (ms) に測った位置を追加する"""
+        if self.count and t_ms <= self.times[self.count - 1]:
+            # 同じ画像から2回呼ばれた時などは最新の値を置き換えるだけ
+            self.xs[self.count - 1] = x
+            self.ys[self.count - 1] = y
+        else:
+            if self.count == HISTORY:
+                for i in range(HISTORY - 1): # 一番古いものを捨てて詰める
+                    self.times[i] = self.times[i + 1]
+                    self.xs[i] = self.xs[i + 1]
+                    self.ys[i] = self.ys[i + 1]
+            else:
+                self.count += 1
+            last = self.count - 1
+            self.times[last] = t_ms
+            self.xs[last] = x
+            self.ys[last] = y
+        self.measured[0] = int(x)
+        self.measured[1] = int(y)
+
+    def position(self, now_ms, out):
+        """now_ms に描く位置を out ([x, y] のリスト) に書き込む。サンプルが無ければ False"""
+        count = self.count
+        if count == 0:
+            return False
+        last = count - 1
+        t = now_ms - self.render_delay_ms
+        if count == 1 or t <= self.times[0]:
+            out[0] = int(self.xs[0])
+            out[1] = int(self.ys[0])
+            return True
+
+        if t <= self.times[last]:
+            # サンプルの間: 挟んでいる2つを直線補間
+            i = 1
+            while self.times[i] < t:
+                i += 1
+            t0, t1 = self.times[i - 1], self.times[i]
+            alpha = (t - t0) / (t1 - t0)
+            out[0] = int(self.xs[i - 1] + (self.xs[i] - self.xs[i - 1]) * alpha)
+            out[1] = int(self.ys[i - 1] + (self.ys[i] - self.ys[i - 1]) * alpha)
+            return True
+
+        # 最後のサンプルより後: 一番古いサンプルからの平均速度で先読みする (3点使うと手ぶれで揺れにくい)
+        span = self.times[last] - self.times[0]
+        ahead = min(t - self.times[last], self.max_extrapolate_ms)
+        out[0] = int(self.xs[last] + (self.xs[last] - self.xs[0]) / span * ahead)
+        out[1] = int(self.ys[last] + (self.ys[last] - self.ys[0]) / span * ahead)
+        return True
@@ -0,0 +1,74 @@
+# --- ★ ダーティ矩形による部分画面更新 ---
+# 左カラム (スコア / ログ / カメラ) は内容が変わった時だけ描き直し、
+# 画面更新は pygame.display.flip() ではなく pygame.display.update(rects) で
+# 変化した矩形だけを送る。 (内蔵GPUやソフトウェアSDLでの転送量を減らす)
+#
+# 使い方:
+#   panels = DirtyPanels()
+#   if panels.needs_redraw(SCORE_PANEL_RECT, (score, time_str)):
+#       ... スコアパネルを描き直す ...
+#   panels.mark(GAME_PANEL_RECT)   # 毎フレーム描き直す領域
+#   panels.present()               # flip() の代わり
+
+import pygame
+
+# ウィンドウが隠れた/戻った時などに出るイベント (全体を描き直す必要がある)
+EXPOSE_EVENTS = tuple(
+    getattr(pygame, name) for name in ("VIDEOEXPOSE", "WINDOWEXPOSED", "WINDOWRESTORED")
+    if hasattr(pygame, name)
+)
+
+_NO_KEY = object() # まだ一度も描いていないパネル用
+
+
+class DirtyPanels:
+    """パネルごとの「内容キー」を覚えておき、変化したパネルだけ再描画・転送する"""
+
+    def __init__(self):
+        self.panel_keys = {}
+        self.dirty_rects = []
+        self._spare_rects = []
+        self.full_update = True # 初回は画面全体を送る
+
+    def needs_redraw(self, rect, key):
+        """内容キーが前回と違えば True を返し、その矩形を今フレームの更新対象にする"""
+        rect_key = tuple(rect)
+        if self.panel_keys.get(rect_key, _NO_KEY) == key:
+            return False
+        self.panel_keys[rect_key] = key
+        self.dirty_rects.append(rect)
+        return True
+
+    def mark(self, rect):
+        """毎フレーム描き直す領域 (ゲームパネルなど) を更新対象に加える"""
+        self.dirty_rects.append(rect)
+
+    def invalidate(self):
+        """全パネルを次フレームで描き直し、画面全体を転送する"""
+        self.panel_keys.clear()
+        self.full_update = True
+
+    def handle_event(self, event):
+        if event.type in EXPOSE_EVENTS:
+            self.invalidate()
+
+    def take_dirty_rects(self):
+        """★ 今フレームに送る矩形のリストを返してリセットする (画面全体を送る時は None)"""
+        if self.full_update:
+            self.full_update = False
+            self.dirty_rects.clear()
+            return None
+        # ★ 2つのリストを交互に使う (毎フレームリストを作らない)。返したリストは次に呼ぶまで有効
+        rects = self.dirty_rects
+        self.dirty_rects = self._spare_rects
+        self.dirty_rects.clear()
+        self._spare_rects = rects
+        return rects
+
+    def present(self):
+        """pygame.display.flip() の代わりに呼ぶ"""
+        rects = self.take_dirty_rects()
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
@@ -0,0 +1,143 @@
+# --- ★ 敵の群れを NumPy 配列でまとめて動かす (Structure of Arrays) ---
+# 敵1体ごとの Sprite / Vector2 計算をやめ、位置・速度・HP・種類を配列で持つ。
+# 移動・壁での反射・デコピンの当たり判定 (円 vs 矩形) を配列演算で一括処理し、
+# 描画は Surface.blits でまとめて行う。敵の数が数千体になってもほぼ同じコストで回る。
+
+import random
+import numpy as np
+
+
+class EnemySwarm:
+    """敵の群れ。生きている敵は配列の先頭 count 個に詰めて持つ"""
+
+    def __init__(self, damage_images, max_hp, width, height, capacity=64):
+        # damage_images: {種類: {hp: Surface}} / max_hp: {種類: 最大HP}
+        self.type_names = list(damage_images.keys())
+        self.type_index = {name: i for i, name in enumerate(self.type_names)}
+        self.images_by_type = [damage_images[name] for name in self.type_names]
+        self.max_hp_by_type = [max_hp[name] for name in self.type_names]
+        self.size_by_type = [damage_images[name][max_hp[name]].get_size() for name in self.type_names]
+        self.bounds = np.array([width, height], dtype=np.float64)
+
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float64) # 左上の座標
+        self.prev_pos = np.zeros((capacity, 2), dtype=np.float64) # ★ 1つ前のステップの座標 (描画の補間用)
+        self.vel = np.zeros((capacity, 2), dtype=np.float64) # 1ステップあたりの移動量
+        self.size = np.zeros((capacity, 2), dtype=np.float64)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.kind = np.zeros(capacity, dtype=np.int16)
+        self.images = [] # 現在のHPに対応する画像 (blits 用、配列と同じ並び)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        capacity = len(self.hp) * 2
+        for name in ("pos", "prev_pos", "vel", "size"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, 2), dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        for name in ("hp", "kind"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def clear(self):
+        self.count = 0
+        self.images.clear()
+
+    def spawn(self, enemy_type, x, y, vx, vy):
+        """指定位置・速度で敵を1体追加し、その添字を返す"""
+        if self.count == len(self.hp):
+            self._grow()
+        t = self.type_index[enemy_type]
+        i = self.count
+        hp = self.max_hp_by_type[t]
+        self.pos[i] = (x, y)
+        self.prev_pos[i] = (x, y)
+        self.vel[i] = (vx, vy)
+        self.size[i] = self.size_by_type[t]
+        self.hp[i] = hp
+        self.kind[i] = t
+        self.images.append(self.images_by_type[t][hp])
+        self.count += 1
+        return i
+
+    def spawn_random_corner(self, enemy_type, padding=30):
+        """四隅のどこかに出現させ、画面中央に向かって動かす"""
+        w, h = self.size_by_type[self.type_index[enemy_type]]
+        bound_w, bound_h = self.bounds
+        corner = random.randint(0, 3) # 0:左上, 1:右上, 2:左下, 3:右下
+        x = padding if corner in (0, 2) else bound_w - padding - w
+        y = padding if corner in (0, 1) else bound_h - padding - h
+
+        # 画面中央に向かうように初期方向を調整
+        dx = bound_w / 2 - (x + w / 2)
+        dy = bound_h / 2 - (y + h / 2)
+        length = np.hypot(dx, dy) or 1.0
+        speed = random.randint(1, 3) # 移動速度
+        return self.spawn(enemy_type, x, y, dx / length * speed, dy / length * speed)
+
+    def update(self):
+        """全ての敵を1ステップ分動かし、画面端で反射させる"""
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        self.prev_pos[:n] = pos
+        vel = self.vel[:n]
+        max_pos = self.bounds - self.size[:n]
+
+        pos += vel
+        out_of_bounds = (pos < 0) | (pos > max_pos)
+        vel[out_of_bounds] *= -1
+        np.clip(pos, 0, max_pos, out=pos)
+
+    def hit_circle(self, cx, cy, radius):
+        """円 (デコピンの範囲) と重なっている敵の添字を返す"""
+        n = self.count
+        if n == 0:
+            return np.empty(0, dtype=np.intp)
+        pos = self.pos[:n]
+        far = pos + self.size[:n]
+        # 矩形の中で円の中心に一番近い点までの距離で判定する
+        nearest_x = np.clip(cx, pos[:, 0], far[:, 0])
+        nearest_y = np.clip(cy, pos[:, 1], far[:, 1])
+        dist_sq = (nearest_x - cx) ** 2 + (nearest_y - cy) ** 2
+        return np.flatnonzero(dist_sq <= radius * radius)
+
+    def damage(self, indices, amount=1):
+        """指定した敵にダメージを与え、倒した数を返す (倒した敵は取り除く)"""
+        if len(indices) == 0:
+            return 0
+        self.hp[indices] -= amount
+        alive = np.ones(self.count, dtype=bool)
+        for i in indices:
+            hp = int(self.hp[i])
+            if hp > 0:
+                # ★ HPが変わった敵だけ画像を差し替える
+                self.images[i] = self.images_by_type[self.kind[i]][hp]
+            else:
+                alive[i] = False
+
+        killed = self.count - int(np.count_nonzero(alive))
+        if killed:
+            n = self.count
+            m = n - killed
+            for name in ("pos", "prev_pos", "vel", "size", "hp", "kind"):
+                arr = getattr(self, name)
+                arr[:m] = arr[:n][alive]
+            self.images = [img for img, keep in zip(self.images, alive) if keep]
+            self.count = m
+        return killed
+
+    def draw(self, surface, alpha=1.0):
+        """全ての敵を blits でまとめて描画する (★ Surface でも renderbackend のキャンバスでもよい。alpha は前のステップとの補間係数)"""
+        n = self.count
+        if n == 0:
+            return
+        prev = self.prev_pos[:n]
+        positions = (prev + (self.pos[:n] - prev) * alpha).astype(np.int32).tolist()
+        surface.blits(zip(self.images, positions), doreturn=False)
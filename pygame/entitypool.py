@@ -0,0 +1,165 @@
+# --- ★ 弾・エフェクト用のエンティティプール ---
+# 弾やヒットエフェクトを [Rect, 'type', speed, ...] のようなリストで持ち、
+# 毎フレーム list.remove() するのをやめて、配列 (NumPy) のスロットで管理する。
+# - spawn / despawn は空きスロットの使い回しなので O(1) (リストの作り直しなし)
+# - spawn が返すハンドルは (スロット番号 + 世代) なので、消えた弾のハンドルは無効になる
+# - 移動・アニメーション・寿命 (タイマー) は update() で一括処理、描画は Surface.blits で一括
+#
+# 使い方:
+#   balls = EntityPool()
+#   handle = balls.spawn(ball_rect, vx=vx, vy=vy, frames=[img_ball])
+#   for _ in range(sim_steps):              # ★ fixedstep の固定ステップごとに進める
+#       balls.update(fixed_step.step_ms)
+#   for slot in balls.live_slots():
+#       if balls.rect(slot).colliderect(player_rect):
+#           balls.despawn_slot(slot)
+#   balls.draw(game_surface, fixed_step.alpha) # ★ ステップの間を補間して描く
+
+import numpy as np
+import pygame
+
+HANDLE_SLOT_BITS = 20 # ハンドル = 世代 << 20 | スロット番号
+
+
+class EntityPool:
+    """位置・速度・アニメーション・寿命を配列で持つ弾/エフェクトの入れ物"""
+
+    def __init__(self, capacity=32):
+        self.x = np.zeros(capacity, dtype=np.float64) # 左上の座標
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.w = np.zeros(capacity, dtype=np.int32)
+        self.h = np.zeros(capacity, dtype=np.int32)
+        self.prev_x = np.zeros(capacity, dtype=np.float64) # ★ 1つ前のステップの座標 (描画の補間用)
+        self.prev_y = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64) # 1ステップあたりの移動量
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.frame = np.zeros(capacity, dtype=np.float64) # アニメーションのコマ (小数)
+        self.frame_step = np.zeros(capacity, dtype=np.float64) # 1ステップで進むコマ数
+        self.frame_count = np.ones(capacity, dtype=np.int32)
+        self.loop = np.zeros(capacity, dtype=bool) # True: 最後のコマの次は最初に戻る / False: 最後で止まる
+        self.timer = np.zeros(capacity, dtype=np.float64) # 残り時間 (ms)
+        self.has_timer = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.generation = np.zeros(capacity, dtype=np.int64)
+        self.kind = [None] * capacity # 'kidan', 'hado' など
+        self.frames = [None] * capacity # アニメーションの画像リスト
+        self._rects = [pygame.Rect(0, 0, 0, 0) for _ in range(capacity)]
+        self._free = list(range(capacity - 1, -1, -1)) # 空きスロット (末尾から使う)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _grow(self):
+        old = len(self.alive)
+        capacity = old * 2
+        for name in ("x", "y", "prev_x", "prev_y", "w", "h", "vx", "vy", "frame", "frame_step", "frame_count",
+                     "loop", "timer", "has_timer", "alive", "generation"):
+            arr = getattr(self, name)
+            new = np.zeros(capacity, dtype=arr.dtype)
+            new[:old] = arr
+            setattr(self, name, new)
+        self.frame_count[old:] = 1
+        self.kind.extend([None] * old)
+        self.frames.extend([None] * old)
+        self._rects.extend(pygame.Rect(0, 0, 0, 0) for _ in range(old))
+        self._free.extend(range(capacity - 1, old - 1, -1))
+
+    def spawn(self, rect, kind=None, vx=0, vy=0, frames=None, frame_step=0.0, loop=True, timer=None):
+        """弾/エフェクトを1つ出してハンドルを返す。timer (ms) を指定すると時間切れで自動的に消える"""
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.x[slot], self.y[slot] = rect[0], rect[1]
+        self.prev_x[slot], self.prev_y[slot] = rect[0], rect[1]
+        self.w[slot], self.h[slot] = rect[2], rect[3]
+        self.vx[slot], self.vy[slot] = vx, vy
+        self.frame[slot] = 0
+        self.frame_step[slot] = frame_step
+        self.frame_count[slot] = len(frames) if frames else 1
+        self.loop[slot] = loop
+        self.has_timer[slot] = timer is not None
+        self.timer[slot] = timer or 0
+        self.alive[slot] = True
+        self.kind[slot] = kind
+        self.frames[slot] = frames
+        self._count += 1
+        return int(self.generation[slot]) << HANDLE_SLOT_BITS | slot
+
+    def slot_of(self, handle):
+        """ハンドルのスロット番号 (もう消えている場合は None)"""
+        slot = handle & ((1 << HANDLE_SLOT_BITS) - 1)
+        if slot < len(self.alive) and self.alive[slot] and self.generation[slot] == handle >> HANDLE_SLOT_BITS:
+            return slot
+        return None
+
+    def is_alive(self, handle):
+        return self.slot_of(handle) is not None
+
+    def despawn(self, handle):
+        slot = self.slot_of(handle)
+        if slot is not None:
+            self.despawn_slot(slot)
+
+    def despawn_slot(self, slot):
+        if not self.alive[slot]:
+            return
+        self.alive[slot] = False
+        self.generation[slot] += 1 # 古いハンドルを無効にする
+        self.kind[slot] = None
+        self.frames[slot] = None
+        self._free.append(slot)
+        self._count -= 1
+
+    def clear(self):
+        for slot in self.live_slots():
+            self.despawn_slot(slot)
+
+    def live_slots(self):
+        """生きているスロット番号のリスト (ループ中に despawn_slot しても安全)"""
+        return np.flatnonzero(self.alive).tolist()
+
+    def rect(self, slot):
+        """スロットの現在の矩形 (スロットごとに使い回す Rect なので保存しないこと)"""
+        r = self._rects[slot]
+        r.update(int(self.x[slot]), int(self.y[slot]), int(self.w[slot]), int(self.h[slot]))
+        return r
+
+    def query_rect(self, rect):
+        """rect と重なっている生きたスロット番号のリスト"""
+        left, top = np.trunc(self.x), np.trunc(self.y)
+        hit = self.alive & (left < rect.right) & (left + self.w > rect.left) \
+            & (top < rect.bottom) & (top + self.h > rect.top)
+        return np.flatnonzero(hit).tolist()
+
+    def update(self, delta_time_ms):
+        """全スロットの移動・アニメーション・寿命を1ステップ分 (delta_time_ms) 一括で進める"""
+        alive = self.alive
+        np.copyto(self.prev_x, self.x)
+        np.copyto(self.prev_y, self.y)
+        self.x[alive] += self.vx[alive]
+        self.y[alive] += self.vy[alive]
+
+        self.frame[alive] += self.frame_step[alive]
+        last = self.frame_count - 1
+        looping = alive & self.loop
+        self.frame[looping] %= self.frame_count[looping]
+        clamped = alive & ~self.loop
+        self.frame[clamped] = np.minimum(self.frame[clamped], last[clamped])
+
+        timed = alive & self.has_timer
+        self.timer[timed] -= delta_time_ms
+        for slot in np.flatnonzero(timed & (self.timer <= 0)).tolist():
+            self.despawn_slot(slot)
+
+    def draw(self, surface, alpha=1.0):
+        """生きているスロットを Surface.blits でまとめて描画する (★ alpha: 前のステップとの補間係数)"""
+        slots = np.flatnonzero(self.alive)
+        if len(slots) == 0:
+            return
+        prev_x, prev_y = self.prev_x[slots], self.prev_y[slots]
+        xs = np.trunc(prev_x + (self.x[slots] - prev_x) * alpha).astype(np.int32).tolist()
+        ys = np.trunc(prev_y + (self.y[slots] - prev_y) * alpha).astype(np.int32).tolist()
+        frame_indices = self.frame[slots].astype(np.int32).tolist()
+        surface.blits([(self.frames[slot][f], (x, y))
+                       for slot, f, x, y in zip(slots.tolist(), frame_indices, xs, ys)], doreturn=False)
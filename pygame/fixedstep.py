@@ -0,0 +1,77 @@
+# --- ★ 固定タイムステップ (物理の更新を画面のフレームレートから切り離す) ---
+# 重力・敵の移動・弾の速度は「1ステップあたり」で書いておき、描画のフレーム時間を
+# アキュムレーターに貯めて、決まった間隔 (SIM_HZ) のステップを必要な回数だけ進める。
+# 30 / 60 / 120 Hz のどの画面でも、負荷でフレームが落ちても、ゲームの速さは変わらない。
+# ★ ステップの間隔は、値をどの速さで決めたかに合わせる (下の SIM_HZ と CAMERA_PACED_HZ)。
+# 描画は「1つ前のステップ」と「今のステップ」の間を alpha で補間して、動きを滑らかにする。
+#
+# 使い方:
+#   FPS = display_fps_from_argv()          # 画面のフレームレート (--fps)
+#   fixed_step = FixedStep(hz=SIM_HZ)
+#   while running:
+#       sim_steps = fixed_step.advance(clock.get_time())
+#       for _ in range(sim_steps):
+#           enemy.update()                 # 1ステップ分だけ動かす (prev_y を覚えておく)
+#       enemy.draw(surface, fixed_step.alpha)  # prev_y と y の間を補間して描く
+#       clock.tick(FPS)
+
+import os
+import sys
+
+SIM_HZ = 60 # 物理を進める間隔の既定値 (1秒あたりのステップ数)
+# ★ 今までのゲームの「1フレームあたり」の値 (重力 0.8 など) は clock.tick(60) のつもりで書いてあるが、
+#   ループが毎フレーム cap.read() でカメラの次の画像を待っていたので、実際には 30 fps のウェブカメラの
+#   速さ (1秒に30回) で進んでいた。その値を変えずに「1ステップあたり」として使うゲームは、
+#   この間隔で進めると、遊んでいた時と同じ実際の速さになる。
+CAMERA_PACED_HZ = 30
+MAX_STEPS_PER_FRAME = 5 # 1フレームで進めるステップの上限 (これを超えた遅れは捨てて、ゲームを遅くする)
+MIN_FPS, MAX_FPS = 15, 240
+
+
+def display_fps_from_argv(argv=None, default=60):
+    """--fps 120 (無ければ環境変数 FESTIVAL_FPS) で選ばれた画面のフレームレート"""
+    argv = sys.argv if argv is None else argv
+    value = os.environ.get("FESTIVAL_FPS", default)
+    if "--fps" in argv:
+        index = argv.index("--fps") + 1
+        if index < len(argv):
+            value = argv[index]
+    try:
+        fps = int(value)
+    except ValueError:
+        print(f"警告: フレームレート '{value}' は数値ではありません。{default} で動かします。")
+        return default
+    return max(MIN_FPS, min(MAX_FPS, fps))
+
+
+def lerp(a, b, alpha):
+    """a から b へ alpha (0.0 - 1.0) だけ進んだ値"""
+    return a + (b - a) * alpha
+
+
+class FixedStep:
+    """フレーム時間をアキュムレーターに貯め、固定間隔のステップ数と補間係数を返す"""
+
+    def __init__(self, hz=SIM_HZ, max_steps=MAX_STEPS_PER_FRAME):
+        self.hz = hz
+        self.step_ms = 1000.0 / hz
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.alpha = 0.0 # 描画の補間係数 (前のステップ 0.0 - 今のステップ 1.0)
+        self.dropped_ms = 0.0 # 追いつけずに捨てた時間の合計
+
+    def advance(self, frame_ms):
+        """前のフレームにかかった時間 (ms) を渡し、このフレームで進めるステップ数を返す"""
+        self.accumulator += frame_ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps: # 重すぎる時は追いかけ続けない (処理が雪だるま式に増えないように)
+            self.dropped_ms += (steps - self.max_steps) * self.step_ms
+            steps = self.max_steps
+            self.accumulator = self.step_ms * steps + self.accumulator % self.step_ms
+        self.accumulator -= steps * self.step_ms
+        self.alpha = self.accumulator / self.step_ms
+        return steps
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 0.0
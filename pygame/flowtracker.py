@@ -0,0 +1,222 @@
+# --- ★ MediaPipe の推論の間を、オプティカルフローでつなぐ ---
+# 手は1フレームの間にはほとんど動かないのに、今は毎フレーム MediaPipe の推論 (手のひらの検出 + ランドマーク) を
+# 走らせている。FlowTrackedHands は推論を every フレームに1回だけ行い、その間のフレームでは
+# 主なランドマーク (手首・指の付け根 (MCP)・指先) を、縮小したグレースケール画像の上で
+# cv2.calcOpticalFlowPyrLK で追いかける。それ以外のランドマークは、追えた点の平均の移動量だけ平行移動する。
+#   ・次の推論で位置を付け直し (re-anchor)、その時の「追いかけた位置と推論した位置のずれ」(drift) を記録する
+#   ・追えた点が半分より少ない手は捨て、次のフレームで推論し直す
+#   ・推論で手が見つからなかった時は、次のフレームも推論する (手が入ってきたのをすぐに見つけるため)
+# 結果は Hands.process() と同じ形 (multi_hand_landmarks / multi_handedness) なので、ゲーム側はそのまま使える。
+# (推論を待たない --tracker tasks とは組み合わせず、solutions の Hands で使う想定)
+#
+# 使い方 (リポジトリのルートで):
+#   python pygame/newgoal.py --flow-every 3       # 推論は3フレームに1回
+#   python pygame/launcher.py --flow-every 2
+# 推論の回数と精度の比較 (録画した動画で、毎フレーム推論した結果を正解として比べる):
+#   python pygame/flowtracker.py --video capture.mp4             # every = 1, 2, 3, 5
+#   python pygame/flowtracker.py --video capture.mp4 --flow-every 4
+
+import sys
+import time
+import cv2
+import numpy as np
+
+FLOW_WIDTH = 320 # オプティカルフローを計算する画像の幅
+# 追いかけるランドマーク: 手首, 親指〜小指の MCP (親指は CMC の次の MCP), 親指〜小指の先
+KEY_LANDMARKS = (0, 2, 5, 9, 13, 17, 4, 8, 12, 16, 20)
+LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+MIN_TRACKED_RATIO = 0.5 # 追えた点がこれより少ない手は見失ったとみなす
+REPORT_EVERY = 900 # このフレーム数ごとに推論の回数と drift を表示する (30fps で 30秒)
+
+
+def flow_every_from_argv(argv=None, default=1):
+    """--flow-every 3 で指定された、推論を何フレームに1回にするか (1 ならオプティカルフローを使わない)"""
+    argv = sys.argv if argv is None else argv
+    if "--flow-every" in argv:
+        index = argv.index("--flow-every") + 1
+        if index < len(argv) and argv[index].isdigit():
+            return max(1, int(argv[index]))
+    return default
+
+
+class FlowResult:
+    """Hands.process() の戻り値と同じ形の結果"""
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None, inferred=True):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+        self.inferred = inferred # False ならオプティカルフローで動かした結果
+
+
+class FlowTrackedHands:
+    """hands (mp.solutions.hands.Hands など) の推論を every フレームに1回にし、間をオプティカルフローで埋める"""
+
+    def __init__(self, hands, every=3):
+        from mediapipe.framework.formats import landmark_pb2
+        self._landmark_pb2 = landmark_pb2
+        self.hands = hands
+        self.every = every
+        self.since_inference = every # 次のフレームで推論する
+        self.prev_gray = None
+        self.tracked = [] # 手ごとの 21x2 のランドマーク (正規化座標)
+        self.z = [] # 手ごとの 21 個の z (推論した時の値のまま)
+        self.handedness = [] # 手ごとの ClassificationList
+        # 統計 (report() で表示する)
+        self.frames = 0
+        self.inferences = 0
+        self.drift_sum = 0.0
+        self.drift_max = 0.0
+        self.drift_count = 0
+        self.lost_hands = 0
+
+    def small_gray(self, image_rgb):
+        height, width = image_rgb.shape[:2]
+        size = (FLOW_WIDTH, round(height * FLOW_WIDTH / width))
+        return cv2.resize(cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY), size, interpolation=cv2.INTER_AREA)
+
+    def process(self, image_rgb):
+        """every フレームに1回は推論、それ以外はオプティカルフローで動かした結果を返す"""
+        self.frames += 1
+        gray = self.small_gray(image_rgb)
+        if self.tracked and self.every > 1 and self.prev_gray.shape == gray.shape:
+            self.propagate(gray) # 推論するフレームでも追いかけておく (推論の結果と比べて drift を測る)
+        if not self.tracked or self.since_inference >= self.every:
+            result = self.infer(image_rgb)
+        else:
+            self.since_inference += 1
+            result = FlowResult(self.landmark_lists(), self.handedness, inferred=False)
+        self.prev_gray = gray
+        if self.frames % REPORT_EVERY == 0:
+            print(self.report())
+        return result
+
+    def infer(self, image_rgb):
+        """推論して位置を付け直す。直前まで追いかけていた手とのずれを drift として記録する"""
+        results = self.hands.process(image_rgb)
+        self.inferences += 1
+        self.since_inference = 1
+        inferred = [np.array([(p.x, p.y) for p in points.landmark], np.float32)
+                    for points in (results.multi_hand_landmarks or [])]
+        if self.tracked and inferred and self.every > 1:
+            for points in self.tracked:
+                # 手首が一番近い推論結果の手と比べる (主なランドマークの平均のずれ、画像の幅・高さに対する割合)
+                nearest = min(inferred, key=lambda other: np.linalg.norm(other[0] - points[0]))
+                drift = float(np.mean(np.linalg.norm(nearest[list(KEY_LANDMARKS)] - points[list(KEY_LANDMARKS)], axis=1)))
+                self.drift_sum += drift
+                self.drift_max = max(self.drift_max, drift)
+                self.drift_count += 1
+        self.tracked = inferred
+        self.handedness = list(results.multi_handedness or [])
+        self.z = [[p.z for p in points.landmark] for points in (results.multi_hand_landmarks or [])]
+        return results
+
+    def propagate(self, gray):
+        """前のフレームから主なランドマークを追いかけ、他のランドマークは平均の移動量だけ動かす"""
+        height, width = gray.shape
+        scale = np.array([width, height], np.float32)
+        keys = list(KEY_LANDMARKS)
+        points = np.concatenate([hand[keys] for hand in self.tracked]) * scale
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points.reshape(-1, 1, 2), None, **LK_PARAMS)
+        moved = moved.reshape(-1, 2) / scale
+        status = status.reshape(-1).astype(bool)
+        kept = []
+        kept_handedness = []
+        kept_z = []
+        for i, hand in enumerate(self.tracked):
+            part = slice(i * len(keys), (i + 1) * len(keys))
+            ok = status[part]
+            if ok.mean() < MIN_TRACKED_RATIO:
+                self.lost_hands += 1
+                continue
+            offset = (moved[part][ok] - hand[keys][ok]).mean(axis=0)
+            hand = hand + offset # 追いかけていない点は平行移動
+            hand[np.array(keys)[ok]] = moved[part][ok]
+            kept.append(hand)
+            kept_handedness.append(self.handedness[i])
+            kept_z.append(self.z[i])
+        if len(kept) < len(self.tracked):
+            self.since_inference = self.every # 見失った手があるので、このフレーム (次のフレーム) で推論し直す
+        self.tracked = kept
+        self.handedness = kept_handedness
+        self.z = kept_z
+
+    def landmark_lists(self):
+        """追いかけている手を NormalizedLandmarkList (Hands の結果と同じ型) にする"""
+        if not self.tracked:
+            return None
+        landmark_pb2 = self._landmark_pb2
+        return [
+            landmark_pb2.NormalizedLandmarkList(landmark=[
+                landmark_pb2.NormalizedLandmark(x=x, y=y, z=z) for (x, y), z in zip(hand.tolist(), zs)
+            ])
+            for hand, zs in zip(self.tracked, self.z)
+        ]
+
+    def report(self):
+        saved = 1 - self.inferences / max(1, self.frames)
+        drift = self.drift_sum / max(1, self.drift_count)
+        return (f"[flow] every {self.every}: {self.inferences}/{self.frames} inferences ({saved * 100:.0f}% saved),"
+                f" drift avg {drift:.4f} max {self.drift_max:.4f}, lost {self.lost_hands}")
+
+    def close(self):
+        self.hands.close()
+
+
+if __name__ == "__main__":
+    import mediapipe as mp
+    from capturedaemon import camera_index_from_argv, open_capture
+
+    FRAMES = 300
+    SETTINGS = dict(max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    # 同じ画像をすべての設定に渡すため、先に全部読んでおく (ゲームと同じく左右反転して RGB にする)
+    if "--video" in sys.argv:
+        source = cv2.VideoCapture(sys.argv[sys.argv.index("--video") + 1])
+        limit = None
+    else:
+        source = open_capture(camera_index_from_argv())
+        limit = FRAMES
+    frames = []
+    while limit is None or len(frames) < limit:
+        success, image = source.read()
+        if not success:
+            break
+        frames.append(cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB))
+    source.release()
+    if not frames:
+        sys.exit("画像を読めませんでした。")
+    everies = [flow_every_from_argv(default=1)] if "--flow-every" in sys.argv else [1, 2, 3, 5]
+    print(f"{len(frames)} 枚 ({frames[0].shape[1]}x{frames[0].shape[0]})、正解は毎フレームの推論")
+
+    # 正解: 毎フレーム推論した主なランドマーク
+    hands = mp.solutions.hands.Hands(**SETTINGS)
+    truth = []
+    for image in frames:
+        results = hands.process(image)
+        truth.append([np.array([(p.x, p.y) for p in points.landmark], np.float32)[list(KEY_LANDMARKS)]
+                      for points in (results.multi_hand_landmarks or [])])
+    hands.close()
+
+    print(f"{'every':>6} {'ms/frame':>9} {'inferences':>11} {'error avg':>10} {'error p95':>10} {'missed':>7}")
+    for every in everies:
+        tracker = FlowTrackedHands(mp.solutions.hands.Hands(**SETTINGS), every)
+        errors = []
+        missed = 0 # 正解にある手が結果に無かった数
+        start = time.perf_counter()
+        for image, expected in zip(frames, truth):
+            results = tracker.process(image)
+            found = [np.array([(p.x, p.y) for p in points.landmark], np.float32)[list(KEY_LANDMARKS)]
+                     for points in (results.multi_hand_landmarks or [])]
+            for points in expected:
+                if not found:
+                    missed += 1
+                    continue
+                nearest = min(found, key=lambda other: np.linalg.norm(other[0] - points[0]))
+                errors.append(float(np.mean(np.linalg.norm(nearest - points, axis=1))))
+        elapsed_ms = (time.perf_counter() - start) * 1000 / len(frames)
+        tracker.close()
+        print(f"{every:>6} {elapsed_ms:>9.2f} {tracker.inferences:>11}"
+              f" {np.mean(errors) if errors else float('nan'):>10.4f}"
+              f" {np.percentile(errors, 95) if errors else float('nan'):>10.4f} {missed:>7}")
+    print("error: 主なランドマークの平均のずれ (画像の幅・高さに対する割合)")
@@ -0,0 +1,197 @@
+# --- ★ ゲーム共通のランタイム (カメラ・MediaPipe・終了処理) ---
+# 各ゲームはカメラと MediaPipe をここから受け取る。
+#   ・1本のゲームを直接起動した時 (python pygame/newgoal.py): 今までどおり自分で開いて、終わったら閉じる
+#   ・ランチャーから起動した時 (python pygame/launcher.py): ランチャーが開いたカメラと MediaPipe を
+#     全ゲームで使い回す (ゲームの切り替えでカメラを開き直したり、モデルを読み直したりしない)
+#
+# 使い方 (ゲーム側):
+#   from gameruntime import runtime
+#   hands = runtime.hands(max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7)
+#   cap = runtime.open_camera(0)
+#   for event in pygame.event.get():
+#       if runtime.is_exit_event(event):   # ウィンドウを閉じた (ランチャーからなら ESC でも戻る)
+#           running = False
+#   ...
+#   cap.release()          # ランチャーから起動した時は何もしない (カメラは開いたまま)
+#   runtime.shutdown()     # cv2.destroyAllWindows() + pygame.quit() の代わり
+#
+# ★ supervisor (pygame/supervisor.py) の下で動いている時は、runtime.heartbeat() で止まっていないことを、
+#   runtime.report_score() でラウンドの結果を supervisor に知らせる (単体で起動した時は何もしない)。
+# ★ カメラ共有デーモン (pygame/capturedaemon.py) が動いていれば、open_camera() はカメラを直接開かずに
+#   デーモンの共有メモリから読む (録画やプレビューと同時にカメラを使える)。
+# ★ --tracker tasks (pygame/trackerbackend.py) なら、hands() は推論を待たない HandLandmarker (LIVE_STREAM) を返す。
+# ★ --flow-every 3 (pygame/flowtracker.py) なら、hands() の推論は3フレームに1回で、間はオプティカルフローで追いかける。
+# ★ --motion-gate (pygame/motiongate.py) なら、誰も動いていない間と同じ画像が続く間は hands() の推論を飛ばす。
+# ★ --holistic split (pygame/splitholistic.py) なら、holistic() は Pose と Hands を別々のプロセスで動かす。
+# ★ --qos (pygame/qosgovernor.py) なら、hands() / holistic() の推論は負荷に応じて画像を縮め、軽い設定で作り直す。
+#   open_camera() のカメラは、次の画像を待った時間を qos に知らせる (待ち時間は負荷に数えない)。
+# ★ hands(profile="rulercatch", ...) なら、pygame/handtuner.py が決めた profile/rulercatch.json の設定で上書きする。
+
+import cv2
+import pygame
+from capturedaemon import open_capture
+from flowtracker import FlowTrackedHands, flow_every_from_argv
+from handtuner import apply_profile
+from motiongate import MotionGatedHands, motion_gate_from_argv
+from qosgovernor import QoSCamera, QoSModel, qos_from_argv
+from splitholistic import create_holistic, holistic_mode_from_argv
+from trackerbackend import create_hands, tracker_from_argv
+
+STARTUP_GRACE_MS = 15000 # ★ 画像の読み込み・ウィンドウやカメラを開く間は、これだけ心拍が来なくても止まったとみなさない
+
+
+class SharedCamera:
+    """cv2.VideoCapture の代わり。ランチャーから起動したゲームが release() しても閉じない"""
+
+    def __init__(self, index=0):
+        self.index = index
+        self.capture = open_capture(index) # ★ デーモンが動いていれば共有メモリから読む
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def read(self):
+        return self.capture.read()
+
+    def grab(self):
+        return self.capture.grab()
+
+    def retrieve(self):
+        return self.capture.retrieve()
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value)
+
+    @property
+    def from_daemon(self):
+        return getattr(self.capture, "from_daemon", False) # ★ capturedaemon.frame_age_ms() 用
+
+    def release(self):
+        pass # ゲームの終了・クリア時に呼ばれても開いたままにする (次のゲームで開き直さない)
+
+    def reopen(self):
+        """閉じてしまった (抜けた) カメラを開き直す"""
+        self.capture.release()
+        self.capture = open_capture(self.index)
+
+    def close(self):
+        """ランチャーの終了時に本当に閉じる"""
+        self.capture.release()
+
+
+class GameRuntime:
+    """ランチャーから起動されたか (hosted) で、カメラ・MediaPipe・終了処理を切り替える"""
+
+    def __init__(self):
+        self.hosted = False
+        self._cameras = {} # {カメラ番号: SharedCamera}
+        self._models = {} # {(種類, 設定): MediaPipe のソリューション}
+        self.watchdog = None # ★ supervisor の心拍 (supervisor.Heartbeat)。supervisor の下でだけ設定される
+        self.listener = None # ★ supervisor へのメッセージを送る関数 (パイプの send)
+        self.scores = {} # ★ {ゲーム: 最後のラウンドの結果} ランチャーのメニューに表示する
+
+    def open_camera(self, index=0):
+        """カメラを開く (ランチャーからなら開いたままのカメラを返す)"""
+        if not self.hosted:
+            camera = open_capture(index) # ★ cv2.VideoCapture(index) (デーモンが動いていれば共有メモリ)
+        else:
+            camera = self._cameras.get(index)
+            if camera is None:
+                camera = self._cameras[index] = SharedCamera(index)
+            elif not camera.isOpened():
+                camera.reopen()
+        return QoSCamera(camera) if qos_from_argv() else camera # ★ カメラを待った時間を qos に知らせる
+
+    def _model(self, kind, factory, kwargs):
+        if not self.hosted:
+            return factory(**kwargs)
+        key = (kind, tuple(sorted(kwargs.items())))
+        model = self._models.get(key)
+        if model is None:
+            model = self._models[key] = factory(**kwargs)
+        return model
+
+    def hands(self, profile=None, **kwargs):
+        """mp.solutions.hands.Hands(**kwargs) (ランチャーからなら同じ設定のものを使い回す)
+        ★ --tracker tasks なら、同じ形の結果を返す trackerbackend.LiveStreamHands
+        ★ --flow-every N なら、推論を N フレームに1回にする flowtracker.FlowTrackedHands
+        ★ --motion-gate なら、その前に動きが無い間は推論を飛ばす motiongate.MotionGatedHands
+        ★ --qos なら、推論のすぐ前で qos の段に合わせる qosgovernor.QoSModel
+        ★ profile にゲーム名を渡すと、handtuner.py が書いたそのゲームの設定で kwargs を上書きする"""
+        kwargs = apply_profile(profile, kwargs)
+        tracker = tracker_from_argv()
+        every = flow_every_from_argv()
+        gate = motion_gate_from_argv()
+        governed = qos_from_argv()
+
+        def factory(**settings):
+            if governed:
+                hands = QoSModel("hands", lambda **overridden: create_hands(tracker, **overridden), settings)
+            else:
+                hands = create_hands(tracker, **settings)
+            if every > 1:
+                hands = FlowTrackedHands(hands, every)
+            return MotionGatedHands(hands) if gate else hands
+
+        return self._model(f"hands:{tracker}:{every}:{gate}:{governed}", factory, kwargs)
+
+    def holistic(self, profile=None, **kwargs):
+        """mp.solutions.holistic.Holistic(**kwargs) (ランチャーからなら同じ設定のものを使い回す)
+        ★ --holistic split なら、同じ形の結果を返す splitholistic.SplitHolistic
+        ★ --qos なら、qos の段に合わせる qosgovernor.QoSModel
+        ★ profile は hands() と同じ"""
+        kwargs = apply_profile(profile, kwargs)
+        mode = holistic_mode_from_argv()
+        governed = qos_from_argv()
+
+        def factory(**settings):
+            if governed:
+                return QoSModel(mode, lambda **overridden: create_holistic(mode, **overridden), settings)
+            return create_holistic(mode, **settings)
+
+        return self._model(f"holistic:{mode}:{governed}", factory, kwargs)
+
+    def heartbeat(self, grace_ms=None):
+        """★ 毎フレーム呼ぶ。supervisor の下なら「止まっていない」と知らせる
+        (grace_ms: これから長くかかる処理の前に、次の心拍までの猶予を延ばす)"""
+        if self.watchdog is not None:
+            self.watchdog.beat(grace_ms)
+
+    def notify(self, *message):
+        """★ supervisor にメッセージ (タプル) を送る。単体で起動した時は何もしない"""
+        if self.listener is not None:
+            self.listener(message)
+
+    def report_score(self, game, text):
+        """★ ラウンドの結果を残す (supervisor の下なら、プロセスを切り替えても引き継がれる)"""
+        self.scores[game] = text
+        self.notify("score", game, text)
+
+    def is_exit_event(self, event):
+        """ゲームを終える操作か (ウィンドウを閉じる / ランチャーからなら ESC でメニューに戻る)"""
+        if event.type == pygame.QUIT:
+            return True
+        return self.hosted and event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+
+    def shutdown(self):
+        """ゲームの終了処理。ランチャーから起動した時はウィンドウを閉じずにメニューへ戻る"""
+        if self.hosted:
+            return
+        cv2.destroyAllWindows()
+        pygame.quit()
+
+    def close(self):
+        """ランチャーの終了時に、共有しているカメラと MediaPipe を閉じる"""
+        for camera in self._cameras.values():
+            camera.close()
+        for model in self._models.values():
+            model.close()
+        self._cameras.clear()
+        self._models.clear()
+
+
+# プロセス全体で共有するランタイム
+runtime = GameRuntime()
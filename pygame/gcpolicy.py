@@ -0,0 +1,145 @@
+# --- ★ ガベージコレクション (GC) の止めどころ ---
+# フレームループで敵のリストや MediaPipe の結果オブジェクトを作っては捨てていると、
+# 循環参照を探す GC が好きなタイミングで走り、ホールドをつかんだ瞬間などにフレームが飛ぶ。
+# そこで
+#   ・読み込みが終わったら gc.freeze() で、ずっと使うオブジェクト (画像・フォントなど) を GC の対象から外す
+#   ・ラウンド中は自動の GC を止める (または起動間隔を広げる)
+#   ・ゲームオーバー / クリア / リトライの切り替わりで、明示的にまとめて回収する
+# GC にかかった時間は gc.callbacks で測り、プロファイラーにも "gc" として渡す。
+#
+# 使い方:
+#   gc_policy = GCPolicy(mode=gc_mode_from_argv(), profiler=profiler)
+#   gc_policy.freeze()                  # 画像などを読み終わった所 (メインループの直前)
+#   gc_policy.start_round()             # ゲーム開始
+#   gc_policy.end_round("game over")    # ゲームオーバー / クリア
+#   gc_policy.collect("retry")          # リトライなど、ラウンドの外での切り替わり
+#   print(gc_policy.report())
+#   gc_policy.close()                   # シーンの exit()
+# ★ run_scene() は最後に close_gc_policies() を呼ぶので、exit() まで来なかった時 (enter() の途中の
+#   SystemExit、update() や exit() の中の例外) も、ラウンド中に止めた GC はランチャーのメニューに戻る前に元に戻る。
+#
+# モード (--gc-mode または環境変数 FESTIVAL_GC_MODE):
+#   off     ラウンド中は自動の GC を止める (既定)
+#   tune    ラウンド中は世代0の間隔を広げる (止めるのが不安な時)
+#   default 何もしない (比較用)
+
+import gc
+import os
+import sys
+import time
+
+GC_MODES = ("off", "tune", "default")
+TUNED_THRESHOLD = (50000, 50, 100) # tune モードでのラウンド中の gc.set_threshold
+_open_policies = [] # ★ まだ close() されていない GCPolicy (close_gc_policies() が閉じる)
+
+
+def gc_mode_from_argv(argv=None, default="off"):
+    """--gc-mode off|tune|default (無ければ環境変数 FESTIVAL_GC_MODE) で選ばれたモード"""
+    argv = sys.argv if argv is None else argv
+    mode = os.environ.get("FESTIVAL_GC_MODE", default)
+    if "--gc-mode" in argv:
+        index = argv.index("--gc-mode") + 1
+        if index < len(argv):
+            mode = argv[index]
+    if mode not in GC_MODES:
+        print(f"警告: 不明な GC モード '{mode}' です。default で動かします。")
+        mode = "default"
+    return mode
+
+
+class GCPolicy:
+    """ラウンド中は自動の GC を抑え、状態の切り替わりでまとめて回収する"""
+
+    def __init__(self, mode="off", profiler=None):
+        self.mode = mode
+        self.profiler = profiler
+        self.in_round = False
+        self._saved_threshold = gc.get_threshold()
+        self._saved_enabled = gc.isenabled()
+        # 集計だけ持つ (GC の記録のためにメモリを使い続けないように)
+        self.pauses = 0
+        self.pause_total_ms = 0.0
+        self.pause_max_ms = 0.0
+        self.round_pauses = 0 # ラウンド中に起きた自動の GC (止めていれば 0 のはず)
+        self.round_pause_max_ms = 0.0
+        self.frozen_objects = 0
+        self._start = 0.0
+        gc.callbacks.append(self._on_gc)
+        _open_policies.append(self)
+
+    def _on_gc(self, phase, info):
+        """gc.callbacks から呼ばれる。回収1回ごとの停止時間を記録する"""
+        if phase == "start":
+            self._start = time.perf_counter()
+            return
+        ms = (time.perf_counter() - self._start) * 1000
+        self.pauses += 1
+        self.pause_total_ms += ms
+        if ms > self.pause_max_ms:
+            self.pause_max_ms = ms
+        if self.in_round:
+            self.round_pauses += 1
+            if ms > self.round_pause_max_ms:
+                self.round_pause_max_ms = ms
+        if self.profiler is not None:
+            self.profiler.record("gc", ms)
+
+    def freeze(self):
+        """読み込みが終わった所で呼ぶ。今あるオブジェクトを回収してから GC の対象外にする"""
+        if self.mode == "default":
+            return
+        gc.collect()
+        gc.freeze()
+        self.frozen_objects = gc.get_freeze_count()
+
+    def start_round(self):
+        """ラウンド開始。自動の GC を止める (tune なら間隔を広げる)"""
+        if self.in_round:
+            return
+        self.in_round = True
+        if self.mode == "off":
+            gc.disable()
+        elif self.mode == "tune":
+            gc.set_threshold(*TUNED_THRESHOLD)
+
+    def end_round(self, reason="round end"):
+        """ゲームオーバー / クリアで呼ぶ。設定を元に戻し、ラウンド中にたまったゴミをまとめて回収する"""
+        if self.in_round:
+            self.in_round = False
+            gc.set_threshold(*self._saved_threshold)
+            if self._saved_enabled:
+                gc.enable()
+        return self.collect(reason)
+
+    def collect(self, reason):
+        """状態の切り替わり (リトライなど) で明示的に回収する。かかった時間 (ms) を返す"""
+        if self.mode == "default":
+            return 0.0
+        start = time.perf_counter()
+        collected = gc.collect()
+        ms = (time.perf_counter() - start) * 1000
+        print(f"[gc] {reason}: collected {collected} objects in {ms:.2f}ms")
+        return ms
+
+    def close(self):
+        """終了時に呼ぶ。GC の設定とコールバックを元に戻す (2回目からは何もしない)"""
+        if self not in _open_policies:
+            return
+        _open_policies.remove(self)
+        if self.in_round:
+            self.end_round("exit")
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        gc.unfreeze()
+
+    def report(self):
+        avg = self.pause_total_ms / self.pauses if self.pauses else 0.0
+        return (f"[gc] mode {self.mode}: {self.pauses} collections, avg {avg:.2f}ms, max {self.pause_max_ms:.2f}ms;"
+                f" during rounds {self.round_pauses} (max {self.round_pause_max_ms:.2f}ms);"
+                f" frozen {self.frozen_objects} objects")
+
+
+def close_gc_policies():
+    """★ close() されていない GCPolicy を全部閉じる (run_scene() がシーンの終わりに必ず呼ぶ)"""
+    for policy in list(_open_policies):
+        policy.close()
@@ -0,0 +1,251 @@
+# --- ★ 検出の設定 (min_detection_confidence / min_tracking_confidence / model_complexity) をゲームごとに決める ---
+# 今はどのゲームも min_detection_confidence=0.7, min_tracking_confidence=0.7 で、model_complexity は既定のまま。
+# この3つで、ジェスチャーの正確さと、重い手のひらの検出 (palm detection) をやり直す回数が変わる。
+# handtuner.py は録画したプレイ (capturedaemon.py --record) を GRID の全部の組み合わせで推論し直して、
+#   ms/frame     推論1回の時間の平均
+#   redetect/min 手を見失って検出し直した回数 (見えている手の数が増えたフレームの数、1分あたり)
+#   accuracy     ラベル (下の --label で付ける) と、ゲームの is_hand_open() で判定したジェスチャーが合っている割合
+# を測り、accuracy が一番良いものから ACCURACY_TOLERANCE 以内の設定のうち、一番速い (ほぼ同じなら検出し直しが少ない)
+# ものを profile/<ゲーム名>.json に書く。ゲームは起動時に runtime.hands(profile=self.name, ...) でそれを読み、
+# 書いてある設定でコードの既定値を上書きする (--no-profile で読まない)。
+# ラベルは1フレームごとに none (手が無い) / open (全部の手がパー) / closed (グーの手がある) / skip (数えない)。
+#
+# 使い方 (リポジトリのルートで):
+#   python pygame/capturedaemon.py --record session1.mp4                 # プレイを録画
+#   python pygame/handtuner.py --label session1.mp4                      # ラベルを付ける (session1.mp4.labels.json)
+#   python pygame/handtuner.py --game rulercatch --video session1.mp4 --video session2.mp4
+#   python pygame/rulercatch.py --no-profile                             # 調整前の設定で遊ぶ
+
+import importlib
+import itertools
+import json
+import os
+import sys
+import time
+import cv2
+
+PROFILE_DIR = "profile"
+TUNED_KEYS = ("min_detection_confidence", "min_tracking_confidence", "model_complexity")
+GRID = dict(
+    min_detection_confidence=(0.5, 0.6, 0.7, 0.8),
+    min_tracking_confidence=(0.5, 0.7, 0.9),
+    model_complexity=(0, 1),
+)
+BASELINE = dict(min_detection_confidence=0.7, min_tracking_confidence=0.7, model_complexity=1) # 今のゲームの設定
+HOLISTIC_GAMES = ("fightingame",) # runtime.holistic() を使うゲーム (それ以外は runtime.hands())
+MAX_NUM_HANDS = 2 # どのゲームも両手を検出する
+ACCURACY_TOLERANCE = 0.02 # 一番良い accuracy からこれだけ低いものまでは、速さで選ぶ
+SPEED_TOLERANCE = 1.05 # 一番速いものの 5% 以内なら、検出し直しが少ない方を選ぶ
+LABELS = ("none", "open", "closed", "skip")
+LABEL_KEYS = {ord("n"): "none", ord("o"): "open", ord("c"): "closed", ord("s"): "skip"}
+
+
+def profile_path(game):
+    return os.path.join(PROFILE_DIR, f"{game}.json")
+
+
+def load_profile(game):
+    """profile/<game>.json に書いてある設定 (無ければ空の dict)"""
+    path = profile_path(game)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            settings = json.load(f)["settings"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"警告: {path} を読めません ({e})。コードの設定で検出します。")
+        return {}
+    return {key: settings[key] for key in TUNED_KEYS if key in settings}
+
+
+def apply_profile(game, kwargs, argv=None):
+    """kwargs (ゲームの既定の設定) を、game のプロファイルの設定で上書きしたもの (--no-profile なら kwargs のまま)"""
+    argv = sys.argv if argv is None else argv
+    if game is None or "--no-profile" in argv:
+        return kwargs
+    profile = load_profile(game)
+    if profile:
+        print(f"[profile] {game}: " + ", ".join(f"{key}={value}" for key, value in profile.items()))
+    return {**kwargs, **profile}
+
+
+def labels_path(video):
+    return video + ".labels.json"
+
+
+def load_labels(video, frame_count):
+    """フレームごとのラベル (ラベルが無い・skip のフレームは None)。
+    ファイルは [[ラベルが始まるフレーム, ラベル], ...] の形"""
+    with open(labels_path(video), encoding="utf-8") as f:
+        changes = sorted(json.load(f))
+    labels = [None] * frame_count
+    for (start, label), (end, _) in zip(changes, changes[1:] + [(frame_count, None)]):
+        for number in range(start, min(end, frame_count)):
+            labels[number] = None if label == "skip" else label
+    return labels
+
+
+def read_frames(video):
+    """動画の全フレームを、ゲームと同じく左右反転した RGB で読む (と fps)"""
+    source = cv2.VideoCapture(video)
+    fps = source.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    while True:
+        success, image = source.read()
+        if not success:
+            break
+        frames.append(cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB))
+    source.release()
+    return frames, fps
+
+
+def found_hands(results, holistic):
+    """推論結果に含まれる手のランドマークのリスト"""
+    if holistic:
+        return [hand for hand in (results.left_hand_landmarks, results.right_hand_landmarks) if hand]
+    return list(results.multi_hand_landmarks or [])
+
+
+def gesture(hands, is_hand_open):
+    """ラベルと同じ言葉で表したジェスチャー"""
+    if not hands:
+        return "none"
+    return "open" if all(is_hand_open(hand) for hand in hands) else "closed"
+
+
+def measure(sessions, settings, holistic, is_hand_open):
+    """settings で全部のセッションを推論し直した結果 (ms/frame, redetect/min, accuracy)"""
+    import mediapipe as mp
+    inference_ms = 0.0
+    frame_count = 0
+    redetects = 0
+    minutes = 0.0
+    correct = 0
+    labelled = 0
+    for frames, fps, labels in sessions:
+        # セッションごとに作り直す (前の動画の手を追いかけ続けないように)
+        if holistic:
+            model = mp.solutions.holistic.Holistic(**settings)
+        else:
+            model = mp.solutions.hands.Hands(max_num_hands=MAX_NUM_HANDS, **settings)
+        previous = 0
+        for image, label in zip(frames, labels):
+            started = time.perf_counter()
+            results = model.process(image)
+            inference_ms += (time.perf_counter() - started) * 1000
+            hands = found_hands(results, holistic)
+            if len(hands) > previous:
+                redetects += 1
+            previous = len(hands)
+            if label is not None:
+                labelled += 1
+                correct += gesture(hands, is_hand_open) == label
+        model.close()
+        frame_count += len(frames)
+        minutes += len(frames) / fps / 60
+    return dict(ms_per_frame=round(inference_ms / max(1, frame_count), 2),
+                redetect_per_min=round(redetects / max(minutes, 1e-9), 1),
+                accuracy=round(correct / max(1, labelled), 3))
+
+
+def recommend(reports):
+    """[(settings, measured)] から、accuracy が十分で一番速い (ほぼ同じなら検出し直しが少ない) もの"""
+    best_accuracy = max(measured["accuracy"] for _, measured in reports)
+    accurate = [report for report in reports if report[1]["accuracy"] >= best_accuracy - ACCURACY_TOLERANCE]
+    fastest = min(measured["ms_per_frame"] for _, measured in accurate)
+    fast = [report for report in accurate if report[1]["ms_per_frame"] <= fastest * SPEED_TOLERANCE]
+    return min(fast, key=lambda report: (report[1]["redetect_per_min"], -report[1]["accuracy"]))
+
+
+def tune(game, videos):
+    """videos を GRID の全部の組み合わせで推論し直し、一番良い設定を profile/<game>.json に書く"""
+    module = importlib.import_module(game) # シーンの作りなので、import しただけではウィンドウもカメラも開かない
+    holistic = game in HOLISTIC_GAMES
+    sessions = []
+    for video in videos:
+        frames, fps = read_frames(video)
+        if not frames:
+            print(f"エラー: {video} を読めませんでした。")
+            return 1
+        if not os.path.exists(labels_path(video)):
+            print(f"エラー: {labels_path(video)} がありません (python pygame/handtuner.py --label {video})。")
+            return 1
+        sessions.append((frames, fps, load_labels(video, len(frames))))
+        print(f"{video}: {len(frames)} 枚 ({frames[0].shape[1]}x{frames[0].shape[0]}, {fps:.0f}fps)")
+
+    reports = []
+    print(f"{'detect':>7} {'track':>6} {'complexity':>11} {'ms/frame':>9} {'redetect/min':>13} {'accuracy':>9}")
+    for values in itertools.product(*GRID.values()):
+        settings = dict(zip(GRID.keys(), values))
+        measured = measure(sessions, settings, holistic, module.is_hand_open)
+        reports.append((settings, measured))
+        print(f"{settings['min_detection_confidence']:>7} {settings['min_tracking_confidence']:>6}"
+              f" {settings['model_complexity']:>11} {measured['ms_per_frame']:>9.2f}"
+              f" {measured['redetect_per_min']:>13.1f} {measured['accuracy']:>9.3f}")
+
+    settings, measured = recommend(reports)
+    baseline = next(report for report in reports if report[0] == BASELINE)[1]
+    profile = dict(game=game, settings=settings, measured=measured, baseline=dict(settings=BASELINE, measured=baseline),
+                   videos=[os.path.basename(video) for video in videos],
+                   tuned_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(profile_path(game), "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+        f.write("\n")
+    print(f"[profile] {game}: {settings} -> {profile_path(game)}")
+    print(f"  今の設定 {baseline}")
+    print(f"  調整後   {measured}")
+    return 0
+
+
+def label(video):
+    """動画を再生しながらキーでラベルを付け、<video>.labels.json に書く。
+    n: none / o: open / c: closed / s: skip (押したフレームから次に押すまで)、スペース: 一時停止、ESC: 保存して終了"""
+    frames, fps = read_frames(video)
+    if not frames:
+        print(f"エラー: {video} を読めませんでした。")
+        return 1
+    changes = [[0, "skip"]]
+    number = 0
+    paused = False
+    while number < len(frames):
+        image = cv2.cvtColor(frames[number], cv2.COLOR_RGB2BGR)
+        cv2.putText(image, f"{number}/{len(frames)} {changes[-1][1]}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 2)
+        cv2.imshow("Hand Tuner Labels (n/o/c/s, space, ESC)", image)
+        key = cv2.waitKey(0 if paused else max(1, round(1000 / fps))) & 0xFF
+        if key == 27:
+            break
+        if key == ord(" "):
+            paused = not paused
+            continue
+        if key in LABEL_KEYS:
+            if changes[-1][0] == number:
+                changes[-1][1] = LABEL_KEYS[key]
+            else:
+                changes.append([number, LABEL_KEYS[key]])
+        if not paused:
+            number += 1
+    cv2.destroyAllWindows()
+    with open(labels_path(video), "w", encoding="utf-8") as f:
+        json.dump(changes, f)
+    print(f"{labels_path(video)}: {len(changes)} 個のラベル")
+    return 0
+
+
+def main():
+    if "--label" in sys.argv:
+        position = sys.argv.index("--label") + 1
+        if position >= len(sys.argv):
+            print("エラー: --label の後に動画のパスを指定してください。")
+            return 1
+        return label(sys.argv[position])
+    videos = [sys.argv[i + 1] for i, arg in enumerate(sys.argv[:-1]) if arg == "--video"]
+    if "--game" not in sys.argv or sys.argv.index("--game") + 1 >= len(sys.argv) or not videos:
+        print("使い方: python pygame/handtuner.py --game rulercatch --video session1.mp4 [--video ...]")
+        return 1
+    return tune(sys.argv[sys.argv.index("--game") + 1], videos)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ import cv2
 import mediapipe as mp
 import pandas as pd
 import os
+from capturedaemon import open_capture # ★ cv2.VideoCapture の代わり
 
 csv_file = "data/hand_landmarks.csv"
 
@@ -11,7 +12,7 @@ hands = mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_c
 mp_drawing = mp.solutions.drawing_utils
 
 # カメラのセットアップ
-cap = cv2.VideoCapture(0)
+cap = open_capture(0) # ★ カメラ共有デーモンが動いていれば共有メモリから読む
 
 # 手の座標データを収集
 landmarks_data = []
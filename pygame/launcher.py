@@ -0,0 +1,199 @@
+# --- ★ ランチャー (1つのプロセスで全ゲームを切り替えて遊ぶ) ---
+# ゲームを1本ずつ python で起動すると、毎回 MediaPipe の読み込み・カメラのオープン・
+# ウィンドウの作成・画像のデコードが走り、ゲームの切り替えに数秒かかる。
+# ランチャーは最初に1回だけカメラと MediaPipe を開き (gameruntime.runtime)、ゲームは同じプロセスの中で
+# 実行する。メニューで選んでいる間に、そのゲームのシーンの load() (画像の先読み・コースの生成) を
+# ワーカースレッドで済ませ、読み終わった画像から画面用に変換しておくので、選んでから遊べるまでが短くなる。
+# ★ ゲームは scene.Scene のサブクラス (モジュールの SCENE) を import して run_scene() で動かす。
+#   import しただけではウィンドウもカメラも開かないので、メニューの裏で準備しても画面は乱れない。
+#
+# 使い方 (リポジトリのルートで):
+#   python pygame/launcher.py                   # ↑↓ / マウスで選んで Enter / クリック、ESC で終了
+#   python pygame/launcher.py --render-scale 0.5  # 後ろの引数はそのまま各ゲームに渡す
+# ゲーム中は ESC (またはウィンドウを閉じる) でメニューに戻る。
+# 無人で動かす時は pygame/supervisor.py から起動する (ゲームが止まったら待機中のプロセスに切り替わる)。
+
+import importlib
+import os
+import sys
+import threading
+import time
+import numpy as np
+import pygame
+from assetcache import assets
+from assetmanager import ASSET_MANIFEST, asset_manager
+from gameruntime import runtime, STARTUP_GRACE_MS
+from scene import run_scene
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (ASSET_MANIFEST のキー, メニューの表示名)  ※ シーンは pygame/<キー>.py の SCENE
+GAMES = [
+    ("newgoal", "100m Climb"),
+    ("timeattackclimb", "Time Attack Climb"),
+    ("oneminuterace", "1 Minute Climb"),
+    ("rulercatch", "Icicle Catch"),
+    ("fightingame", "Fighting Game"),
+    ("spmove", "Special Move Battle"),
+    ("dekopin", "Dekopin Challenge"),
+]
+
+SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
+FPS = 30
+WARM_BUDGET_MS = 8 # メニューの1フレームで画像の変換に使ってよい時間
+
+BG_COLOR = (20, 30, 50)
+ITEM_COLOR = (60, 80, 120)
+SELECTED_COLOR = (230, 160, 40)
+TEXT_COLOR = (255, 255, 255)
+ITEM_RECTS = [pygame.Rect(390, 130 + i * 75, 500, 60) for i in range(len(GAMES))]
+
+
+def warm_assets(key, warmed, budget_ms=WARM_BUDGET_MS):
+    """先読みが終わった画像を、メニューの空き時間に convert してキャッシュに入れる"""
+    deadline = time.perf_counter() + budget_ms / 1000
+    for path in ASSET_MANIFEST.get(key, []):
+        if path in warmed or not asset_manager.is_loaded(path):
+            continue
+        try:
+            assets.get(path)
+        except FileNotFoundError:
+            pass # ゲーム側で同じエラーを表示させる
+        warmed.add(path)
+        if time.perf_counter() > deadline:
+            return
+
+
+def prepare_scene(key, args, prepared=None):
+    """★ pygame/<key>.py のシーンを作り、load() をワーカースレッドで始める。(キー, シーン, スレッド) を返す。
+    prepared が同じゲームの準備ならそれをそのまま返す (準備しておくのは選んでいるゲームの1本だけ。
+    コースの壁は大きな画像なので、前に選んでいたゲームの分は手放す)"""
+    if prepared is not None and prepared[0] == key:
+        return prepared
+    module = importlib.import_module(key)
+    scene = module.SCENE([os.path.join(GAME_DIR, f"{key}.py")] + args)
+    loader = threading.Thread(target=scene.ensure_loaded, name=f"load-{key}", daemon=True)
+    loader.start()
+    return key, scene, loader
+
+
+def run_game(key, scene, loader):
+    """シーンを動かし、終わったら (ESC / ゲームの終了) 戻る"""
+    saved_argv = sys.argv
+    sys.argv = scene.argv # sys.argv を直接見るモジュールにも同じオプションが見えるように
+    asset_manager.restart_clock() # ゲームの [assets] レポートに、起動にかかった時間だけが出るように
+    asset_manager.preload(scene.name) # (読み込み済みなら何もしないで、計測だけ始まる)
+    start = time.perf_counter()
+    runtime.notify("playing", key) # ★ supervisor は待機中のプロセスにも同じゲームを準備させる
+    runtime.heartbeat(STARTUP_GRACE_MS) # ★ load() の終わりを待つ間は supervisor に待ってもらう
+    try:
+        loader.join() # ★ メニューにいる間に終わっていれば待たない
+        run_scene(scene)
+    except SystemExit:
+        pass # 画像が無い時などの sys.exit() でランチャーまで終わらないように
+    finally:
+        sys.argv = saved_argv
+    # ゲームが登録したタイマー (敵の出現など) と、残ったイベントを片付ける
+    for event_type in range(pygame.USEREVENT, pygame.NUMEVENTS):
+        pygame.time.set_timer(event_type, 0)
+    pygame.event.clear()
+    return time.perf_counter() - start
+
+
+def draw_menu(screen, font, small_font, selected, status):
+    screen.fill(BG_COLOR)
+    title = font.render("Festival Games", True, TEXT_COLOR)
+    screen.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 70)))
+    for i, ((key, name), rect) in enumerate(zip(GAMES, ITEM_RECTS)):
+        pygame.draw.rect(screen, SELECTED_COLOR if i == selected else ITEM_COLOR, rect, border_radius=10)
+        text = font.render(name, True, TEXT_COLOR)
+        screen.blit(text, text.get_rect(center=rect.center))
+        if key in runtime.scores: # ★ 最後のラウンドの結果
+            score = small_font.render(runtime.scores[key], True, TEXT_COLOR)
+            screen.blit(score, score.get_rect(midleft=(rect.right + 20, rect.centery)))
+    hint = small_font.render(status, True, TEXT_COLOR)
+    screen.blit(hint, hint.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30)))
+    pygame.display.flip()
+
+
+def warm_up():
+    """★ ウィンドウとカメラ以外の準備。全ゲームの import と手の検出モデルの読み込み・初回の推論を済ませる
+    (supervisor の待機プロセスはここまで済ませて、切り替えの合図を待つ)"""
+    runtime.hosted = True
+    pygame.init()
+    for key, name in GAMES:
+        importlib.import_module(key) # import してもウィンドウやカメラは開かない
+    hands = runtime.hands(max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    hands.process(np.zeros((480, 640, 3), dtype=np.uint8)) # 最初の1回だけ遅いので、ここで済ませておく
+
+
+def main(args=None, start_key=None, prepared=None):
+    """メニューを開く。start_key を渡すとそのゲームをすぐに始める (supervisor が切り替えた時)"""
+    args = sys.argv[1:] if args is None else args
+    # カメラと手の検出モデルを先に開いておく (ゲームは同じ設定ならこれを使い回す)
+    start = time.perf_counter()
+    warm_up()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Festival Games")
+    font = pygame.font.Font(None, 48)
+    small_font = pygame.font.Font(None, 28)
+    clock = pygame.time.Clock()
+    runtime.open_camera(0)
+    print(f"[launcher] camera + MediaPipe ready in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    keys = [key for key, name in GAMES]
+    selected = keys.index(start_key) if start_key in keys else 0
+    warmed = set() # convert 済みの画像のパス
+    prepared = prepare_scene(GAMES[selected][0], args, prepared) # ★ 選んでいるゲームのシーン (load() はワーカースレッドで実行中)
+    status = "Enter / click: play   ESC in game: back to menu   ESC here: quit"
+    autostart = start_key in keys
+    running = True
+    while running:
+        runtime.heartbeat() # ★ supervisor の下なら「止まっていない」と知らせる
+        choice = selected if autostart else None
+        autostart = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key in (pygame.K_UP, pygame.K_DOWN):
+                    step = -1 if event.key == pygame.K_UP else 1
+                    selected = (selected + step) % len(GAMES)
+                    prepared = prepare_scene(GAMES[selected][0], args, prepared)
+                elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER, pygame.K_SPACE):
+                    choice = selected
+            elif event.type == pygame.MOUSEMOTION:
+                for i, rect in enumerate(ITEM_RECTS):
+                    if rect.collidepoint(event.pos) and i != selected:
+                        selected = i
+                        prepared = prepare_scene(GAMES[selected][0], args, prepared)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                for i, rect in enumerate(ITEM_RECTS):
+                    if rect.collidepoint(event.pos):
+                        selected = choice = i
+
+        if choice is not None:
+            key, name = GAMES[choice]
+            played = run_game(*prepare_scene(key, args, prepared)) # (クリックでいきなり選ばれた時はここで準備する)
+            print(f"[launcher] {key}: played {played:.1f}s, back to menu")
+            runtime.notify("menu")
+            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Festival Games")
+            status = f"{name} finished. Enter / click: play   ESC: quit"
+            # 次に遊ぶ時は新しいシーン (新しいコース) を用意する
+            prepared = prepare_scene(GAMES[selected][0], args)
+            continue
+
+        warm_assets(GAMES[selected][0], warmed)
+        draw_menu(screen, font, small_font, selected, status)
+        clock.tick(FPS)
+
+    runtime.close()
+    asset_manager.release()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# --- ★ 誰もいない時は MediaPipe を休ませる (動きの検出による推論の間引き) ---
+# 祭りのブースでは、プレイヤーの入れ替わりの間もカメラは空のブースを映していて、MediaPipe は全速で
+# 推論を続ける。ノート PC が熱くなり、サーマルスロットリングで次のプレイヤーの時に遅くなる。
+# MotionGatedHands は推論の前に、縮小したグレースケール画像 (GATE_WIDTH) で安く判定して、
+#   ・ドライバーが同じ画像を繰り返し渡してきた (間引いた画素が前の画像と完全に同じ) → 推論せずに前の結果を返す
+#     (本物のカメラの新しい画像ならセンサーのノイズで必ずどこか違う)
+#   ・前の推論で手が無く、背景 (ゆっくり更新する平均画像) から変わった画素も無い → 推論せずに前の結果を返す
+#   ・背景から変わった画素が MOTION_RATIO 以上ある / 前の推論で手があった → そのフレームで推論する
+# 動きが出たフレームでそのまま推論するので、人が来てから推論が始まるまでの遅れは無い。
+# 念のため、止まっている間も IDLE_CHECK_FRAMES に1回は推論する (背景に溶け込んだ手を見逃さないように)。
+# 推論を飛ばした数と、それで浮いた CPU 時間 (推論1回あたりの CPU 時間の平均 x 飛ばした回数) を定期的に表示する。
+#
+# 使い方 (リポジトリのルートで):
+#   python pygame/launcher.py --motion-gate
+#   python pygame/newgoal.py --motion-gate --flow-every 3   # オプティカルフローとも組み合わせられる
+
+import sys
+import time
+import cv2
+import numpy as np
+
+GATE_WIDTH = 80 # 判定に使う画像の幅 (80x60 なら 1 フレーム 0.1ms ほど)
+DUPLICATE_STRIDE = 16 # 同じ画像の繰り返しかどうかは、縦横これだけ間引いた画素 (縮小はしない) で比べる
+PIXEL_DIFF = 25 # 背景との差がこれより大きい画素を「変わった」とみなす
+MOTION_RATIO = 0.01 # 変わった画素がこの割合以上あれば動きがあるとみなす
+BACKGROUND_ALPHA = 0.05 # 背景を今の画像に寄せる割合 (照明のゆっくりした変化に追いつく)
+IDLE_CHECK_FRAMES = 30 # 止まっている間も、このフレーム数に1回は推論する
+REPORT_EVERY = 900 # このフレーム数ごとに、飛ばした推論の数と浮いた CPU 時間を表示する
+
+
+def motion_gate_from_argv(argv=None):
+    """--motion-gate が指定されたか"""
+    argv = sys.argv if argv is None else argv
+    return "--motion-gate" in argv
+
+
+class MotionGatedHands:
+    """hands (mp.solutions.hands.Hands など) の前に置き、動きが無い間は推論を飛ばす"""
+
+    def __init__(self, hands):
+        self.hands = hands
+        self.background = None # float32 の縮小グレースケール画像
+        self.previous = None # 前の画像の間引いた画素
+        self.last_results = None
+        self.has_hands = False
+        self.idle_frames = 0
+        # 統計 (report() で表示する)
+        self.frames = 0
+        self.inferences = 0
+        self.duplicates = 0
+        self.idle_skips = 0
+        self.inference_cpu_s = 0.0 # 推論にかかった CPU 時間の合計 (MediaPipe のスレッドの分も含む)
+        self.gate_cpu_s = 0.0 # 判定にかかった CPU 時間の合計
+
+    def process(self, image_rgb):
+        """動きがあれば推論し、無ければ前の結果を返す"""
+        self.frames += 1
+        started = time.process_time()
+        height, width = image_rgb.shape[:2]
+        size = (GATE_WIDTH, round(height * GATE_WIDTH / width))
+        small = cv2.resize(cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY), size, interpolation=cv2.INTER_AREA)
+        sample = image_rgb[::DUPLICATE_STRIDE, ::DUPLICATE_STRIDE].copy()
+        skip = None
+        if self.last_results is not None and self.background is not None and self.background.shape == small.shape:
+            if np.array_equal(sample, self.previous):
+                skip = "duplicate"
+            elif not self.has_hands and self.idle_frames < IDLE_CHECK_FRAMES and not self.moving(small):
+                skip = "idle"
+        if self.background is None or self.background.shape != small.shape:
+            self.background = small.astype(np.float32)
+        elif not self.has_hands:
+            cv2.accumulateWeighted(small, self.background, BACKGROUND_ALPHA) # 手がある間は背景を動かさない
+        self.previous = sample
+        self.gate_cpu_s += time.process_time() - started
+        if self.frames % REPORT_EVERY == 0:
+            print(self.report())
+
+        if skip == "duplicate":
+            self.duplicates += 1
+            return self.last_results
+        if skip == "idle":
+            self.idle_skips += 1
+            self.idle_frames += 1
+            return self.last_results
+        started = time.process_time()
+        results = self.hands.process(image_rgb)
+        self.inference_cpu_s += time.process_time() - started
+        self.inferences += 1
+        self.idle_frames = 0
+        self.last_results = results
+        self.has_hands = bool(results.multi_hand_landmarks)
+        return results
+
+    def moving(self, small):
+        """背景から変わった画素が MOTION_RATIO 以上あるか"""
+        changed = cv2.absdiff(small.astype(np.float32), self.background) > PIXEL_DIFF
+        return changed.mean() >= MOTION_RATIO
+
+    def report(self):
+        skipped = self.duplicates + self.idle_skips
+        per_inference = self.inference_cpu_s / max(1, self.inferences)
+        saved_s = per_inference * skipped
+        return (f"[gate] skipped {skipped}/{self.frames} inferences (idle {self.idle_skips}, duplicate {self.duplicates}),"
+                f" saved ~{saved_s:.1f}s CPU ({per_inference * 1000:.1f}ms each),"
+                f" gate cost {self.gate_cpu_s * 1000 / max(1, self.frames):.2f}ms/frame")
+
+    def close(self):
+        self.hands.close()
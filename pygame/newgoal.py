@@ -1,37 +1,48 @@
 import cv2
 import mediapipe as mp
 import pygame
-import math
 import random
-import numpy as np # カメラ映像変換に必要
-import sys # ★ リトライ用にインポート
+from bisect import bisect_left, bisect_right # ★ 画面内のホールドの範囲を二分探索で求める
+from dirtypanel import DirtyPanels # ★ 左カラムの部分更新
+from assetcache import assets # ★ 読み込み・変形済みの画像をプロセス全体で共有
+from assetmanager import asset_manager # ★ 画像の並列プリロードとデコード済みキャッシュ
+from gameruntime import runtime # ★ カメラと MediaPipe (ランチャーから起動した時は全ゲームで共有)
+from qosgovernor import qos # ★ 重い時にプレビューと骨格の描画を間引く (--qos)
+from renderbackend import render_scale_from_argv # ★ ゲームパネルの内部解像度
+from alloccheck import AllocationCheck # ★ フレームループのメモリ確保チェック
+from gcpolicy import GCPolicy, gc_mode_from_argv # ★ ラウンド中は GC を止め、切り替わりでまとめて回収
+from fixedstep import FixedStep, CAMERA_PACED_HZ # ★ 物理は画面のフレームレートと関係なく固定ステップで進める
+from capturedaemon import frame_age_ms # ★ デーモンから読んだ画像を撮った時刻
+from cursorinterp import CursorTrack # ★ カメラの速さでしか来ない手の位置を描画フレームごとに補間
+from climbcourse import build_wall, generate_holds # ★ 壁とホールドの生成 (画面が無くても作れる)
+from scene import Scene, run_scene # ★ load / enter / update / render / exit のフックで動かす (import しただけでは何もしない)
 
 # --- 初期設定 ---
 
-# MediaPipeの手検出モデルと描画ツールを準備
+# MediaPipeの手検出モデルと描画ツール (★ モデル自体は enter() で runtime から受け取る)
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
-hands = mp_hands.Hands(
-    max_num_hands=2,
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
-
-# Pygameの初期化
-pygame.init()
-pygame.font.init() # フォントモジュールを明示的に初期化
 
 # --- ★ 画面レイアウト定義 ---
 SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
 LEFT_PANEL_WIDTH = int(SCREEN_WIDTH * 0.2) # 256
-GAME_PANEL_WIDTH = SCREEN_WIDTH - LEFT_PANEL_WIDTH # 1024
-GAME_HEIGHT = SCREEN_HEIGHT # 720
+
+# ★ ゲームパネルの内部解像度の倍率 (--render-scale 0.5 で 512x360 に描いて、転送時に 1024x720 へ拡大)
+# ゲームパネル内の大きさ・速さ (ピクセル) はすべて px() で 1280x720 基準の値から求める
+RENDER_SCALE = render_scale_from_argv()
+
+def px(value):
+    """1280x720 基準のピクセル数を内部解像度でのピクセル数にする"""
+    return int(value * RENDER_SCALE)
+
+GAME_PANEL_WIDTH = px(SCREEN_WIDTH - LEFT_PANEL_WIDTH) # 1024 (内部解像度)
+GAME_HEIGHT = px(SCREEN_HEIGHT) # 720 (内部解像度)
 
 # 各パネルのRectを定義
 SCORE_PANEL_RECT = pygame.Rect(0, 0, LEFT_PANEL_WIDTH, int(SCREEN_HEIGHT * 0.4))
 LOG_PANEL_RECT = pygame.Rect(0, SCORE_PANEL_RECT.height, LEFT_PANEL_WIDTH, int(SCREEN_HEIGHT * 0.3))
 CAM_PANEL_RECT = pygame.Rect(0, SCORE_PANEL_RECT.height + LOG_PANEL_RECT.height, LEFT_PANEL_WIDTH, int(SCREEN_HEIGHT * 0.3))
-GAME_PANEL_RECT = pygame.Rect(LEFT_PANEL_WIDTH, 0, GAME_PANEL_WIDTH, GAME_HEIGHT)
+GAME_PANEL_RECT = pygame.Rect(LEFT_PANEL_WIDTH, 0, SCREEN_WIDTH - LEFT_PANEL_WIDTH, SCREEN_HEIGHT) # ★ 画面上の位置 (拡大後)
 
 # --- ★エネミーの定義 ---
 class Enemy(pygame.sprite.Sprite):
@@ -42,16 +53,23 @@ class Enemy(pygame.sprite.Sprite):
         self.rect.x = random.randint(0, GAME_PANEL_WIDTH - self.rect.width)
         self.rect.y = -self.rect.height
         self.speed = speed
+        self.prev_y = self.rect.y # ★ 1つ前のステップの位置 (描画の補間用)
+        self.draw_rect = self.rect.copy() # ★ 補間した描画位置 (毎フレーム使い回す)
 
     def update(self):
+        """1ステップ (1/CAMERA_PACED_HZ 秒) 分だけ落とす"""
+        self.prev_y = self.rect.y
         self.rect.y += self.speed
 
-    def draw(self, surface):
-        surface.blit(self.image, self.rect)
+    def draw(self, surface, alpha=1.0):
+        """★ 前のステップと今のステップの間を alpha で補間した位置に描く"""
+        self.draw_rect.x = self.rect.x
+        self.draw_rect.y = self.prev_y + int((self.rect.y - self.prev_y) * alpha)
+        surface.blit(self.image, self.draw_rect)
 
 
 # --- ゲーム設定と物理定義 ---
-PIXELS_PER_METER = 360
+PIXELS_PER_METER = px(360)
 TOTAL_CLIMB_METERS = 105.0
 MAX_PULL_METERS = 2.0
 GOAL_HOLD_METERS = 100.0 # ★ ゴールホールドの設置高さ
@@ -59,16 +77,13 @@ GOAL_HOLD_METERS = 100.0 # ★ ゴールホールドの設置高さ
 TOTAL_CLIMB_PIXELS = int(TOTAL_CLIMB_METERS * PIXELS_PER_METER)
 MAX_PULL_PIXELS = int(MAX_PULL_METERS * PIXELS_PER_METER)
 
-GRAVITY_ACCEL = 0.8
-current_fall_velocity = 0.0
-MAX_FALL_SPEED = 30
-FPS = 60 # ★ フレームレート定義
-
-# Pygameウィンドウの設定
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption(f"Bouldering Game ({int(GOAL_HOLD_METERS)}m Climb)")
+# ★ 重力・落下速度・敵の速度は「1ステップ (1/CAMERA_PACED_HZ 秒) あたり」の値
+#   (カメラを待つループで1秒に約30フレーム進んでいた時の1フレーム分。その時と同じ実際の速さになる)
+GRAVITY_ACCEL = 0.8 * RENDER_SCALE
+MAX_FALL_SPEED = 30 * RENDER_SCALE
+ENEMY_SPEED = max(1, px(2)) # ★ 敵の落下速度 (ピクセル/ステップ)
 
-# 色とフォントの定義
+# 色の定義
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
@@ -81,180 +96,52 @@ BUTTON_COLOR = (0, 100, 200) # ★ リトライボタン用
 BUTTON_HOVER_COLOR = (0, 150, 255) # ★ リトライボタン用
 BUTTON_TEXT_COLOR = WHITE # ★ リトライボタン用
 
-font_ui = pygame.font.Font(None, 36)
-font_log = pygame.font.Font(None, 24)
-font_title = pygame.font.Font(None, 40)
-game_over_font = pygame.font.Font(None, 100)
-goal_text_font = pygame.font.Font(None, 80)
-button_font_small = pygame.font.Font(None, 30) # ★ リトライボタン用の小さいフォント
-
-# ★エネミーの画像読み込み
-enemy_image = None
-try:
-    enemy_image = pygame.image.load("image/enemy.png").convert_alpha()
-except FileNotFoundError:
-    print("エラー: image/enemy.png が見つかりません。")
-
-# ★ ゴール背景の読み込み
-goal_background_image = None
-try:
-    img = pygame.image.load("image/goaliceclimb.png").convert()
-    goal_background_image = pygame.transform.scale(img, (GAME_PANEL_WIDTH, GAME_HEIGHT))
-except FileNotFoundError:
-    print("エラー: image/goaliceclimb.png が見つかりません。")
-
-# ★ ダンサーアニメーション画像の読み込み
-dancer_images = []
-dancer_frame = 0
-dancer_frame_time = 0
 ANIMATION_SPEED_MS = 100
-try:
-    for i in range(1, 6):
-        img_path = f"image/c-dancer-{i}.png"
-        img = pygame.image.load(img_path).convert_alpha()
-        img = pygame.transform.scale(img, (300, 300))
-        dancer_images.append(img)
-except FileNotFoundError as e:
-    print(f"エラー: ダンサー画像が見つかりません。 {e}")
-
-# ★ ゴールホールド画像の読み込み
-goal_hold_image = None
-goal_hold_rect_world = None # ワールド座標でのRect
-try:
-    goal_hold_image = pygame.image.load("image/goalhold.png").convert_alpha()
-    img_rect = goal_hold_image.get_rect()
-    goal_y = TOTAL_CLIMB_PIXELS - (GOAL_HOLD_METERS * PIXELS_PER_METER) - img_rect.height
-    goal_x = (GAME_PANEL_WIDTH - img_rect.width) // 2
-    goal_hold_rect_world = pygame.Rect(goal_x, goal_y, img_rect.width, img_rect.height)
-except FileNotFoundError:
-    print("エラー: image/goalhold.png が見つかりません。")
-
-
-# ★エネミー管理リスト
-enemy_list = []
 
 # ★エネミー出現イベント
 ENEMY_SPAWN_EVENT = pygame.USEREVENT + 1
-pygame.time.set_timer(ENEMY_SPAWN_EVENT, 5000)
-
-# プレイヤー（カーソル）の設定 (左右別々に)
-left_cursor_pos = [-100, -100]
-right_cursor_pos = [-100, -100]
-cursor_radius = 45
-
-# ★デコピン（Flick）検知用の変数
-FLICK_THRESHOLD = 40
-left_middle_tip_y = [0, 0]
-right_middle_tip_y = [0, 0]
-left_flick_pos = [-100, -100]
-right_flick_pos = [-100, -100]
-left_flick_detected = False
-right_flick_detected = False
-
-
-# Webカメラの準備
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("エラー: カメラを起動できません。")
-    # この時点では running = False にしない
-
-# --- 100mの壁を生成 ---
-full_background = None
-try:
-    tile_image = pygame.image.load("image/backsnow.png").convert()
-    tile_height = tile_image.get_height()
-    full_background = pygame.Surface((GAME_PANEL_WIDTH, TOTAL_CLIMB_PIXELS))
-    for y in range(0, TOTAL_CLIMB_PIXELS, tile_height):
-        full_background.blit(tile_image, (0, y))
-except FileNotFoundError:
-    print("エラー: image/backsnow.png が見つかりません。")
-
-# 背景スクロール用の変数
-max_scroll = 0 # ★ グローバルスコープで初期化
-if full_background:
-    max_scroll = full_background.get_height() - GAME_HEIGHT
-    world_y_offset = max_scroll
-else:
-    world_y_offset = 0
-
-# --- ホールド（掴む岩）の生成 ---
-holds_list = []
-hold_image = None
-try:
-    hold_image = pygame.image.load("image/blockcatch.png").convert_alpha()
-    hold_rect_img = hold_image.get_rect()
-    hold_width, hold_height = hold_rect_img.width, hold_rect_img.height
-
-    current_y = TOTAL_CLIMB_PIXELS - (GAME_HEIGHT // 2)
-    side = 0
-
-    min_hold_y = 0
-    if goal_hold_rect_world:
-        min_hold_y = goal_hold_rect_world.bottom + 50
-
-    while current_y > min_hold_y:
-        y_variation = random.randint(-PIXELS_PER_METER // 4, PIXELS_PER_METER // 4)
-        h_y = current_y + y_variation
-        if h_y < min_hold_y:
-            h_y = min_hold_y + random.randint(10, 50)
-        if h_y > TOTAL_CLIMB_PIXELS - hold_height:
-             h_y = TOTAL_CLIMB_PIXELS - hold_height - random.randint(10, 50)
-
-        x_variation = random.randint(-80, 80)
-        if side == 0:
-            h_x = (GAME_PANEL_WIDTH / 4) - (hold_width / 2) + x_variation
-        else:
-            h_x = (GAME_PANEL_WIDTH * 3 / 4) - (hold_width / 2) + x_variation
-
-        holds_list.append(pygame.Rect(h_x, h_y, hold_width, hold_height))
-        current_y -= PIXELS_PER_METER
-        side = 1 - side
-except FileNotFoundError:
-    print("エラー: image/blockcatch.png が見つかりません。")
-
-# --- 掴み状態の管理変数 (左右別々に) ---
-left_was_holding = False # ★ 修正: 前フレームで掴めていたか (can_grab)
-right_was_holding = False # ★ 修正: 前フレームで掴めていたか (can_grab)
-left_hold_start_y = 0   # ★ 手のY座標アンカー
-right_hold_start_y = 0  # ★ 手のY座標アンカー
-# world_hold_start_y = 0 # ★ 削除
-world_anchor_y_left = 0  # ★ 左手用のワールドY座標アンカー
-world_anchor_y_right = 0 # ★ 右手用のワールドY座標アンカー
-
-
-# --- ★ゲーム状態の管理 ---
-game_over = False
-game_won = False
-
-# --- ★ ゴールホールドタッチ変数 ---
-touching_goal_hold_left = False
-touching_goal_hold_right = False
-both_hands_touching_goal_start_time = 0
-GOAL_TOUCH_DURATION_MS = 1000
 
-# --- ★タイマー変数 ---
-start_time = 0
-elapsed_time = 0
-final_time = 0
-game_start_flag = False
+# プレイヤー（カーソル）の設定
+cursor_radius = px(45)
+GRAB_ON_MEASURED = True # ★ True: ホールドをつかむ判定と引き下ろしの量は最後に測った位置で行う
+# (False だと先読みした位置で判定する。更新はカメラの1枚ごとなので滑らかにはならず、行き過ぎだけが判定に入る。補間した位置は描画だけに使う)
+
+# ★デコピン（Flick）検知のしきい値
+FLICK_THRESHOLD = px(40)
 
-# --- ★テキストログ変数 ---
-log_messages = []
+GOAL_TOUCH_DURATION_MS = 1000
 MAX_LOG_LINES = 6
-enemy_kill_count = 0
 
 # --- ★ リトライボタン ---
 retry_button_rect_screen = pygame.Rect(0, 0, 300, 60)
 retry_button_rect_screen.center = (GAME_PANEL_RECT.centerx, GAME_PANEL_RECT.bottom - 80)
-# ゲームパネル内の座標に変換したRect (描画/判定用)
-retry_button_rect_game = retry_button_rect_screen.copy()
+# ゲームパネル内 (内部解像度) の座標に変換したRect (描画/判定用)
+retry_button_rect_game = pygame.Rect(0, 0, px(retry_button_rect_screen.width), px(retry_button_rect_screen.height))
 retry_button_rect_game.center = (
-    retry_button_rect_screen.centerx - GAME_PANEL_RECT.left,
-    retry_button_rect_screen.centery - GAME_PANEL_RECT.top
+    px(retry_button_rect_screen.centerx - GAME_PANEL_RECT.left),
+    px(retry_button_rect_screen.centery - GAME_PANEL_RECT.top)
 )
 
+OFFSCREEN_POS = (-100, -100) # 手が映っていない時のカーソル位置
+CURSOR_ALPHA = 128
+
 
-# --- ★ 関数定義 ---
+def load_scaled(path, size=None, alpha=True):
+    """★ 画像を内部解像度に合わせた大きさで読み込む (size は 1280x720 基準、省略時は元画像の大きさ)"""
+    if size is None:
+        size = assets.get(path, alpha=alpha).get_size()
+    return assets.get(path, (px(size[0]), px(size[1])), alpha=alpha)
+
+def scaled_size(path):
+    """★ load_scaled(path) で読んだ時の大きさ (画面が無くても分かる)"""
+    width, height = asset_manager.image_size(path)
+    return px(width), px(height)
+
+def make_cursor_sprite(color):
+    """半透明の円のカーソル画像"""
+    sprite = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, color + (CURSOR_ALPHA,), (cursor_radius, cursor_radius), cursor_radius)
+    return sprite
 
 def is_hand_open(hand_landmarks):
     tip_ids = [mp_hands.HandLandmark.INDEX_FINGER_TIP, mp_hands.HandLandmark.MIDDLE_FINGER_TIP, mp_hands.HandLandmark.RING_FINGER_TIP, mp_hands.HandLandmark.PINKY_TIP]
@@ -262,11 +149,6 @@ def is_hand_open(hand_landmarks):
     open_fingers = sum(1 for tip_id, pip_id in zip(tip_ids, pip_ids) if hand_landmarks.landmark[tip_id].y < hand_landmarks.landmark[pip_id].y)
     return open_fingers >= 3
 
-def add_log(message):
-    log_messages.append(message)
-    if len(log_messages) > MAX_LOG_LINES:
-        log_messages.pop(0)
-
 def format_time(ms):
     total_seconds = ms // 1000
     minutes = total_seconds // 60
@@ -274,201 +156,351 @@ def format_time(ms):
     milliseconds = (ms % 1000) // 10
     return f"{minutes:02}:{seconds:02}.{milliseconds:02}"
 
-# ★★★ リトライ（リセット）関数 ★★★
-def reset_game():
-    global game_over, game_won, world_y_offset, current_fall_velocity, left_was_holding, right_was_holding
-    global elapsed_time, final_time, game_start_flag
-    global enemy_list, enemy_kill_count, log_messages
-    global cap, both_hands_touching_goal_start_time
-    global left_hold_start_y, right_hold_start_y, world_anchor_y_left, world_anchor_y_right # ★ アンカーもリセット
-
-    # ゲーム状態リセット
-    game_over = False
-    game_won = False
-
-    # プレイヤー位置リセット
-    world_y_offset = max_scroll # スタート地点
-    current_fall_velocity = 0.0
-    left_was_holding = False
-    right_was_holding = False
-    both_hands_touching_goal_start_time = 0
-    left_hold_start_y = 0
-    right_hold_start_y = 0
-    world_anchor_y_left = 0
-    world_anchor_y_right = 0
-
-
-    # タイマーリセット
-    elapsed_time = 0
-    final_time = 0
-    game_start_flag = False
-
-    # 敵とログのリセット
-    enemy_list = []
-    enemy_kill_count = 0
-    log_messages = []
-    add_log("Game Ready. Press 'R' for 90m Rocket.")
-
-    # カメラのリセット
-    if not cap.isOpened():
-        cap = cv2.VideoCapture(0)
-        if cap.isOpened():
-            print("Camera reopened for retry.")
-        else:
-            print("Error: Failed to reopen camera for retry.")
-            add_log("Error: Camera failed to reopen.")
-
-# --- メインループ ---
-running = True
-clock = pygame.time.Clock()
-add_log("Game Ready. Press 'R' for 90m Rocket.")
-camera_surface_scaled = None
-
-while running:
 
-    mouse_pos = pygame.mouse.get_pos() # ★ マウス位置取得
-    mouse_click = False # ★ マウスクリックリセット
+# --- ★ シーン (ゲームの状態はすべてここに持つ) ---
+class NewGoalScene(Scene):
+    """100m クライム。load() で 100m の壁とホールドを作っておく"""
+
+    name = "newgoal"
+
+    def load(self):
+        super().load() # 画像の先読み
+        # --- ★ ゴールホールドの位置 (ワールド座標) ---
+        self.goal_hold_rect_world = None
+        try:
+            goal_width, goal_height = scaled_size("image/goalhold.png")
+            goal_y = TOTAL_CLIMB_PIXELS - (GOAL_HOLD_METERS * PIXELS_PER_METER) - goal_height
+            goal_x = (GAME_PANEL_WIDTH - goal_width) // 2
+            self.goal_hold_rect_world = pygame.Rect(goal_x, goal_y, goal_width, goal_height)
+        except FileNotFoundError:
+            print("エラー: image/goalhold.png が見つかりません。")
+
+        # --- 100mの壁を生成 ---
+        self.full_background = None
+        try:
+            tile = asset_manager.load_unconverted("image/backsnow.png")
+            if RENDER_SCALE != 1.0:
+                tile = pygame.transform.scale(tile, (px(tile.get_width()), px(tile.get_height())))
+            self.full_background = build_wall(tile, GAME_PANEL_WIDTH, TOTAL_CLIMB_PIXELS)
+        except FileNotFoundError:
+            print("エラー: image/backsnow.png が見つかりません。")
+
+        # --- ホールド（掴む岩）の生成 ---
+        holds_list = []
+        try:
+            min_hold_y = 0
+            if self.goal_hold_rect_world:
+                min_hold_y = self.goal_hold_rect_world.bottom + px(50)
+            holds_list = generate_holds(scaled_size("image/blockcatch.png"), TOTAL_CLIMB_PIXELS, GAME_PANEL_WIDTH, GAME_HEIGHT,
+                                        PIXELS_PER_METER, min_hold_y, spacing=PIXELS_PER_METER, scale=RENDER_SCALE)
+        except FileNotFoundError:
+            print("エラー: image/blockcatch.png が見つかりません。")
+
+        # ★ ホールドは動かないので上端の Y 座標で並べておき、画面内の範囲は二分探索で求める
+        # (毎フレームの検索でリストや集合を作らない)
+        holds_list.sort(key=lambda rect: rect.top)
+        self.holds_list = holds_list
+        self.hold_tops = [rect.top for rect in holds_list]
+        self.hold_max_height = max((rect.height for rect in holds_list), default=0)
+
+        # 背景スクロールの範囲
+        self.max_scroll = self.full_background.get_height() - GAME_HEIGHT if self.full_background else 0
+
+    def enter(self):
+        # Pygameウィンドウの設定
+        self.screen = screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption(f"Bouldering Game ({int(GOAL_HOLD_METERS)}m Climb)")
+
+        # ★ ゲームパネルは内部解像度の Surface に描き、画面転送の直前に1回だけ拡大する
+        self.game_panel_view = screen.subsurface(GAME_PANEL_RECT)
+        self.game_surface = self.game_panel_view if RENDER_SCALE == 1.0 else pygame.Surface((GAME_PANEL_WIDTH, GAME_HEIGHT))
+
+        self.font_ui = font_ui = pygame.font.Font(None, 36)
+        self.font_log = font_log = pygame.font.Font(None, 24)
+        font_title = pygame.font.Font(None, 40)
+        # ★ ゲームパネルに描く文字は内部解像度に合わせた大きさ
+        self.font_game_ui = pygame.font.Font(None, px(36))
+        self.game_over_font = pygame.font.Font(None, px(100))
+        self.goal_text_font = pygame.font.Font(None, px(80))
+        button_font_small = pygame.font.Font(None, px(30)) # ★ リトライボタン用の小さいフォント
+
+        # ★エネミーの画像読み込み
+        self.enemy_image = None
+        try:
+            self.enemy_image = load_scaled("image/enemy.png")
+        except FileNotFoundError:
+            print("エラー: image/enemy.png が見つかりません。")
+
+        # ★ ゴール背景の読み込み
+        self.goal_background_image = None
+        try:
+            self.goal_background_image = assets.get("image/goaliceclimb.png", (GAME_PANEL_WIDTH, GAME_HEIGHT), alpha=False)
+        except FileNotFoundError:
+            print("エラー: image/goaliceclimb.png が見つかりません。")
+
+        # ★ ダンサーアニメーション画像の読み込み
+        self.dancer_images = []
+        self.dancer_frame = 0
+        self.dancer_frame_time = 0
+        try:
+            for i in range(1, 6):
+                img_path = f"image/c-dancer-{i}.png"
+                img = load_scaled(img_path, (300, 300))
+                self.dancer_images.append(img)
+        except FileNotFoundError as e:
+            print(f"エラー: ダンサー画像が見つかりません。 {e}")
+
+        # ★ ゴールホールドとホールドの画像 (位置は load() で決めてある)
+        self.goal_hold_image = None
+        if self.goal_hold_rect_world:
+            self.goal_hold_image = load_scaled("image/goalhold.png")
+        self.hold_image = None
+        if self.holds_list:
+            self.hold_image = load_scaled("image/blockcatch.png")
+
+        # ★エネミー管理リスト
+        self.enemy_list = []
+        pygame.time.set_timer(ENEMY_SPAWN_EVENT, 5000)
+
+        # プレイヤー（カーソル）の設定 (左右別々に)
+        self.left_cursor_pos = [-100, -100] # ★ 描画する位置 (ランドマークのサンプルから補間した位置)
+        self.right_cursor_pos = [-100, -100]
+
+        # ★ 手の位置の補間。ホールドの判定を「補間した位置」と「最後に測った位置」のどちらで行うかを選べる
+        self.left_cursor_track = CursorTrack()
+        self.right_cursor_track = CursorTrack()
+        self.left_grab_pos = self.left_cursor_track.measured if GRAB_ON_MEASURED else self.left_cursor_pos # どちらも中身だけ書き換わるリスト
+        self.right_grab_pos = self.right_cursor_track.measured if GRAB_ON_MEASURED else self.right_cursor_pos
+
+        # ★デコピン（Flick）検知用の変数
+        self.left_middle_tip_y = [0, 0]
+        self.right_middle_tip_y = [0, 0]
+        self.left_flick_pos = [-100, -100]
+        self.right_flick_pos = [-100, -100]
+        self.left_flick_detected = False
+        self.right_flick_detected = False
+
+        # MediaPipe と Webカメラの準備 (★ ランチャーからなら開いたままのものを使い回す)
+        self.hands = runtime.hands(
+            profile=self.name, # ★ handtuner.py で決めた設定があれば、下の値を上書きする
+            max_num_hands=2,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7
+        )
+        self.cap = runtime.open_camera(0)
+        if not self.cap.isOpened():
+            print("エラー: カメラを起動できません。")
+            # この時点では running = False にしない
+
+        # --- ★ 毎フレーム使い回すオブジェクト (フレームループの中では作らずに中身だけ書き換える) ---
+        self.left_cursor_rect = pygame.Rect(0, 0, cursor_radius * 2, cursor_radius * 2)
+        self.right_cursor_rect = pygame.Rect(0, 0, cursor_radius * 2, cursor_radius * 2)
+        self.left_grab_rect = pygame.Rect(0, 0, cursor_radius * 2, cursor_radius * 2) # ホールドの当たり判定用 (left_grab_pos の位置)
+        self.right_grab_rect = pygame.Rect(0, 0, cursor_radius * 2, cursor_radius * 2)
+        self.left_flick_rect = pygame.Rect(0, 0, cursor_radius * 2, cursor_radius * 2)
+        self.right_flick_rect = pygame.Rect(0, 0, cursor_radius * 2, cursor_radius * 2)
+        self.hold_screen_rect = pygame.Rect(0, 0, 0, 0) # ホールドの画面上の位置 (1つずつ書き換えて使う)
+        self.goal_hold_rect_screen_buffer = pygame.Rect(0, 0, 0, 0)
+        self.background_dest = pygame.Rect(0, 0, 0, 0)
+
+        # 左カラムのパネル (subsurface は最初に1回だけ作る)
+        self.score_surface = screen.subsurface(SCORE_PANEL_RECT)
+        self.log_surface = screen.subsurface(LOG_PANEL_RECT)
+        self.cam_surface = screen.subsurface(CAM_PANEL_RECT)
+
+        self.cursor_sprites = {GREEN: make_cursor_sprite(GREEN), RED: make_cursor_sprite(RED)} # 色ごとに作っておく
+
+        # 変わらない文字は最初に1回だけ描いておく
+        self.retry_text = button_font_small.render("Retry Challenge", True, BUTTON_TEXT_COLOR)
+        self.retry_text_rect = self.retry_text.get_rect(center=retry_button_rect_game.center)
+        self.score_title_text = font_title.render("SCORE", True, WHITE)
+        self.rocket_help_text = font_log.render("'R' Key: 90m Rocket", True, GREEN)
+        self.log_title_text = font_title.render("LOG", True, WHITE)
+        self.cam_title_text = font_title.render("CAMERA", True, WHITE)
+        self.cam_error_text = font_log.render("Camera not found.", True, RED)
+
+        # ★ スコアの数字は毎フレーム変わるので、0-9 と記号の画像を1回だけ作っておき1文字ずつ並べる
+        # (タイマーが動いている間、毎フレーム文字列と Surface を作らないように)
+        self.digit_glyphs = [font_ui.render(str(digit), True, WHITE) for digit in range(10)]
+        self.colon_glyph = font_ui.render(":", True, WHITE)
+        self.dot_glyph = font_ui.render(".", True, WHITE)
+        self.height_label_text = font_ui.render("Height: ", True, WHITE)
+        self.meter_unit_text = font_ui.render(" m", True, WHITE)
+        self.time_label_text = font_ui.render("Time: ", True, WHITE)
+        self.kills_label_text = font_ui.render("Kills: ", True, WHITE)
+        self.glyph_dest = pygame.Rect(0, 0, 0, 0)
+
+        self.camera_surface_scaled = None
+        self.camera_frame_id = 0 # ★ カメラ映像が更新されるたびに増える (カメラパネルの再描画判定用)
+        self.panels = DirtyPanels() # ★ 左カラムは内容が変わった時だけ再描画
+        # ★ --alloc-check: 定常状態のフレームでメモリを確保していないかを tracemalloc で確かめて終了する
+        # (手が映っていない時は、仮の手の結果で更新・描画の処理を通す)
+        self.alloc_check = AllocationCheck(enabled="--alloc-check" in self.argv)
+        self.hands = self.alloc_check.wrap_hands(self.hands)
+        self.mouse_pos = (0, 0)
+        self.mouse_click = False
+        self.dt_ms = 0
+        self.reset_round()
+
+        print(asset_manager.finish_startup(self.name)) # ★ 起動時間 (コールド/ウォーム) を表示
+        self.gc_policy = GCPolicy(mode=gc_mode_from_argv(self.argv))
+        self.gc_policy.freeze() # ★ 読み込んだ画像やフォントは GC の対象から外す
+        self.fixed_step = FixedStep(hz=CAMERA_PACED_HZ) # ★ 落下と敵の移動を進める固定ステップ
+
+    # --- ★ 関数定義 ---
+
+    def add_log(self, message):
+        self.log_version += 1
+        self.log_messages.append(message)
+        if len(self.log_messages) > MAX_LOG_LINES:
+            self.log_messages.pop(0)
+
+    def blit_glyph(self, surface, glyph, x, y):
+        """★ 作っておいた文字の画像を (x, y) に描き、次の文字の x を返す"""
+        glyph_dest = self.glyph_dest
+        glyph_dest.x = x
+        glyph_dest.y = y
+        surface.blit(glyph, glyph_dest)
+        return x + glyph.get_width()
+
+    def blit_digits(self, surface, value, x, y, min_digits=1):
+        """★ 0以上の整数を min_digits 桁まで0埋めして描き、次の文字の x を返す (文字列を作らない)"""
+        divisor = 1
+        digits = 1
+        while divisor * 10 <= value or digits < min_digits:
+            divisor *= 10
+            digits += 1
+        while divisor:
+            x = self.blit_glyph(surface, self.digit_glyphs[value // divisor % 10], x, y)
+            divisor //= 10
+        return x
+
+    def reset_round(self):
+        """ラウンドの状態を最初に戻す (enter とリトライで呼ぶ)"""
+        # ゲーム状態
+        self.game_over = False
+        self.game_won = False
+
+        # プレイヤー位置 (★ --- 掴み状態の管理変数 (左右別々に) ---)
+        self.world_y_offset = self.max_scroll # スタート地点
+        self.current_fall_velocity = 0.0
+        self.left_was_holding = False # ★ 修正: 前フレームで掴めていたか (can_grab)
+        self.right_was_holding = False
+        self.both_hands_touching_goal_start_time = 0
+        self.left_hold_start_y = 0   # ★ 手のY座標アンカー
+        self.right_hold_start_y = 0
+        self.world_anchor_y_left = 0  # ★ 左手用のワールドY座標アンカー
+        self.world_anchor_y_right = 0 # ★ 右手用のワールドY座標アンカー
+
+        # タイマー
+        self.start_time = 0
+        self.elapsed_time = 0
+        self.final_time = 0
+        self.game_start_flag = False
+
+        # 敵とログ
+        self.enemy_list.clear()
+        self.enemy_kill_count = 0
+        self.log_messages = []
+        self.log_version = 0 # ★ ログが変わるたびに増える (ログパネルの再描画判定用)
+        self.end_screen_texts = [] # ゴール/ゲームオーバー画面の (文字の画像, 位置)。その状態になった時に1回だけ作る
+        self.add_log("Game Ready. Press 'R' for 90m Rocket.")
+
+        # 描画に使う、更新で求めた値 (リトライ直後のフレームは何も映さない)
+        self.visible_hold_start = self.visible_hold_end = 0 # 画面内のホールドは holds_list[start:end]
+        self.goal_hold_rect_screen = None
+        self.left_can_grab = False
+        self.right_can_grab = False
+        self.left_flick_detected = False
+        self.right_flick_detected = False
+
+    # ★★★ リトライ（リセット）関数 ★★★
+    def reset_game(self):
+        self.reset_round()
+
+        # カメラのリセット
+        if not self.cap.isOpened():
+            self.cap = runtime.open_camera(0)
+            if self.cap.isOpened():
+                print("Camera reopened for retry.")
+            else:
+                print("Error: Failed to reopen camera for retry.")
+                self.add_log("Error: Camera failed to reopen.")
 
-    if 'max_scroll' in locals():
-        height_climbed = (max_scroll - world_y_offset) / PIXELS_PER_METER
-    else:
-        height_climbed = 0
+        self.gc_policy.collect("retry") # ★ 前のラウンドの敵やログをまとめて回収
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+    def handle_event(self, event):
+        self.panels.handle_event(event)
 
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_RETURN:
-                running = False
+                self.running = False
 
-            if event.key == pygame.K_r and not game_over and not game_won:
+            if event.key == pygame.K_r and not self.game_over and not self.game_won:
                 warp_height_meters = 90.0
                 current_max_scroll = (int(TOTAL_CLIMB_METERS * PIXELS_PER_METER)) - GAME_HEIGHT
                 warp_y_offset = current_max_scroll - (warp_height_meters * PIXELS_PER_METER)
                 if warp_y_offset < 0: warp_y_offset = 0
                 if warp_y_offset > current_max_scroll: warp_y_offset = current_max_scroll
-                world_y_offset = warp_y_offset
-                left_was_holding = False
-                right_was_holding = False
-                current_fall_velocity = 0
-                add_log("ROCKET! Warping to 90m.")
+                self.world_y_offset = warp_y_offset
+                self.left_was_holding = False
+                self.right_was_holding = False
+                self.current_fall_velocity = 0
+                self.add_log("ROCKET! Warping to 90m.")
 
         # ★ マウスクリックイベントを検出
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1: # 左クリック
-                mouse_click = True
-
-        if event.type == ENEMY_SPAWN_EVENT and not game_over and not game_won:
-            if enemy_image:
-                enemy_list.append(Enemy(enemy_image))
-
-    screen.fill(GRAY)
-
-    if game_won:
-        # --- ★★★ GAME CLEAR ★★★ ---
-
-        if final_time == 0:
-            final_time = elapsed_time
-            add_log(f"GOAL! Time: {format_time(final_time)}")
-            if cap.isOpened(): # ★ クリア時にカメラを閉じる
-                cap.release()
-                print("Camera released on success.")
-
-        game_surface = screen.subsurface(GAME_PANEL_RECT)
-
-        if goal_background_image:
-            game_surface.blit(goal_background_image, (0, 0))
-        else:
-            game_surface.fill(SKY_BLUE)
-
-        goal_text = goal_text_font.render(f"{int(GOAL_HOLD_METERS)}m Climb Success!!", True, ORANGE)
-        game_surface.blit(goal_text, (
-            game_surface.get_width() // 2 - goal_text.get_width() // 2,
-            game_surface.get_height() // 4 - goal_text.get_height() // 2
-        ))
-
-        time_text = font_ui.render(f"Clear Time: {format_time(final_time)}", True, ORANGE)
-        game_surface.blit(time_text, (
-            game_surface.get_width() // 2 - time_text.get_width() // 2,
-            game_surface.get_height() // 4 + goal_text.get_height()
-        ))
-
-        if dancer_images:
-            delta_time_ms_anim = clock.get_time() # アニメーション用に時間を取得
-            dancer_frame_time += delta_time_ms_anim
-            if dancer_frame_time > ANIMATION_SPEED_MS:
-                dancer_frame = (dancer_frame + 1) % len(dancer_images)
-                dancer_frame_time = 0
-
-            current_dancer_image = dancer_images[dancer_frame]
-            img_rect = current_dancer_image.get_rect(center=(game_surface.get_width() // 2, game_surface.get_height() // 2 + 100))
-            game_surface.blit(current_dancer_image, img_rect)
-
-        # ★ リトライボタンのロジック (マウスクリック)
-        mouse_x_in_game = mouse_pos[0] - GAME_PANEL_RECT.left
-        mouse_y_in_game = mouse_pos[1] - GAME_PANEL_RECT.top
-        is_hovering_retry = False
-        if GAME_PANEL_RECT.collidepoint(mouse_pos):
-             is_hovering_retry = retry_button_rect_game.collidepoint(mouse_x_in_game, mouse_y_in_game)
-
-        if is_hovering_retry and mouse_click:
-             reset_game()
-        else:
-            # ボタン描画
-            btn_color = BUTTON_HOVER_COLOR if is_hovering_retry else BUTTON_COLOR
-            pygame.draw.rect(game_surface, btn_color, retry_button_rect_game, border_radius=10)
-            btn_text = button_font_small.render("Retry Challenge", True, BUTTON_TEXT_COLOR)
-            game_surface.blit(btn_text, btn_text.get_rect(center=retry_button_rect_game.center))
-
-
-    elif game_over:
-        # --- ★★★ GAME OVER ★★★ ---
-        if final_time == 0:
-            final_time = elapsed_time
-            add_log(f"GAME OVER... Time: {format_time(final_time)}")
-            if cap.isOpened(): # ★ ゲームオーバー時にカメラを閉じる
-                cap.release()
-                print("Camera released on game over.")
-
-        game_surface = screen.subsurface(GAME_PANEL_RECT)
-        game_surface.fill(BLACK)
-        go_text = game_over_font.render("GAME OVER", True, RED)
-        game_surface.blit(go_text, (
-            game_surface.get_width() // 2 - go_text.get_width() // 2,
-            game_surface.get_height() // 2 - go_text.get_height() // 2 - 50
-        ))
-
-        time_text = font_ui.render(f"Final Time: {format_time(final_time)}", True, WHITE)
-        game_surface.blit(time_text, (
-            game_surface.get_width() // 2 - time_text.get_width() // 2,
-            game_surface.get_height() // 2 + 50
-        ))
-
-        # ★ リトライボタンのロジック (マウスクリック)
-        mouse_x_in_game = mouse_pos[0] - GAME_PANEL_RECT.left
-        mouse_y_in_game = mouse_pos[1] - GAME_PANEL_RECT.top
-        is_hovering_retry = False
-        if GAME_PANEL_RECT.collidepoint(mouse_pos):
-             is_hovering_retry = retry_button_rect_game.collidepoint(mouse_x_in_game, mouse_y_in_game)
-
-        if is_hovering_retry and mouse_click:
-             reset_game()
-        else:
-            # ボタン描画
-            btn_color = BUTTON_HOVER_COLOR if is_hovering_retry else BUTTON_COLOR
-            pygame.draw.rect(game_surface, btn_color, retry_button_rect_game, border_radius=10)
-            btn_text = button_font_small.render("Retry Challenge", True, BUTTON_TEXT_COLOR)
-            game_surface.blit(btn_text, btn_text.get_rect(center=retry_button_rect_game.center))
+                self.mouse_click = True
+
+        if event.type == ENEMY_SPAWN_EVENT and not self.game_over and not self.game_won:
+            if self.enemy_image:
+                self.enemy_list.append(Enemy(self.enemy_image, ENEMY_SPEED))
+
+    def update(self, dt_ms):
+        self.dt_ms = dt_ms
+        if self.game_won and self.dancer_images: # ★ ダンサーのアニメーションは描画ではなく更新で進める (--qos で描画を飛ばしても同じ速さ)
+            self.dancer_frame_time += dt_ms
+            if self.dancer_frame_time > ANIMATION_SPEED_MS:
+                self.dancer_frame = (self.dancer_frame + 1) % len(self.dancer_images)
+                self.dancer_frame_time = 0
+        sim_steps = self.fixed_step.advance(dt_ms) # ★ 前のフレームの時間の分だけ物理を進める
+        self.mouse_pos = pygame.mouse.get_pos() # ★ マウス位置取得
+        mouse_click = self.mouse_click
+        self.mouse_click = False # ★ マウスクリックリセット
+
+        if self.game_won or self.game_over:
+            # --- ★★★ GAME CLEAR / GAME OVER ★★★ ---
+            if self.final_time == 0:
+                self.final_time = self.elapsed_time
+                if self.game_won:
+                    self.add_log(f"GOAL! Time: {format_time(self.final_time)}")
+                    self.report_score(f"GOAL! Time: {format_time(self.final_time)}") # ★ メニューに表示する結果
+                    self.gc_policy.end_round("goal") # ★ ここでまとめて回収
+                else:
+                    self.add_log(f"GAME OVER... Time: {format_time(self.final_time)}")
+                    self.report_score(f"GAME OVER... Time: {format_time(self.final_time)}")
+                    self.gc_policy.end_round("game over") # ★ ここでまとめて回収
+                if self.cap.isOpened(): # ★ クリア / ゲームオーバー時にカメラを閉じる (ランチャーからなら開いたまま)
+                    self.cap.release()
+                    print("Camera released on success." if self.game_won else "Camera released on game over.")
+
+            # ★ リトライボタンのロジック (マウスクリック)
+            if self.is_hovering_retry() and mouse_click:
+                 self.reset_game()
+            return
 
-    else:
         # --- ★★★ GAME RUNNING ★★★ ---
+        cap = self.cap
+        left_cursor_pos = self.left_cursor_pos
+        right_cursor_pos = self.right_cursor_pos
+        left_grab_pos = self.left_grab_pos
+        right_grab_pos = self.right_grab_pos
 
         if not cap.isOpened():
-            add_log("Camera feed lost.")
+            self.add_log("Camera feed lost.")
             # running = False # ★ 終了させずにUI表示は続ける
 
-        camera_surface_scaled = None # ★ 毎フレームリセット
         left_is_grabbing = False # ★ 検出前にリセット
         right_is_grabbing = False # ★ 検出前にリセット
         left_is_open_now = True # ★ デフォルトは開
@@ -478,31 +510,36 @@ while running:
             success, image_cam = cap.read()
             if not success:
                 print("Warning: Failed to read frame.")
+                self.camera_surface_scaled = None # ★ 読めた時の画像は、--qos でプレビューを間引いても表示し続ける
             else:
+                frame_time_ms = pygame.time.get_ticks() - frame_age_ms(cap) # ★ この画像を撮った時刻 (カーソル補間のサンプル時刻。デーモンからなら撮った時の時刻)
+
                 # 2. 手の検出
                 image_rgb = cv2.cvtColor(cv2.flip(image_cam, 1), cv2.COLOR_BGR2RGB)
                 image_rgb.flags.writeable = False
-                results = hands.process(image_rgb)
+                results = self.hands.process(image_rgb)
 
                 # 3. ★ カメラ映像の準備 (描画は後で)
-                image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-                if results and results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        mp_drawing.draw_landmarks(image_bgr, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+                if qos.preview_due(): # ★ 重い時はカメラのプレビューを間引く (前の画像を表示し続ける)
+                    image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+                    if qos.draw_skeleton and results and results.multi_hand_landmarks: # ★ 重い時は骨格を描かない
+                        for hand_landmarks in results.multi_hand_landmarks:
+                            mp_drawing.draw_landmarks(image_bgr, hand_landmarks, mp_hands.HAND_CONNECTIONS)
 
-                image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-                image_pygame = pygame.image.frombuffer(image_rgb.tobytes(), image_rgb.shape[1::-1], "RGB")
-                camera_surface_scaled = pygame.transform.scale(image_pygame, (CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
+                    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+                    image_pygame = pygame.image.frombuffer(image_rgb.tobytes(), image_rgb.shape[1::-1], "RGB")
+                    self.camera_surface_scaled = pygame.transform.scale(image_pygame, (CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
+                    self.camera_frame_id += 1
 
 
                 # 4. ジェスチャーとゲームロジック
-                left_flick_detected = False
-                right_flick_detected = False
+                self.left_flick_detected = False
+                self.right_flick_detected = False
 
-                left_cursor_pos[:] = [-100, -100]
-                right_cursor_pos[:] = [-100, -100]
-                left_flick_pos[:] = [-100, -100]
-                right_flick_pos[:] = [-100, -100]
+                left_hand_seen = False
+                right_hand_seen = False
+                self.left_flick_pos[:] = OFFSCREEN_POS
+                self.right_flick_pos[:] = OFFSCREEN_POS
 
                 if results and results.multi_hand_landmarks:
                     for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
@@ -517,108 +554,151 @@ while running:
                         if handedness.classification[0].label == 'Left':
                             left_is_grabbing = not is_open
                             left_is_open_now = is_open # ★ 開閉状態を更新
-                            left_cursor_pos[:] = hand_pos
-                            left_flick_pos[:] = (flick_pos_x, flick_pos_y)
+                            left_hand_seen = True
+                            self.left_cursor_track.add_sample(frame_time_ms, hand_pos[0], hand_pos[1])
+                            self.left_flick_pos[:] = (flick_pos_x, flick_pos_y)
 
-                            left_middle_tip_y[0] = left_middle_tip_y[1]
-                            left_middle_tip_y[1] = flick_pos_y
-                            flick_velocity = left_middle_tip_y[0] - left_middle_tip_y[1]
+                            self.left_middle_tip_y[0] = self.left_middle_tip_y[1]
+                            self.left_middle_tip_y[1] = flick_pos_y
+                            flick_velocity = self.left_middle_tip_y[0] - self.left_middle_tip_y[1]
 
                             if is_open and flick_velocity > FLICK_THRESHOLD:
-                                left_flick_detected = True
+                                self.left_flick_detected = True
 
                         elif handedness.classification[0].label == 'Right':
                             right_is_grabbing = not is_open
                             right_is_open_now = is_open # ★ 開閉状態を更新
-                            right_cursor_pos[:] = hand_pos
-                            right_flick_pos[:] = (flick_pos_x, flick_pos_y)
+                            right_hand_seen = True
+                            self.right_cursor_track.add_sample(frame_time_ms, hand_pos[0], hand_pos[1])
+                            self.right_flick_pos[:] = (flick_pos_x, flick_pos_y)
 
-                            right_middle_tip_y[0] = right_middle_tip_y[1]
-                            right_middle_tip_y[1] = flick_pos_y
-                            flick_velocity = right_middle_tip_y[0] - right_middle_tip_y[1]
+                            self.right_middle_tip_y[0] = self.right_middle_tip_y[1]
+                            self.right_middle_tip_y[1] = flick_pos_y
+                            flick_velocity = self.right_middle_tip_y[0] - self.right_middle_tip_y[1]
 
                             if is_open and flick_velocity > FLICK_THRESHOLD:
-                                right_flick_detected = True
-        
-        # ★ 手の開閉変化を検出 (カメラが失敗しても実行されるように外に出す)
-        left_closed_this_frame = left_was_holding and not left_is_open_now # left_was_holding は前フレームの 'is_open' 状態
-        right_closed_this_frame = right_was_holding and not right_is_open_now
+                                self.right_flick_detected = True
 
-        left_was_holding = left_is_open_now # 今フレームの状態を「前フレーム用」に保存
-        right_was_holding = right_is_open_now
+                if not left_hand_seen: # ★ 新しい画像に手が無ければ補間をやめる
+                    self.left_cursor_track.clear()
+                if not right_hand_seen:
+                    self.right_cursor_track.clear()
 
-        # --- 当たり判定 (ホールド) ---
-        left_cursor_rect = pygame.Rect(left_cursor_pos[0] - cursor_radius, left_cursor_pos[1] - cursor_radius, cursor_radius * 2, cursor_radius * 2)
-        right_cursor_rect = pygame.Rect(right_cursor_pos[0] - cursor_radius, right_cursor_pos[1] - cursor_radius, cursor_radius * 2, cursor_radius * 2)
+        # ★ 描画するカーソルの位置を、この描画フレームの時刻に合わせて補間する
+        now_ms = pygame.time.get_ticks()
+        if not self.left_cursor_track.position(now_ms, left_cursor_pos):
+            left_cursor_pos[:] = OFFSCREEN_POS
+        if not self.right_cursor_track.position(now_ms, right_cursor_pos):
+            right_cursor_pos[:] = OFFSCREEN_POS
+
+        self.alloc_check.begin() # ★ ここから画面転送まで (カメラと MediaPipe は除く) のメモリ確保を測る
 
-        visible_holds_for_drawing = []
-        left_colliding_hold = None
-        right_colliding_hold = None
+        # ★ 手の開閉変化を検出 (カメラが失敗しても実行されるように外に出す)
+        self.left_was_holding = left_is_open_now # 今フレームの状態を「前フレーム用」に保存
+        self.right_was_holding = right_is_open_now
 
-        if hold_image:
+        # --- 当たり判定 (ホールド) ---
+        # ★ Rect は作り直さずに位置だけ書き換える
+        left_grab_rect = self.left_grab_rect
+        right_grab_rect = self.right_grab_rect
+        self.left_cursor_rect.x = left_cursor_pos[0] - cursor_radius
+        self.left_cursor_rect.y = left_cursor_pos[1] - cursor_radius
+        self.right_cursor_rect.x = right_cursor_pos[0] - cursor_radius
+        self.right_cursor_rect.y = right_cursor_pos[1] - cursor_radius
+        left_grab_rect.x = left_grab_pos[0] - cursor_radius
+        left_grab_rect.y = left_grab_pos[1] - cursor_radius
+        right_grab_rect.x = right_grab_pos[0] - cursor_radius
+        right_grab_rect.y = right_grab_pos[1] - cursor_radius
+
+        world_y_offset = self.world_y_offset
+        left_on_hold = False
+        right_on_hold = False
+        visible_hold_start = visible_hold_end = 0
+
+        if self.hold_image:
             min_y_world = world_y_offset
             max_y_world = world_y_offset + GAME_HEIGHT
-            for hold_rect_world in holds_list:
-                if hold_rect_world.bottom > min_y_world and hold_rect_world.top < max_y_world:
-                    screen_rect = hold_rect_world.move(0, -world_y_offset)
-                    visible_holds_for_drawing.append(screen_rect)
-
-                    if left_colliding_hold is None and left_cursor_rect.colliderect(screen_rect):
-                        left_colliding_hold = screen_rect
-                    if right_colliding_hold is None and right_cursor_rect.colliderect(screen_rect):
-                        right_colliding_hold = screen_rect
+            # ★ 全ホールドを調べずに、画面に映っている範囲のホールドだけを二分探索で求める
+            visible_hold_start = bisect_right(self.hold_tops, min_y_world - self.hold_max_height)
+            visible_hold_end = bisect_left(self.hold_tops, max_y_world)
+            holds_list = self.holds_list
+            hold_screen_rect = self.hold_screen_rect
+            for i in range(visible_hold_start, visible_hold_end):
+                hold_rect_world = holds_list[i]
+                hold_screen_rect.x = hold_rect_world.x
+                hold_screen_rect.y = hold_rect_world.y - world_y_offset
+                hold_screen_rect.width = hold_rect_world.width
+                hold_screen_rect.height = hold_rect_world.height
+
+                if not left_on_hold and left_grab_rect.colliderect(hold_screen_rect):
+                    left_on_hold = True
+                if not right_on_hold and right_grab_rect.colliderect(hold_screen_rect):
+                    right_on_hold = True
+        self.visible_hold_start = visible_hold_start
+        self.visible_hold_end = visible_hold_end
 
         # --- ★ ゴールホールドの当たり判定 ---
         goal_hold_rect_screen = None
         touching_goal_hold_left = False
         touching_goal_hold_right = False
+        goal_hold_rect_world = self.goal_hold_rect_world
         if goal_hold_rect_world:
             min_y_world = world_y_offset
             max_y_world = world_y_offset + GAME_HEIGHT
             if goal_hold_rect_world.bottom > min_y_world and goal_hold_rect_world.top < max_y_world:
-                goal_hold_rect_screen = goal_hold_rect_world.move(0, -world_y_offset)
-                if left_cursor_rect.colliderect(goal_hold_rect_screen):
+                goal_hold_rect_screen = self.goal_hold_rect_screen_buffer # ★ 使い回しの Rect
+                goal_hold_rect_screen.update(goal_hold_rect_world)
+                goal_hold_rect_screen.y -= world_y_offset
+                if left_grab_rect.colliderect(goal_hold_rect_screen):
                     touching_goal_hold_left = True
-                if right_cursor_rect.colliderect(goal_hold_rect_screen):
+                if right_grab_rect.colliderect(goal_hold_rect_screen):
                     touching_goal_hold_right = True
+        self.goal_hold_rect_screen = goal_hold_rect_screen
 
         # --- ★★★ 掴みとスクロールのロジック (V4 - 修正) ★★★
-        left_can_grab_normal = left_is_grabbing and (left_colliding_hold is not None)
-        right_can_grab_normal = right_is_grabbing and (right_colliding_hold is not None)
+        left_can_grab_normal = left_is_grabbing and left_on_hold
+        right_can_grab_normal = right_is_grabbing and right_on_hold
         left_can_grab_goal = left_is_grabbing and touching_goal_hold_left
         right_can_grab_goal = right_is_grabbing and touching_goal_hold_right
 
         left_can_grab = left_can_grab_normal or left_can_grab_goal
         right_can_grab = right_can_grab_normal or right_can_grab_goal
+        self.left_can_grab = left_can_grab
+        self.right_can_grab = right_can_grab
 
 
-        if not game_start_flag and (left_can_grab or right_can_grab):
-            game_start_flag = True
-            start_time = pygame.time.get_ticks()
-            add_log("Climb START!")
+        if not self.game_start_flag and (left_can_grab or right_can_grab):
+            self.game_start_flag = True
+            self.start_time = pygame.time.get_ticks()
+            self.add_log("Climb START!")
+            self.gc_policy.start_round() # ★ 登っている間は自動の GC を止める (ホールドをつかんだ瞬間に止まらないように)
 
-        left_grabbed_this_frame = left_can_grab and not left_was_holding # left_was_holding は前フレームの 'is_grabbing' 状態
-        right_grabbed_this_frame = right_can_grab and not right_was_holding
+        left_grabbed_this_frame = left_can_grab and not self.left_was_holding # left_was_holding は前フレームの 'is_grabbing' 状態
+        right_grabbed_this_frame = right_can_grab and not self.right_was_holding
 
         # --- アンカーポイントの設定 ---
         # 左手が新しく掴んだ
         if left_grabbed_this_frame:
-            left_hold_start_y = left_cursor_pos[1] # 手のY座標を記録
-            world_anchor_y_left = world_y_offset   # その時のワールドY座標を記録
-        
+            self.left_hold_start_y = left_grab_pos[1] # 手のY座標を記録
+            self.world_anchor_y_left = world_y_offset   # その時のワールドY座標を記録
+
         # 右手が新しく掴んだ
         if right_grabbed_this_frame:
-            right_hold_start_y = right_cursor_pos[1] # 手のY座標を記録
-            world_anchor_y_right = world_y_offset  # その時のワールドY座標を記録
+            self.right_hold_start_y = right_grab_pos[1] # 手のY座標を記録
+            self.world_anchor_y_right = world_y_offset  # その時のワールドY座標を記録
 
         # --- スクロール計算 ---
         # (ゴールホールドを掴んでいる場合はスクロールしない)
-        
-        # まず、落下すると仮定
-        current_fall_velocity += GRAVITY_ACCEL
-        if current_fall_velocity > MAX_FALL_SPEED:
-            current_fall_velocity = MAX_FALL_SPEED
-        new_world_y_offset = world_y_offset + int(current_fall_velocity)
+
+        # まず、落下すると仮定 (★ このフレームのステップ数だけ重力を積分する)
+        current_fall_velocity = self.current_fall_velocity
+        fall_distance = 0
+        for _ in range(sim_steps):
+            current_fall_velocity += GRAVITY_ACCEL
+            if current_fall_velocity > MAX_FALL_SPEED:
+                current_fall_velocity = MAX_FALL_SPEED
+            fall_distance += int(current_fall_velocity)
+        new_world_y_offset = world_y_offset + fall_distance
 
         # 各手が掴んでいる場合の目標Yオフセットを計算
         target_y_left = -1 # 左手の目標Y (未設定)
@@ -626,23 +706,23 @@ while running:
 
         # 1. 左手が通常ホールドを掴んでいる場合
         if left_can_grab_normal:
-            pull_distance_left = left_cursor_pos[1] - left_hold_start_y
+            pull_distance_left = left_grab_pos[1] - self.left_hold_start_y
             if pull_distance_left < 0: pull_distance_left = 0
             if pull_distance_left > MAX_PULL_PIXELS: pull_distance_left = MAX_PULL_PIXELS
-            
-            target_y_left = world_anchor_y_left - pull_distance_left
+
+            target_y_left = self.world_anchor_y_left - pull_distance_left
             new_world_y_offset = target_y_left # 落下をキャンセルし、左手の位置を採用
             current_fall_velocity = 0 # 落下速度リセット
 
         # 2. 右手が通常ホールドを掴んでいる場合
         if right_can_grab_normal:
-            pull_distance_right = right_cursor_pos[1] - right_hold_start_y
+            pull_distance_right = right_grab_pos[1] - self.right_hold_start_y
             if pull_distance_right < 0: pull_distance_right = 0
             if pull_distance_right > MAX_PULL_PIXELS: pull_distance_right = MAX_PULL_PIXELS
-            
-            target_y_right = world_anchor_y_right - pull_distance_right
+
+            target_y_right = self.world_anchor_y_right - pull_distance_right
             current_fall_velocity = 0 # 落下速度リセット
-            
+
             # 両手が掴んでいる場合、より高く登れる方(Yオフセットが小さい方)を採用
             if left_can_grab_normal:
                 new_world_y_offset = min(target_y_left, target_y_right)
@@ -653,177 +733,278 @@ while running:
         elif left_can_grab_goal or right_can_grab_goal:
             current_fall_velocity = 0 # 落下は止める
             new_world_y_offset = world_y_offset # スクロールはしない
-        
+
         # 最終的なYオフセットを適用
         world_y_offset = new_world_y_offset
+        self.current_fall_velocity = current_fall_velocity
 
         # --- 状態保存 ---
-        left_was_holding = left_can_grab
-        right_was_holding = right_can_grab
+        self.left_was_holding = left_can_grab
+        self.right_was_holding = right_can_grab
 
         # --- 範囲制限 ---
-        if world_y_offset > max_scroll: world_y_offset = max_scroll
+        if world_y_offset > self.max_scroll: world_y_offset = self.max_scroll
         if world_y_offset < 0: world_y_offset = 0
+        self.world_y_offset = world_y_offset
 
 
         # --- ★ ゴール判定 (両手タッチ1秒) ---
         if touching_goal_hold_left and touching_goal_hold_right:
-            if both_hands_touching_goal_start_time == 0:
-                both_hands_touching_goal_start_time = pygame.time.get_ticks()
+            if self.both_hands_touching_goal_start_time == 0:
+                self.both_hands_touching_goal_start_time = pygame.time.get_ticks()
             else:
-                touch_duration = pygame.time.get_ticks() - both_hands_touching_goal_start_time
+                touch_duration = pygame.time.get_ticks() - self.both_hands_touching_goal_start_time
                 if touch_duration >= GOAL_TOUCH_DURATION_MS:
-                    game_won = True # ★★★ ゲームクリア ★★★
+                    self.game_won = True # ★★★ ゲームクリア ★★★
         else:
-            both_hands_touching_goal_start_time = 0
+            self.both_hands_touching_goal_start_time = 0
 
 
         # --- ★エネミーの更新と当たり判定 ---
-        left_flick_rect = pygame.Rect(left_flick_pos[0] - cursor_radius, left_flick_pos[1] - cursor_radius, cursor_radius*2, cursor_radius*2)
-        right_flick_rect = pygame.Rect(right_flick_pos[0] - cursor_radius, right_flick_pos[1] - cursor_radius, cursor_radius*2, cursor_radius*2)
+        left_flick_rect = self.left_flick_rect
+        right_flick_rect = self.right_flick_rect
+        left_flick_rect.x = self.left_flick_pos[0] - cursor_radius
+        left_flick_rect.y = self.left_flick_pos[1] - cursor_radius
+        right_flick_rect.x = self.right_flick_pos[0] - cursor_radius
+        right_flick_rect.y = self.right_flick_pos[1] - cursor_radius
+
+        enemy_list = self.enemy_list
+        for _ in range(sim_steps): # ★ 固定ステップごとに動かす
+            for enemy in enemy_list: # ★ 消したらすぐ break するのでコピーせずに回す
+                enemy.update()
+
+                if enemy.rect.top > GAME_HEIGHT:
+                    enemy_list.remove(enemy)
+                    self.game_over = True
+                    break
+            if self.game_over:
+                break
+        # ★ フリックの範囲にいる敵を倒す (敵は数体なので順に全部調べる。倒した敵はその場で消し、リストはコピーしない)
+        left_flick = self.left_flick_detected
+        right_flick = self.right_flick_detected
+        index = 0
+        while (left_flick or right_flick) and index < len(enemy_list):
+            enemy = enemy_list[index]
+            if not ((left_flick and left_flick_rect.colliderect(enemy.rect))
+                    or (right_flick and right_flick_rect.colliderect(enemy.rect))):
+                index += 1
+                continue
+            del enemy_list[index] # 次の敵が同じ index に来る
+            self.enemy_kill_count += 1
+            self.add_log(f"Enemy Defeated! ({self.enemy_kill_count})")
+            if self.enemy_kill_count > 0 and self.enemy_kill_count % 5 == 0:
+                self.add_log("5 Kills! +10m Bonus!")
+
+                min_y_offset_for_100m = self.max_scroll - (GOAL_HOLD_METERS * PIXELS_PER_METER)
+
+                self.world_y_offset -= (10 * PIXELS_PER_METER)
+
+                if self.world_y_offset < min_y_offset_for_100m:
+                    self.world_y_offset = min_y_offset_for_100m
+
+                self.left_was_holding = False
+                self.right_was_holding = False
+                self.current_fall_velocity = 0
+
+        if self.game_start_flag and not self.game_won and not self.game_over:
+            self.elapsed_time = pygame.time.get_ticks() - self.start_time
+
+    def is_hovering_retry(self):
+        """マウスがリトライボタンの上にあるか"""
+        mouse_pos = self.mouse_pos
+        if not GAME_PANEL_RECT.collidepoint(mouse_pos):
+            return False
+        mouse_x_in_game = px(mouse_pos[0] - GAME_PANEL_RECT.left)
+        mouse_y_in_game = px(mouse_pos[1] - GAME_PANEL_RECT.top)
+        return retry_button_rect_game.collidepoint(mouse_x_in_game, mouse_y_in_game)
+
+    def render(self):
+        game_surface = self.game_surface
+        panels = self.panels
+
+        if self.game_won:
+            # --- ★★★ GAME CLEAR ★★★ ---
+            if self.goal_background_image:
+                game_surface.blit(self.goal_background_image, (0, 0))
+            else:
+                game_surface.fill(SKY_BLUE)
+
+            if not self.end_screen_texts: # ★ 文字はクリアした時に1回だけ描く
+                goal_text = self.goal_text_font.render(f"{int(GOAL_HOLD_METERS)}m Climb Success!!", True, ORANGE)
+                self.end_screen_texts.append((goal_text, (
+                    game_surface.get_width() // 2 - goal_text.get_width() // 2,
+                    game_surface.get_height() // 4 - goal_text.get_height() // 2
+                )))
+                time_text = self.font_game_ui.render(f"Clear Time: {format_time(self.final_time)}", True, ORANGE)
+                self.end_screen_texts.append((time_text, (
+                    game_surface.get_width() // 2 - time_text.get_width() // 2,
+                    game_surface.get_height() // 4 + goal_text.get_height()
+                )))
+            game_surface.blits(self.end_screen_texts, doreturn=False)
+
+            if self.dancer_images:
+                current_dancer_image = self.dancer_images[self.dancer_frame]
+                img_rect = current_dancer_image.get_rect(center=(game_surface.get_width() // 2, game_surface.get_height() // 2 + px(100)))
+                game_surface.blit(current_dancer_image, img_rect)
+
+            self.draw_retry_button(game_surface)
+
+        elif self.game_over:
+            # --- ★★★ GAME OVER ★★★ ---
+            game_surface.fill(BLACK)
+            if not self.end_screen_texts: # ★ 文字はゲームオーバーになった時に1回だけ描く
+                go_text = self.game_over_font.render("GAME OVER", True, RED)
+                self.end_screen_texts.append((go_text, (
+                    game_surface.get_width() // 2 - go_text.get_width() // 2,
+                    game_surface.get_height() // 2 - go_text.get_height() // 2 - px(50)
+                )))
+                time_text = self.font_game_ui.render(f"Final Time: {format_time(self.final_time)}", True, WHITE)
+                self.end_screen_texts.append((time_text, (
+                    game_surface.get_width() // 2 - time_text.get_width() // 2,
+                    game_surface.get_height() // 2 + px(50)
+                )))
+            game_surface.blits(self.end_screen_texts, doreturn=False)
+
+            self.draw_retry_button(game_surface)
 
-        for enemy in enemy_list[:]:
-            enemy.update()
+        else:
+            # --- ★★★ GAME RUNNING ★★★ ---
+            # 5. Pygameの描画処理
+            world_y_offset = self.world_y_offset
+            if self.full_background:
+                self.background_dest.y = -world_y_offset
+                game_surface.blit(self.full_background, self.background_dest)
+            else:
+                game_surface.fill(SKY_BLUE)
 
-            if enemy.rect.top > GAME_HEIGHT:
-                enemy_list.remove(enemy)
-                game_over = True
-                break
+            if self.hold_image:
+                hold_image = self.hold_image
+                holds_list = self.holds_list
+                hold_screen_rect = self.hold_screen_rect
+                for i in range(self.visible_hold_start, self.visible_hold_end):
+                    hold_screen_rect.x = holds_list[i].x
+                    hold_screen_rect.y = holds_list[i].y - world_y_offset
+                    game_surface.blit(hold_image, hold_screen_rect)
+
+            if self.goal_hold_image and self.goal_hold_rect_screen:
+                 game_surface.blit(self.goal_hold_image, self.goal_hold_rect_screen)
+
+            alpha = self.fixed_step.alpha
+            for enemy in self.enemy_list:
+                enemy.draw(game_surface, alpha) # ★ ステップの間を補間して描く
+
+            left_cursor_color = GREEN if self.left_can_grab else RED
+            right_cursor_color = GREEN if self.right_can_grab else RED
+
+            # ★ 色ごとに作っておいたカーソル画像を、カーソルの Rect の位置に描く
+            if self.left_cursor_pos[0] != -100:
+                game_surface.blit(self.cursor_sprites[left_cursor_color], self.left_cursor_rect)
+
+            if self.right_cursor_pos[0] != -100:
+                game_surface.blit(self.cursor_sprites[right_cursor_color], self.right_cursor_rect)
+
+            if self.left_flick_detected:
+                pygame.draw.circle(game_surface, BLUE, self.left_flick_pos, cursor_radius + px(10), max(1, px(5)))
+            if self.right_flick_detected:
+                pygame.draw.circle(game_surface, BLUE, self.right_flick_pos, cursor_radius + px(10), max(1, px(5)))
+
+        # --- ★★★ UIパネルの描画 (全状態共通) ★★★ ---
 
-            killed = False
-            if left_flick_detected and left_flick_rect.colliderect(enemy.rect):
-                enemy_list.remove(enemy)
-                killed = True
-
-            elif right_flick_detected and right_flick_rect.colliderect(enemy.rect):
-                enemy_list.remove(enemy)
-                killed = True
-
-            if killed:
-                enemy_kill_count += 1
-                add_log(f"Enemy Defeated! ({enemy_kill_count})")
-                if enemy_kill_count > 0 and enemy_kill_count % 5 == 0:
-                    add_log("5 Kills! +10m Bonus!")
-                    
-                    min_y_offset_for_100m = max_scroll - (GOAL_HOLD_METERS * PIXELS_PER_METER)
-                    
-                    world_y_offset -= (10 * PIXELS_PER_METER)
-                    
-                    if world_y_offset < min_y_offset_for_100m:
-                        world_y_offset = min_y_offset_for_100m
-                    
-                    left_was_holding = False
-                    right_was_holding = False
-                    current_fall_velocity = 0
-
-        # ★ game_over チェック
-        if game_over:
-            pass # このフレームの残りは描画のみ
-
-        # 5. Pygameの描画処理
-        game_surface = screen.subsurface(GAME_PANEL_RECT)
-
-        if full_background:
-            game_surface.blit(full_background, (0, -world_y_offset))
+        # --- スコアパネル (左上) ---
+        if self.game_won:
+            display_height = GOAL_HOLD_METERS
         else:
-            game_surface.fill(SKY_BLUE)
-
-        if hold_image:
-            for rect in visible_holds_for_drawing:
-                game_surface.blit(hold_image, rect)
-
-        if goal_hold_image and goal_hold_rect_screen:
-             game_surface.blit(goal_hold_image, goal_hold_rect_screen)
-
-        for enemy in enemy_list:
-            enemy.draw(game_surface)
-
-        left_cursor_color = GREEN if left_can_grab else RED
-        right_cursor_color = GREEN if right_can_grab else RED
-        ALPHA_VALUE = 128
-
-        if left_cursor_pos[0] != -100:
-            circle_surface_left = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(circle_surface_left, left_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
-            game_surface.blit(circle_surface_left, (left_cursor_pos[0] - cursor_radius, left_cursor_pos[1] - cursor_radius))
-
-        if right_cursor_pos[0] != -100:
-            circle_surface_right = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(circle_surface_right, right_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
-            game_surface.blit(circle_surface_right, (right_cursor_pos[0] - cursor_radius, right_cursor_pos[1] - cursor_radius))
-
-        if left_flick_detected:
-            pygame.draw.circle(game_surface, BLUE, left_flick_pos, cursor_radius + 10, 5)
-        if right_flick_detected:
-            pygame.draw.circle(game_surface, BLUE, right_flick_pos, cursor_radius + 10, 5)
-
-    # --- ★★★ UIパネルの描画 (全状態共通) ★★★ ---
-
-    if game_start_flag and not game_won and not game_over:
-        elapsed_time = pygame.time.get_ticks() - start_time
-
-    # --- スコアパネル (左上) ---
-    score_surface = screen.subsurface(SCORE_PANEL_RECT)
-    score_surface.fill(BLACK)
-    title_text = font_title.render("SCORE", True, WHITE)
-    score_surface.blit(title_text, (10, 10))
-
-    display_height = height_climbed
-    if game_won:
-        display_height = GOAL_HOLD_METERS
-
-    height_text_str = f"Height: {display_height:.1f} m"
-    height_text = font_ui.render(height_text_str, True, WHITE)
-    score_surface.blit(height_text, (15, 60))
-
-    time_text_str = f"Time: {format_time(elapsed_time)}"
-    if final_time > 0:
-        time_text_str = f"Time: {format_time(final_time)}"
-    time_text = font_ui.render(time_text_str, True, WHITE)
-    score_surface.blit(time_text, (15, 110))
-
-    kill_text_str = f"Kills: {enemy_kill_count}"
-    kill_text = font_ui.render(kill_text_str, True, WHITE)
-    score_surface.blit(kill_text, (15, 160))
-
-    r_text = font_log.render("'R' Key: 90m Rocket", True, GREEN)
-    score_surface.blit(r_text, (15, 250))
-
-
-    # --- ログパネル (左中) ---
-    log_surface = screen.subsurface(LOG_PANEL_RECT)
-    log_surface.fill(BLACK)
-    log_title = font_title.render("LOG", True, WHITE)
-    log_surface.blit(log_title, (10, 10))
-    y_pos = 50
-    for message in log_messages:
-        log_text = font_log.render(message, True, GREEN)
-        log_surface.blit(log_text, (15, y_pos))
-        y_pos += 25
-
-    # --- カメラパネル (左下) ---
-    cam_title = font_title.render("CAMERA", True, WHITE)
-    cam_surface = screen.subsurface(CAM_PANEL_RECT)
-    pygame.draw.rect(cam_surface, BLACK, (0, 0, CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
-    cam_surface.blit(cam_title, (10, 10))
-
-    if cap.isOpened() and camera_surface_scaled:
-        cam_surface.blit(camera_surface_scaled, (0, 30))
-    elif not cap.isOpened():
-         # ★ ゲーム実行中のみエラー表示
-         if not game_won and not game_over:
-             cam_error_text = font_log.render("Camera not found.", True, RED)
-             cam_surface.blit(cam_error_text, (10, 50))
-    
-    # 画面更新 (全状態共通)
-    pygame.display.flip()
-    delta_time_ms = clock.tick(FPS) # ★ FPSを制御し、delta_time_ms を取得
-
-# --- 終了処理 ---
-if cap.isOpened():
-    cap.release()
-cv2.destroyAllWindows()
-pygame.quit()
-sys.exit() # ★ 確実な終了
-
-#リトライできない
\ No newline at end of file
+            display_height = (self.max_scroll - self.world_y_offset) / PIXELS_PER_METER
+
+        shown_time = self.final_time if self.final_time > 0 else self.elapsed_time
+
+        # ★ 表示内容が変わった時だけ描き直す (数字は作っておいた文字の画像を並べる)
+        height_tenths = max(0, round(display_height * 10))
+        if panels.needs_redraw(SCORE_PANEL_RECT, (height_tenths, shown_time // 10, self.enemy_kill_count)):
+            score_surface = self.score_surface
+            blit_glyph = self.blit_glyph
+            blit_digits = self.blit_digits
+            score_surface.fill(BLACK)
+            score_surface.blit(self.score_title_text, (10, 10))
+
+            # Height: 12.3 m
+            x = blit_glyph(score_surface, self.height_label_text, 15, 60)
+            x = blit_digits(score_surface, height_tenths // 10, x, 60)
+            x = blit_glyph(score_surface, self.dot_glyph, x, 60)
+            x = blit_digits(score_surface, height_tenths % 10, x, 60)
+            blit_glyph(score_surface, self.meter_unit_text, x, 60)
+
+            # Time: 01:23.45 (format_time と同じ形)
+            total_seconds = shown_time // 1000
+            x = blit_glyph(score_surface, self.time_label_text, 15, 110)
+            x = blit_digits(score_surface, total_seconds // 60, x, 110, 2)
+            x = blit_glyph(score_surface, self.colon_glyph, x, 110)
+            x = blit_digits(score_surface, total_seconds % 60, x, 110, 2)
+            x = blit_glyph(score_surface, self.dot_glyph, x, 110)
+            blit_digits(score_surface, shown_time % 1000 // 10, x, 110, 2)
+
+            # Kills: 3
+            x = blit_glyph(score_surface, self.kills_label_text, 15, 160)
+            blit_digits(score_surface, self.enemy_kill_count, x, 160)
+
+            score_surface.blit(self.rocket_help_text, (15, 250))
+
+
+        # --- ログパネル (左中) ---
+        if panels.needs_redraw(LOG_PANEL_RECT, self.log_version):
+            log_surface = self.log_surface
+            log_surface.fill(BLACK)
+            log_surface.blit(self.log_title_text, (10, 10))
+            y_pos = 50
+            for message in self.log_messages:
+                log_text = self.font_log.render(message, True, GREEN)
+                log_surface.blit(log_text, (15, y_pos))
+                y_pos += 25
+
+        # --- カメラパネル (左下) ---
+        cam_opened = self.cap.isOpened()
+        show_camera = cam_opened and self.camera_surface_scaled is not None
+        show_cam_error = not cam_opened and not self.game_won and not self.game_over # ★ ゲーム実行中のみエラー表示
+        # ★ キーは整数だけにする (映像があればフレーム番号、無ければ -1 / エラー表示中は -2)
+        if panels.needs_redraw(CAM_PANEL_RECT, self.camera_frame_id if show_camera else (-2 if show_cam_error else -1)):
+            cam_surface = self.cam_surface
+            cam_surface.fill(BLACK)
+            cam_surface.blit(self.cam_title_text, (10, 10))
+
+            if show_camera:
+                cam_surface.blit(self.camera_surface_scaled, (0, 30))
+            elif show_cam_error:
+                cam_surface.blit(self.cam_error_text, (10, 50))
+
+        # 画面更新 (全状態共通)
+        if game_surface is not self.game_panel_view:
+            pygame.transform.scale(game_surface, GAME_PANEL_RECT.size, self.game_panel_view) # ★ 内部解像度から1回だけ拡大
+        panels.mark(GAME_PANEL_RECT) # ゲームパネルは毎フレーム描き直している
+        panels.present() # ★ flip() の代わりに変化した矩形だけ転送
+        self.alloc_check.end()
+        if self.alloc_check.done:
+            self.running = False
+
+    def draw_retry_button(self, game_surface):
+        """ゴール / ゲームオーバー画面のリトライボタン"""
+        is_hovering_retry = self.is_hovering_retry()
+        btn_color = BUTTON_HOVER_COLOR if is_hovering_retry else BUTTON_COLOR
+        pygame.draw.rect(game_surface, btn_color, retry_button_rect_game, border_radius=10)
+        game_surface.blit(self.retry_text, self.retry_text_rect)
+
+    def exit(self):
+        # --- 終了処理 ---
+        pygame.time.set_timer(ENEMY_SPAWN_EVENT, 0)
+        if self.alloc_check.enabled:
+            print(self.alloc_check.report())
+        self.gc_policy.close()
+        print(self.gc_policy.report())
+        if self.cap.isOpened():
+            self.cap.release()
+        self.exit_code = 0 if self.alloc_check.ok else 1 # ★ --alloc-check で失敗した時は終了コード 1
+
+
+SCENE = NewGoalScene # ★ ランチャーが探すシーンのクラス
+
+if __name__ == "__main__":
+    run_scene(NewGoalScene())
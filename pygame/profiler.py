@@ -0,0 +1,91 @@
+# --- ★ フレーム時間の計測 ---
+# 1フレームを「ステージ」(カメラ / 更新 / 描画 / 画面転送 など) に区切って時間を測り、
+# 負荷 (画面上の敵の数など) ごとにまとめて表にする。ストレステストや性能調査用。
+#
+# 使い方:
+#   profiler = FrameProfiler(enabled=True, load_label="enemies")
+#   while running:
+#       profiler.begin_frame()
+#       ... カメラ処理 ...
+#       profiler.lap("camera")
+#       ... 描画 ...
+#       profiler.lap("render")
+#       profiler.end_frame(load=len(enemies))
+#   print(profiler.report())
+
+import time
+
+
+class FrameProfiler:
+    """ステージごとの処理時間を負荷の区間 (bucket_size 刻み) ごとに集計する"""
+
+    def __init__(self, enabled=True, bucket_size=1000, load_label="load"):
+        self.enabled = enabled
+        self.bucket_size = bucket_size
+        self.load_label = load_label
+        self.stage_names = [] # 最初に出てきた順
+        self.buckets = {} # {区間の先頭: {"frames": [ms, ...], "stages": {name: 合計ms}}}
+        self._frame_start = 0.0
+        self._lap_start = 0.0
+        self._laps = {}
+        self._in_frame = False # begin_frame() の後、end_frame() がまだ呼ばれていない
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._frame_start = self._lap_start = time.perf_counter()
+        self._laps = {}
+        self._in_frame = True
+
+    def lap(self, name):
+        """前回の lap (または begin_frame) からの時間を name のステージとして記録"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._laps[name] = self._laps.get(name, 0.0) + (now - self._lap_start) * 1000
+        self._lap_start = now
+        if name not in self.stage_names:
+            self.stage_names.append(name)
+
+    def record(self, name, ms):
+        """★ lap とは別に測った時間 (GC の停止など) を name のステージに足す。
+        他のステージの時間にも含まれているので、ステージの合計はフレーム時間より大きくなることがある"""
+        if not self.enabled:
+            return
+        self._laps[name] = self._laps.get(name, 0.0) + ms
+        if name not in self.stage_names:
+            self.stage_names.append(name)
+
+    def end_frame(self, load=0, at_last_lap=False):
+        """フレームの合計時間を記録する。load はそのフレームの負荷 (敵の数など)。
+        ★ at_last_lap なら最後の lap の時刻をフレームの終わりにする (次のフレームの初めに閉じる時、間の待ち時間を入れない)。
+        begin_frame() の後にまだ閉じていなければ何もしない"""
+        if not self.enabled or not self._in_frame:
+            return 0.0
+        self._in_frame = False
+        frame_end = self._lap_start if at_last_lap else time.perf_counter()
+        frame_ms = (frame_end - self._frame_start) * 1000
+        key = int(load) // self.bucket_size * self.bucket_size
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = {"frames": [], "stages": {}}
+        bucket["frames"].append(frame_ms)
+        for name, ms in self._laps.items():
+            bucket["stages"][name] = bucket["stages"].get(name, 0.0) + ms
+        return frame_ms
+
+    def report(self):
+        """負荷の区間ごとの フレーム数 / 平均 / p95 / 最大 と ステージ別平均 (ms) の表を返す"""
+        header = f"{self.load_label:>13} {'frames':>7} {'avg':>7} {'p95':>7} {'max':>7}"
+        header += "".join(f" {name:>9}" for name in self.stage_names)
+        lines = [header]
+        for key in sorted(self.buckets):
+            bucket = self.buckets[key]
+            frames = sorted(bucket["frames"])
+            count = len(frames)
+            avg = sum(frames) / count
+            p95 = frames[min(count - 1, int(count * 0.95))]
+            line = f"{key:>6}-{key + self.bucket_size - 1:<6} {count:>7} {avg:>7.2f} {p95:>7.2f} {frames[-1]:>7.2f}"
+            line += "".join(f" {bucket['stages'].get(name, 0.0) / count:>9.2f}" for name in self.stage_names)
+            lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,225 @@
+# --- ★ 負荷に応じて品質を下げる governor (フレーム時間が予算を超えたら段階的に軽くする) ---
+# 今は1フレームの処理が予算 (1000 / fps ms) を超えても何も変わらず、ゲームがそのまま遅くなる。
+# --qos を付けると、run_scene() が毎フレーム「更新 (カメラ・推論を含む)」と「描画」の時間を、
+# 推論のラッパー (QoSModel) が推論の時間を、カメラのラッパー (QoSCamera) がカメラの次の画像を待った時間を
+# qos に知らせる。カメラを待つ時間 (30 fps のカメラなら毎フレーム約 33ms) は負荷ではないので
+# 更新の時間から引き、残りの平均 (指数移動平均) が予算を
+# DEGRADE_FRAMES フレーム続けて超えたら LADDER を1段下げる。余裕が RECOVER_FRAMES フレーム続いたら1段戻す:
+#   1. preview    カメラのプレビュー (左下) を3フレームに1回だけ作る
+#   2. skeleton   プレビューに骨格を描かない
+#   3. inference  推論に渡す画像を半分の大きさにし、model_complexity を 0 にする
+#   4. hands      max_num_hands を 1 にする (片手で遊べるゲーム = シーンの single_hand が True の時だけ)
+#   5. render     描画を2フレームに1回にする (更新とカメラは毎フレーム)
+# 段は下から順に重ねてかかる。切り替えるたびに、その時の平均とステージ別の時間を表示する。
+# 戻した直後にまた下げることになったら、次に戻すまでのフレーム数を倍にする (行ったり来たりしないように)。
+# ※ 描画の内部解像度 (--render-scale) はコースや速さの大きさに組み込まれていて、遊んでいる途中には
+#   変えられないので、5 は描画の回数を減らして代わりにする。
+#
+# 使い方 (リポジトリのルートで):
+#   python pygame/launcher.py --qos
+#   python pygame/rulercatch.py --qos
+# ゲーム側 (カメラのプレビュー):
+#   if qos.preview_due():
+#       if qos.draw_skeleton and results.multi_hand_landmarks: ... draw_landmarks ...
+#       ... camera_surface_scaled を作る ...
+
+import sys
+import time
+import cv2
+
+DEGRADE_FRAMES = 15 # 平均が予算を超えたフレームがこれだけ続いたら1段下げる
+RECOVER_FRAMES = 90 # 平均が予算の RECOVER_RATIO 未満のフレームがこれだけ続いたら1段戻す
+RECOVER_RATIO = 0.6
+MAX_RECOVER_FRAMES = 1800 # 行ったり来たりする時の、戻すまでのフレーム数の上限
+COOLDOWN_FRAMES = 30 # 切り替えた後、効果が平均に出るまで判定しないフレーム数
+EMA_ALPHA = 0.1 # フレーム時間の平均を今のフレームに寄せる割合
+
+# (名前, その段で変える設定)
+LADDER = [
+    ("preview", dict(preview_every=3)),
+    ("skeleton", dict(draw_skeleton=False)),
+    ("inference", dict(inference_scale=0.5, model_complexity=0)),
+    ("hands", dict(max_num_hands=1)),
+    ("render", dict(render_every=2)),
+]
+FULL_QUALITY = dict(preview_every=1, draw_skeleton=True, inference_scale=1.0, model_complexity=None,
+                    max_num_hands=None, render_every=1)
+
+
+def qos_from_argv(argv=None):
+    """--qos が指定されたか"""
+    argv = sys.argv if argv is None else argv
+    return "--qos" in argv
+
+
+class QoSGovernor:
+    """フレーム時間を見て LADDER の段を上げ下げし、今の段の設定を属性で見せる"""
+
+    def __init__(self):
+        self.enabled = False
+        self.scene_name = "scene"
+        self.budget_ms = 1000 / 60
+        self.rungs = [] # このシーンで使える LADDER の段
+        self.level = 0 # 0 = 全部そのまま、n = rungs の n 段目まで下げた
+        self.__dict__.update(FULL_QUALITY)
+        self.average_ms = 0.0
+        self.stage_ms = {} # ステージ別の時間の平均
+        self.inference_ms = 0.0 # このフレームの推論の時間 (QoSModel が足す)
+        self.camera_wait_ms = 0.0 # ★ このフレームでカメラを待った時間 (QoSCamera が足す)
+        self.over = 0
+        self.under = 0
+        self.cooldown = 0
+        self.recover_frames = RECOVER_FRAMES
+        self.recovered_at = None # 最後に戻したフレーム
+        self.frame = 0
+        self.preview_count = 0
+        self.render_count = 0
+
+    def begin(self, scene):
+        """シーンを始める時に呼ぶ (段は全部そのままに戻す)"""
+        self.enabled = qos_from_argv(scene.argv)
+        self.scene_name = scene.name
+        self.budget_ms = 1000 / scene.fps
+        self.rungs = [rung for rung in LADDER if rung[0] != "hands" or scene.single_hand]
+        self.level = 0
+        self.__dict__.update(FULL_QUALITY)
+        self.average_ms = 0.0
+        self.stage_ms = {}
+        self.inference_ms = 0.0
+        self.camera_wait_ms = 0.0
+        self.over = self.under = self.cooldown = 0
+        self.recover_frames = RECOVER_FRAMES
+        self.recovered_at = None
+        self.frame = 0
+        if self.enabled:
+            print(f"[qos] {self.scene_name}: frame budget {self.budget_ms:.1f}ms,"
+                  f" ladder {' > '.join(name for name, _ in self.rungs)}")
+
+    def preview_due(self):
+        """カメラのプレビューをこのフレームで作るか (preview 段では preview_every 回に1回)"""
+        self.preview_count += 1
+        return self.preview_count % self.preview_every == 0
+
+    def render_due(self):
+        """このフレームを描くか (render 段では render_every 回に1回)"""
+        self.render_count += 1
+        return self.render_count % self.render_every == 0
+
+    def record_inference(self, ms):
+        self.inference_ms += ms
+
+    def record_camera_wait(self, ms):
+        self.camera_wait_ms += ms
+
+    def model_overrides(self, kind):
+        """推論モデルの設定のうち、今の段で上書きするもの"""
+        overrides = {}
+        if kind in ("hands", "holistic") and self.model_complexity is not None: # split は使わない (作り直しも重い)
+            overrides["model_complexity"] = self.model_complexity
+        if kind == "hands" and self.max_num_hands is not None:
+            overrides["max_num_hands"] = self.max_num_hands
+        return overrides
+
+    def end_frame(self, update_ms, render_ms):
+        """1フレーム分の時間を記録し、必要なら段を上げ下げする"""
+        if not self.enabled:
+            return
+        self.frame += 1
+        update_ms = max(0.0, update_ms - self.camera_wait_ms) # ★ カメラを待っていた時間は負荷に数えない
+        stages = {"camera": self.camera_wait_ms, "update": update_ms, "inference": self.inference_ms, "render": render_ms}
+        self.inference_ms = 0.0
+        self.camera_wait_ms = 0.0
+        for name, ms in stages.items():
+            self.stage_ms[name] = self.stage_ms.get(name, ms) * (1 - EMA_ALPHA) + ms * EMA_ALPHA
+        frame_ms = update_ms + render_ms # 推論は update に含まれている (カメラの待ちは含まない)
+        self.average_ms = frame_ms if self.frame == 1 else self.average_ms * (1 - EMA_ALPHA) + frame_ms * EMA_ALPHA
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return
+        if self.average_ms > self.budget_ms:
+            self.over += 1
+            self.under = 0
+        elif self.average_ms < self.budget_ms * RECOVER_RATIO:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+        if self.over >= DEGRADE_FRAMES and self.level < len(self.rungs):
+            if self.recovered_at is not None and self.frame - self.recovered_at < self.recover_frames * 2:
+                self.recover_frames = min(self.recover_frames * 2, MAX_RECOVER_FRAMES) # 戻したのが早すぎた
+            self.set_level(self.level + 1, "down")
+        elif self.under >= self.recover_frames and self.level > 0:
+            self.recovered_at = self.frame
+            self.set_level(self.level - 1, "up")
+
+    def set_level(self, level, direction):
+        before = self.rungs[self.level - 1][0] if self.level else "full"
+        self.level = level
+        self.__dict__.update(FULL_QUALITY)
+        for _, settings in self.rungs[:level]:
+            self.__dict__.update(settings)
+        after = self.rungs[level - 1][0] if level else "full"
+        stages = ", ".join(f"{name} {ms:.1f}" for name, ms in self.stage_ms.items())
+        print(f"[qos] {self.scene_name}: {direction} {before} -> {after} (level {level}/{len(self.rungs)}),"
+              f" frame {self.average_ms:.1f}ms / budget {self.budget_ms:.1f}ms ({stages})")
+        self.over = self.under = 0
+        self.cooldown = COOLDOWN_FRAMES
+
+
+class QoSModel:
+    """MediaPipe のモデルの前に置き、qos の段に合わせて推論の画像を縮め、設定が変われば作り直す"""
+
+    def __init__(self, kind, factory, settings):
+        self.kind = kind # "hands" / "holistic" / "split"
+        self.factory = factory
+        self.settings = settings
+        self.applied = None # 今のモデルを作った時の上書き
+        self.model = None
+
+    def process(self, image_rgb):
+        overrides = qos.model_overrides(self.kind)
+        if overrides != self.applied:
+            if self.model is not None:
+                self.model.close()
+            self.model = self.factory(**{**self.settings, **overrides})
+            self.applied = overrides
+        if qos.inference_scale < 1.0:
+            height, width = image_rgb.shape[:2]
+            size = (round(width * qos.inference_scale), round(height * qos.inference_scale))
+            image_rgb = cv2.resize(image_rgb, size, interpolation=cv2.INTER_AREA) # 座標は 0-1 なのでそのまま使える
+        started = time.perf_counter()
+        results = self.model.process(image_rgb)
+        qos.record_inference((time.perf_counter() - started) * 1000)
+        return results
+
+    def close(self):
+        if self.model is not None:
+            self.model.close()
+            self.model = None
+            self.applied = None
+
+
+class QoSCamera:
+    """★ カメラの前に置き、read() / grab() で次の画像を待った時間を qos に知らせる (それ以外はそのまま渡す)"""
+
+    def __init__(self, capture):
+        self.capture = capture
+
+    def read(self):
+        started = time.perf_counter()
+        result = self.capture.read()
+        qos.record_camera_wait((time.perf_counter() - started) * 1000)
+        return result
+
+    def grab(self):
+        started = time.perf_counter()
+        result = self.capture.grab()
+        qos.record_camera_wait((time.perf_counter() - started) * 1000)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.capture, name) # isOpened / retrieve / get / release など
+
+
+# プロセス全体で共有する governor (run_scene() が begin / end_frame を呼ぶ)
+qos = QoSGovernor()
@@ -0,0 +1,299 @@
+# --- ★ 描画バックエンド (Surface / pygame._sdl2 の Renderer + Texture) ---
+# 今までどおり画面の Surface に blit する "surface" と、SDL の Renderer で Texture を描く "sdl2" を
+# 実行ごとに選べるようにする (python pygame/dekopin.py --renderer sdl2、または環境変数 FESTIVAL_RENDERER)。
+# ゲームはキャンバスの blit / blits (Surface と同じ呼び方) / circle と、文字やボタン用の overlay (Surface) に描くだけで、
+# どちらのバックエンドでも同じコードで動く。
+# - sdl2: 画像は最初に描いた時に1回だけ Texture にアップロードして使い回す
+#   (アトラスの subsurface はシートごと1枚の Texture)。中身を書き換える Surface は overlay に描くこと。
+# - 左カラム (スコア / ログ / カメラ) はこれまでどおり screen (Surface) に描き、
+#   DirtyPanels で変化した矩形だけを Texture に送る。
+# GPU の無いヘッドレスの Linux では SDL_RENDER_DRIVER=software でソフトウェアレンダラーになる。
+# ★ render_scale_from_argv() は --render-scale 0.5 のような「ゲームパネルの内部解像度の倍率」を返す
+#   (低性能なノート PC 向け。ゲーム側が小さな Surface に描き、最後に1回だけ拡大して転送する)。
+#
+# 使い方:
+#   display = create_display((SCREEN_WIDTH, SCREEN_HEIGHT), "Dekopin", renderer_from_argv())
+#   screen = display.screen                       # 左カラムはこれまでどおり
+#   canvas = display.canvas(GAME_PANEL_RECT)
+#   canvas.begin(SKY_BLUE)                        # 毎フレーム最初に背景色で塗る
+#   canvas.blits(zip(images, positions))
+#   canvas.circle((255, 255, 0, 80), (x, y), r)   # 半透明の円
+#   canvas.overlay.blit(text, pos)                # 文字・ボタンなど
+#   display.present(panels)                       # panels.present() の代わり
+#
+# 性能比較: python pygame/renderbackend.py
+
+import os
+import sys
+import weakref
+import pygame
+
+RENDERERS = ("surface", "sdl2")
+CIRCLE_TEXTURE_RADIUS = 128 # sdl2 の円はこの大きさの白い円を拡大縮小・色付けして描く
+MIN_RENDER_SCALE = 0.25 # 内部解像度はこれより下げない (1280x720 で 256x180 のゲームパネル)
+
+
+def renderer_from_argv(argv=None, default="surface"):
+    """--renderer surface|sdl2 (無ければ環境変数 FESTIVAL_RENDERER) で選ばれたバックエンド名"""
+    argv = sys.argv if argv is None else argv
+    name = os.environ.get("FESTIVAL_RENDERER", default)
+    if "--renderer" in argv:
+        index = argv.index("--renderer") + 1
+        if index < len(argv):
+            name = argv[index]
+    if name not in RENDERERS:
+        print(f"警告: 不明なレンダラー '{name}' です。surface で描画します。")
+        name = "surface"
+    return name
+
+
+def render_scale_from_argv(argv=None, default=1.0):
+    """--render-scale 0.5 (無ければ環境変数 FESTIVAL_RENDER_SCALE) で選ばれたゲームパネルの内部解像度の倍率"""
+    argv = sys.argv if argv is None else argv
+    value = os.environ.get("FESTIVAL_RENDER_SCALE", default)
+    if "--render-scale" in argv:
+        index = argv.index("--render-scale") + 1
+        if index < len(argv):
+            value = argv[index]
+    try:
+        scale = float(value)
+    except ValueError:
+        print(f"警告: 不正な --render-scale '{value}' です。1.0 で描画します。")
+        return 1.0
+    return min(max(scale, MIN_RENDER_SCALE), 1.0)
+
+
+def create_display(size, caption, renderer="surface"):
+    """ウィンドウを作って描画バックエンドを返す。sdl2 が使えない環境では surface になる"""
+    if renderer == "sdl2":
+        try:
+            return TextureDisplay(size, caption)
+        except (ImportError, RuntimeError, pygame.error) as e:
+            print(f"警告: sdl2 レンダラーを使えません。surface で描画します。 {e}")
+    return SurfaceDisplay(size, caption)
+
+
+def subtract_rect(rect, hole):
+    """rect から hole を除いた部分を最大4つの矩形で返す"""
+    hole = rect.clip(hole)
+    if not hole:
+        return [rect]
+    parts = [
+        pygame.Rect(rect.left, rect.top, rect.width, hole.top - rect.top),
+        pygame.Rect(rect.left, hole.bottom, rect.width, rect.bottom - hole.bottom),
+        pygame.Rect(rect.left, hole.top, hole.left - rect.left, hole.height),
+        pygame.Rect(hole.right, hole.top, rect.right - hole.right, hole.height),
+    ]
+    return [part for part in parts if part.width > 0 and part.height > 0]
+
+
+# --- Surface バックエンド (今までどおり) ---
+class SurfaceDisplay:
+    name = "surface"
+
+    def __init__(self, size, caption):
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(caption)
+
+    def canvas(self, rect):
+        return SurfaceCanvas(self.screen.subsurface(rect))
+
+    def present(self, panels):
+        panels.present()
+
+
+class SurfaceCanvas:
+    """画面の一部 (subsurface) にそのまま描く"""
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.overlay = surface
+
+    def begin(self, color):
+        self.surface.fill(color)
+
+    def blit(self, image, dest):
+        self.surface.blit(image, dest)
+
+    def blits(self, sequence, doreturn=False):
+        self.surface.blits(sequence, doreturn=False)
+
+    def circle(self, color, center, radius):
+        """半透明の円 (color の4番目がアルファ)"""
+        circle_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(circle_surface, color, (radius, radius), radius)
+        self.surface.blit(circle_surface, (center[0] - radius, center[1] - radius))
+
+
+# --- sdl2 バックエンド (Renderer + Texture) ---
+class TextureDisplay:
+    name = "sdl2"
+
+    def __init__(self, size, caption):
+        from pygame._sdl2.video import Renderer, Texture, Window
+
+        self._texture_class = Texture
+        # display.set_mode は使わない (画面の Surface があると Renderer を作れない)
+        self.window = Window(caption, size)
+        self.renderer = Renderer(self.window, vsync=False) # フレームレートは clock.tick に任せる
+        self.screen = pygame.Surface(size) # 左カラムなど Surface に描く部分
+        self.screen_texture = Texture(self.renderer, size, streaming=True)
+        self.textures = weakref.WeakKeyDictionary() # {Surface: Texture} 1回だけアップロード
+        self.canvases = []
+        self.uncovered = [self.screen.get_rect()] # どのキャンバスにも含まれない (screen から送る) 部分
+        self.active_canvas = None
+        self._circle_texture = None
+
+    def canvas(self, rect):
+        canvas = TextureCanvas(self, rect)
+        self.canvases.append(canvas)
+        self.uncovered = [part for rect in self.uncovered for part in subtract_rect(rect, canvas.rect)]
+        return canvas
+
+    def texture(self, image):
+        """image を描くための (Texture, 元画像の中の矩形)。subsurface は親の Surface ごと1枚にする"""
+        parent = image.get_abs_parent()
+        texture = self.textures.get(parent)
+        if texture is None:
+            texture = self.textures[parent] = self._texture_class.from_surface(self.renderer, parent)
+        x, y = image.get_abs_offset()
+        return texture, (x, y, image.get_width(), image.get_height())
+
+    def circle_texture(self):
+        if self._circle_texture is None:
+            radius = CIRCLE_TEXTURE_RADIUS
+            circle_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(circle_surface, (255, 255, 255), (radius, radius), radius)
+            self._circle_texture = self._texture_class.from_surface(self.renderer, circle_surface)
+        return self._circle_texture
+
+    def activate(self, canvas):
+        """canvas の範囲だけに描くようにする (座標はキャンバス内、はみ出しは切り取られる)"""
+        if self.active_canvas is not canvas:
+            self.renderer.set_viewport(canvas.rect if canvas else None)
+            self.active_canvas = canvas
+
+    def present(self, panels):
+        """panels (DirtyPanels) で変化した矩形だけ Texture に送り、画面に出す"""
+        for canvas in self.canvases:
+            canvas.flush()
+        self.activate(None)
+        dirty_rects = panels.take_dirty_rects()
+        for rect in (self.uncovered if dirty_rects is None else dirty_rects):
+            if any(canvas.rect.contains(rect) for canvas in self.canvases):
+                continue # キャンバスの部分は Renderer で直接描いている
+            rect = rect.clip(self.screen.get_rect())
+            self.screen_texture.update(self.screen.subsurface(rect), area=rect)
+        for rect in self.uncovered:
+            self.screen_texture.draw(srcrect=rect, dstrect=rect)
+        self.renderer.present()
+
+
+class TextureCanvas:
+    """画面の一部に Renderer で描く。overlay は文字やボタン用の透明な Surface"""
+
+    def __init__(self, display, rect):
+        self.display = display
+        self.rect = pygame.Rect(rect)
+        self._overlay = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self._overlay_texture = display._texture_class(display.renderer, self.rect.size, streaming=True)
+        self._overlay_texture.blend_mode = pygame.BLENDMODE_BLEND
+        self._overlay_used = False
+
+    @property
+    def overlay(self):
+        if not self._overlay_used:
+            self._overlay.fill((0, 0, 0, 0))
+            self._overlay_used = True
+        return self._overlay
+
+    def flush(self):
+        """overlay に描いた分を画面に出す (この後に描いた画像は overlay より手前になる)"""
+        if self._overlay_used:
+            self.display.activate(self)
+            self._overlay_texture.update(self._overlay)
+            self._overlay_texture.draw(dstrect=(0, 0, self.rect.width, self.rect.height))
+            self._overlay_used = False
+
+    def begin(self, color):
+        self._overlay_used = False
+        self.display.activate(self)
+        renderer = self.display.renderer
+        renderer.draw_color = pygame.Color(color)
+        renderer.fill_rect((0, 0, self.rect.width, self.rect.height))
+
+    def blit(self, image, dest):
+        self.flush()
+        self.display.activate(self)
+        texture, area = self.display.texture(image)
+        texture.draw(srcrect=area, dstrect=(dest[0], dest[1], area[2], area[3]))
+
+    def blits(self, sequence, doreturn=False):
+        self.flush()
+        self.display.activate(self)
+        texture_of = self.display.texture
+        for image, dest in sequence:
+            texture, area = texture_of(image)
+            texture.draw(srcrect=area, dstrect=(dest[0], dest[1], area[2], area[3]))
+
+    def circle(self, color, center, radius):
+        """半透明の円 (color の4番目がアルファ)"""
+        self.flush()
+        self.display.activate(self)
+        texture = self.display.circle_texture()
+        texture.color = color[:3]
+        texture.alpha = color[3] if len(color) > 3 else 255
+        texture.draw(dstrect=(center[0] - radius, center[1] - radius, radius * 2, radius * 2))
+
+
+# --- 性能比較 (surface vs sdl2) ---
+if __name__ == "__main__":
+    import time
+    from assetcache import assets
+    from dirtypanel import DirtyPanels
+
+    SIZE = (1280, 720)
+    PANEL_RECT = pygame.Rect(256, 0, 1024, 720)
+    FRAMES = 120
+    pygame.init()
+    font = pygame.font.Font(None, 36)
+    print(f"SDL_VIDEODRIVER={os.environ.get('SDL_VIDEODRIVER', '-')}"
+          f" SDL_RENDER_DRIVER={os.environ.get('SDL_RENDER_DRIVER', '-')}")
+    print("ゲームパネルに 300px のダンサー2体 + n 体の敵 (最大 250px) + 半透明の円2つ、左カラムは10フレームに1回更新")
+    print(f"{'n':>6} {'surface':>9} {'sdl2':>9}  (ms/frame)")
+
+    def bench(renderer, n):
+        display = create_display(SIZE, "renderbackend bench", renderer)
+        if display.name != renderer:
+            return float("nan")
+        canvas = display.canvas(PANEL_RECT)
+        panels = DirtyPanels()
+        # 画像は表示を作った後に読む (convert に画面が必要)
+        dancer = assets.get("image/c-dancer-1.png", (300, 300))
+        enemy_images = [assets.get("image/dekoenemy.png", (250, 250)), assets.get("image/enemy_red.png", (175, 175)),
+                        assets.get("image/enemy.png", (100, 100))]
+        rng = __import__("random").Random(0)
+        sprites = [(enemy_images[i % 3], (rng.randint(0, 900), rng.randint(0, 600))) for i in range(n)]
+        start = time.perf_counter()
+        for frame in range(FRAMES):
+            pygame.event.pump()
+            canvas.begin((135, 206, 235))
+            canvas.blits(sprites)
+            canvas.blit(dancer, (200, 400))
+            canvas.blit(dancer, (600, 400))
+            canvas.overlay.blit(font.render(f"frame {frame}", True, (0, 0, 0)), (20, 20))
+            canvas.circle((255, 255, 0, 80), (300 + frame, 300), 100)
+            canvas.circle((0, 255, 0, 80), (700 - frame, 300), 80)
+            if panels.needs_redraw(pygame.Rect(0, 0, 256, 288), frame // 10):
+                display.screen.fill((0, 0, 0), (0, 0, 256, 288))
+                display.screen.blit(font.render(f"Score: {frame}", True, (255, 255, 255)), (15, 60))
+            panels.mark(PANEL_RECT)
+            display.present(panels)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / FRAMES
+        assets.clear() # 次のバックエンドで作り直す (画面ごとに convert が違う)
+        pygame.display.quit()
+        pygame.display.init()
+        return elapsed_ms
+
+    for n in (10, 100, 1000):
+        print(f"{n:>6} {bench('surface', n):>9.2f} {bench('sdl2', n):>9.2f}")
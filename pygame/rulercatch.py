@@ -5,21 +5,22 @@ import math
 import random
 import numpy as np # カメラ映像変換に必要
 import sys # 終了処理用にインポート
+from dirtypanel import DirtyPanels # ★ 左カラムの部分更新
+from assetcache import assets # ★ 読み込み・変形済みの画像をプロセス全体で共有
+from assetmanager import asset_manager # ★ 画像の並列プリロードとデコード済みキャッシュ
+from gameruntime import runtime # ★ カメラと MediaPipe (ランチャーから起動した時は全ゲームで共有)
+from qosgovernor import qos # ★ 重い時にプレビューと骨格の描画を間引く (--qos)
+from fixedstep import FixedStep, CAMERA_PACED_HZ # ★ 物理は画面のフレームレートと関係なく固定ステップで進める
+from gcpolicy import GCPolicy, gc_mode_from_argv # ★ ラウンド中は GC を止め、切り替わりでまとめて回収
+from capturedaemon import frame_age_ms # ★ デーモンから読んだ画像を撮った時刻
+from cursorinterp import CursorTrack # ★ カメラの速さでしか来ない手の位置を描画フレームごとに補間
+from scene import Scene, run_scene # ★ load / enter / update / render / exit のフックで動かす (import しただけでは何もしない)
 
 # --- 初期設定 ---
 
-# MediaPipeの手検出モデルと描画ツールを準備
+# MediaPipeの手検出モデルと描画ツール (★ モデル自体は enter() で runtime から受け取る)
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
-hands = mp_hands.Hands(
-    max_num_hands=2, # 両手使えるように
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
-
-# Pygameの初期化
-pygame.init()
-pygame.font.init()
 
 # --- 画面レイアウト定義 ---
 SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
@@ -45,18 +46,24 @@ class Icicle(pygame.sprite.Sprite):
         self.rect.centerx = GAME_PANEL_WIDTH // 2
         self.rect.bottom = 100 # 上端よりさらに上に配置
         self.velocity_y = 0.0 # 初速度
+        self.prev_y = self.rect.y # ★ 1つ前のステップの位置 (描画の補間用)
+        self.draw_rect = self.rect.copy()
 
     def update(self, gravity_accel):
-        # 重力加速度を適用
+        """1ステップ (1/CAMERA_PACED_HZ 秒) 分だけ重力加速度を適用する"""
+        self.prev_y = self.rect.y
         self.velocity_y += gravity_accel
         self.rect.y += int(self.velocity_y)
 
-    def draw(self, surface):
-        surface.blit(self.image, self.rect)
+    def draw(self, surface, alpha=1.0):
+        """★ 前のステップと今のステップの間を alpha で補間した位置に描く"""
+        self.draw_rect.x = self.rect.x
+        self.draw_rect.y = self.prev_y + int((self.rect.y - self.prev_y) * alpha)
+        surface.blit(self.image, self.draw_rect)
 
 # --- ゲーム設定と物理定義 ---
 PIXELS_PER_METER = 360 # 参考値 (重力計算に使用)
-FPS = 60 # フレームレート
+GRAVITY_FPS = 60 # ★ 重力の式で割っているフレームレート (今までの FPS = 60。遊んでいた時の落ち方を変えないよう、そのまま使う)
 
 # ★ 重力オプション辞書 (名前: m/s^2)
 GRAVITY_OPTIONS = {
@@ -69,15 +76,8 @@ GRAVITY_OPTIONS = {
     "Uranus": 8.69, #天王星
     "Neptune": 11.15, #海王星
 }
-# ★ 選択中の重力キーと計算後の加速度
-selected_gravity_key = "Earth"
-GRAVITY_ACCEL = (GRAVITY_OPTIONS[selected_gravity_key] * PIXELS_PER_METER) / (FPS * FPS)
-
-# Pygameウィンドウの設定
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Icicle Catch Game")
 
-# 色とフォントの定義
+# 色の定義
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
@@ -92,74 +92,19 @@ BUTTON_TEXT_COLOR = WHITE
 RADIO_BUTTON_COLOR = WHITE
 RADIO_BUTTON_SELECTED_COLOR = GREEN
 
-font_ui = pygame.font.Font(None, 36)
-font_log = pygame.font.Font(None, 24)
-font_title = pygame.font.Font(None, 40)
-game_over_font = pygame.font.Font(None, 100)
-result_text_font = pygame.font.Font(None, 80)
-button_font = pygame.font.Font(None, 50)
-button_font_small = pygame.font.Font(None, 30)
-# ★ ラジオボタン用フォント
-radio_font = pygame.font.Font(None, 22)
-
-
-# --- アセット読み込み ---
-
-# ★ つらら画像の読み込み
-icicle_image = None
-try:
-    img = pygame.image.load("image/turara.png").convert_alpha()
-    icicle_image = img
-except FileNotFoundError:
-    print("エラー: image/turara.png が見つかりません。")
-    pygame.quit()
-    sys.exit()
-
-# ★ ダンサーアニメーション画像の読み込み (成功画面用)
-dancer_images = []
-dancer_frame = 0
-dancer_frame_time = 0
 ANIMATION_SPEED_MS = 100
-try:
-    for i in range(1, 6):
-        img_path = f"image/c-dancer-{i}.png"
-        img = pygame.image.load(img_path).convert_alpha()
-        img = pygame.transform.scale(img, (300, 300))
-        dancer_images.append(img)
-except FileNotFoundError as e:
-    print(f"エラー: ダンサー画像が見つかりません。 {e}")
-
-# --- ゲームオブジェクト ---
-icicle = Icicle(icicle_image) if icicle_image else None
-
-# プレイヤー（カーソル）の設定
-left_cursor_pos = [-100, -100]
-right_cursor_pos = [-100, -100]
 cursor_radius = 45
-left_is_open_current = True
-right_is_open_current = True
-left_was_open = True
-right_was_open = True
-
-# Webカメラの準備
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("エラー: カメラを起動できません。")
-
-# --- ゲーム状態管理 ---
-game_state = 'READY' # 'READY', 'WAITING', 'DROPPING', 'CAUGHT', 'MISSED'
-drop_delay_ms = 0
-
-# --- タイマー変数 ---
-start_time = 0
-elapsed_time = 0
-final_time = 0
+CATCH_ON_MEASURED = True # ★ True: つかむ判定 (スタートボタン・つらら) は最後に測った位置で行う
+# (False だと先読みした位置で判定する。更新はカメラの1枚ごとなので滑らかにはならず、行き過ぎだけが判定に入る。補間した位置は描画だけに使う)
 
 # --- UI要素 ---
 start_button_rect_screen = pygame.Rect(0, 0, 200, 80)
 start_button_rect_screen.center = (GAME_PANEL_RECT.centerx, GAME_PANEL_RECT.centery)
 retry_button_rect_screen = pygame.Rect(0, 0, 300, 60)
 retry_button_rect_screen.center = (GAME_PANEL_RECT.centerx, GAME_PANEL_RECT.bottom - 80)
+# ★ ゲームパネル内の座標のボタン (画面の座標から毎フレーム計算していたものを1回だけ作る)
+start_button_rect_game = start_button_rect_screen.move(-GAME_PANEL_RECT.left, -GAME_PANEL_RECT.top)
+retry_button_rect_game = retry_button_rect_screen.move(-GAME_PANEL_RECT.left, -GAME_PANEL_RECT.top)
 
 # ★ ラジオボタンのRect辞書
 radio_button_rects = {}
@@ -207,349 +152,450 @@ def format_time(ms):
 # ★ 重力加速度を計算する関数
 def calculate_gravity_accel(key):
     gravity_ms2 = GRAVITY_OPTIONS.get(key, 9.8) # 見つからなければ地球の重力
-    return (gravity_ms2 * PIXELS_PER_METER) / (FPS * FPS)
-
-# ★ ゲームリセット関数
-def reset_game():
-    global game_state, elapsed_time, final_time, drop_delay_ms, icicle, start_time, left_is_open_current, right_is_open_current, left_was_open, right_was_open, selected_gravity_key, GRAVITY_ACCEL
-    game_state = 'READY'
-    elapsed_time = 0
-    final_time = 0
-    drop_delay_ms = 0
-    if icicle:
-        icicle.reset()
-    start_time = 0
-    left_is_open_current = True
-    right_is_open_current = True
-    left_was_open = True
-    right_was_open = True
-    # ★ 重力を地球に戻す
-    selected_gravity_key = "Earth"
-    GRAVITY_ACCEL = calculate_gravity_accel(selected_gravity_key)
-    global cap
-    if not cap.isOpened():
-       cap = cv2.VideoCapture(0)
-       if cap.isOpened():
-           print("Camera reopened for retry.")
-       else:
-           print("Error: Failed to reopen camera for retry.")
-
-
-# --- メインループ ---
-running = True
-clock = pygame.time.Clock()
-camera_surface_scaled = None
-
-while running:
-
-    delta_time_ms = clock.tick(FPS)
-    mouse_pos = pygame.mouse.get_pos()
-    mouse_click = False
-
-    # 1. イベント処理
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+    # ★ 1ステップあたりの加速度。今までの「1フレームあたり」の値と同じにして、カメラを待つループと同じ
+    #   1秒に CAMERA_PACED_HZ 回進めるので、遊んでいた時と同じ速さで落ちる (表示の m/s² どおりではない)
+    return (gravity_ms2 * PIXELS_PER_METER) / (GRAVITY_FPS * GRAVITY_FPS)
+
+
+# --- ★ シーン (ゲームの状態はすべてここに持つ) ---
+class RulerCatchScene(Scene):
+    """つららキャッチ。load では画像の先読みだけ行う"""
+
+    name = "rulercatch"
+    single_hand = True # ★ 片手でも遊べるので、重い時 (--qos) は max_num_hands を 1 に下げてよい
+
+    def enter(self):
+        # Pygameウィンドウの設定
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Icicle Catch Game")
+
+        self.font_ui = pygame.font.Font(None, 36)
+        self.font_log = pygame.font.Font(None, 24)
+        self.font_title = pygame.font.Font(None, 40)
+        self.game_over_font = pygame.font.Font(None, 100)
+        self.result_text_font = pygame.font.Font(None, 80)
+        self.button_font = pygame.font.Font(None, 50)
+        self.button_font_small = pygame.font.Font(None, 30)
+        # ★ ラジオボタン用フォント
+        self.radio_font = pygame.font.Font(None, 22)
+
+        # --- アセット読み込み ---
+
+        # ★ つらら画像の読み込み
+        try:
+            icicle_image = assets.get("image/turara.png")
+        except FileNotFoundError:
+            print("エラー: image/turara.png が見つかりません。")
+            runtime.shutdown() # ★ ランチャーからならウィンドウは閉じずにメニューへ戻る
+            sys.exit()
+
+        # ★ ダンサーアニメーション画像の読み込み (成功画面用)
+        self.dancer_images = []
+        self.dancer_frame = 0
+        self.dancer_frame_time = 0
+        try:
+            for i in range(1, 6):
+                img_path = f"image/c-dancer-{i}.png"
+                img = assets.get(img_path, (300, 300))
+                self.dancer_images.append(img)
+        except FileNotFoundError as e:
+            print(f"エラー: ダンサー画像が見つかりません。 {e}")
+
+        # --- ゲームオブジェクト ---
+        self.icicle = Icicle(icicle_image)
+
+        # プレイヤー（カーソル）の設定
+        self.left_cursor_pos = [-100, -100] # ★ 描画する位置 (ランドマークのサンプルから補間した位置)
+        self.right_cursor_pos = [-100, -100]
+
+        # ★ 手の位置の補間。つららをつかむ判定を「補間した位置」と「最後に測った位置」のどちらで行うかを選べる
+        self.left_cursor_track = CursorTrack()
+        self.right_cursor_track = CursorTrack()
+        self.left_catch_pos = self.left_cursor_track.measured if CATCH_ON_MEASURED else self.left_cursor_pos # どちらも中身だけ書き換わるリスト
+        self.right_catch_pos = self.right_cursor_track.measured if CATCH_ON_MEASURED else self.right_cursor_pos
+        self.left_cursor_rect_game = pygame.Rect(0, 0, cursor_radius * 2, cursor_radius * 2)
+        self.right_cursor_rect_game = pygame.Rect(0, 0, cursor_radius * 2, cursor_radius * 2)
+
+        # MediaPipe と Webカメラの準備 (★ ランチャーからなら開いたままのものを使い回す)
+        self.hands = runtime.hands(
+            profile=self.name, # ★ handtuner.py で決めた設定があれば、下の値を上書きする
+            max_num_hands=2, # 両手使えるように
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7
+        )
+        self.cap = runtime.open_camera(0)
+        if not self.cap.isOpened():
+            print("エラー: カメラを起動できません。")
+
+        self.camera_surface_scaled = None
+        self.camera_frame_id = 0 # ★ カメラ映像が更新されるたびに増える (カメラパネルの再描画判定用)
+        self.panels = DirtyPanels() # ★ 左カラムは内容が変わった時だけ再描画
+        self.fixed_step = FixedStep(hz=CAMERA_PACED_HZ) # ★ つららの落下を進める固定ステップ
+        self.mouse_pos = (0, 0)
+        self.mouse_click = False
+        self.dt_ms = 0
+        self.reset_game()
+        self.gc_policy = GCPolicy(mode=gc_mode_from_argv(self.argv))
+        self.gc_policy.freeze() # ★ 読み込んだ画像やフォントは GC の対象から外す
+
+        print(asset_manager.finish_startup(self.name)) # ★ 起動時間 (コールド/ウォーム) を表示
+
+    # ★ ゲームリセット
+    def reset_game(self):
+        self.game_state = 'READY' # 'READY', 'WAITING', 'DROPPING', 'CAUGHT', 'MISSED'
+        self.elapsed_time = 0
+        self.final_time = 0
+        self.drop_delay_ms = 0
+        self.icicle.reset()
+        self.start_time = 0
+        self.left_is_open_current = True
+        self.right_is_open_current = True
+        self.left_was_open = True
+        self.right_was_open = True
+        # ★ 重力を地球に戻す
+        self.selected_gravity_key = "Earth"
+        self.gravity_accel = calculate_gravity_accel(self.selected_gravity_key)
+        if not self.cap.isOpened():
+            self.cap = runtime.open_camera(0)
+            if self.cap.isOpened():
+                print("Camera reopened for retry.")
+            else:
+                print("Error: Failed to reopen camera for retry.")
+
+    def handle_event(self, event):
+        self.panels.handle_event(event)
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_RETURN:
-                running = False
+                self.running = False
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:
-                mouse_click = True
-
-    # 画面全体をクリア
-    screen.fill(GRAY)
-
-    # --- カメラ処理 & 手の検出 (常に実行) ---
-    left_closed_this_frame = False
-    right_closed_this_frame = False
-    results = None
-    hand_detected = False
-
-    if cap.isOpened():
-        success, image_cam = cap.read()
-        if success:
-            image_rgb = cv2.cvtColor(cv2.flip(image_cam, 1), cv2.COLOR_BGR2RGB)
-            image_rgb.flags.writeable = False
-            results = hands.process(image_rgb)
-            image_rgb.flags.writeable = True
-
-            image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-            if results and results.multi_hand_landmarks:
-                hand_detected = True
-                for hand_landmarks in results.multi_hand_landmarks:
-                    mp_drawing.draw_landmarks(image_bgr, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-            image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-            image_pygame = pygame.image.frombuffer(image_rgb.tobytes(), image_rgb.shape[1::-1], "RGB")
-            camera_surface_scaled = pygame.transform.scale(image_pygame, (CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
-
-            left_is_open_now = True
-            right_is_open_now = True
-            left_cursor_pos[:] = [-100, -100]
-            right_cursor_pos[:] = [-100, -100]
-
-            if results and results.multi_hand_landmarks:
-                for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                    is_open = is_hand_open(hand_landmarks)
-                    mcp_landmark = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_MCP]
-                    hand_pos = (int(mcp_landmark.x * GAME_PANEL_WIDTH), int(mcp_landmark.y * GAME_HEIGHT))
-
-                    if handedness.classification[0].label == 'Left':
-                        left_cursor_pos[:] = hand_pos
-                        left_is_open_now = is_open
-                    elif handedness.classification[0].label == 'Right':
-                        right_cursor_pos[:] = hand_pos
-                        right_is_open_now = is_open
-
-            left_closed_this_frame = left_was_open and not left_is_open_now
-            right_closed_this_frame = right_was_open and not right_is_open_now
-
-            left_was_open = left_is_open_now
-            right_was_open = right_is_open_now
-            left_is_open_current = left_is_open_now
-            right_is_open_current = right_is_open_now
-
-        else:
-             if cap.isOpened():
-                 print("Warning: Failed to read frame from camera.")
-             left_cursor_pos[:] = [-100, -100]
-             right_cursor_pos[:] = [-100, -100]
-
-    else:
-        left_is_open_current = True
-        right_is_open_current = True
-        left_cursor_pos[:] = [-100, -100]
-        right_cursor_pos[:] = [-100, -100]
-
-
-    # --- ゲームロジック (状態に基づいて実行) ---
-
-    left_cursor_rect_game = pygame.Rect(left_cursor_pos[0] - cursor_radius, left_cursor_pos[1] - cursor_radius, cursor_radius * 2, cursor_radius * 2)
-    right_cursor_rect_game = pygame.Rect(right_cursor_pos[0] - cursor_radius, right_cursor_pos[1] - cursor_radius, cursor_radius * 2, cursor_radius * 2)
-    start_button_rect_game = start_button_rect_screen.copy()
-    start_button_rect_game.center = (start_button_rect_screen.centerx - GAME_PANEL_RECT.left, start_button_rect_screen.centery - GAME_PANEL_RECT.top)
-    retry_button_rect_game = retry_button_rect_screen.copy()
-    retry_button_rect_game.center = (retry_button_rect_screen.centerx - GAME_PANEL_RECT.left, retry_button_rect_screen.centery - GAME_PANEL_RECT.top)
-
-    # ★ ラジオボタンのクリック処理 (どの状態でも変更可能)
-    if mouse_click:
-        for key, rect in radio_button_rects.items():
-            # マウス座標はスクリーン全体なのでそのまま使う
-            if rect.collidepoint(mouse_pos):
-                if selected_gravity_key != key:
-                    selected_gravity_key = key
-                    GRAVITY_ACCEL = calculate_gravity_accel(key)
-                    print(f"Gravity changed to: {key} ({GRAVITY_OPTIONS[key]:.2f} m/s^2)")
-                    # もしゲーム中なら影響を与える
-                    if game_state == 'DROPPING' and icicle:
-                        # 速度に影響を与えるか、あるいはリセットするか
-                        # ここではリセットせずにそのまま継続
-                        pass
-                break # 他のボタンはチェックしない
-
-
-    if game_state == 'READY':
-        start_activated = False
-        if left_closed_this_frame and start_button_rect_game.colliderect(left_cursor_rect_game):
-            start_activated = True
-        elif right_closed_this_frame and start_button_rect_game.colliderect(right_cursor_rect_game):
-            start_activated = True
-        
-        # 2. ★ マウスクリックでスタート (ここから追加)
-        mouse_x_in_game = mouse_pos[0] - GAME_PANEL_RECT.left
-        mouse_y_in_game = mouse_pos[1] - GAME_PANEL_RECT.top
-        
-        # ゲームパネル内でのクリックかをまず確認
-        if GAME_PANEL_RECT.collidepoint(mouse_pos):
-             # ゲームパネル内座標のスタートボタンRectと衝突判定
-             if start_button_rect_game.collidepoint(mouse_x_in_game, mouse_y_in_game) and mouse_click:
-                  start_activated = True # ★ クリックでもアクティベート
-        # ★ (ここまで追加)
-
-        if start_activated:
-            game_state = 'WAITING'
-            start_time = pygame.time.get_ticks()
-            elapsed_time = 0
-            drop_delay_ms = random.randint(5000, 10000)
-            if icicle: icicle.reset()
-
-    elif game_state == 'WAITING':
-        elapsed_time = pygame.time.get_ticks() - start_time
-        if elapsed_time >= drop_delay_ms:
-            game_state = 'DROPPING'
-
-    elif game_state == 'DROPPING':
-        elapsed_time = pygame.time.get_ticks() - start_time
-        if icicle:
-            icicle.update(GRAVITY_ACCEL) # ★ 現在選択中の重力を使う
+                self.mouse_click = True
+
+    def update(self, dt_ms):
+        self.dt_ms = dt_ms
+        if self.game_state == 'CAUGHT' and self.dancer_images: # ★ ダンサーのアニメーションは描画ではなく更新で進める (--qos で描画を飛ばしても同じ速さ)
+            self.dancer_frame_time += dt_ms
+            if self.dancer_frame_time > ANIMATION_SPEED_MS:
+                self.dancer_frame = (self.dancer_frame + 1) % len(self.dancer_images)
+                self.dancer_frame_time = 0
+        sim_steps = self.fixed_step.advance(dt_ms) # ★ 前のフレームの時間の分だけ物理を進める
+        self.mouse_pos = mouse_pos = pygame.mouse.get_pos()
+        mouse_click = self.mouse_click
+        self.mouse_click = False
+
+        # --- カメラ処理 & 手の検出 (常に実行) ---
+        left_closed_this_frame, right_closed_this_frame = self.read_camera()
+
+        # ★ 描画するカーソルの位置を、この描画フレームの時刻に合わせて補間する
+        now_ms = pygame.time.get_ticks()
+        if not self.left_cursor_track.position(now_ms, self.left_cursor_pos):
+            self.left_cursor_pos[:] = [-100, -100]
+        if not self.right_cursor_track.position(now_ms, self.right_cursor_pos):
+            self.right_cursor_pos[:] = [-100, -100]
+
+
+        # --- ゲームロジック (状態に基づいて実行) ---
+
+        # ★ つかむ判定は CATCH_ON_MEASURED で選んだ位置で行う
+        left_cursor_rect_game = self.left_cursor_rect_game
+        right_cursor_rect_game = self.right_cursor_rect_game
+        left_cursor_rect_game.center = self.left_catch_pos
+        right_cursor_rect_game.center = self.right_catch_pos
+
+        # ★ ラジオボタンのクリック処理 (どの状態でも変更可能)
+        if mouse_click:
+            for key, rect in radio_button_rects.items():
+                # マウス座標はスクリーン全体なのでそのまま使う
+                if rect.collidepoint(mouse_pos):
+                    if self.selected_gravity_key != key:
+                        self.selected_gravity_key = key
+                        self.gravity_accel = calculate_gravity_accel(key)
+                        print(f"Gravity changed to: {key} ({GRAVITY_OPTIONS[key]:.2f} m/s^2)")
+                        # ゲーム中ならそのまま継続 (落下中のつららにも新しい重力がかかる)
+                    break # 他のボタンはチェックしない
+
+
+        if self.game_state == 'READY':
+            start_activated = False
+            if left_closed_this_frame and start_button_rect_game.colliderect(left_cursor_rect_game):
+                start_activated = True
+            elif right_closed_this_frame and start_button_rect_game.colliderect(right_cursor_rect_game):
+                start_activated = True
+
+            # 2. ★ マウスクリックでスタート
+            mouse_x_in_game = mouse_pos[0] - GAME_PANEL_RECT.left
+            mouse_y_in_game = mouse_pos[1] - GAME_PANEL_RECT.top
+
+            # ゲームパネル内でのクリックかをまず確認
+            if GAME_PANEL_RECT.collidepoint(mouse_pos):
+                 # ゲームパネル内座標のスタートボタンRectと衝突判定
+                 if start_button_rect_game.collidepoint(mouse_x_in_game, mouse_y_in_game) and mouse_click:
+                      start_activated = True # ★ クリックでもアクティベート
+
+            if start_activated:
+                self.game_state = 'WAITING'
+                self.start_time = pygame.time.get_ticks()
+                self.elapsed_time = 0
+                self.drop_delay_ms = random.randint(5000, 10000)
+                self.icicle.reset()
+                self.gc_policy.start_round() # ★ 待っている間と落ちている間は自動の GC を止める (つかんだ瞬間に止まらないように)
+
+        elif self.game_state == 'WAITING':
+            self.elapsed_time = pygame.time.get_ticks() - self.start_time
+            if self.elapsed_time >= self.drop_delay_ms:
+                self.game_state = 'DROPPING'
+
+        elif self.game_state == 'DROPPING':
+            self.elapsed_time = pygame.time.get_ticks() - self.start_time
+            icicle = self.icicle
+            for _ in range(sim_steps):
+                icicle.update(self.gravity_accel) # ★ 現在選択中の重力を使う (1ステップずつ)
             if icicle.rect.top > GAME_HEIGHT:
-                game_state = 'MISSED'
-                final_time = elapsed_time
-                if cap.isOpened():
+                self.game_state = 'MISSED'
+                self.final_time = self.elapsed_time
+                self.gc_policy.end_round("missed") # ★ ここでまとめて回収
+                self.report_score("Missed...") # ★ メニューに表示する結果
+                if self.cap.isOpened():
                     # ★ カメラは閉じない
-                    # cap.release()
                     print("Game over.")
 
-            icicle_rect_game = icicle.rect
-
             caught = False
-            if left_closed_this_frame and left_cursor_rect_game.colliderect(icicle_rect_game):
+            if left_closed_this_frame and left_cursor_rect_game.colliderect(icicle.rect):
                 caught = True
-            elif right_closed_this_frame and right_cursor_rect_game.colliderect(icicle_rect_game):
+            elif right_closed_this_frame and right_cursor_rect_game.colliderect(icicle.rect):
                 caught = True
 
             if caught:
-                game_state = 'CAUGHT'
-                final_time = elapsed_time
-                if cap.isOpened():
+                self.game_state = 'CAUGHT'
+                self.final_time = self.elapsed_time
+                self.gc_policy.end_round("caught") # ★ ここでまとめて回収
+                self.report_score(f"Catch Time: {format_time(self.final_time)}") # ★ メニューに表示する結果
+                if self.cap.isOpened():
                     # ★ カメラは閉じない
-                    # cap.release()
                     print("Icicle caught!")
 
-    elif game_state == 'CAUGHT' or game_state == 'MISSED':
-        # ★ マウスクリックでリトライ
-        mouse_x_in_game = mouse_pos[0] - GAME_PANEL_RECT.left
-        mouse_y_in_game = mouse_pos[1] - GAME_PANEL_RECT.top
-
-        if GAME_PANEL_RECT.collidepoint(mouse_pos):
-             if retry_button_rect_game.collidepoint(mouse_x_in_game, mouse_y_in_game) and mouse_click:
-                  reset_game()
-
+        elif self.game_state == 'CAUGHT' or self.game_state == 'MISSED':
+            # ★ マウスクリックでリトライ
+            mouse_x_in_game = mouse_pos[0] - GAME_PANEL_RECT.left
+            mouse_y_in_game = mouse_pos[1] - GAME_PANEL_RECT.top
+
+            if GAME_PANEL_RECT.collidepoint(mouse_pos):
+                 if retry_button_rect_game.collidepoint(mouse_x_in_game, mouse_y_in_game) and mouse_click:
+                      self.reset_game()
+                      self.gc_policy.collect("retry") # ★ 前のラウンドの結果などをまとめて回収
+
+    def read_camera(self):
+        """カメラ画像を1枚読んで手を検出し、(左手を閉じた, 右手を閉じた) を返す"""
+        left_closed_this_frame = False
+        right_closed_this_frame = False
+        cap = self.cap
+
+        if cap.isOpened():
+            success, image_cam = cap.read()
+            if success:
+                frame_time_ms = pygame.time.get_ticks() - frame_age_ms(cap) # ★ この画像を撮った時刻 (カーソル補間のサンプル時刻。デーモンからなら撮った時の時刻)
+                image_rgb = cv2.cvtColor(cv2.flip(image_cam, 1), cv2.COLOR_BGR2RGB)
+                image_rgb.flags.writeable = False
+                results = self.hands.process(image_rgb)
+                image_rgb.flags.writeable = True
+
+                if qos.preview_due(): # ★ 重い時はカメラのプレビューを間引く (前の画像を表示し続ける)
+                    image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+                    if qos.draw_skeleton and results and results.multi_hand_landmarks: # ★ 重い時は骨格を描かない
+                        for hand_landmarks in results.multi_hand_landmarks:
+                            mp_drawing.draw_landmarks(image_bgr, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+
+                    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+                    image_pygame = pygame.image.frombuffer(image_rgb.tobytes(), image_rgb.shape[1::-1], "RGB")
+                    self.camera_surface_scaled = pygame.transform.scale(image_pygame, (CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
+                    self.camera_frame_id += 1
+
+                left_is_open_now = True
+                right_is_open_now = True
+                left_hand_seen = False
+                right_hand_seen = False
+
+                if results and results.multi_hand_landmarks:
+                    for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                        is_open = is_hand_open(hand_landmarks)
+                        mcp_landmark = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_MCP]
+                        hand_pos = (int(mcp_landmark.x * GAME_PANEL_WIDTH), int(mcp_landmark.y * GAME_HEIGHT))
+
+                        if handedness.classification[0].label == 'Left':
+                            left_hand_seen = True
+                            self.left_cursor_track.add_sample(frame_time_ms, hand_pos[0], hand_pos[1])
+                            left_is_open_now = is_open
+                        elif handedness.classification[0].label == 'Right':
+                            right_hand_seen = True
+                            self.right_cursor_track.add_sample(frame_time_ms, hand_pos[0], hand_pos[1])
+                            right_is_open_now = is_open
+
+                if not left_hand_seen: # ★ 新しい画像に手が無ければ補間をやめる
+                    self.left_cursor_track.clear()
+                if not right_hand_seen:
+                    self.right_cursor_track.clear()
+
+                left_closed_this_frame = self.left_was_open and not left_is_open_now
+                right_closed_this_frame = self.right_was_open and not right_is_open_now
+
+                self.left_was_open = left_is_open_now
+                self.right_was_open = right_is_open_now
+                self.left_is_open_current = left_is_open_now
+                self.right_is_open_current = right_is_open_now
+
+            else:
+                 if cap.isOpened():
+                     print("Warning: Failed to read frame from camera.")
+                 self.left_cursor_track.clear()
+                 self.right_cursor_track.clear()
 
-    # --- 描画処理 ---
-
-    # --- ゲームパネル (右側) ---
-    game_surface = screen.subsurface(GAME_PANEL_RECT)
-    game_surface.fill(SKY_BLUE)
-
-    if game_state == 'CAUGHT':
-        result_text = result_text_font.render("Success!!", True, ORANGE)
-        game_surface.blit(result_text, result_text.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 4)))
-        time_text = font_ui.render(f"Catch Time: {format_time(final_time)}", True, BLACK)
-        game_surface.blit(time_text, time_text.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 4 + 70)))
-
-        if dancer_images:
-            dancer_frame_time += delta_time_ms
-            if dancer_frame_time > ANIMATION_SPEED_MS:
-                dancer_frame = (dancer_frame + 1) % len(dancer_images)
-                dancer_frame_time = 0
-            current_dancer_image = dancer_images[dancer_frame]
-            img_rect = current_dancer_image.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 2 + 100))
-            game_surface.blit(current_dancer_image, img_rect)
-
-        mouse_x_in_game = mouse_pos[0] - GAME_PANEL_RECT.left
-        mouse_y_in_game = mouse_pos[1] - GAME_PANEL_RECT.top
+        else:
+            self.left_is_open_current = True
+            self.right_is_open_current = True
+            self.left_cursor_track.clear()
+            self.right_cursor_track.clear()
+
+        return left_closed_this_frame, right_closed_this_frame
+
+    def render(self):
+        screen = self.screen
+        panels = self.panels
+        game_state = self.game_state
+        mouse_x_in_game = self.mouse_pos[0] - GAME_PANEL_RECT.left
+        mouse_y_in_game = self.mouse_pos[1] - GAME_PANEL_RECT.top
+
+        # --- ゲームパネル (右側) ---
+        game_surface = screen.subsurface(GAME_PANEL_RECT)
+        game_surface.fill(SKY_BLUE)
+
+        if game_state == 'CAUGHT':
+            result_text = self.result_text_font.render("Success!!", True, ORANGE)
+            game_surface.blit(result_text, result_text.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 4)))
+            time_text = self.font_ui.render(f"Catch Time: {format_time(self.final_time)}", True, BLACK)
+            game_surface.blit(time_text, time_text.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 4 + 70)))
+
+            if self.dancer_images:
+                current_dancer_image = self.dancer_images[self.dancer_frame]
+                img_rect = current_dancer_image.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 2 + 100))
+                game_surface.blit(current_dancer_image, img_rect)
+
+            self.draw_retry_button(game_surface, mouse_x_in_game, mouse_y_in_game)
+
+        elif game_state == 'MISSED':
+            go_text = self.game_over_font.render("GAME OVER", True, RED)
+            game_surface.blit(go_text, go_text.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 2 - 50)))
+            time_text = self.font_ui.render(f"Final Time: {format_time(self.final_time)}", True, WHITE) # Game Over時は白文字
+            game_surface.blit(time_text, time_text.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 2 + 50)))
+
+            self.draw_retry_button(game_surface, mouse_x_in_game, mouse_y_in_game)
+
+        else: # READY, WAITING, DROPPING
+            if game_state == 'WAITING' or game_state == 'DROPPING':
+                 self.icicle.draw(game_surface, self.fixed_step.alpha) # ★ ステップの間を補間して描く
+
+            if game_state == 'READY':
+                is_hovering_start = start_button_rect_game.colliderect(self.left_cursor_rect_game) or start_button_rect_game.colliderect(self.right_cursor_rect_game)
+                btn_color = BUTTON_HOVER_COLOR if is_hovering_start else BUTTON_COLOR
+                pygame.draw.rect(game_surface, btn_color, start_button_rect_game, border_radius=10)
+                btn_text = self.button_font.render("START", True, BUTTON_TEXT_COLOR)
+                game_surface.blit(btn_text, btn_text.get_rect(center=start_button_rect_game.center))
+
+            left_cursor_color = GREEN if not self.left_is_open_current else RED # 閉じていたら緑
+            right_cursor_color = GREEN if not self.right_is_open_current else RED # 閉じていたら緑
+            ALPHA_VALUE = 128
+            left_cursor_pos = self.left_cursor_pos
+            right_cursor_pos = self.right_cursor_pos
+
+            if left_cursor_pos[0] != -100:
+                circle_surface_left = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(circle_surface_left, left_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
+                game_surface.blit(circle_surface_left, (left_cursor_pos[0] - cursor_radius, left_cursor_pos[1] - cursor_radius)) # ゲーム座標基準
+
+            if right_cursor_pos[0] != -100:
+                circle_surface_right = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(circle_surface_right, right_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
+                game_surface.blit(circle_surface_right, (right_cursor_pos[0] - cursor_radius, right_cursor_pos[1] - cursor_radius)) # ゲーム座標基準
+
+
+        # --- UIパネルの描画 ---
+
+        # --- スコアパネル (左上) ---
+        display_time = self.elapsed_time if self.final_time == 0 else self.final_time
+
+        # ★ 表示内容 (タイマーと選択中の重力) が変わった時だけ描き直す
+        if panels.needs_redraw(SCORE_PANEL_RECT, (format_time(display_time), self.selected_gravity_key)):
+            score_surface = screen.subsurface(SCORE_PANEL_RECT)
+            score_surface.fill(BLACK)
+            title_text = self.font_title.render("TIMER / GRAVITY", True, WHITE) # タイトル変更
+            score_surface.blit(title_text, (10, 10))
+
+            time_text = self.font_ui.render(f"{format_time(display_time)}", True, WHITE)
+            score_surface.blit(time_text, (15, 60))
+
+            # ★ ラジオボタン描画
+            radio_y = radio_y_start
+            for key in GRAVITY_OPTIONS.keys():
+                center_y = SCORE_PANEL_RECT.top + radio_y
+                center_x = SCORE_PANEL_RECT.left + radio_x_pos
+
+                # ボタンの円
+                pygame.draw.circle(score_surface, RADIO_BUTTON_COLOR, (center_x, center_y), radio_radius, 1) # 枠線
+                if key == self.selected_gravity_key:
+                    pygame.draw.circle(score_surface, RADIO_BUTTON_SELECTED_COLOR, (center_x, center_y), radio_radius - 3) # 内側の塗りつぶし
+
+                # ラベル
+                label_text = self.radio_font.render(f"{key} ({GRAVITY_OPTIONS[key]:.2f} m/s²)", True, WHITE)
+                score_surface.blit(label_text, (center_x + label_x_offset, center_y - label_text.get_height() // 2))
+
+                radio_y += radio_y_offset
+
+
+        # --- 説明パネル (左中) ---
+        # ★ 説明文は固定なので最初の1回 (と画面の再露出時) だけ描く
+        if panels.needs_redraw(LOG_PANEL_RECT, None):
+            log_surface = screen.subsurface(LOG_PANEL_RECT)
+            log_surface.fill(BLACK)
+            log_title = self.font_title.render("HOW TO PLAY", True, WHITE)
+            log_surface.blit(log_title, (10, 10))
+            y_pos = 50
+            for line in instructions:
+                log_text = self.font_log.render(line, True, GREEN)
+                log_surface.blit(log_text, (15, y_pos))
+                y_pos += 25
+
+        # --- カメラパネル (左下) ---
+        # ★ カメラが開いていない場合もエラー表示しない（リトライ時に再オープンするため）
+        show_camera = self.cap.isOpened() and self.camera_surface_scaled is not None
+        if panels.needs_redraw(CAM_PANEL_RECT, self.camera_frame_id if show_camera else None):
+            cam_surface = screen.subsurface(CAM_PANEL_RECT)
+            pygame.draw.rect(cam_surface, BLACK, (0, 0, CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
+            cam_title = self.font_title.render("CAMERA", True, WHITE)
+            cam_surface.blit(cam_title, (10, 10))
+
+            if show_camera:
+                cam_surface.blit(self.camera_surface_scaled, (0, 30))
+
+        # 画面更新
+        panels.mark(GAME_PANEL_RECT) # ゲームパネルは毎フレーム描き直している
+        panels.present() # ★ flip() の代わりに変化した矩形だけ転送
+
+    def draw_retry_button(self, game_surface, mouse_x_in_game, mouse_y_in_game):
+        """成功 / ゲームオーバー画面のリトライボタン"""
         is_hovering_retry = retry_button_rect_game.collidepoint(mouse_x_in_game, mouse_y_in_game)
-
         btn_color = BUTTON_HOVER_COLOR if is_hovering_retry else BUTTON_COLOR
         pygame.draw.rect(game_surface, btn_color, retry_button_rect_game, border_radius=10)
-        btn_text = button_font_small.render("Retry Challenge", True, BUTTON_TEXT_COLOR)
+        btn_text = self.button_font_small.render("Retry Challenge", True, BUTTON_TEXT_COLOR)
         game_surface.blit(btn_text, btn_text.get_rect(center=retry_button_rect_game.center))
 
-    elif game_state == 'MISSED':
-        go_text = game_over_font.render("GAME OVER", True, RED)
-        game_surface.blit(go_text, go_text.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 2 - 50)))
-        time_text = font_ui.render(f"Final Time: {format_time(final_time)}", True, WHITE) # Game Over時は白文字
-        game_surface.blit(time_text, time_text.get_rect(center=(GAME_PANEL_WIDTH // 2, GAME_HEIGHT // 2 + 50)))
+    def exit(self):
+        # --- 終了処理 ---
+        self.gc_policy.close()
+        print(self.gc_policy.report())
+        if self.cap.isOpened():
+            self.cap.release() # ★ ランチャーからなら開いたまま
 
-        mouse_x_in_game = mouse_pos[0] - GAME_PANEL_RECT.left
-        mouse_y_in_game = mouse_pos[1] - GAME_PANEL_RECT.top
-        is_hovering_retry = retry_button_rect_game.collidepoint(mouse_x_in_game, mouse_y_in_game)
 
-        btn_color = BUTTON_HOVER_COLOR if is_hovering_retry else BUTTON_COLOR
-        pygame.draw.rect(game_surface, btn_color, retry_button_rect_game, border_radius=10)
-        btn_text = button_font_small.render("Retry Challenge", True, BUTTON_TEXT_COLOR)
-        game_surface.blit(btn_text, btn_text.get_rect(center=retry_button_rect_game.center))
+SCENE = RulerCatchScene # ★ ランチャーが探すシーンのクラス
 
-    else: # READY, WAITING, DROPPING
-        if icicle and (game_state == 'WAITING' or game_state == 'DROPPING'):
-             icicle.draw(game_surface)
-
-        if game_state == 'READY':
-            is_hovering_start = start_button_rect_game.colliderect(left_cursor_rect_game) or start_button_rect_game.colliderect(right_cursor_rect_game)
-            btn_color = BUTTON_HOVER_COLOR if is_hovering_start else BUTTON_COLOR
-            pygame.draw.rect(game_surface, btn_color, start_button_rect_game, border_radius=10)
-            btn_text = button_font.render("START", True, BUTTON_TEXT_COLOR)
-            game_surface.blit(btn_text, btn_text.get_rect(center=start_button_rect_game.center))
-
-        left_cursor_color = GREEN if not left_is_open_current else RED # 閉じていたら緑
-        right_cursor_color = GREEN if not right_is_open_current else RED # 閉じていたら緑
-        ALPHA_VALUE = 128
-
-        if left_cursor_pos[0] != -100:
-            circle_surface_left = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(circle_surface_left, left_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
-            game_surface.blit(circle_surface_left, (left_cursor_pos[0] - cursor_radius, left_cursor_pos[1] - cursor_radius)) # ゲーム座標基準
-
-        if right_cursor_pos[0] != -100:
-            circle_surface_right = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(circle_surface_right, right_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
-            game_surface.blit(circle_surface_right, (right_cursor_pos[0] - cursor_radius, right_cursor_pos[1] - cursor_radius)) # ゲーム座標基準
-
-
-    # --- UIパネルの描画 ---
-
-    # --- スコアパネル (左上) ---
-    score_surface = screen.subsurface(SCORE_PANEL_RECT)
-    score_surface.fill(BLACK)
-    title_text = font_title.render("TIMER / GRAVITY", True, WHITE) # タイトル変更
-    score_surface.blit(title_text, (10, 10))
-
-    display_time = elapsed_time if final_time == 0 else final_time
-    time_text = font_ui.render(f"{format_time(display_time)}", True, WHITE)
-    score_surface.blit(time_text, (15, 60))
-
-    # ★ ラジオボタン描画
-    radio_y = radio_y_start
-    for key in GRAVITY_OPTIONS.keys():
-        center_y = SCORE_PANEL_RECT.top + radio_y
-        center_x = SCORE_PANEL_RECT.left + radio_x_pos
-
-        # ボタンの円
-        pygame.draw.circle(score_surface, RADIO_BUTTON_COLOR, (center_x, center_y), radio_radius, 1) # 枠線
-        if key == selected_gravity_key:
-            pygame.draw.circle(score_surface, RADIO_BUTTON_SELECTED_COLOR, (center_x, center_y), radio_radius - 3) # 内側の塗りつぶし
-
-        # ラベル
-        label_text = radio_font.render(f"{key} ({GRAVITY_OPTIONS[key]:.2f} m/s²)", True, WHITE)
-        score_surface.blit(label_text, (center_x + label_x_offset, center_y - label_text.get_height() // 2))
-
-        radio_y += radio_y_offset
-
-
-    # --- 説明パネル (左中) ---
-    log_surface = screen.subsurface(LOG_PANEL_RECT)
-    log_surface.fill(BLACK)
-    log_title = font_title.render("HOW TO PLAY", True, WHITE)
-    log_surface.blit(log_title, (10, 10))
-    y_pos = 50
-    for line in instructions:
-        log_text = font_log.render(line, True, GREEN)
-        log_surface.blit(log_text, (15, y_pos))
-        y_pos += 25
-
-    # --- カメラパネル (左下) ---
-    cam_surface = screen.subsurface(CAM_PANEL_RECT)
-    pygame.draw.rect(cam_surface, BLACK, (0, 0, CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
-    cam_title = font_title.render("CAMERA", True, WHITE)
-    cam_surface.blit(cam_title, (10, 10))
-
-    if cap.isOpened() and camera_surface_scaled:
-        cam_surface.blit(camera_surface_scaled, (0, 30))
-    elif not cap.isOpened(): # カメラが開いていない場合
-         # ★ どの状態でもエラー表示しない（リトライ時に再オープンするため）
-         # if game_state not in ['CAUGHT', 'MISSED']:
-         #     cam_error_text = font_log.render("Camera not found.", True, RED)
-         #     cam_surface.blit(cam_error_text, (10, 50))
-         pass # エラーメッセージは不要
-
-    # 画面更新
-    pygame.display.flip()
-
-# --- 終了処理 ---
-if cap.isOpened():
-    cap.release()
-cv2.destroyAllWindows()
-pygame.quit()
-sys.exit()
+if __name__ == "__main__":
+    run_scene(RulerCatchScene())
@@ -0,0 +1,115 @@
+# --- ★ シーン (ゲーム1本分) のライフサイクル ---
+# 各ゲームは import しただけでは何もしない (ウィンドウ・カメラ・MediaPipe を開かない) ように、
+# 処理を Scene のフックに分ける。ゲームの状態はモジュールのグローバル変数ではなく、シーンの属性に持つ。
+#   load()                 重い準備 (画像の先読み・コースの生成)。画面には触らない
+#                          (ランチャーはメニューで選ばれている間にワーカースレッドで呼ぶ)
+#   enter()                遊び始める時に1回。画面・フォント・画像の convert・カメラ・MediaPipe・状態の初期化
+#   handle_event(event)    イベント1つごと (ウィンドウを閉じる / ESC は run_scene が処理する)
+#   update(dt_ms)          1フレーム分の入力 (カメラ) とゲームの更新。dt_ms は前のフレームにかかった時間
+#   render()               1フレーム分の描画と画面への転送
+#   exit()                 終わる時に1回。カメラを閉じ、GC の設定などを元に戻す
+#                          (★ GCPolicy は exit() が無くても run_scene() が最後に閉じる)
+# ★ --qos なら、run_scene() が update() と render() の時間を qos (pygame/qosgovernor.py) に知らせ、
+#   重い時は render() を1フレームおきにする。なので時間で進む状態 (アニメーションのコマなど) や
+#   フレームの計測の区切りは update() に置き、render() は描くだけにすること。
+#   片手で遊べるゲームは single_hand = True にしておくと、重い時に max_num_hands を 1 に下げられる。
+# カメラと MediaPipe は gameruntime.runtime から受け取るので、ランチャーからなら全シーンで共有される。
+# ラウンドが終わったら self.report_score("GOAL! Time: 01:23.45") のように結果を知らせる
+# (ランチャーのメニューに表示され、supervisor の下ならプロセスを切り替えても残る)。
+#
+# 使い方 (ゲーム側):
+#   class RulerCatchScene(Scene):
+#       name = "rulercatch"        # ASSET_MANIFEST のキー
+#       def load(self): ...
+#       ...
+#   SCENE = RulerCatchScene        # ランチャーはこの名前でシーンのクラスを探す
+#   if __name__ == "__main__":
+#       run_scene(RulerCatchScene())
+
+import sys
+import time
+import pygame
+from assetmanager import asset_manager
+from fixedstep import display_fps_from_argv
+from gameruntime import runtime, STARTUP_GRACE_MS
+from gcpolicy import close_gc_policies # ★ シーンが GC を止めたまま終わらないように
+from qosgovernor import qos
+
+
+class Scene:
+    """ゲーム1本分。フックを上書きし、状態は self に持つ"""
+
+    name = "scene" # ASSET_MANIFEST のキー (画像の先読み・起動時間のレポートに使う)
+    default_fps = 60
+    single_hand = False # ★ 片手で遊べるか (True なら qos が max_num_hands を 1 に下げてよい)
+
+    def __init__(self, argv=None):
+        self.argv = sys.argv if argv is None else argv # --fps などのオプションはここから読む
+        self.fps = display_fps_from_argv(self.argv, default=self.default_fps)
+        self.loaded = False
+        self.running = False
+        self.exit_code = 0 # 直接起動した時の終了コード
+
+    def ensure_loaded(self):
+        """load() をまだ呼んでいなければ呼ぶ"""
+        if not self.loaded:
+            self.load()
+            self.loaded = True
+
+    def load(self):
+        """重い準備。既定では画像の先読みだけ始める"""
+        asset_manager.preload(self.name)
+
+    def enter(self):
+        pass
+
+    def handle_event(self, event):
+        pass
+
+    def update(self, dt_ms):
+        pass
+
+    def render(self):
+        pass
+
+    def exit(self):
+        pass
+
+    def report_score(self, text):
+        """★ ラウンドの結果を runtime に残す"""
+        runtime.report_score(self.name, text)
+
+
+def run_scene(scene):
+    """シーンを load → enter → (update → render) の繰り返し → exit の順に動かす。
+    直接起動した時は pygame の初期化から終了処理まで行い、scene.exit_code で終了する
+    (ランチャーからなら exit の後にそのまま戻る)"""
+    pygame.init()
+    runtime.heartbeat(STARTUP_GRACE_MS) # ★ コースの生成や画像の変換の間は supervisor に待ってもらう
+    scene.ensure_loaded()
+    scene.running = True
+    try:
+        scene.enter() # 必要な画像が無い時などは、ここでエラーを表示して SystemExit する
+        clock = pygame.time.Clock()
+        qos.begin(scene) # ★ --qos が無ければ何もしない
+        try:
+            while scene.running:
+                dt_ms = clock.tick(scene.fps)
+                runtime.heartbeat() # ★ supervisor の下なら「止まっていない」と知らせる
+                for event in pygame.event.get():
+                    if runtime.is_exit_event(event): # ランチャーからなら ESC でメニューに戻る
+                        scene.running = False
+                    scene.handle_event(event)
+                started = time.perf_counter()
+                scene.update(dt_ms)
+                updated = time.perf_counter()
+                if qos.render_due(): # ★ 重い時は1フレームおきに描く
+                    scene.render()
+                qos.end_frame((updated - started) * 1000, (time.perf_counter() - updated) * 1000)
+        finally:
+            scene.exit()
+    finally:
+        close_gc_policies() # ★ exit() まで来なかった時や exit() が例外で止まった時も、止めた GC を元に戻す
+    if not runtime.hosted:
+        runtime.shutdown()
+        sys.exit(scene.exit_code)
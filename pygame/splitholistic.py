@@ -0,0 +1,387 @@
+# --- ★ Holistic の代わりに Pose と Hands を別々のプロセス (別々のコア) で動かす ---
+# 格闘ゲーム (fightingame) は毎フレーム Holistic (顔・体・両手を全部まとめて推論) を動かしていて、
+# 全ゲームの中で一番重い。使っているのは肘の角度 (Pose) と両手のパー/グー (Hands) だけなので、
+#   ・Pose は画像を POSE_WIDTH まで縮めて、POSE_HZ の間隔で1つのコアで動かす (体は小さくても見つかる)
+#   ・Hands は元の大きさで、追いつける限り毎フレームもう1つのコアで動かす
+# 画像は capturedaemon.FrameRing (共有メモリ) で2つのプロセスに渡し、結果は撮った時刻付きでパイプで戻す。
+# process() は画像を共有メモリに書いてすぐに戻り、届いている中で最新の Hands の結果に、同じ時刻の Pose
+# (前後2つの Pose の結果を時刻で線形補間) を合わせて Holistic と同じ形で返す:
+#   results.pose_landmarks.landmark[...] / results.left_hand_landmarks / results.right_hand_landmarks
+# なので、fightingame の calculate_angle() と is_hand_open() はそのまま使える。
+# 左右の手は Holistic と同じく Pose の手首に近い方に割り当てる (Pose がまだ無い時は Hands の左右の判定を使う)。
+# 最初の結果が届くまで (プロセスの起動と MediaPipe の読み込みの間) は、何も見つからなかった時と同じになる。
+#
+# 使い方 (リポジトリのルートで):
+#   python pygame/fightingame.py --holistic split   # (または環境変数 FESTIVAL_HOLISTIC=split)
+#   python pygame/launcher.py --holistic split
+# 性能比較 (同じ画像を Holistic と split に同じ間隔で渡す):
+#   python pygame/splitholistic.py
+#   python pygame/splitholistic.py --video capture.mp4   # capturedaemon.py --record で録った動画
+
+import atexit
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+from capturedaemon import FrameRing, POLL_S
+
+HOLISTIC_MODES = ("holistic", "split")
+POSE_WIDTH = 320 # Pose に渡す画像の幅 (高さは縦横比を保つ)
+POSE_HZ = 15 # Pose を動かす回数 (1秒あたり)
+POSE_HISTORY = 8 # 時刻を合わせるために取っておく Pose の結果の数
+FUSE_WINDOW_S = 0.25 # Hands の時刻とこれ以上離れた Pose は使わない
+JOIN_TIMEOUT_S = 1.0 # close() でプロセスの終わりを待つ時間
+
+# Pose のランドマーク番号 (mp.solutions.pose.PoseLandmark と同じ)
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+
+
+def holistic_mode_from_argv(argv=None, default="holistic"):
+    """--holistic holistic|split (無ければ環境変数 FESTIVAL_HOLISTIC) で選ばれたモード"""
+    argv = sys.argv if argv is None else argv
+    name = os.environ.get("FESTIVAL_HOLISTIC", default)
+    if "--holistic" in argv:
+        index = argv.index("--holistic") + 1
+        if index < len(argv):
+            name = argv[index]
+    if name not in HOLISTIC_MODES:
+        print(f"警告: 不明なモード '{name}' です。holistic で検出します。")
+        name = "holistic"
+    return name
+
+
+def pin_to_cpu(slot):
+    """(子プロセス) 後ろから slot 番目のコアだけで動く (コアが3つ以上ある時だけ。0 番はゲームに残す)"""
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < 3:
+        return None
+    cpu = cpus[-1 - slot]
+    os.sched_setaffinity(0, {cpu})
+    return cpu
+
+
+def pipeline_main(kind, segment_name, conn, settings, parent_pid):
+    """(子プロセス) 共有メモリの最新の画像で Pose か Hands を動かし、結果を numpy の配列で送る"""
+    import cv2
+    import mediapipe as mp
+
+    cpu = pin_to_cpu(0 if kind == "pose" else 1)
+    if kind == "pose":
+        model = mp.solutions.pose.Pose(model_complexity=0, **settings)
+        interval = 1.0 / POSE_HZ
+    else:
+        model = mp.solutions.hands.Hands(max_num_hands=2, **settings)
+        interval = 0.0
+    # ゲームのプロセスと同じ resource_tracker を使うので、登録はそのまま (消すのはゲーム側の close())
+    ring = FrameRing(shared_memory.SharedMemory(name=segment_name))
+    frame = np.empty(ring.shape, np.uint8)
+    pose_size = (POSE_WIDTH, round(ring.shape[0] * POSE_WIDTH / ring.shape[1]))
+    conn.send(("ready", kind, cpu))
+
+    last_frame_number = -1
+    next_run = 0.0
+    try:
+        while not conn.poll():
+            if os.getppid() != parent_pid: # ゲームのプロセスが kill された
+                break
+            now = time.monotonic()
+            if now < next_run or ring.latest_frame_number() <= last_frame_number:
+                time.sleep(POLL_S)
+                continue
+            latest = ring.read_latest(frame)
+            if latest is None:
+                continue
+            last_frame_number, timestamp = latest
+            next_run = now + interval
+            if kind == "pose":
+                results = model.process(cv2.resize(frame, pose_size, interpolation=cv2.INTER_AREA))
+                points = None
+                if results.pose_landmarks:
+                    points = np.array([(p.x, p.y, p.z, p.visibility) for p in results.pose_landmarks.landmark],
+                                      np.float32)
+                conn.send(("pose", timestamp, points))
+            else:
+                results = model.process(frame)
+                hands = []
+                if results.multi_hand_landmarks:
+                    for points, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                        hands.append((np.array([(p.x, p.y, p.z) for p in points.landmark], np.float32),
+                                      handedness.classification[0].label))
+                conn.send(("hands", timestamp, hands))
+    except (BrokenPipeError, EOFError):
+        pass # ゲームのプロセスが終わった
+    finally:
+        model.close()
+        ring.close()
+
+
+class HolisticResult:
+    """Holistic.process() の戻り値と同じ形の結果 (+ どの画像の結果か)"""
+
+    def __init__(self, pose_landmarks=None, left_hand_landmarks=None, right_hand_landmarks=None, timestamp=None):
+        self.pose_landmarks = pose_landmarks
+        self.left_hand_landmarks = left_hand_landmarks # 体の左手 (Holistic と同じく Pose の LEFT_WRIST 側)
+        self.right_hand_landmarks = right_hand_landmarks
+        self.timestamp = timestamp # 元になった画像を渡した時刻 (time.monotonic() の秒。まだ結果が無ければ None)
+
+
+class SplitHolistic:
+    """mp.solutions.holistic.Holistic の代わり。Pose と Hands を別々のプロセスで動かし、時刻で合わせる"""
+
+    def __init__(self, min_detection_confidence=0.5, min_tracking_confidence=0.5, **unused):
+        # model_complexity などの Holistic だけの設定は無視する
+        from mediapipe.framework.formats import landmark_pb2
+        self._landmark_pb2 = landmark_pb2
+        self.settings = dict(min_detection_confidence=min_detection_confidence,
+                             min_tracking_confidence=min_tracking_confidence)
+        self.context = multiprocessing.get_context("spawn") # MediaPipe のスレッドを fork で引き継がない
+        self.ring = None
+        self.pipelines = {} # {"pose" / "hands": (プロセス, パイプ)}
+        self.frame_number = 0
+        self.last_timestamp = None # 最後に渡した画像の時刻
+        self.pose_history = deque(maxlen=POSE_HISTORY) # [(時刻, 33x4 の配列 or None)]
+        self.hands = None # (時刻, [(21x3 の配列, 左右)])
+        self.latest = HolisticResult()
+        atexit.register(self.close) # 共有メモリを消す
+
+    def start(self, shape):
+        """画像の大きさに合わせた共有メモリを作り、Pose と Hands のプロセスを起動する"""
+        self.close()
+        name = f"festival_holistic{os.getpid()}_{id(self)}"
+        self.ring = FrameRing.create(name, shape)
+        # ゲームのプロセスが kill された時は、子プロセスが親がいなくなったのに気づいて自分で終わる
+        for kind in ("pose", "hands"):
+            conn, child_conn = self.context.Pipe()
+            process = self.context.Process(target=pipeline_main, daemon=True,
+                                           args=(kind, name, child_conn, self.settings, os.getpid()))
+            process.start()
+            child_conn.close()
+            self.pipelines[kind] = (process, conn)
+
+    def process(self, image_rgb):
+        """画像 (RGB) を2つのプロセスに渡し、届いている中で最新の結果を返す (推論は待たない)"""
+        if self.ring is None or self.ring.shape != image_rgb.shape:
+            self.start(image_rgb.shape)
+        self.frame_number += 1
+        self.last_timestamp = time.monotonic()
+        self.ring.publish(image_rgb, self.last_timestamp, self.frame_number)
+        if self.receive():
+            self.latest = self.fuse()
+        return self.latest
+
+    def receive(self):
+        """パイプに届いている結果を全部読む。新しい結果があれば True"""
+        updated = False
+        for kind, (process, conn) in self.pipelines.items():
+            try:
+                while conn.poll():
+                    message = conn.recv()
+                    if message[0] == "pose":
+                        self.pose_history.append((message[1], message[2]))
+                        updated = True
+                    elif message[0] == "hands":
+                        self.hands = (message[1], message[2])
+                        updated = True
+                    elif message[0] == "ready":
+                        cpu = "" if message[2] is None else f" on cpu {message[2]}"
+                        print(f"[holistic] {message[1]} pipeline ready{cpu}")
+            except (EOFError, OSError):
+                pass # プロセスが落ちた (その検出は止まったまま。Holistic と同じく何も見つからない扱い)
+        return updated
+
+    def pose_at(self, timestamp):
+        """timestamp の時の Pose (前後の結果を線形補間。FUSE_WINDOW_S 以内に無ければ None)"""
+        before = after = None
+        for entry in self.pose_history:
+            if entry[0] <= timestamp:
+                before = entry
+            elif after is None:
+                after = entry
+        if before is not None and after is not None and before[1] is not None and after[1] is not None:
+            ratio = (timestamp - before[0]) / (after[0] - before[0])
+            return before[1] + (after[1] - before[1]) * ratio
+        nearest = min((entry for entry in (before, after) if entry is not None),
+                      key=lambda entry: abs(entry[0] - timestamp), default=None)
+        if nearest is None or abs(nearest[0] - timestamp) > FUSE_WINDOW_S:
+            return None
+        return nearest[1]
+
+    def assign_hands(self, hands, pose):
+        """手を (体の左手, 体の右手) に分ける"""
+        if pose is None:
+            # 左右反転した画像では、Hands の "Left" は Pose (Holistic) の右手側にいる
+            left = next((points for points, label in hands if label == "Right"), None)
+            right = next((points for points, label in hands if label == "Left"), None)
+            return left, right
+        wrists = pose[[LEFT_WRIST, RIGHT_WRIST], :2]
+        # 手ごとの (Pose の左手首までの距離, 右手首までの距離)
+        distances = [np.linalg.norm(wrists - points[0, :2], axis=1) for points, _ in hands]
+        if len(hands) == 1:
+            return (hands[0][0], None) if distances[0][0] <= distances[0][1] else (None, hands[0][0])
+        if distances[0][0] + distances[1][1] <= distances[0][1] + distances[1][0]:
+            return hands[0][0], hands[1][0]
+        return hands[1][0], hands[0][0]
+
+    def fuse(self):
+        """最新の Hands の結果と同じ時刻の Pose を合わせて、Holistic と同じ形にする"""
+        if self.hands is not None:
+            timestamp, hands = self.hands
+        elif self.pose_history:
+            timestamp, hands = self.pose_history[-1][0], []
+        else:
+            return HolisticResult()
+        pose = self.pose_at(timestamp)
+        left, right = self.assign_hands(hands[:2], pose)
+        landmark_pb2 = self._landmark_pb2
+        pose_landmarks = None
+        if pose is not None:
+            pose_landmarks = landmark_pb2.NormalizedLandmarkList(landmark=[
+                landmark_pb2.NormalizedLandmark(x=x, y=y, z=z, visibility=visibility) for x, y, z, visibility in pose.tolist()
+            ])
+
+        def hand_landmarks(points):
+            if points is None:
+                return None
+            return landmark_pb2.NormalizedLandmarkList(landmark=[
+                landmark_pb2.NormalizedLandmark(x=x, y=y, z=z) for x, y, z in points.tolist()
+            ])
+
+        return HolisticResult(pose_landmarks, hand_landmarks(left), hand_landmarks(right), timestamp)
+
+    def close(self):
+        """子プロセスを止めて、共有メモリを消す"""
+        for process, conn in self.pipelines.values():
+            try:
+                conn.send(("quit",))
+            except OSError:
+                pass
+        for process, conn in self.pipelines.values():
+            process.join(JOIN_TIMEOUT_S)
+            if process.is_alive():
+                process.kill()
+                process.join(JOIN_TIMEOUT_S)
+            conn.close()
+        self.pipelines.clear()
+        if self.ring is not None:
+            segment = self.ring.segment
+            self.ring.close()
+            segment.unlink()
+            self.ring = None
+
+
+def create_holistic(mode="holistic", **kwargs):
+    """mode で選んだ Holistic (split なら SplitHolistic)"""
+    if mode == "split":
+        if not multiprocessing.current_process().daemon:
+            return SplitHolistic(**kwargs)
+        print("警告: daemon のプロセスからは子プロセスを起動できません。holistic で検出します。")
+    import mediapipe as mp
+    return mp.solutions.holistic.Holistic(**kwargs)
+
+
+if __name__ == "__main__":
+    import cv2
+    from capturedaemon import camera_index_from_argv, open_capture
+
+    FRAMES = 300
+    FPS = 30 # 画像はカメラと同じ間隔で渡す
+    WARMUP_S = 10.0 # split のプロセスの起動を待つ最大の時間
+    SETTINGS = dict(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    OPEN_TIP_PIP = ((8, 6), (12, 10), (16, 14), (20, 18)) # fightingame.is_hand_open() と同じ指
+
+    def elbow_angles(pose_landmarks):
+        """(左肘, 右肘) の角度 (fightingame.calculate_angle() と同じ計算)"""
+        if pose_landmarks is None:
+            return None
+        points = np.array([(p.x, p.y) for p in pose_landmarks.landmark])
+        angles = []
+        for shoulder, elbow, wrist in ((11, 13, 15), (12, 14, 16)):
+            ba, bc = points[shoulder] - points[elbow], points[wrist] - points[elbow]
+            cosine = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
+            angles.append(np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0))))
+        return angles
+
+    def hand_open(hand_landmarks):
+        if hand_landmarks is None:
+            return None
+        points = hand_landmarks.landmark
+        return sum(1 for tip, pip in OPEN_TIP_PIP if points[tip].y < points[pip].y) >= 3
+
+    def percentile(values, p):
+        return float(np.percentile(values, p)) if values else float("nan")
+
+    # 同じ画像を両方に渡すため、先に全部読んでおく (ゲームと同じく左右反転して RGB にする)
+    if "--video" in sys.argv:
+        source = cv2.VideoCapture(sys.argv[sys.argv.index("--video") + 1])
+    else:
+        source = open_capture(camera_index_from_argv())
+    frames = []
+    while len(frames) < FRAMES:
+        success, image = source.read()
+        if not success:
+            break
+        frames.append(np.ascontiguousarray(cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)))
+    source.release()
+    if not frames:
+        sys.exit("画像を読めませんでした。")
+    print(f"{len(frames)} 枚 ({frames[0].shape[1]}x{frames[0].shape[0]}) を {FPS}fps の間隔で渡す")
+
+    def bench(mode):
+        """{画像の番号: (肘の角度, 左手パー, 右手パー)} と process() の時間・結果の遅れ (ms)"""
+        holistic = create_holistic(mode, **SETTINGS)
+        if mode == "split":
+            # 2つのプロセスが MediaPipe を読み終えるまで待つ (ゲームでは待たずに遊び始める)
+            deadline = time.monotonic() + WARMUP_S
+            while time.monotonic() < deadline and holistic.latest.timestamp is None:
+                holistic.process(frames[0])
+                time.sleep(1 / FPS)
+            holistic.pose_history.clear()
+            holistic.hands = None
+        call_ms = []
+        latency_ms = []
+        states = {}
+        sent_at = {} # {画像を渡した時刻: 画像の番号}
+        seen = None
+        start = time.perf_counter()
+        for frame_number, image in enumerate(frames):
+            time.sleep(max(0.0, start + frame_number / FPS - time.perf_counter()))
+            before = time.perf_counter()
+            results = holistic.process(image)
+            call_ms.append((time.perf_counter() - before) * 1000)
+            number = frame_number
+            if mode == "split":
+                sent_at[holistic.last_timestamp] = frame_number
+                if results.timestamp is None or results.timestamp == seen:
+                    continue # 新しい結果はまだ届いていない
+                seen = results.timestamp
+                number = sent_at.get(seen, frame_number)
+                latency_ms.append((time.monotonic() - seen) * 1000)
+            else:
+                latency_ms.append(call_ms[-1]) # 結果は process() の中で届く
+            states[number] = (elbow_angles(results.pose_landmarks),
+                              hand_open(results.left_hand_landmarks), hand_open(results.right_hand_landmarks))
+        elapsed = time.perf_counter() - start
+        holistic.close()
+        return states, call_ms, latency_ms, elapsed
+
+    reports = {mode: bench(mode) for mode in HOLISTIC_MODES}
+    print(f"{'':>9} {'call ms':>14} {'latency ms':>14} {'results/s':>10}")
+    for mode, (states, call_ms, latency_ms, elapsed) in reports.items():
+        print(f"{mode:>9} {np.mean(call_ms):>6.2f} p95 {percentile(call_ms, 95):>6.2f}"
+              f" {np.mean(latency_ms):>6.2f} p95 {percentile(latency_ms, 95):>6.2f} {len(states) / elapsed:>10.1f}")
+    # 同じ画像の結果どうしで、肘の角度と手のパー/グーがどれだけ合っているか
+    holistic_states, split_states = reports["holistic"][0], reports["split"][0]
+    angle_diffs = []
+    open_matches = []
+    for number in holistic_states.keys() & split_states.keys():
+        (angles_a, left_a, right_a), (angles_b, left_b, right_b) = holistic_states[number], split_states[number]
+        if angles_a is not None and angles_b is not None:
+            angle_diffs += [abs(a - b) for a, b in zip(angles_a, angles_b)]
+        open_matches += [a == b for a, b in ((left_a, left_b), (right_a, right_b)) if a is not None and b is not None]
+    print(f"肘の角度の差 (同じ画像): 平均 {np.mean(angle_diffs) if angle_diffs else float('nan'):.1f} 度"
+          f" / パー・グーの一致 {np.mean(open_matches) * 100 if open_matches else float('nan'):.0f}%")
@@ -4,21 +4,21 @@ import pygame
 import math
 import random
 import numpy as np
+from dirtypanel import DirtyPanels # ★ 左カラムの部分更新
+from assetcache import assets # ★ 読み込み・変形済みの画像をプロセス全体で共有
+from assetmanager import asset_manager # ★ 画像の並列プリロードとデコード済みキャッシュ
+from gameruntime import runtime # ★ カメラと MediaPipe (ランチャーから起動した時は全ゲームで共有)
+from qosgovernor import qos # ★ 重い時にプレビューと骨格の描画を間引く (--qos)
+from entitypool import EntityPool # ★ 弾とエフェクトを配列のスロットで管理
+from gcpolicy import GCPolicy, gc_mode_from_argv # ★ ラウンド中は GC を止め、切り替わりでまとめて回収
+from fixedstep import FixedStep # ★ 弾の移動は画面のフレームレートと関係なく固定ステップで進める
+from scene import Scene, run_scene # ★ load / enter / update / render / exit のフックで動かす (import しただけでは何もしない)
 
 # --- 初期設定 ---
 
-# MediaPipe Handsモデルと描画ツールを準備
+# MediaPipe Handsモデルと描画ツール (★ モデル自体は enter() で runtime から受け取る)
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
-hands = mp_hands.Hands(
-    max_num_hands=2, # 両手を検出
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
-
-# Pygameの初期化
-pygame.init()
-pygame.font.init()
 
 # --- 画面レイアウト定義 ---
 SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
@@ -32,11 +32,7 @@ LOG_PANEL_RECT = pygame.Rect(0, SCORE_PANEL_RECT.height, LEFT_PANEL_WIDTH, int(S
 CAM_PANEL_RECT = pygame.Rect(0, SCORE_PANEL_RECT.height + LOG_PANEL_RECT.height, LEFT_PANEL_WIDTH, int(SCREEN_HEIGHT * 0.3))
 GAME_PANEL_RECT = pygame.Rect(LEFT_PANEL_WIDTH, 0, GAME_PANEL_WIDTH, GAME_HEIGHT)
 
-# Pygameウィンドウの設定
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("MediaPipe Fighting Game")
-
-# 色とフォントの定義
+# 色の定義
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
@@ -48,20 +44,34 @@ ORANGE = (255, 165, 0)
 YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 
-font_ui = pygame.font.Font(None, 36)
-font_log = pygame.font.Font(None, 24)
-font_title = pygame.font.Font(None, 40)
-font_result = pygame.font.Font(None, 100)
+PLAYER_SIZE = (200, 400)
+ENEMY_SIZE = (200, 400)
+ANIMATION_SPEED_MS = 100
+# ダメージエフェクトのサイズを拡大
+EFFECT_SCALE = 1.5
+
+# --- ★ 格闘ゲームの定数 ★ ---
+PLAYER_MAX_HP = 5000
+PLAYER_MAX_ENERGY = 100
+ENEMY_MAX_HP = 5000
+
+# ★★★ 追加: エナジー自動回復 ★★★
+ENERGY_REGEN_TIME_MS = 1000 # 1秒ごと
+
+# パンチ判定用のZ座標の閾値
+PUNCH_Z_THRESHOLD = -0.1
+
+MAX_LOG_LINES = 6
+
+# ★ 弾の速さは 30 FPS の1フレームあたりで決めてあるので、物理も 30Hz のステップで進める
+PHYSICS_HZ = 30
 
 # --- 画像読み込み (フォールバック付) ---
 
 def load_image(path, size=None, fallback_color=ORANGE):
     """画像読み込み関数。失敗したら色付きのSurfaceを返す"""
     try:
-        image = pygame.image.load(path).convert_alpha()
-        if size:
-            image = pygame.transform.scale(image, size)
-        return image
+        return assets.get(path, size) # ★ 同じ画像・同じサイズは2回目からキャッシュ
     except FileNotFoundError:
         print(f"エラー: 画像 '{path}' が見つかりません。代替図形を使います。")
         if size:
@@ -72,134 +82,18 @@ def load_image(path, size=None, fallback_color=ORANGE):
         surface.fill(fallback_color)
         return surface
 
-# --- 画像読み込み ---
-# (画像読み込み部分は元のコードから変更ありません)
-
-# プレイヤー画像
-PLAYER_SIZE = (200, 400)
-img_kihon = load_image("image/kihon.png", PLAYER_SIZE, BLUE)
-img_punch_right = load_image("image/rightattack.png", PLAYER_SIZE, (0, 0, 200))
-img_punch_left = load_image("image/leftattack.png", PLAYER_SIZE, (0, 0, 180))
-img_kikouha = load_image("image/kikouha.png", PLAYER_SIZE, (0, 100, 200))
-img_hado = load_image("image/hissatuhado.png", PLAYER_SIZE, (100, 100, 255))
-img_guard = load_image("image/gard.png", (100, 400), (0, 200, 200)) # ガード用
-
-# ダンサーアニメーション画像の読み込み
-dancer_images = []
-dancer_frame = 0
-dancer_frame_time = 0
-ANIMATION_SPEED_MS = 100
-try:
-    for i in range(1, 6):
-        img_path = f"image/c-dancer-{i}.png"
-        img = pygame.image.load(img_path).convert_alpha()
-        img = pygame.transform.scale(img, (300, 300))
-        dancer_images.append(img)
-except FileNotFoundError as e:
-    print(f"エラー: ダンサー画像が見つかりません。 {e}")
-
-# 敵画像
-ENEMY_SIZE = (200, 400)
-img_enemy = load_image("image/damager.png", ENEMY_SIZE, RED)
-
-# 弾 / エフェクト画像
-img_ball = load_image("image/ball.png", (50, 50), RED)
-
-# 気弾アニメーションリスト
-img_kidan = [
-    load_image("image/kidan3.png", (80, 80), YELLOW), # 手前から
-    load_image("image/kidan2.png", (80, 80), YELLOW),
-    load_image("image/kidan1.png", (80, 80), YELLOW), # 奥へ
-]
-# 波動アニメーションリスト
-img_hado_bullets_raw = [
-    load_image("image/hado4.png", (90, 150), PURPLE),
-    load_image("image/hado2.png", (90, 150), PURPLE),
-    load_image("image/hado1.png", (90, 150), PURPLE),
-]
-
-
-# ダメージエフェクトのサイズを拡大
-EFFECT_SCALE = 1.5
-img_dageki_dm = load_image("image/dagekidm.png", (int(100 * EFFECT_SCALE), int(100 * EFFECT_SCALE)), ORANGE)
-img_kidan_dm = load_image("image/kidandm.png", (int(150 * EFFECT_SCALE), int(150 * EFFECT_SCALE)), YELLOW)
-img_hado_dm = load_image("image/hadodm.png", (int(200 * EFFECT_SCALE), int(200 * EFFECT_SCALE)), PURPLE)
-
-# 終了画面用
-goal_background_image = None
-try:
-    img = pygame.image.load("image/goaliceclimb.png").convert()
-    goal_background_image = pygame.transform.scale(img, (GAME_PANEL_WIDTH, GAME_HEIGHT))
-except FileNotFoundError:
-    print("エラー: image/goaliceclimb.png が見つかりません。")
-
-
-# --- Webカメラの準備 ---
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("エラー: カメラを起動できません。")
-
-# --- ★ 格闘ゲーム変数 ★ ---
-
-# ステータス
-player_hp = 5000
-PLAYER_MAX_HP = 5000
-player_energy = 100
-PLAYER_MAX_ENERGY = 100
-enemy_hp = 5000
-ENEMY_MAX_HP = 5000
-enemy_heal_count = 30
-
-# 位置
-player_rect = img_kihon.get_rect(center=(GAME_PANEL_WIDTH * 0.20, GAME_HEIGHT // 2))
-enemy_rect = img_enemy.get_rect(center=(GAME_PANEL_WIDTH * 0.80, GAME_HEIGHT // 2))
-guard_rect = img_guard.get_rect(center=(player_rect.centerx + 75, player_rect.centery))
-
-# 状態管理
-player_state = 'kihon' # kihon, punch_right, punch_left, kikouha, hado, guard
-player_state_timer = 0
-game_finished = False
-game_won = False
-
-# 弾 と エフェクト のリスト
-player_bullets = [] # [Rect, 'type', speed]
-enemy_bullets = [] # # [Rect, vector_x, vector_y, image_surface]
-hit_effects = [] # [Image, Rect, timer]
-
-# 敵の行動タイマー
-enemy_heal_timer = 0
-enemy_attack_timer = 0
-enemy_next_attack_time = random.randint(5000, 8000)
-
-# ★★★ 追加: エナジー自動回復タイマー ★★★
-player_energy_regen_timer = 0
-ENERGY_REGEN_TIME_MS = 1000 # 1秒ごと
-
-# 防御タイマー
-guard_start_time = 0
-guard_duration_ms = 0
-last_guard_bonus_time = 0
-
-# ジェスチャー判定用 (Z座標ロジック含む)
-prev_user_left_is_open = False
-prev_user_right_is_open = False
-prev_user_left_is_punching = False
-prev_user_right_is_punching = False
-
-# パンチ判定用のZ座標の閾値
-PUNCH_Z_THRESHOLD = -0.1
-
-# テキストログ
-log_messages = []
-MAX_LOG_LINES = 6
+def build_strip(images):
+    """画像を横に並べて1枚にする (弾の連結描画を毎フレーム blit しないため)"""
+    strip = pygame.Surface((sum(img.get_width() for img in images), max(img.get_height() for img in images)), pygame.SRCALPHA)
+    draw_x = 0
+    for img in images:
+        # 透明な下地にそのまま写す (アルファ合成で縁が暗くならないように MAX でコピー)
+        strip.blit(img, (draw_x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        draw_x += img.get_width()
+    return strip
 
 # --- 関数定義 ---
 
-def add_log(message):
-    log_messages.append(message)
-    if len(log_messages) > MAX_LOG_LINES:
-        log_messages.pop(0)
-
 def format_time(ms):
     total_seconds = ms // 1000
     minutes = total_seconds // 60
@@ -286,96 +180,218 @@ def draw_bar(surface, rect, value, max_value, color, bg_color=GRAY):
     pygame.draw.rect(surface, WHITE, rect, 2)
 
 
-# --- メインループ ---
-running = True
-clock = pygame.time.Clock()
-add_log("Game Start!")
-camera_surface_scaled = None # カメラ映像保持用
-
-while running:
-
-    delta_time_ms = clock.get_time()
-    current_time_ms = pygame.time.get_ticks()
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+# --- ★ シーン (ゲームの状態はすべてここに持つ) ---
+class SpecialMoveScene(Scene):
+    """必殺技バトル。load では画像の先読みだけ行う"""
+
+    name = "spmove"
+    default_fps = 30 # 画面のフレームレート (--fps 60 にしても弾の速さは同じ)
+
+    def enter(self):
+        # Pygameウィンドウの設定
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("MediaPipe Fighting Game")
+
+        self.font_ui = pygame.font.Font(None, 36)
+        self.font_log = pygame.font.Font(None, 24)
+        self.font_title = pygame.font.Font(None, 40)
+        self.font_result = pygame.font.Font(None, 100)
+
+        # --- 画像読み込み ---
+
+        # プレイヤー画像
+        self.img_kihon = load_image("image/kihon.png", PLAYER_SIZE, BLUE)
+        self.img_punch_right = load_image("image/rightattack.png", PLAYER_SIZE, (0, 0, 200))
+        self.img_punch_left = load_image("image/leftattack.png", PLAYER_SIZE, (0, 0, 180))
+        self.img_kikouha = load_image("image/kikouha.png", PLAYER_SIZE, (0, 100, 200))
+        self.img_hado = load_image("image/hissatuhado.png", PLAYER_SIZE, (100, 100, 255))
+        self.img_guard = load_image("image/gard.png", (100, 400), (0, 200, 200)) # ガード用
+
+        # ダンサーアニメーション画像の読み込み
+        self.dancer_images = []
+        self.dancer_frame = 0
+        self.dancer_frame_time = 0
+        try:
+            for i in range(1, 6):
+                img_path = f"image/c-dancer-{i}.png"
+                img = assets.get(img_path, (300, 300))
+                self.dancer_images.append(img)
+        except FileNotFoundError as e:
+            print(f"エラー: ダンサー画像が見つかりません。 {e}")
+
+        # 敵画像
+        self.img_enemy = load_image("image/damager.png", ENEMY_SIZE, RED)
+
+        # 弾 / エフェクト画像
+        self.img_ball = load_image("image/ball.png", (50, 50), RED)
+
+        # 気弾アニメーションリスト
+        self.img_kidan = [
+            load_image("image/kidan3.png", (80, 80), YELLOW), # 手前から
+            load_image("image/kidan2.png", (80, 80), YELLOW),
+            load_image("image/kidan1.png", (80, 80), YELLOW), # 奥へ
+        ]
+        # 波動アニメーションリスト
+        self.img_hado_bullets_raw = [
+            load_image("image/hado4.png", (90, 150), PURPLE),
+            load_image("image/hado2.png", (90, 150), PURPLE),
+            load_image("image/hado1.png", (90, 150), PURPLE),
+        ]
+
+        # ★ 弾は連結した1枚の画像として描く
+        self.img_kidan_strip = build_strip(self.img_kidan)
+        self.img_hado_strip = build_strip(self.img_hado_bullets_raw)
+
+        self.img_dageki_dm = load_image("image/dagekidm.png", (int(100 * EFFECT_SCALE), int(100 * EFFECT_SCALE)), ORANGE)
+        self.img_kidan_dm = load_image("image/kidandm.png", (int(150 * EFFECT_SCALE), int(150 * EFFECT_SCALE)), YELLOW)
+        self.img_hado_dm = load_image("image/hadodm.png", (int(200 * EFFECT_SCALE), int(200 * EFFECT_SCALE)), PURPLE)
+
+        # 終了画面用
+        self.goal_background_image = None
+        try:
+            self.goal_background_image = assets.get("image/goaliceclimb.png", (GAME_PANEL_WIDTH, GAME_HEIGHT), alpha=False)
+        except FileNotFoundError:
+            print("エラー: image/goaliceclimb.png が見つかりません。")
+
+        # --- MediaPipe と Webカメラの準備 (★ ランチャーからなら開いたままのものを使い回す) ---
+        self.hands = runtime.hands(
+            profile=self.name, # ★ handtuner.py で決めた設定があれば、下の値を上書きする
+            max_num_hands=2, # 両手を検出
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7
+        )
+        self.cap = runtime.open_camera(0)
+        if not self.cap.isOpened():
+            print("エラー: カメラを起動できません。")
+
+        # --- ★ 格闘ゲーム変数 ★ ---
+
+        # ステータス
+        self.player_hp = 5000
+        self.player_energy = 100
+        self.enemy_hp = 5000
+        self.enemy_heal_count = 30
+
+        # 位置
+        self.player_rect = self.img_kihon.get_rect(center=(GAME_PANEL_WIDTH * 0.20, GAME_HEIGHT // 2))
+        self.enemy_rect = self.img_enemy.get_rect(center=(GAME_PANEL_WIDTH * 0.80, GAME_HEIGHT // 2))
+        self.guard_rect = self.img_guard.get_rect(center=(self.player_rect.centerx + 75, self.player_rect.centery))
+
+        # 状態管理
+        self.player_state = 'kihon' # kihon, punch_right, punch_left, kikouha, hado, guard
+        self.player_state_timer = 0
+        self.game_finished = False
+        self.game_won = False
+
+        # 弾 と エフェクト のリスト
+        # ★ リストではなくエンティティプールで持つ (spawn/despawn は O(1))
+        self.player_bullets = EntityPool() # kind: 'kidan' / 'hado', vx: 弾速
+        self.enemy_bullets = EntityPool() # vx, vy: プレイヤーへ向かう速度, 画像は攻撃ごとの大きさ
+        self.hit_effects = EntityPool() # timer (ms) が切れたら自動で消える
+
+        # 敵の行動タイマー
+        self.enemy_heal_timer = 0
+        self.enemy_attack_timer = 0
+        self.enemy_next_attack_time = random.randint(5000, 8000)
+
+        # ★★★ 追加: エナジー自動回復タイマー ★★★
+        self.player_energy_regen_timer = 0
+
+        # 防御タイマー
+        self.guard_start_time = 0
+        self.guard_duration_ms = 0
+        self.last_guard_bonus_time = 0
+
+        # ジェスチャー判定用 (Z座標ロジック含む)
+        self.prev_user_left_is_open = False
+        self.prev_user_right_is_open = False
+        self.prev_user_left_is_punching = False
+        self.prev_user_right_is_punching = False
+
+        # テキストログ
+        self.log_messages = []
+        self.add_log("Game Start!")
+        self.camera_surface_scaled = None # カメラ映像保持用
+        self.camera_frame_id = 0 # ★ カメラ映像が更新されるたびに増える (カメラパネルの再描画判定用)
+        self.panels = DirtyPanels() # ★ 左カラムは内容が変わった時だけ再描画
+        self.dt_ms = 0
+
+        print(asset_manager.finish_startup(self.name)) # ★ 起動時間 (コールド/ウォーム) を表示
+        self.fixed_step = FixedStep(hz=PHYSICS_HZ)
+        self.gc_policy = GCPolicy(mode=gc_mode_from_argv(self.argv))
+        self.gc_policy.freeze() # ★ 読み込んだ画像やフォントは GC の対象から外す
+        self.gc_policy.start_round() # ★ 戦っている間は自動の GC を止める (技を出した瞬間に止まらないように)
+
+    def add_log(self, message):
+        self.log_messages.append(message)
+        if len(self.log_messages) > MAX_LOG_LINES:
+            self.log_messages.pop(0)
+
+    def handle_event(self, event):
+        self.panels.handle_event(event)
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_RETURN:
-                running = False
-
-    screen.fill(GRAY)
+                self.running = False
+
+    def update(self, dt_ms):
+        self.dt_ms = dt_ms
+        if self.game_finished and self.dancer_images: # ★ ダンサーのアニメーションは描画ではなく更新で進める (--qos で描画を飛ばしても同じ速さ)
+            self.dancer_frame_time += dt_ms
+            if self.dancer_frame_time > ANIMATION_SPEED_MS:
+                self.dancer_frame = (self.dancer_frame + 1) % len(self.dancer_images)
+                self.dancer_frame_time = 0
+        sim_steps = self.fixed_step.advance(dt_ms) # ★ 前のフレームの時間の分だけ物理を進める
+        current_time_ms = pygame.time.get_ticks()
+
+        if self.game_finished:
+            # --- GAME FINISHED ---
+            if self.cap.isOpened():
+                self.cap.release()
+            return
 
-    if game_finished:
-        # --- GAME FINISHED ---
-        
-        game_surface = screen.subsurface(GAME_PANEL_RECT)
-        if goal_background_image:
-            game_surface.blit(goal_background_image, (0, 0))
-        else:
-            game_surface.fill(SKY_BLUE)
-
-        if game_won:
-            result_text_str = "Win!!"
-            result_color = ORANGE
-        else:
-            result_text_str = "You Lose..."
-            result_color = RED
-            
-        result_text = font_result.render(result_text_str, True, result_color)
-        game_surface.blit(result_text, (
-            game_surface.get_width() // 2 - result_text.get_width() // 2,
-            game_surface.get_height() // 3 - result_text.get_height() // 2
-        ))
-        
-        if dancer_images:
-            dancer_frame_time += delta_time_ms
-            if dancer_frame_time > ANIMATION_SPEED_MS:
-                dancer_frame = (dancer_frame + 1) % len(dancer_images)
-                dancer_frame_time = 0
-
-            current_dancer_image = dancer_images[dancer_frame]
-            img_rect = current_dancer_image.get_rect(center=(game_surface.get_width() // 2, game_surface.get_height() // 2 + 100))
-            game_surface.blit(current_dancer_image, img_rect)
-
-        if cap.isOpened():
-            cap.release()
-
-    elif not game_finished:
         # --- GAME RUNNING ---
+        cap = self.cap
+        fixed_step = self.fixed_step
+        player_rect = self.player_rect
+        enemy_rect = self.enemy_rect
+        player_bullets = self.player_bullets
+        enemy_bullets = self.enemy_bullets
+        hit_effects = self.hit_effects
 
-        camera_surface_scaled = None 
-        results = None 
+        results = None # ★ camera_surface_scaled は読めなかった時だけ消す (--qos でプレビューを間引いた時は前の画像のまま)
 
         if not cap.isOpened():
-            if "Camera feed lost." not in log_messages:
-                add_log("Camera feed lost.")
+            if "Camera feed lost." not in self.log_messages:
+                self.add_log("Camera feed lost.")
         else:
             success, image_cam = cap.read()
             if not success:
-                if "Camera frame read error." not in log_messages:
-                    add_log("Camera frame read error.")
+                self.camera_surface_scaled = None
+                if "Camera frame read error." not in self.log_messages:
+                    self.add_log("Camera frame read error.")
             else:
                 # 2. Hands 検出
                 image_rgb = cv2.cvtColor(cv2.flip(image_cam, 1), cv2.COLOR_BGR2RGB)
                 image_rgb.flags.writeable = False
-                results = hands.process(image_rgb)
+                results = self.hands.process(image_rgb)
 
                 # 3. カメラ映像の準備 (左下パネル用)
-                image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_BGR2RGB)
-                
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        mp_drawing.draw_landmarks(
-                            image_bgr,
-                            hand_landmarks,
-                            mp_hands.HAND_CONNECTIONS, 
-                            mp_drawing.DrawingSpec(color=GREEN, thickness=2, circle_radius=2),
-                            mp_drawing.DrawingSpec(color=WHITE, thickness=2, circle_radius=2))
+                if qos.preview_due(): # ★ 重い時はカメラのプレビューを間引く (前の画像を表示し続ける)
+                    image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_BGR2RGB)
 
-                image_rgb_cam = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-                image_pygame = pygame.image.frombuffer(image_rgb_cam.tobytes(), image_rgb_cam.shape[1::-1], "RGB")
-                camera_surface_scaled = pygame.transform.scale(image_pygame, (CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
+                    if qos.draw_skeleton and results.multi_hand_landmarks: # ★ 重い時は骨格を描かない
+                        for hand_landmarks in results.multi_hand_landmarks:
+                            mp_drawing.draw_landmarks(
+                                image_bgr,
+                                hand_landmarks,
+                                mp_hands.HAND_CONNECTIONS,
+                                mp_drawing.DrawingSpec(color=GREEN, thickness=2, circle_radius=2),
+                                mp_drawing.DrawingSpec(color=WHITE, thickness=2, circle_radius=2))
+
+                    image_rgb_cam = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+                    image_pygame = pygame.image.frombuffer(image_rgb_cam.tobytes(), image_rgb_cam.shape[1::-1], "RGB")
+                    self.camera_surface_scaled = pygame.transform.scale(image_pygame, (CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
+                    self.camera_frame_id += 1
 
 
         # 4. 格闘ゲーム ジェスチャーロジック
@@ -405,121 +421,121 @@ while running:
 
 
         # プレイヤー状態タイマー更新
-        if player_state_timer > 0:
-            player_state_timer -= delta_time_ms
+        if self.player_state_timer > 0:
+            self.player_state_timer -= dt_ms
         else:
-            player_state = 'kihon'
-            guard_duration_ms = 0
+            self.player_state = 'kihon'
+            self.guard_duration_ms = 0
 
 
         # ジェスチャー判定
         
         # (1) 状態変化を検出
         # ★★★ 修正: グー -> パー (気弾/波動用) ★★★
-        user_left_just_opened = (not prev_user_left_is_open) and is_user_left_open
-        user_right_just_opened = (not prev_user_right_is_open) and is_user_right_open
+        user_left_just_opened = (not self.prev_user_left_is_open) and is_user_left_open
+        user_right_just_opened = (not self.prev_user_right_is_open) and is_user_right_open
         
         # 突き -> 戻し (パンチ用)
-        user_left_just_punched = (not prev_user_left_is_punching) and is_user_left_punching
-        user_right_just_punched = (not prev_user_right_is_punching) and is_user_right_punching
+        user_left_just_punched = (not self.prev_user_left_is_punching) and is_user_left_punching
+        user_right_just_punched = (not self.prev_user_right_is_punching) and is_user_right_punching
 
 
         # (3) ★★★ 修正: 攻撃判定 (kihon状態の時のみ) ★★★
-        if player_state == 'kihon':
+        if self.player_state == 'kihon':
             
             # ★★★ 修正: 優先1: 波動 (両手が グー -> パー) ★★★
             if (user_left_just_opened and user_right_just_opened) and \
-               player_energy >= 50:
+               self.player_energy >= 50:
                 
-                player_state = 'hado'
-                player_state_timer = 2500 # 2.5秒硬直
-                player_energy -= 50
-                add_log("HADO! (E-50)")
-                hado_width = sum(img.get_width() for img in img_hado_bullets_raw)
-                hado_height = img_hado_bullets_raw[0].get_height()
-                player_bullets.append([pygame.Rect(player_rect.right, player_rect.centery - hado_height // 2 + 30, hado_width, hado_height), 'hado', 10]) # 弾速 10 
+                self.player_state = 'hado'
+                self.player_state_timer = 2500 # 2.5秒硬直
+                self.player_energy -= 50
+                self.add_log("HADO! (E-50)")
+                hado_width = sum(img.get_width() for img in self.img_hado_bullets_raw)
+                hado_height = self.img_hado_bullets_raw[0].get_height()
+                player_bullets.spawn(pygame.Rect(player_rect.right, player_rect.centery - hado_height // 2 + 30, hado_width, hado_height), 'hado', vx=10, frames=[self.img_hado_strip]) # 弾速 10 
 
             # 優先2: 打撃 (両手グー ＆ 片手突き) (変更なし)
             elif (not is_user_left_open and not is_user_right_open) and \
                  (user_left_just_punched != user_right_just_punched) and \
-                 player_energy >= 1:
+                 self.player_energy >= 1:
 
-                enemy_hp -= 150
-                hit_effects.append([img_dageki_dm, img_dageki_dm.get_rect(center=enemy_rect.center), 150]) # 0.1秒
+                self.enemy_hp -= 150
+                hit_effects.spawn(self.img_dageki_dm.get_rect(center=enemy_rect.center), frames=[self.img_dageki_dm], timer=150) # 0.1秒
                 
                 if user_left_just_punched: # ユーザーの左手
-                    player_state = 'punch_left'
-                    add_log("LEFT PUNCH! (E-1)")
+                    self.player_state = 'punch_left'
+                    self.add_log("LEFT PUNCH! (E-1)")
                 else: # user_right_just_punched # ユーザーの右手
-                    player_state = 'punch_right'
-                    add_log("RIGHT PUNCH! (E-1)")
+                    self.player_state = 'punch_right'
+                    self.add_log("RIGHT PUNCH! (E-1)")
                     
-                player_state_timer = 100 # 0.1秒硬直
-                player_energy -= 1
+                self.player_state_timer = 100 # 0.1秒硬直
+                self.player_energy -= 1
 
             # ★★★ 修正: 優先3: 気弾 (片手が グー -> パー) ★★★
             elif (user_left_just_opened != user_right_just_opened) and \
-                 player_energy >= 10:
+                 self.player_energy >= 10:
                 
-                player_state = 'kikouha'
-                player_state_timer = 1000 # 1秒硬直
-                player_energy -= 10
-                add_log("KIKOUHA! (E-10)")
-                kidan_width = sum(img.get_width() for img in img_kidan)
-                kidan_height = img_kidan[0].get_height()
-                player_bullets.append([pygame.Rect(player_rect.right, player_rect.centery - kidan_height // 2, kidan_width, kidan_height), 'kidan', 8]) # 弾速 8
+                self.player_state = 'kikouha'
+                self.player_state_timer = 1000 # 1秒硬直
+                self.player_energy -= 10
+                self.add_log("KIKOUHA! (E-10)")
+                kidan_width = sum(img.get_width() for img in self.img_kidan)
+                kidan_height = self.img_kidan[0].get_height()
+                player_bullets.spawn(pygame.Rect(player_rect.right, player_rect.centery - kidan_height // 2, kidan_width, kidan_height), 'kidan', vx=8, frames=[self.img_kidan_strip]) # 弾速 8
 
             # 優先4: ガード (指先合わせ) (変更なし)
             elif is_fingertips_touching(user_left_hand_landmarks, user_right_hand_landmarks):
-                player_state = 'guard'
-                guard_start_time = current_time_ms
-                guard_duration_ms = 0
+                self.player_state = 'guard'
+                self.guard_start_time = current_time_ms
+                self.guard_duration_ms = 0
 
         # (5) 防御継続判定
 
-        if player_state == 'guard':
+        if self.player_state == 'guard':
             if is_fingertips_touching(user_left_hand_landmarks, user_right_hand_landmarks):
 
-                guard_duration_ms = current_time_ms - guard_start_time
+                self.guard_duration_ms = current_time_ms - self.guard_start_time
             else:
-                player_state = 'kihon' # 防御解除
-                guard_duration_ms = 0
-                last_guard_bonus_time = 0
+                self.player_state = 'kihon' # 防御解除
+                self.guard_duration_ms = 0
+                self.last_guard_bonus_time = 0
 
         # 判定用に現在の状態を保存
-        prev_user_left_is_open = is_user_left_open
-        prev_user_right_is_open = is_user_right_open
-        prev_user_left_is_punching = is_user_left_punching
-        prev_user_right_is_punching = is_user_right_punching
+        self.prev_user_left_is_open = is_user_left_open
+        self.prev_user_right_is_open = is_user_right_open
+        self.prev_user_left_is_punching = is_user_left_punching
+        self.prev_user_right_is_punching = is_user_right_punching
 
 
         # 5. ゲームロジック更新
         
         # (1) 敵の回復 5パーセント回復（30カウント１秒ごと）
-        enemy_heal_timer += delta_time_ms
-        if enemy_heal_timer >= 1000: # 1秒ごと
-            enemy_heal_timer = 0
-            if enemy_hp < ENEMY_MAX_HP and enemy_heal_count > 0:
-                heal_amount = int(enemy_hp * 0.05)
-                enemy_hp = min(ENEMY_MAX_HP, enemy_hp + heal_amount)
-                enemy_heal_count -= 1
+        self.enemy_heal_timer += dt_ms
+        if self.enemy_heal_timer >= 1000: # 1秒ごと
+            self.enemy_heal_timer = 0
+            if self.enemy_hp < ENEMY_MAX_HP and self.enemy_heal_count > 0:
+                heal_amount = int(self.enemy_hp * 0.05)
+                self.enemy_hp = min(ENEMY_MAX_HP, self.enemy_hp + heal_amount)
+                self.enemy_heal_count -= 1
 
         # (2) 敵の攻撃
-        enemy_attack_timer += delta_time_ms
-        if enemy_attack_timer >= enemy_next_attack_time:
-            enemy_attack_timer = 0
-            enemy_next_attack_time = random.randint(2500, 5000)
+        self.enemy_attack_timer += dt_ms
+        if self.enemy_attack_timer >= self.enemy_next_attack_time:
+            self.enemy_attack_timer = 0
+            self.enemy_next_attack_time = random.randint(2500, 5000)
             num_balls = random.randint(1, 5)
-            add_log(f"Enemy attacks! ({num_balls} balls)")
+            self.add_log(f"Enemy attacks! ({num_balls} balls)")
             # 1球 (1.0倍) -> 5球 (3.0倍) ( 1 + (n-1)*0.5 )
             scale_factor = 1.0 + (num_balls - 1) * 0.5
-            original_size = img_ball.get_size()
+            original_size = self.img_ball.get_size()
             scaled_size = (int(original_size[0] * scale_factor), int(original_size[1] * scale_factor))
             
-            # この攻撃（num_balls）で使う弾の画像を作成
-            current_attack_ball_img = pygame.transform.scale(img_ball, scaled_size)
+            # この攻撃（num_balls）で使う弾の画像を作成 (★ 同じ大きさは2回目からキャッシュ)
+            current_attack_ball_img = assets.get(self.img_ball, scaled_size)
             for _ in range(num_balls):
-                #ball_rect = img_ball.get_rect(center=enemy_rect.center)
+                #ball_rect = self.img_ball.get_rect(center=enemy_rect.center)
                 ball_rect = current_attack_ball_img.get_rect(center=enemy_rect.center)
                 dx = player_rect.centerx - enemy_rect.centerx
                 dy = player_rect.centery - enemy_rect.centery
@@ -528,230 +544,268 @@ while running:
                 vx = (dx / dist) * 10 #10
                 vy = (dy / dist) * 10 #10
                 #enemy_bullets.append([ball_rect, vx, vy])
-                enemy_bullets.append([ball_rect, vx, vy, current_attack_ball_img])
-
-        # (3) プレイヤーの弾の移動と当たり判定
-        for bullet in player_bullets[:]: 
-            bullet[0].x += bullet[2] # speed
-
-            # 敵との当たり判定
-            if bullet[0].colliderect(enemy_rect):
-                if bullet[1] == 'kidan':
-                    enemy_hp -= 500 
-                    hit_effects.append([img_kidan_dm, img_kidan_dm.get_rect(center=enemy_rect.center), 200])
-                elif bullet[1] == 'hado':
-                    enemy_hp -= 2000 
-                    hit_effects.append([img_hado_dm, img_hado_dm.get_rect(center=enemy_rect.center), 200])
-                player_bullets.remove(bullet)
-                continue
-            
-            # 画面外
-            if bullet[0].left > GAME_PANEL_WIDTH:
-                player_bullets.remove(bullet)
-                continue
+                enemy_bullets.spawn(ball_rect, vx=vx, vy=vy, frames=[current_attack_ball_img])
+
+        for _ in range(sim_steps): # ★ 弾の移動と当たり判定は固定ステップごとに進める
+            # (3) プレイヤーの弾の移動と当たり判定
+            player_bullets.update(fixed_step.step_ms) # ★ 移動を一括で
+            for slot in player_bullets.live_slots():
+                bullet_rect = player_bullets.rect(slot)
+                bullet_kind = player_bullets.kind[slot]
+
+                # 敵との当たり判定
+                if bullet_rect.colliderect(enemy_rect):
+                    if bullet_kind == 'kidan':
+                        self.enemy_hp -= 500 
+                        hit_effects.spawn(self.img_kidan_dm.get_rect(center=enemy_rect.center), frames=[self.img_kidan_dm], timer=200)
+                    elif bullet_kind == 'hado':
+                        self.enemy_hp -= 2000 
+                        hit_effects.spawn(self.img_hado_dm.get_rect(center=enemy_rect.center), frames=[self.img_hado_dm], timer=200)
+                    player_bullets.despawn_slot(slot)
+                    continue
             
-            # 敵の弾との相殺 (気弾のみ)
-            if bullet[1] == 'kidan':
-                collided_with_enemy_ball = False
-                for enemy_ball in enemy_bullets[:]:
-                    if bullet[0].colliderect(enemy_ball[0]):
-                        collision_point = bullet[0].center
-                        hit_effects.append([img_kidan_dm, img_kidan_dm.get_rect(center=collision_point), 200])
-                        player_bullets.remove(bullet)
-                        enemy_bullets.remove(enemy_ball)
-                        add_log("Offset!")
-                        collided_with_enemy_ball = True
-                        break 
-                
-                if collided_with_enemy_ball:
+                # 画面外
+                if bullet_rect.left > GAME_PANEL_WIDTH:
+                    player_bullets.despawn_slot(slot)
                     continue
-            # 敵の弾を貫通 (波動のみ)
-            elif bullet[1] == 'hado':
-                for enemy_ball in enemy_bullets[:]:
-                    if bullet[0].colliderect(enemy_ball[0]):
-                        collision_point = enemy_ball[0].center # 敵の弾の位置にエフェクト
-                        hit_effects.append([img_hado_dm, img_hado_dm.get_rect(center=collision_point), 200])
-                        enemy_bullets.remove(enemy_ball) # 敵の弾だけ消える
-                        add_log("Hado breaks ball!")
+            
+                # ★ 重なっている敵の弾だけを配列で一括判定
+                hit_balls = enemy_bullets.query_rect(bullet_rect)
+
+                # 敵の弾との相殺 (気弾のみ)
+                if bullet_kind == 'kidan':
+                    if hit_balls:
+                        collision_point = bullet_rect.center
+                        hit_effects.spawn(self.img_kidan_dm.get_rect(center=collision_point), frames=[self.img_kidan_dm], timer=200)
+                        player_bullets.despawn_slot(slot)
+                        enemy_bullets.despawn_slot(hit_balls[0])
+                        self.add_log("Offset!")
+                        continue
+                # 敵の弾を貫通 (波動のみ)
+                elif bullet_kind == 'hado':
+                    for ball_slot in hit_balls:
+                        collision_point = enemy_bullets.rect(ball_slot).center # 敵の弾の位置にエフェクト
+                        hit_effects.spawn(self.img_hado_dm.get_rect(center=collision_point), frames=[self.img_hado_dm], timer=200)
+                        enemy_bullets.despawn_slot(ball_slot) # 敵の弾だけ消える
+                        self.add_log("Hado breaks ball!")
                         # 波動(bullet)は削除しない
                         # breakもしない (波動は複数の敵の弾を貫通できるため)
 
 
-        # (4) 敵の弾の移動と当たり判定
-        for ball in enemy_bullets[:]:
-            ball[0].x += ball[1] # vx
-            ball[0].y += ball[2] # vy
+            # (4) 敵の弾の移動と当たり判定
+            enemy_bullets.update(fixed_step.step_ms) # ★ 移動を一括で
+            for slot in enemy_bullets.live_slots():
+                ball_rect = enemy_bullets.rect(slot)
             
-            if player_state == 'guard' and ball[0].colliderect(guard_rect):
-                enemy_bullets.remove(ball)
+                if self.player_state == 'guard' and ball_rect.colliderect(self.guard_rect):
+                    enemy_bullets.despawn_slot(slot)
                 
-                # ★★★ 修正: ガード成功ボーナス ★★★
-                add_log("Guarded! HP+5, E+5")
-                player_hp = min(PLAYER_MAX_HP, player_hp + 5)
-                player_energy = min(PLAYER_MAX_ENERGY, player_energy + 5)
+                    # ★★★ 修正: ガード成功ボーナス ★★★
+                    self.add_log("Guarded! HP+5, E+5")
+                    self.player_hp = min(PLAYER_MAX_HP, self.player_hp + 5)
+                    self.player_energy = min(PLAYER_MAX_ENERGY, self.player_energy + 5)
                 
-                continue
+                    continue
             
-            if ball[0].colliderect(player_rect):
-                player_hp -= 500
-                enemy_bullets.remove(ball)
-                add_log("Hit! (HP-500)")
-                continue
-
-            if ball[0].right < 0 or ball[0].top > GAME_HEIGHT or ball[0].bottom < 0:
-                enemy_bullets.remove(ball)
+                if ball_rect.colliderect(player_rect):
+                    self.player_hp -= 500
+                    enemy_bullets.despawn_slot(slot)
+                    self.add_log("Hit! (HP-500)")
+                    continue
+
+                if ball_rect.right < 0 or ball_rect.top > GAME_HEIGHT or ball_rect.bottom < 0:
+                    enemy_bullets.despawn_slot(slot)
         # ★★★ 追加: (4.5) プレイヤーのエナジー自動回復 (HP50%以下) ★★★
-        if player_hp <= (PLAYER_MAX_HP / 2):
-            player_energy_regen_timer += delta_time_ms
-            if player_energy_regen_timer >= ENERGY_REGEN_TIME_MS:
-                player_energy_regen_timer = 0 # タイマーリセット
-                if player_energy < PLAYER_MAX_ENERGY:
-                    player_energy = min(PLAYER_MAX_ENERGY, player_energy + 2)
-                    # add_log("Energy +2 (Low HP)") # ログが煩雑になるためコメントアウト
+        if self.player_hp <= (PLAYER_MAX_HP / 2):
+            self.player_energy_regen_timer += dt_ms
+            if self.player_energy_regen_timer >= ENERGY_REGEN_TIME_MS:
+                self.player_energy_regen_timer = 0 # タイマーリセット
+                if self.player_energy < PLAYER_MAX_ENERGY:
+                    self.player_energy = min(PLAYER_MAX_ENERGY, self.player_energy + 2)
+                    # self.add_log("Energy +2 (Low HP)") # ログが煩雑になるためコメントアウト
         else:
             # HPが50%を超えたらタイマーリセット
-            player_energy_regen_timer = 0
+            self.player_energy_regen_timer = 0
 
-        # (5) ヒットエフェクトのタイマー更新
-        for effect in hit_effects[:]:
-            effect[2] -= delta_time_ms
-            if effect[2] <= 0:
-                hit_effects.remove(effect)
+        # (5) ヒットエフェクトのタイマー更新 (★ 時間切れのエフェクトはプールが自動で消す)
+        for _ in range(sim_steps):
+            hit_effects.update(fixed_step.step_ms)
 
         # (6) HP/エナジーのクランプ
-        player_hp = max(0, player_hp)
-        player_energy = max(0, min(PLAYER_MAX_ENERGY, player_energy))
-        enemy_hp = max(0, enemy_hp)
+        self.player_hp = max(0, self.player_hp)
+        self.player_energy = max(0, min(PLAYER_MAX_ENERGY, self.player_energy))
+        self.enemy_hp = max(0, self.enemy_hp)
 
         # (7) ゲーム終了判定
-        if player_hp <= 0:
-            game_finished = True
-            game_won = False
-            add_log("You Lose...")
-        elif enemy_hp <= 0:
-            game_finished = True
-            game_won = True
-            add_log("Win!!")
+        if self.player_hp <= 0:
+            self.game_finished = True
+            self.game_won = False
+            self.gc_policy.end_round("lose") # ★ ここでまとめて回収
+            self.add_log("You Lose...")
+            self.report_score("You Lose...") # ★ メニューに表示する結果
+        elif self.enemy_hp <= 0:
+            self.game_finished = True
+            self.game_won = True
+            self.gc_policy.end_round("win") # ★ ここでまとめて回収
+            self.add_log("Win!!")
+            self.report_score("Win!!")
+
+    def render(self):
+        screen = self.screen
+        panels = self.panels
+
+        # ★ 画面全体のクリアはしない (各パネルが自分の領域を塗りつぶす)
+        game_surface = screen.subsurface(GAME_PANEL_RECT)
 
+        if self.game_finished:
+            # --- GAME FINISHED ---
+            if self.goal_background_image:
+                game_surface.blit(self.goal_background_image, (0, 0))
+            else:
+                game_surface.fill(SKY_BLUE)
 
-        # 6. Pygame ゲーム画面描画
-        
-        game_surface = screen.subsurface(GAME_PANEL_RECT)
-        game_surface.fill(SKY_BLUE) 
-
-        # プレイヤー描画
-        if player_state == 'kihon':
-            game_surface.blit(img_kihon, player_rect)
-        elif player_state == 'punch_right':
-            game_surface.blit(img_punch_right, player_rect)
-        elif player_state == 'punch_left':
-            game_surface.blit(img_punch_left, player_rect)
-        elif player_state == 'kikouha':
-            game_surface.blit(img_kikouha, player_rect)
-        elif player_state == 'hado':
-            game_surface.blit(img_hado, player_rect)
-        elif player_state == 'guard':
-            game_surface.blit(img_kihon, player_rect) 
-            game_surface.blit(img_guard, guard_rect) 
-
-        # 敵描画
-        game_surface.blit(img_enemy, enemy_rect)
-        
-        # プレイヤーの弾 描画 (連結描画)
-        for bullet in player_bullets:
-            draw_x = bullet[0].left
-            if bullet[1] == 'kidan':
-                for img in img_kidan:
-                    game_surface.blit(img, (draw_x, bullet[0].top))
-                    draw_x += img.get_width()
-            elif bullet[1] == 'hado':
-                for img in img_hado_bullets_raw:
-                    game_surface.blit(img, (draw_x, bullet[0].top))
-                    draw_x += img.get_width()
-
-        # 敵の弾 描画
-        for ball in enemy_bullets:
-            #game_surface.blit(img_ball, ball[0])
-            game_surface.blit(ball[3], ball[0])
-
-        # エフェクト 描画
-        for effect in hit_effects:
-            game_surface.blit(effect[0], effect[1]) # img, rect
-
-        # ★★★ 修正: HP/エナジーバー 描画 (テキストラベル付き) ★★★
-        
-        # プレイヤーHP
-        hp_bar_rect = pygame.Rect(player_rect.left, player_rect.top - 55, player_rect.width, 20)
-        hp_text_ui = font_log.render("HP", True, WHITE)
-        game_surface.blit(hp_text_ui, (hp_bar_rect.left - hp_text_ui.get_width() - 5, hp_bar_rect.top - 3)) # Y座標を微調整
-        draw_bar(game_surface, hp_bar_rect, player_hp, PLAYER_MAX_HP, GREEN)
-        
-        # プレイヤーエナジー
-        energy_bar_rect = pygame.Rect(player_rect.left, player_rect.top - 30, player_rect.width, 20)
-        e_text_ui = font_log.render("E", True, WHITE)
-        game_surface.blit(e_text_ui, (energy_bar_rect.left - e_text_ui.get_width() - 5, energy_bar_rect.top - 3)) # Y座標を微調整
-        draw_bar(game_surface, energy_bar_rect, player_energy, PLAYER_MAX_ENERGY, BLUE)
+            if self.game_won:
+                result_text_str = "Win!!"
+                result_color = ORANGE
+            else:
+                result_text_str = "You Lose..."
+                result_color = RED
 
-        # 敵HP
-        draw_bar(game_surface, pygame.Rect(enemy_rect.left, enemy_rect.top - 30, enemy_rect.width, 20), enemy_hp, ENEMY_MAX_HP, RED)
+            result_text = self.font_result.render(result_text_str, True, result_color)
+            game_surface.blit(result_text, (
+                game_surface.get_width() // 2 - result_text.get_width() // 2,
+                game_surface.get_height() // 3 - result_text.get_height() // 2
+            ))
 
+            if self.dancer_images:
+                current_dancer_image = self.dancer_images[self.dancer_frame]
+                img_rect = current_dancer_image.get_rect(center=(game_surface.get_width() // 2, game_surface.get_height() // 2 + 100))
+                game_surface.blit(current_dancer_image, img_rect)
 
-    # --- UIパネルの描画 (全状態共通) ---
+        else:
+            # --- GAME RUNNING ---
+            # 6. Pygame ゲーム画面描画
+            player_rect = self.player_rect
+            enemy_rect = self.enemy_rect
+            player_state = self.player_state
+            alpha = self.fixed_step.alpha
 
-    # --- スコアパネル (左上) ---
-    score_surface = screen.subsurface(SCORE_PANEL_RECT)
-    score_surface.fill(BLACK)
-    title_text = font_title.render("STATUS", True, WHITE)
-    score_surface.blit(title_text, (10, 10))
-    
-    player_hp_text = font_ui.render(f"Player HP: {player_hp}", True, GREEN)
-    score_surface.blit(player_hp_text, (15, 60))
+            game_surface.fill(SKY_BLUE)
 
-    player_en_text = font_ui.render(f"Energy: {player_energy}", True, ORANGE)
-    score_surface.blit(player_en_text, (15, 100))
+            # プレイヤー描画
+            if player_state == 'kihon':
+                game_surface.blit(self.img_kihon, player_rect)
+            elif player_state == 'punch_right':
+                game_surface.blit(self.img_punch_right, player_rect)
+            elif player_state == 'punch_left':
+                game_surface.blit(self.img_punch_left, player_rect)
+            elif player_state == 'kikouha':
+                game_surface.blit(self.img_kikouha, player_rect)
+            elif player_state == 'hado':
+                game_surface.blit(self.img_hado, player_rect)
+            elif player_state == 'guard':
+                game_surface.blit(self.img_kihon, player_rect)
+                game_surface.blit(self.img_guard, self.guard_rect)
+
+            # 敵描画
+            game_surface.blit(self.img_enemy, enemy_rect)
+
+            # プレイヤーの弾 描画 (連結描画 ★ 連結済みの画像を blits でまとめて描画)
+            self.player_bullets.draw(game_surface, alpha)
+
+            # 敵の弾 描画
+            self.enemy_bullets.draw(game_surface, alpha)
+
+            # エフェクト 描画
+            self.hit_effects.draw(game_surface, alpha)
+
+            # ★★★ 修正: HP/エナジーバー 描画 (テキストラベル付き) ★★★
+
+            # プレイヤーHP
+            hp_bar_rect = pygame.Rect(player_rect.left, player_rect.top - 55, player_rect.width, 20)
+            hp_text_ui = self.font_log.render("HP", True, WHITE)
+            game_surface.blit(hp_text_ui, (hp_bar_rect.left - hp_text_ui.get_width() - 5, hp_bar_rect.top - 3)) # Y座標を微調整
+            draw_bar(game_surface, hp_bar_rect, self.player_hp, PLAYER_MAX_HP, GREEN)
+
+            # プレイヤーエナジー
+            energy_bar_rect = pygame.Rect(player_rect.left, player_rect.top - 30, player_rect.width, 20)
+            e_text_ui = self.font_log.render("E", True, WHITE)
+            game_surface.blit(e_text_ui, (energy_bar_rect.left - e_text_ui.get_width() - 5, energy_bar_rect.top - 3)) # Y座標を微調整
+            draw_bar(game_surface, energy_bar_rect, self.player_energy, PLAYER_MAX_ENERGY, BLUE)
+
+            # 敵HP
+            draw_bar(game_surface, pygame.Rect(enemy_rect.left, enemy_rect.top - 30, enemy_rect.width, 20), self.enemy_hp, ENEMY_MAX_HP, RED)
+
+
+        # --- UIパネルの描画 (全状態共通) ---
+
+        # --- スコアパネル (左上) ---
+        # ★ 表示内容が変わった時だけ描き直す
+        if panels.needs_redraw(SCORE_PANEL_RECT, (self.player_hp, self.player_energy, self.enemy_hp, self.enemy_heal_count)):
+            score_surface = screen.subsurface(SCORE_PANEL_RECT)
+            score_surface.fill(BLACK)
+            title_text = self.font_title.render("STATUS", True, WHITE)
+            score_surface.blit(title_text, (10, 10))
+
+            player_hp_text = self.font_ui.render(f"Player HP: {self.player_hp}", True, GREEN)
+            score_surface.blit(player_hp_text, (15, 60))
+
+            player_en_text = self.font_ui.render(f"Energy: {self.player_energy}", True, ORANGE)
+            score_surface.blit(player_en_text, (15, 100))
+
+            enemy_hp_text = self.font_ui.render(f"Enemy HP: {self.enemy_hp}", True, RED)
+            score_surface.blit(enemy_hp_text, (15, 140))
+
+            enemy_heal_text = self.font_ui.render(f"Heal: {self.enemy_heal_count}", True, WHITE)
+            score_surface.blit(enemy_heal_text, (15, 180))
+
+            r_text1 = self.font_log.render("Please reload,", True, GREEN)
+            r_text2 = self.font_log.render("if you want to retry.", True, GREEN)
+            score_surface.blit(r_text1, (15, 230))
+            score_surface.blit(r_text2, (15, 260))
+
+
+        # --- ログパネル (左中) ---
+        if panels.needs_redraw(LOG_PANEL_RECT, tuple(self.log_messages)):
+            log_surface = screen.subsurface(LOG_PANEL_RECT)
+            log_surface.fill(BLACK)
+            log_title = self.font_title.render("LOG", True, WHITE)
+            log_surface.blit(log_title, (10, 10))
+            y_pos = 50
+            for message in self.log_messages:
+                log_text = self.font_log.render(message, True, GREEN)
+                log_surface.blit(log_text, (15, y_pos))
+                y_pos += 25
+
+        # --- カメラパネル (左下) ---
+        cam_opened = self.cap.isOpened()
+        show_camera = not self.game_finished and cam_opened and self.camera_surface_scaled is not None
+        show_cam_error = not self.game_finished and not cam_opened
+        if panels.needs_redraw(CAM_PANEL_RECT, (self.camera_frame_id if show_camera else None, show_cam_error)):
+            cam_title = self.font_title.render("CAMERA", True, WHITE)
+            cam_surface = screen.subsurface(CAM_PANEL_RECT)
+            pygame.draw.rect(cam_surface, BLACK, (0, 0, CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
+            cam_surface.blit(cam_title, (10, 10))
+
+            if show_camera:
+                cam_surface.blit(self.camera_surface_scaled, (0, 30))
+            elif show_cam_error:
+                cam_error_text = self.font_log.render("Camera not found.", True, RED)
+                cam_surface.blit(cam_error_text, (10, 50))
+
+        # 画面更新 (全状態共通)
+        panels.mark(GAME_PANEL_RECT) # ゲームパネルは毎フレーム描き直している
+        panels.present() # ★ flip() の代わりに変化した矩形だけ転送
+
+    def exit(self):
+        # --- 終了処理 ---
+        self.gc_policy.close()
+        print(self.gc_policy.report())
+        if self.cap.isOpened():
+            self.cap.release()
+
+
+SCENE = SpecialMoveScene # ★ ランチャーが探すシーンのクラス
 
-    enemy_hp_text = font_ui.render(f"Enemy HP: {enemy_hp}", True, RED)
-    score_surface.blit(enemy_hp_text, (15, 140))
-    
-    enemy_heal_text = font_ui.render(f"Heal: {enemy_heal_count}", True, WHITE)
-    score_surface.blit(enemy_heal_text, (15, 180))
-    
-    r_text1 = font_log.render("Please reload,", True, GREEN)
-    r_text2 = font_log.render("if you want to retry.", True, GREEN)
-    score_surface.blit(r_text1, (15, 230))
-    score_surface.blit(r_text2, (15, 260))
-
-
-    # --- ログパネル (左中) ---
-    log_surface = screen.subsurface(LOG_PANEL_RECT)
-    log_surface.fill(BLACK)
-    log_title = font_title.render("LOG", True, WHITE)
-    log_surface.blit(log_title, (10, 10))
-    y_pos = 50
-    for message in log_messages:
-        log_text = font_log.render(message, True, GREEN)
-        log_surface.blit(log_text, (15, y_pos))
-        y_pos += 25
-
-    # --- カメラパネル (左下) ---
-    cam_title = font_title.render("CAMERA", True, WHITE)
-    cam_surface = screen.subsurface(CAM_PANEL_RECT)
-    pygame.draw.rect(cam_surface, BLACK, (0, 0, CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
-    cam_surface.blit(cam_title, (10, 10)) 
-
-    if not game_finished:
-        if cap.isOpened() and camera_surface_scaled:
-            cam_surface.blit(camera_surface_scaled, (0, 30))
-        elif not cap.isOpened():
-            cam_error_text = font_log.render("Camera not found.", True, RED)
-            cam_surface.blit(cam_error_text, (10, 50))
-
-    # 画面更新 (全状態共通)
-    pygame.display.flip()
-    clock.tick(30)
-
-# --- 終了処理 ---
-if cap.isOpened():
-    cap.release()
-cv2.destroyAllWindows()
-pygame.quit()
+if __name__ == "__main__":
+    run_scene(SpecialMoveScene())
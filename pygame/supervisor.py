@@ -0,0 +1,194 @@
+# --- ★ 無人運転用の supervisor (止まったゲームを待機中のプロセスに切り替える) ---
+# MediaPipe の呼び出しやカメラのドライバーが固まると、ゲーム (ランチャー) ごと止まってしまい、
+# 起動し直すと MediaPipe の読み込みからやり直しになる。supervisor はランチャーを子プロセスで動かし、
+#   ・もう1つの子プロセスを、import と MediaPipe の読み込み (launcher.warm_up()) まで済ませて待たせておく
+#   ・動いている方の心拍 (runtime.heartbeat()、毎フレーム) を共有メモリで見張る
+#   ・心拍が STALL_MS 途切れたら (またはプロセスが落ちたら) そのプロセスを kill し、待機中の方に切り替える
+#     (遊んでいたゲームはすぐに始め直す。待機中の方は、遊んでいるゲームの load() も先に済ませておく)
+#   ・ラウンドの結果 (runtime.report_score()) はパイプで受け取っておき、切り替えた先に渡す
+# 切り替えた後は、すぐに次の待機プロセスを起動する。
+#
+# 使い方 (リポジトリのルートで):
+#   python pygame/supervisor.py                        # ランチャーと同じ (ESC でメニューから抜けると終了)
+#   python pygame/supervisor.py --stall-ms 500 --render-scale 0.5  # 後ろの引数はランチャー・各ゲームにも渡す
+#
+# 子プロセスは spawn で起動する (MediaPipe のスレッドを fork で引き継がないように)。
+# このモジュールは子プロセスでも import されるので、先頭では標準ライブラリだけを import する。
+
+import multiprocessing
+import sys
+import time
+from multiprocessing.connection import wait
+
+STALL_MS = 1000 # 心拍がこれだけ途切れたら止まったとみなす
+POLL_MS = 5 # 心拍を確かめる間隔
+KILL_TIMEOUT_S = 1.0 # kill したプロセスが終わるのを待つ時間
+
+
+def stall_ms_from_argv(argv=None, default=STALL_MS):
+    """--stall-ms 1000 で指定された、止まったとみなすまでの時間 (ms)"""
+    argv = sys.argv if argv is None else argv
+    if "--stall-ms" in argv:
+        index = argv.index("--stall-ms") + 1
+        if index < len(argv) and argv[index].isdigit():
+            return int(argv[index])
+    return default
+
+
+class Heartbeat:
+    """共有メモリに「次の心拍がこの時刻 (time.monotonic() の秒) までに来るはず」を書く"""
+
+    def __init__(self, deadline, stall_ms):
+        self.deadline = deadline # multiprocessing.Value("d")
+        self.stall_ms = stall_ms
+
+    def beat(self, grace_ms=None):
+        """(子プロセス) 次の心拍までの猶予を書き直す"""
+        self.deadline.value = time.monotonic() + (self.stall_ms if grace_ms is None else grace_ms) / 1000
+
+
+def worker_main(conn, deadline, stall_ms, args):
+    """(子プロセス) 準備を済ませて待ち、"activate" が来たらランチャーとして動く"""
+    import launcher # 子プロセスで初めて pygame と MediaPipe を読む
+    from gameruntime import runtime, STARTUP_GRACE_MS
+
+    launcher.warm_up()
+    conn.send(("warm",))
+    prepared = None
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return # supervisor がいなくなった
+        if message[0] == "prepare": # 動いている方が遊び始めたゲームの load() を先に済ませておく
+            prepared = launcher.prepare_scene(message[1], args, prepared)
+        elif message[0] == "activate":
+            break
+        elif message[0] == "quit":
+            return
+
+    scores, start_key = message[1], message[2]
+    heartbeat = Heartbeat(deadline, stall_ms)
+    heartbeat.beat(STARTUP_GRACE_MS) # ウィンドウとカメラを開く間
+    runtime.watchdog = heartbeat
+    runtime.listener = conn.send
+    runtime.scores.update(scores)
+    launcher.main(args, start_key=start_key, prepared=prepared)
+    conn.send(("exit",))
+
+
+class Worker:
+    """supervisor から見た子プロセス1つ (プロセス・パイプ・心拍)"""
+
+    def __init__(self, context, stall_ms, args):
+        self.deadline = context.Value("d", float("inf"), lock=False) # 切り替えるまでは見張らない
+        self.conn, child_conn = context.Pipe()
+        # daemon にはしない (daemon のプロセスは子プロセスを作れない。ゲームが Pose / Hands を別プロセスで
+        # 動かす時のため)。supervisor が終わる時は main() が kill する
+        self.process = context.Process(target=worker_main, args=(child_conn, self.deadline, stall_ms, args))
+        self.process.start()
+        child_conn.close()
+        self.warm = False
+        self.started = time.perf_counter()
+
+    def activate(self, scores, start_key):
+        """ランチャーとして動かす (心拍は子プロセスが合図を受け取った所から書き始める)"""
+        self.conn.send(("activate", scores, start_key))
+
+    def stalled(self):
+        return time.monotonic() > self.deadline.value
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(KILL_TIMEOUT_S)
+        self.conn.close()
+
+
+def main():
+    args = sys.argv[1:]
+    stall_ms = stall_ms_from_argv(args)
+    context = multiprocessing.get_context("spawn")
+    scores = {} # {ゲーム: 最後のラウンドの結果} 切り替えた先に渡す
+    playing = None # 動いている方が遊んでいるゲーム (メニューなら None)
+    active = None
+    spare = Worker(context, stall_ms, args)
+    failed_at = None # 切り替えを始めた時刻 (切り替えにかかった時間の表示用)
+    print(f"[supervisor] watching for stalls over {stall_ms}ms")
+
+    try:
+        while True:
+            if active is None and spare.warm:
+                # 待機中のプロセスに切り替え、次の待機プロセスを起動する
+                active, spare = spare, None
+                active.activate(scores, playing)
+                if failed_at is not None:
+                    print(f"[supervisor] switched to the warm process in {(time.perf_counter() - failed_at) * 1000:.1f}ms"
+                          f" ({playing or 'menu'})")
+                spare = Worker(context, stall_ms, args)
+
+            waiting = [spare.conn, spare.process.sentinel]
+            if active is not None:
+                waiting += [active.conn, active.process.sentinel]
+            ready = wait(waiting, timeout=POLL_MS / 1000)
+
+            if spare.conn in ready:
+                try:
+                    message = spare.conn.recv()
+                except EOFError:
+                    message = None
+                if message and message[0] == "warm":
+                    spare.warm = True
+                    print(f"[supervisor] warm process ready in {time.perf_counter() - spare.started:.1f}s")
+                    if playing is not None:
+                        spare.conn.send(("prepare", playing))
+            if spare.process.sentinel in ready and not spare.process.is_alive():
+                print(f"[supervisor] warm process exited (code {spare.process.exitcode}), starting another")
+                spare.conn.close()
+                spare = Worker(context, stall_ms, args)
+
+            if active is None:
+                continue
+            finished = False
+            while active.conn.poll():
+                try:
+                    message = active.conn.recv()
+                except EOFError:
+                    break
+                if message[0] == "score":
+                    scores[message[1]] = message[2]
+                elif message[0] == "playing":
+                    playing = message[1]
+                    if spare.warm:
+                        spare.conn.send(("prepare", playing))
+                elif message[0] == "menu":
+                    playing = None
+                elif message[0] == "exit":
+                    finished = True
+            if finished:
+                break
+
+            if not active.process.is_alive():
+                reason = f"exited with code {active.process.exitcode}"
+            elif active.stalled():
+                reason = f"no heartbeat for {stall_ms}ms"
+            else:
+                continue
+            failed_at = time.perf_counter()
+            print(f"[supervisor] game process {reason} ({playing or 'menu'}), switching")
+            active.kill() # カメラを手放させてから切り替える
+            active = None
+
+        # ランチャーが (ESC で) 終わった
+        active.process.join(KILL_TIMEOUT_S)
+        if spare.warm:
+            spare.conn.send(("quit",))
+        spare.process.join(KILL_TIMEOUT_S)
+    finally:
+        # Ctrl+C や supervisor の例外でも、子プロセス (ゲーム・待機中) を残さない
+        for worker in (active, spare):
+            if worker is not None and worker.process.is_alive():
+                worker.kill()
+
+
+if __name__ == "__main__":
+    main()
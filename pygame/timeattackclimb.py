@@ -1,24 +1,21 @@
 import cv2
 import mediapipe as mp
 import pygame
-import math
-import random
-import numpy as np # カメラ映像変換に必要
+from dirtypanel import DirtyPanels # ★ 左カラムの部分更新
+from assetcache import assets # ★ 読み込み・変形済みの画像をプロセス全体で共有
+from assetmanager import asset_manager # ★ 画像の並列プリロードとデコード済みキャッシュ
+from gameruntime import runtime # ★ カメラと MediaPipe (ランチャーから起動した時は全ゲームで共有)
+from qosgovernor import qos # ★ 重い時にプレビューと骨格の描画を間引く (--qos)
+from gcpolicy import GCPolicy, gc_mode_from_argv # ★ ラウンド中は GC を止め、切り替わりでまとめて回収
+from fixedstep import FixedStep, CAMERA_PACED_HZ # ★ 落下は画面のフレームレートと関係なく固定ステップで進める
+from climbcourse import build_wall, generate_holds # ★ 壁とホールドの生成 (画面が無くても作れる)
+from scene import Scene, run_scene # ★ load / enter / update / render / exit のフックで動かす (import しただけでは何もしない)
 
 # --- 初期設定 ---
 
-# MediaPipeの手検出モデルと描画ツールを準備
+# MediaPipeの手検出モデルと描画ツール (★ モデル自体は enter() で runtime から受け取る)
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
-hands = mp_hands.Hands(
-    max_num_hands=2,
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
-
-# Pygameの初期化
-pygame.init()
-pygame.font.init() # フォントモジュールを明示的に初期化
 
 # --- ★ 画面レイアウト定義 ---
 SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
@@ -44,16 +41,12 @@ GOAL_HOLD_METERS = 50.0
 TOTAL_CLIMB_PIXELS = int(TOTAL_CLIMB_METERS * PIXELS_PER_METER)
 MAX_PULL_PIXELS = int(MAX_PULL_METERS * PIXELS_PER_METER)
 
+# ★ 重力と落下速度は「1ステップ (1/CAMERA_PACED_HZ 秒) あたり」の値
+#   (カメラを待つループで1秒に約30フレーム進んでいた時の1フレーム分。その時と同じ実際の速さになる)
 GRAVITY_ACCEL = 0.8
-current_fall_velocity = 0.0
 MAX_FALL_SPEED = 30
 
-# Pygameウィンドウの設定
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-# ★ ゴール高さ(50m)が自動で反映される
-pygame.display.set_caption(f"Bouldering Game ({int(GOAL_HOLD_METERS)}m Climb)")
-
-# 色とフォントの定義
+# 色の定義
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
@@ -63,140 +56,12 @@ SKY_BLUE = (135, 206, 235)
 BLUE = (0, 0, 255)
 ORANGE = (255, 165, 0)
 
-font_ui = pygame.font.Font(None, 36)
-font_log = pygame.font.Font(None, 24)
-font_title = pygame.font.Font(None, 40)
-goal_text_font = pygame.font.Font(None, 80)
-
-# ★ ゴール背景の読み込み
-goal_background_image = None
-try:
-    img = pygame.image.load("image/goaliceclimb.png").convert()
-    goal_background_image = pygame.transform.scale(img, (GAME_PANEL_WIDTH, GAME_HEIGHT))
-except FileNotFoundError:
-    print("エラー: image/goaliceclimb.png が見つかりません。")
-
-# ★ ダンサーアニメーション画像の読み込み
-dancer_images = []
-dancer_frame = 0
-dancer_frame_time = 0
 ANIMATION_SPEED_MS = 100
-try:
-    for i in range(1, 6):
-        img_path = f"image/c-dancer-{i}.png"
-        img = pygame.image.load(img_path).convert_alpha()
-        img = pygame.transform.scale(img, (300, 300))
-        dancer_images.append(img)
-except FileNotFoundError as e:
-    print(f"エラー: ダンサー画像が見つかりません。 {e}")
-
-# ★ ゴールホールド画像の読み込み
-goal_hold_image = None
-goal_hold_rect_world = None # ワールド座標でのRect
-try:
-    goal_hold_image = pygame.image.load("image/goalhold.png").convert_alpha()
-    img_rect = goal_hold_image.get_rect()
-    # ワールド座標を計算 (Y座標は (全長 - ゴール高さ) ピクセルがホールドの上端になるように)
-    goal_y = TOTAL_CLIMB_PIXELS - (GOAL_HOLD_METERS * PIXELS_PER_METER) - img_rect.height
-    goal_x = (GAME_PANEL_WIDTH - img_rect.width) // 2 # 中央配置
-    goal_hold_rect_world = pygame.Rect(goal_x, goal_y, img_rect.width, img_rect.height)
-except FileNotFoundError:
-    print("エラー: image/goalhold.png が見つかりません。")
-
-# プレイヤー（カーソル）の設定 (左右別々に)
-left_cursor_pos = [-100, -100]
-right_cursor_pos = [-100, -100]
-cursor_radius = 45
 
+# プレイヤー（カーソル）の設定
+cursor_radius = 45
 
-# Webカメラの準備
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("エラー: カメラを起動できません。")
-    running = False
-
-# --- 50mの壁を生成 (TOTAL_CLIMB_PIXELS が 55m相当になっている) ---
-full_background = None
-try:
-    tile_image = pygame.image.load("image/backsnow.png").convert()
-    tile_height = tile_image.get_height()
-    full_background = pygame.Surface((GAME_PANEL_WIDTH, TOTAL_CLIMB_PIXELS))
-    for y in range(0, TOTAL_CLIMB_PIXELS, tile_height):
-        full_background.blit(tile_image, (0, y))
-except FileNotFoundError:
-    print("エラー: image/backsnow.png が見つかりません。")
-
-# 背景スクロール用の変数
-if full_background:
-    max_scroll = full_background.get_height() - GAME_HEIGHT
-    world_y_offset = max_scroll
-else:
-    max_scroll = 0
-    world_y_offset = 0
-
-# --- ホールド（掴む岩）の生成 ---
-holds_list = []
-hold_image = None
-try:
-    hold_image = pygame.image.load("image/blockcatch.png").convert_alpha()
-    hold_rect_img = hold_image.get_rect() # 画像自体のRectを取得
-    hold_width, hold_height = hold_rect_img.width, hold_rect_img.height
-
-    current_y = TOTAL_CLIMB_PIXELS - (GAME_HEIGHT // 2)
-    side = 0
-
-    min_hold_y = 0
-    if goal_hold_rect_world:
-        min_hold_y = goal_hold_rect_world.bottom + 50 # ゴールホールドの下端+50pxより下
-
-    while current_y > min_hold_y:
-        y_variation = random.randint(-PIXELS_PER_METER // 4, PIXELS_PER_METER // 4)
-        h_y = current_y + y_variation
-        if h_y < min_hold_y:
-            h_y = min_hold_y + random.randint(10, 50)
-        if h_y > TOTAL_CLIMB_PIXELS - hold_height:
-             h_y = TOTAL_CLIMB_PIXELS - hold_height - random.randint(10, 50)
-
-        x_variation = random.randint(-80, 80)
-        if side == 0:
-            h_x = (GAME_PANEL_WIDTH / 4) - (hold_width / 2) + x_variation
-        else:
-            h_x = (GAME_PANEL_WIDTH * 3 / 4) - (hold_width / 2) + x_variation
-
-        holds_list.append(pygame.Rect(h_x, h_y, hold_width, hold_height))
-        
-        # ★変更: ホールドの間隔を 1m (PIXELS_PER_METER) から 0.7m に狭める
-        current_y -= int(PIXELS_PER_METER * 0.7)
-        
-        side = 1 - side
-except FileNotFoundError:
-    print("エラー: image/blockcatch.png が見つかりません。")
-
-# --- 掴み状態の管理変数 (左右別々に) ---
-left_was_holding = False
-right_was_holding = False
-left_hold_start_y = 0
-right_hold_start_y = 0
-world_hold_start_y = 0
-
-# --- ★ゲーム状態の管理 ---
-game_won = False
-
-# --- ★ ゴールホールドタッチ変数 ---
-touching_goal_hold_left = False
-touching_goal_hold_right = False
-both_hands_touching_goal_start_time = 0 # 両手で触り始めた時間(ms)
 GOAL_TOUCH_DURATION_MS = 1000 # 1秒
-
-
-# --- ★タイマー変数 ---
-start_time = 0
-elapsed_time = 0
-final_time = 0
-game_start_flag = False
-
-# --- ★テキストログ変数 ---
-log_messages = []
 MAX_LOG_LINES = 6
 
 # --- ★ 関数定義 ---
@@ -207,11 +72,6 @@ def is_hand_open(hand_landmarks):
     open_fingers = sum(1 for tip_id, pip_id in zip(tip_ids, pip_ids) if hand_landmarks.landmark[tip_id].y < hand_landmarks.landmark[pip_id].y)
     return open_fingers >= 3
 
-def add_log(message):
-    log_messages.append(message)
-    if len(log_messages) > MAX_LOG_LINES:
-        log_messages.pop(0)
-
 def format_time(ms):
     total_seconds = ms // 1000
     minutes = total_seconds // 60
@@ -219,32 +79,162 @@ def format_time(ms):
     milliseconds = (ms % 1000) // 10
     return f"{minutes:02}:{seconds:02}.{milliseconds:02}"
 
-# --- メインループ ---
-running = True
-clock = pygame.time.Clock()
-add_log("Game Ready.")
-# ★ カメラ映像を保持する変数
-camera_surface_scaled = None
-
-while running:
 
-    delta_time_ms = clock.get_time()
-
-    if 'max_scroll' in locals():
-        height_climbed = (max_scroll - world_y_offset) / PIXELS_PER_METER
-    else:
-        height_climbed = 0
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+# --- ★ シーン (ゲームの状態はすべてここに持つ) ---
+class TimeAttackClimbScene(Scene):
+    """50m タイムアタック。load() で 50m の壁とホールドを作っておく"""
+
+    name = "timeattackclimb"
+
+    def load(self):
+        super().load() # 画像の先読み
+        # ★ ゴールホールドの位置 (ワールド座標)
+        self.goal_hold_rect_world = None
+        try:
+            goal_width, goal_height = asset_manager.image_size("image/goalhold.png")
+            # ワールド座標を計算 (Y座標は (全長 - ゴール高さ) ピクセルがホールドの上端になるように)
+            goal_y = TOTAL_CLIMB_PIXELS - (GOAL_HOLD_METERS * PIXELS_PER_METER) - goal_height
+            goal_x = (GAME_PANEL_WIDTH - goal_width) // 2 # 中央配置
+            self.goal_hold_rect_world = pygame.Rect(goal_x, goal_y, goal_width, goal_height)
+        except FileNotFoundError:
+            print("エラー: image/goalhold.png が見つかりません。")
+
+        # --- 50mの壁を生成 (TOTAL_CLIMB_PIXELS が 55m相当になっている) ---
+        self.full_background = None
+        try:
+            tile = asset_manager.load_unconverted("image/backsnow.png")
+            self.full_background = build_wall(tile, GAME_PANEL_WIDTH, TOTAL_CLIMB_PIXELS)
+        except FileNotFoundError:
+            print("エラー: image/backsnow.png が見つかりません。")
+
+        # 背景スクロールの範囲
+        self.max_scroll = self.full_background.get_height() - GAME_HEIGHT if self.full_background else 0
+
+        # --- ホールド（掴む岩）の生成 ---
+        self.holds_list = []
+        try:
+            min_hold_y = 0
+            if self.goal_hold_rect_world:
+                min_hold_y = self.goal_hold_rect_world.bottom + 50 # ゴールホールドの下端+50pxより下
+            # ★変更: ホールドの間隔を 1m (PIXELS_PER_METER) から 0.7m に狭める
+            self.holds_list = generate_holds(asset_manager.image_size("image/blockcatch.png"), TOTAL_CLIMB_PIXELS, GAME_PANEL_WIDTH, GAME_HEIGHT,
+                                             PIXELS_PER_METER, min_hold_y, spacing=int(PIXELS_PER_METER * 0.7))
+        except FileNotFoundError:
+            print("エラー: image/blockcatch.png が見つかりません。")
+
+    def enter(self):
+        # Pygameウィンドウの設定
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # ★ ゴール高さ(50m)が自動で反映される
+        pygame.display.set_caption(f"Bouldering Game ({int(GOAL_HOLD_METERS)}m Climb)")
+
+        self.font_ui = pygame.font.Font(None, 36)
+        self.font_log = pygame.font.Font(None, 24)
+        self.font_title = pygame.font.Font(None, 40)
+        self.goal_text_font = pygame.font.Font(None, 80)
+
+        # ★ ゴール背景の読み込み
+        self.goal_background_image = None
+        try:
+            self.goal_background_image = assets.get("image/goaliceclimb.png", (GAME_PANEL_WIDTH, GAME_HEIGHT), alpha=False)
+        except FileNotFoundError:
+            print("エラー: image/goaliceclimb.png が見つかりません。")
+
+        # ★ ダンサーアニメーション画像の読み込み
+        self.dancer_images = []
+        self.dancer_frame = 0
+        self.dancer_frame_time = 0
+        try:
+            for i in range(1, 6):
+                img_path = f"image/c-dancer-{i}.png"
+                img = assets.get(img_path, (300, 300))
+                self.dancer_images.append(img)
+        except FileNotFoundError as e:
+            print(f"エラー: ダンサー画像が見つかりません。 {e}")
+
+        # ★ ゴールホールドとホールドの画像 (位置は load() で決めてある)
+        self.goal_hold_image = None
+        if self.goal_hold_rect_world:
+            self.goal_hold_image = assets.get("image/goalhold.png")
+        self.hold_image = None
+        if self.holds_list:
+            self.hold_image = assets.get("image/blockcatch.png")
+
+        # プレイヤー（カーソル）の設定 (左右別々に)
+        self.left_cursor_pos = [-100, -100]
+        self.right_cursor_pos = [-100, -100]
+
+        # MediaPipe と Webカメラの準備 (★ ランチャーからなら開いたままのものを使い回す)
+        self.hands = runtime.hands(
+            profile=self.name, # ★ handtuner.py で決めた設定があれば、下の値を上書きする
+            max_num_hands=2,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7
+        )
+        self.cap = runtime.open_camera(0)
+        if not self.cap.isOpened():
+            print("エラー: カメラを起動できません。") # ★ 最初の update() で "Camera feed lost." を出して終了する
+
+        # 背景スクロール用の変数
+        self.world_y_offset = self.max_scroll
+        self.current_fall_velocity = 0.0
+
+        # --- 掴み状態の管理変数 (左右別々に) ---
+        self.left_was_holding = False
+        self.right_was_holding = False
+        self.left_hold_start_y = 0
+        self.right_hold_start_y = 0
+        self.world_hold_start_y = 0
+
+        # --- ★ゲーム状態の管理 ---
+        self.game_won = False
+
+        # --- ★ ゴールホールドタッチ変数 ---
+        self.both_hands_touching_goal_start_time = 0 # 両手で触り始めた時間(ms)
+
+        # --- ★タイマー変数 ---
+        self.start_time = 0
+        self.elapsed_time = 0
+        self.final_time = 0
+        self.game_start_flag = False
+
+        # --- ★テキストログ変数 ---
+        self.log_messages = []
+        self.add_log("Game Ready.")
+
+        # 描画に使う、更新で求めた値
+        self.height_climbed = 0
+        self.visible_holds_for_drawing = []
+        self.goal_hold_rect_screen = None
+        self.left_can_grab = False
+        self.right_can_grab = False
+        self.frame_skipped = False # ★ カメラの読み込みに失敗したフレームは何も描かない
+        self.dt_ms = 0
+
+        # ★ カメラ映像を保持する変数
+        self.camera_surface_scaled = None
+        self.camera_frame_id = 0 # ★ カメラ映像が更新されるたびに増える (カメラパネルの再描画判定用)
+        self.panels = DirtyPanels() # ★ 左カラムは内容が変わった時だけ再描画
+
+        print(asset_manager.finish_startup(self.name)) # ★ 起動時間 (コールド/ウォーム) を表示
+        self.gc_policy = GCPolicy(mode=gc_mode_from_argv(self.argv))
+        self.gc_policy.freeze() # ★ 読み込んだ画像やフォントは GC の対象から外す
+        self.fixed_step = FixedStep(hz=CAMERA_PACED_HZ) # ★ 落下を進める固定ステップ
+
+    def add_log(self, message):
+        self.log_messages.append(message)
+        if len(self.log_messages) > MAX_LOG_LINES:
+            self.log_messages.pop(0)
+
+    def handle_event(self, event):
+        self.panels.handle_event(event)
 
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_RETURN:
-                running = False
+                self.running = False
 
             # ★変更: 90m -> 40m ワープ
-            if event.key == pygame.K_r and not game_won:
+            if event.key == pygame.K_r and not self.game_won:
                 warp_height_meters = 40.0
                 current_max_scroll = (int(TOTAL_CLIMB_METERS * PIXELS_PER_METER)) - GAME_HEIGHT
 
@@ -253,81 +243,68 @@ while running:
                 if warp_y_offset < 0: warp_y_offset = 0
                 if warp_y_offset > current_max_scroll: warp_y_offset = current_max_scroll
 
-                world_y_offset = warp_y_offset
-                left_was_holding = False
-                right_was_holding = False
-                current_fall_velocity = 0
-                add_log("ROCKET! Warping to 40m.")
-
+                self.world_y_offset = warp_y_offset
+                self.left_was_holding = False
+                self.right_was_holding = False
+                self.current_fall_velocity = 0
+                self.add_log("ROCKET! Warping to 40m.")
+
+    def update(self, dt_ms):
+        self.dt_ms = dt_ms
+        if self.game_won and self.dancer_images: # ★ ダンサーのアニメーションは描画ではなく更新で進める (--qos で描画を飛ばしても同じ速さ)
+            self.dancer_frame_time += dt_ms
+            if self.dancer_frame_time > ANIMATION_SPEED_MS:
+                self.dancer_frame = (self.dancer_frame + 1) % len(self.dancer_images)
+                self.dancer_frame_time = 0
+        sim_steps = self.fixed_step.advance(dt_ms) # ★ 前のフレームの時間の分だけ物理を進める
+        self.frame_skipped = False
+        self.height_climbed = (self.max_scroll - self.world_y_offset) / PIXELS_PER_METER
+
+        if self.game_won:
+            # --- ★★★ GAME CLEAR ★★★ ---
+            if self.final_time == 0:
+                self.final_time = self.elapsed_time
+                self.add_log(f"GOAL! Time: {format_time(self.final_time)}")
+                self.report_score(f"GOAL! Time: {format_time(self.final_time)}") # ★ メニューに表示する結果
+                self.gc_policy.end_round("goal") # ★ ここでまとめて回収
+
+            if self.cap.isOpened():
+                self.cap.release()
+            return
 
-    screen.fill(GRAY)
-
-    if game_won:
-        # --- ★★★ GAME CLEAR ★★★ ---
-
-        if final_time == 0:
-            final_time = elapsed_time
-            add_log(f"GOAL! Time: {format_time(final_time)}")
-
-        game_surface = screen.subsurface(GAME_PANEL_RECT)
-
-        if goal_background_image:
-            game_surface.blit(goal_background_image, (0, 0))
-        else:
-            game_surface.fill(SKY_BLUE)
-
-        # ★ ゴール高さ(50m)が自動で表示される
-        goal_text = goal_text_font.render(f"{int(GOAL_HOLD_METERS)}m Climb Success!!", True, ORANGE)
-        game_surface.blit(goal_text, (
-            game_surface.get_width() // 2 - goal_text.get_width() // 2,
-            game_surface.get_height() // 4 - goal_text.get_height() // 2
-        ))
-
-        time_text = font_ui.render(f"Clear Time: {format_time(final_time)}", True, ORANGE)
-        game_surface.blit(time_text, (
-            game_surface.get_width() // 2 - time_text.get_width() // 2,
-            game_surface.get_height() // 4 + goal_text.get_height()
-        ))
-
-        if dancer_images:
-            dancer_frame_time += delta_time_ms
-            if dancer_frame_time > ANIMATION_SPEED_MS:
-                dancer_frame = (dancer_frame + 1) % len(dancer_images)
-                dancer_frame_time = 0
-
-            current_dancer_image = dancer_images[dancer_frame]
-            img_rect = current_dancer_image.get_rect(center=(game_surface.get_width() // 2, game_surface.get_height() // 2 + 100))
-            game_surface.blit(current_dancer_image, img_rect)
-
-        if cap.isOpened():
-            cap.release()
-
-    # ★変更: elif not game_over: -> elif not game_won:
-    elif not game_won:
         # --- ★★★ GAME RUNNING ★★★ ---
+        cap = self.cap
+        left_cursor_pos = self.left_cursor_pos
+        right_cursor_pos = self.right_cursor_pos
 
         if not cap.isOpened():
-            add_log("Camera feed lost.")
-            break
+            self.add_log("Camera feed lost.")
+            self.running = False # ★ ここで終了 (このフレームは描かない)
+            self.frame_skipped = True
+            return
 
         success, image_cam = cap.read()
-        if not success: continue
+        if not success:
+            self.frame_skipped = True
+            return
 
         # 2. 手の検出
         image_rgb = cv2.cvtColor(cv2.flip(image_cam, 1), cv2.COLOR_BGR2RGB)
         image_rgb.flags.writeable = False
-        results = hands.process(image_rgb)
+        results = self.hands.process(image_rgb)
 
         # 3. ★ カメラ映像の準備 (描画は後で)
-        image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(image_bgr, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+        if qos.preview_due(): # ★ 重い時はカメラのプレビューを間引く (前の画像を表示し続ける)
+            image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+            if qos.draw_skeleton and results.multi_hand_landmarks: # ★ 重い時は骨格を描かない
+                for hand_landmarks in results.multi_hand_landmarks:
+                    mp_drawing.draw_landmarks(image_bgr, hand_landmarks, mp_hands.HAND_CONNECTIONS)
 
-        image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-        image_pygame = pygame.image.frombuffer(image_rgb.tobytes(), image_rgb.shape[1::-1], "RGB")
-        # ★ ここで camera_surface_scaled に準備しておく
-        camera_surface_scaled = pygame.transform.scale(image_pygame, (CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
+            image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+            image_pygame = pygame.image.frombuffer(image_rgb.tobytes(), image_rgb.shape[1::-1], "RGB")
+            # ★ ここで camera_surface_scaled に準備しておく
+            self.camera_surface_scaled = pygame.transform.scale(image_pygame, (CAM_PANEL_RECT.width, CAM_PANEL_RECT.height))
+            self.camera_frame_id += 1
 
 
         # 4. ジェスチャーとゲームロジック
@@ -344,7 +321,7 @@ while running:
                 mcp_landmark = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_MCP]
                 hand_pos = (int(mcp_landmark.x * GAME_PANEL_WIDTH), int(mcp_landmark.y * GAME_HEIGHT))
 
-                
+
                 if handedness.classification[0].label == 'Left':
                     left_is_grabbing = not is_open
                     left_cursor_pos[:] = hand_pos
@@ -357,14 +334,15 @@ while running:
         left_cursor_rect = pygame.Rect(left_cursor_pos[0] - cursor_radius, left_cursor_pos[1] - cursor_radius, cursor_radius * 2, cursor_radius * 2)
         right_cursor_rect = pygame.Rect(right_cursor_pos[0] - cursor_radius, right_cursor_pos[1] - cursor_radius, cursor_radius * 2, cursor_radius * 2)
 
+        world_y_offset = self.world_y_offset
         visible_holds_for_drawing = []
         left_colliding_hold = None
         right_colliding_hold = None
 
-        if hold_image:
+        if self.hold_image:
             min_y_world = world_y_offset
             max_y_world = world_y_offset + GAME_HEIGHT
-            for hold_rect_world in holds_list:
+            for hold_rect_world in self.holds_list:
                 if hold_rect_world.bottom > min_y_world and hold_rect_world.top < max_y_world:
                     screen_rect = hold_rect_world.move(0, -world_y_offset)
                     visible_holds_for_drawing.append(screen_rect)
@@ -373,11 +351,13 @@ while running:
                         left_colliding_hold = screen_rect
                     if right_colliding_hold is None and right_cursor_rect.colliderect(screen_rect):
                         right_colliding_hold = screen_rect
+        self.visible_holds_for_drawing = visible_holds_for_drawing
 
         # --- ★ ゴールホールドの当たり判定 ---
         goal_hold_rect_screen = None
         touching_goal_hold_left = False
         touching_goal_hold_right = False
+        goal_hold_rect_world = self.goal_hold_rect_world
         if goal_hold_rect_world:
             min_y_world = world_y_offset
             max_y_world = world_y_offset + GAME_HEIGHT
@@ -387,6 +367,7 @@ while running:
                     touching_goal_hold_left = True
                 if right_cursor_rect.colliderect(goal_hold_rect_screen):
                     touching_goal_hold_right = True
+        self.goal_hold_rect_screen = goal_hold_rect_screen
 
         # --- ★★★ 掴みとスクロールのロジック ★★★ ---
         left_can_grab_normal = left_is_grabbing and (left_colliding_hold is not None)
@@ -396,168 +377,221 @@ while running:
 
         left_can_grab = left_can_grab_normal or left_can_grab_goal
         right_can_grab = right_can_grab_normal or right_can_grab_goal
+        self.left_can_grab = left_can_grab
+        self.right_can_grab = right_can_grab
 
 
-        if not game_start_flag and (left_can_grab or right_can_grab):
-            game_start_flag = True
-            start_time = pygame.time.get_ticks()
-            add_log("Climb START!")
+        if not self.game_start_flag and (left_can_grab or right_can_grab):
+            self.game_start_flag = True
+            self.start_time = pygame.time.get_ticks()
+            self.add_log("Climb START!")
+            self.gc_policy.start_round() # ★ 登っている間は自動の GC を止める (ホールドをつかんだ瞬間に止まらないように)
 
-        left_grabbed_this_frame = left_can_grab and not left_was_holding
-        right_grabbed_this_frame = right_can_grab and not right_was_holding
+        left_grabbed_this_frame = left_can_grab and not self.left_was_holding
+        right_grabbed_this_frame = right_can_grab and not self.right_was_holding
 
         if (left_grabbed_this_frame and left_can_grab_normal) or \
            (right_grabbed_this_frame and right_can_grab_normal):
-            world_hold_start_y = world_y_offset
+            self.world_hold_start_y = world_y_offset
             if left_can_grab_normal:
-                left_hold_start_y = left_cursor_pos[1]
+                self.left_hold_start_y = left_cursor_pos[1]
             if right_can_grab_normal:
-                right_hold_start_y = right_cursor_pos[1]
+                self.right_hold_start_y = right_cursor_pos[1]
 
         if left_can_grab_normal or right_can_grab_normal:
-            current_fall_velocity = 0
+            self.current_fall_velocity = 0
             pull_distance_left = 0
             pull_distance_right = 0
             if left_can_grab_normal:
-                pull_distance_left = left_cursor_pos[1] - left_hold_start_y
+                pull_distance_left = left_cursor_pos[1] - self.left_hold_start_y
             if right_can_grab_normal:
-                pull_distance_right = right_cursor_pos[1] - right_hold_start_y
+                pull_distance_right = right_cursor_pos[1] - self.right_hold_start_y
 
             pull_distance = max(pull_distance_left, pull_distance_right)
 
             if pull_distance < 0: pull_distance = 0
             if pull_distance > MAX_PULL_PIXELS: pull_distance = MAX_PULL_PIXELS
 
-            world_y_offset = world_hold_start_y - pull_distance
+            world_y_offset = self.world_hold_start_y - pull_distance
         elif left_can_grab_goal or right_can_grab_goal:
-             current_fall_velocity = 0
+             self.current_fall_velocity = 0
         else:
-            current_fall_velocity += GRAVITY_ACCEL
-            if current_fall_velocity > MAX_FALL_SPEED:
-                current_fall_velocity = MAX_FALL_SPEED
-            world_y_offset += int(current_fall_velocity)
+            for _ in range(sim_steps): # ★ このフレームのステップ数だけ重力を積分する
+                self.current_fall_velocity += GRAVITY_ACCEL
+                if self.current_fall_velocity > MAX_FALL_SPEED:
+                    self.current_fall_velocity = MAX_FALL_SPEED
+                world_y_offset += int(self.current_fall_velocity)
 
-        left_was_holding = left_can_grab
-        right_was_holding = right_can_grab
+        self.left_was_holding = left_can_grab
+        self.right_was_holding = right_can_grab
 
-        if world_y_offset > max_scroll: world_y_offset = max_scroll
+        if world_y_offset > self.max_scroll: world_y_offset = self.max_scroll
         if world_y_offset < 0: world_y_offset = 0
+        self.world_y_offset = world_y_offset
 
         # --- ★ ゴール判定 (両手タッチ1秒) ---
         if touching_goal_hold_left and touching_goal_hold_right:
-            if both_hands_touching_goal_start_time == 0:
-                both_hands_touching_goal_start_time = pygame.time.get_ticks()
+            if self.both_hands_touching_goal_start_time == 0:
+                self.both_hands_touching_goal_start_time = pygame.time.get_ticks()
             else:
-                touch_duration = pygame.time.get_ticks() - both_hands_touching_goal_start_time
+                touch_duration = pygame.time.get_ticks() - self.both_hands_touching_goal_start_time
                 if touch_duration >= GOAL_TOUCH_DURATION_MS:
-                    game_won = True # ★★★ ゲームクリア ★★★
+                    self.game_won = True # ★★★ ゲームクリア ★★★
         else:
-            both_hands_touching_goal_start_time = 0
+            self.both_hands_touching_goal_start_time = 0
+
+        # ★変更: and not game_over を削除
+        if self.game_start_flag and not self.game_won:
+            self.elapsed_time = pygame.time.get_ticks() - self.start_time
 
-        # 5. Pygameの描画処理
+    def render(self):
+        if self.frame_skipped:
+            return
+        screen = self.screen
+        panels = self.panels
 
+        # ★ 画面全体のクリアはしない (各パネルが自分の領域を塗りつぶす)
         game_surface = screen.subsurface(GAME_PANEL_RECT)
 
-        if full_background:
-            game_surface.blit(full_background, (0, -world_y_offset))
+        if self.game_won:
+            # --- ★★★ GAME CLEAR ★★★ ---
+            if self.goal_background_image:
+                game_surface.blit(self.goal_background_image, (0, 0))
+            else:
+                game_surface.fill(SKY_BLUE)
+
+            # ★ ゴール高さ(50m)が自動で表示される
+            goal_text = self.goal_text_font.render(f"{int(GOAL_HOLD_METERS)}m Climb Success!!", True, ORANGE)
+            game_surface.blit(goal_text, (
+                game_surface.get_width() // 2 - goal_text.get_width() // 2,
+                game_surface.get_height() // 4 - goal_text.get_height() // 2
+            ))
+
+            time_text = self.font_ui.render(f"Clear Time: {format_time(self.final_time)}", True, ORANGE)
+            game_surface.blit(time_text, (
+                game_surface.get_width() // 2 - time_text.get_width() // 2,
+                game_surface.get_height() // 4 + goal_text.get_height()
+            ))
+
+            if self.dancer_images:
+                current_dancer_image = self.dancer_images[self.dancer_frame]
+                img_rect = current_dancer_image.get_rect(center=(game_surface.get_width() // 2, game_surface.get_height() // 2 + 100))
+                game_surface.blit(current_dancer_image, img_rect)
+
         else:
-            game_surface.fill(SKY_BLUE)
-
-        if hold_image:
-            for rect in visible_holds_for_drawing:
-                game_surface.blit(hold_image, rect)
-
-        if goal_hold_image and goal_hold_rect_screen:
-             game_surface.blit(goal_hold_image, goal_hold_rect_screen)
-
-
-        left_cursor_color = GREEN if left_can_grab else RED
-        right_cursor_color = GREEN if right_can_grab else RED
-        ALPHA_VALUE = 128
-
-        if left_cursor_pos[0] != -100:
-            circle_surface_left = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(circle_surface_left, left_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
-            game_surface.blit(circle_surface_left, (left_cursor_pos[0] - cursor_radius, left_cursor_pos[1] - cursor_radius))
-
-        if right_cursor_pos[0] != -100:
-            circle_surface_right = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(circle_surface_right, right_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
-            game_surface.blit(circle_surface_right, (right_cursor_pos[0] - cursor_radius, right_cursor_pos[1] - cursor_radius))
-
-
-
-    # --- ★★★ UIパネルの描画 (全状態共通) ★★★ ---
-
-    # ★変更: and not game_over を削除
-    if game_start_flag and not game_won:
-        elapsed_time = pygame.time.get_ticks() - start_time
-
-    # --- スコアパネル (左上) ---
-    score_surface = screen.subsurface(SCORE_PANEL_RECT)
-    score_surface.fill(BLACK)
-    title_text = font_title.render("SCORE", True, WHITE)
-    score_surface.blit(title_text, (10, 10))
-
-    display_height = height_climbed
-    if game_won:
-        # ゲームクリアしたらゴール高さに固定
-        display_height = GOAL_HOLD_METERS
-
-    height_text_str = f"Height: {display_height:.1f} m"
-    height_text = font_ui.render(height_text_str, True, WHITE)
-    score_surface.blit(height_text, (15, 60))
-
-    time_text_str = f"Time: {format_time(elapsed_time)}"
-    if final_time > 0:
-        time_text_str = f"Time: {format_time(final_time)}"
-    time_text = font_ui.render(time_text_str, True, WHITE)
-    score_surface.blit(time_text, (15, 110))
-
-
-    # ★変更: 90m -> 40m
-    r_text0 = font_log.render("'R' Key: 40m Rocket", True, GREEN)
-    r_text1 = font_log.render("Please reload,", True, GREEN)
-    r_text2 = font_log.render("if you want to retry.", True, GREEN)
-    score_surface.blit(r_text0, (15, 200))
-    score_surface.blit(r_text1, (15, 230))
-    score_surface.blit(r_text2, (15, 260))
-
-
-    # --- ログパネル (左中) ---
-    log_surface = screen.subsurface(LOG_PANEL_RECT)
-    log_surface.fill(BLACK)
-    log_title = font_title.render("LOG", True, WHITE)
-    log_surface.blit(log_title, (10, 10))
-    y_pos = 50
-    for message in log_messages:
-        log_text = font_log.render(message, True, GREEN)
-        log_surface.blit(log_text, (15, y_pos))
-        y_pos += 25
-
-    # --- カメラパネル (左下) ---
-    cam_title = font_title.render("CAMERA", True, WHITE)
-    cam_surface = screen.subsurface(CAM_PANEL_RECT)
-    pygame.draw.rect(cam_surface, BLACK, (0, 0, CAM_PANEL_RECT.width, CAM_PANEL_RECT.height)) # 背景を黒で
-    cam_surface.blit(cam_title, (10, 10)) # タイトルを描画
-
-    # ★変更: and not game_over を削除
-    if not game_won and cap.isOpened():
-        if camera_surface_scaled: # 準備できていれば描画
-            # ★ タイトルが隠れないように、少し下にずらして描画
-            cam_surface.blit(camera_surface_scaled, (0, 30))
-    # ★変更: and not game_over を削除
-    elif not cap.isOpened() and not game_won:
-        cam_error_text = font_log.render("Camera not found.", True, RED)
-        cam_surface.blit(cam_error_text, (10, 50))
-    # ★ game_won の場合は黒背景+タイトルのみ
-
-    # 画面更新 (全状態共通)
-    pygame.display.flip()
-    clock.tick(60)
-
-# --- 終了処理 ---
-if cap.isOpened():
-    cap.release()
-cv2.destroyAllWindows()
-pygame.quit()
\ No newline at end of file
+            # --- ★★★ GAME RUNNING ★★★ ---
+            # 5. Pygameの描画処理
+            if self.full_background:
+                game_surface.blit(self.full_background, (0, -self.world_y_offset))
+            else:
+                game_surface.fill(SKY_BLUE)
+
+            if self.hold_image:
+                for rect in self.visible_holds_for_drawing:
+                    game_surface.blit(self.hold_image, rect)
+
+            if self.goal_hold_image and self.goal_hold_rect_screen:
+                 game_surface.blit(self.goal_hold_image, self.goal_hold_rect_screen)
+
+
+            left_cursor_pos = self.left_cursor_pos
+            right_cursor_pos = self.right_cursor_pos
+            left_cursor_color = GREEN if self.left_can_grab else RED
+            right_cursor_color = GREEN if self.right_can_grab else RED
+            ALPHA_VALUE = 128
+
+            if left_cursor_pos[0] != -100:
+                circle_surface_left = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(circle_surface_left, left_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
+                game_surface.blit(circle_surface_left, (left_cursor_pos[0] - cursor_radius, left_cursor_pos[1] - cursor_radius))
+
+            if right_cursor_pos[0] != -100:
+                circle_surface_right = pygame.Surface((cursor_radius * 2, cursor_radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(circle_surface_right, right_cursor_color + (ALPHA_VALUE,), (cursor_radius, cursor_radius), cursor_radius)
+                game_surface.blit(circle_surface_right, (right_cursor_pos[0] - cursor_radius, right_cursor_pos[1] - cursor_radius))
+
+
+
+        # --- ★★★ UIパネルの描画 (全状態共通) ★★★ ---
+
+        # --- スコアパネル (左上) ---
+        display_height = self.height_climbed
+        if self.game_won:
+            # ゲームクリアしたらゴール高さに固定
+            display_height = GOAL_HOLD_METERS
+
+        height_text_str = f"Height: {display_height:.1f} m"
+        time_text_str = f"Time: {format_time(self.elapsed_time)}"
+        if self.final_time > 0:
+            time_text_str = f"Time: {format_time(self.final_time)}"
+
+        # ★ 表示内容が変わった時だけ描き直す
+        if panels.needs_redraw(SCORE_PANEL_RECT, (height_text_str, time_text_str)):
+            score_surface = screen.subsurface(SCORE_PANEL_RECT)
+            score_surface.fill(BLACK)
+            title_text = self.font_title.render("SCORE", True, WHITE)
+            score_surface.blit(title_text, (10, 10))
+
+            height_text = self.font_ui.render(height_text_str, True, WHITE)
+            score_surface.blit(height_text, (15, 60))
+
+            time_text = self.font_ui.render(time_text_str, True, WHITE)
+            score_surface.blit(time_text, (15, 110))
+
+
+            # ★変更: 90m -> 40m
+            r_text0 = self.font_log.render("'R' Key: 40m Rocket", True, GREEN)
+            r_text1 = self.font_log.render("Please reload,", True, GREEN)
+            r_text2 = self.font_log.render("if you want to retry.", True, GREEN)
+            score_surface.blit(r_text0, (15, 200))
+            score_surface.blit(r_text1, (15, 230))
+            score_surface.blit(r_text2, (15, 260))
+
+
+        # --- ログパネル (左中) ---
+        if panels.needs_redraw(LOG_PANEL_RECT, tuple(self.log_messages)):
+            log_surface = screen.subsurface(LOG_PANEL_RECT)
+            log_surface.fill(BLACK)
+            log_title = self.font_title.render("LOG", True, WHITE)
+            log_surface.blit(log_title, (10, 10))
+            y_pos = 50
+            for message in self.log_messages:
+                log_text = self.font_log.render(message, True, GREEN)
+                log_surface.blit(log_text, (15, y_pos))
+                y_pos += 25
+
+        # --- カメラパネル (左下) ---
+        # ★変更: and not game_over を削除
+        cam_opened = self.cap.isOpened()
+        show_camera = not self.game_won and cam_opened and self.camera_surface_scaled is not None
+        show_cam_error = not cam_opened and not self.game_won
+        if panels.needs_redraw(CAM_PANEL_RECT, (self.camera_frame_id if show_camera else None, show_cam_error)):
+            cam_title = self.font_title.render("CAMERA", True, WHITE)
+            cam_surface = screen.subsurface(CAM_PANEL_RECT)
+            pygame.draw.rect(cam_surface, BLACK, (0, 0, CAM_PANEL_RECT.width, CAM_PANEL_RECT.height)) # 背景を黒で
+            cam_surface.blit(cam_title, (10, 10)) # タイトルを描画
+
+            if show_camera: # 準備できていれば描画
+                # ★ タイトルが隠れないように、少し下にずらして描画
+                cam_surface.blit(self.camera_surface_scaled, (0, 30))
+            elif show_cam_error:
+                cam_error_text = self.font_log.render("Camera not found.", True, RED)
+                cam_surface.blit(cam_error_text, (10, 50))
+            # ★ game_won の場合は黒背景+タイトルのみ
+
+        # 画面更新 (全状態共通)
+        panels.mark(GAME_PANEL_RECT) # ゲームパネルは毎フレーム描き直している
+        panels.present() # ★ flip() の代わりに変化した矩形だけ転送
+
+    def exit(self):
+        # --- 終了処理 ---
+        self.gc_policy.close()
+        print(self.gc_policy.report())
+        if self.cap.isOpened():
+            self.cap.release()
+
+
+SCENE = TimeAttackClimbScene # ★ ランチャーが探すシーンのクラス
+
+if __name__ == "__main__":
+    run_scene(TimeAttackClimbScene())
@@ -0,0 +1,209 @@
+# --- ★ 手の検出バックエンド (mp.solutions の Hands / MediaPipe Tasks の HandLandmarker) ---
+# 今までどおりの mp.solutions.hands.Hands ("solutions") は process() の中で推論が終わるまで待つので、
+# 推論が遅い PC ではゲームのフレームも遅くなる。"tasks" は MediaPipe Tasks の HandLandmarker を
+# LIVE_STREAM モードで動かし、process() は画像を時刻 (time.monotonic() の ms) 付きで渡してすぐに戻る。
+# 結果は MediaPipe のスレッドからコールバックで届き、process() は「届いている中で最新の結果」を返す
+# (推論が追いつかない間に渡した画像は MediaPipe が捨てるので、待ち行列は伸びない)。
+# 返す結果は solutions と同じ形 (multi_hand_landmarks[i].landmark[j].x / multi_handedness[i].classification[0].label)
+# なので、ゲーム側の is_hand_open() や mp_drawing.draw_landmarks() はそのまま使える。
+# 最初の結果が届くまでは、手が見つからなかった時と同じ (multi_hand_landmarks が None) になる。
+#
+# 使い方 (リポジトリのルートで):
+#   python pygame/newgoal.py --tracker tasks        # (または環境変数 FESTIVAL_TRACKER=tasks)
+#   python pygame/launcher.py --tracker tasks       # ランチャーから全ゲーム
+# tasks にはモデルファイル (HAND_MODEL_PATH) が必要。無い時は警告を出して solutions で動かす:
+#   curl -L -o model/hand_landmarker.task \
+#     https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/hand_landmarker.task
+#
+# 性能比較 (同じ画像を両方に同じ間隔で渡す):
+#   python pygame/trackerbackend.py                        # カメラから 300 枚撮って比べる
+#   python pygame/trackerbackend.py --video capture.mp4    # capturedaemon.py --record で録った動画で比べる
+
+import os
+import sys
+import time
+import mediapipe as mp
+
+TRACKERS = ("solutions", "tasks")
+HAND_MODEL_PATH = "model/hand_landmarker.task"
+
+
+def tracker_from_argv(argv=None, default="solutions"):
+    """--tracker solutions|tasks (無ければ環境変数 FESTIVAL_TRACKER) で選ばれたバックエンド名"""
+    argv = sys.argv if argv is None else argv
+    name = os.environ.get("FESTIVAL_TRACKER", default)
+    if "--tracker" in argv:
+        index = argv.index("--tracker") + 1
+        if index < len(argv):
+            name = argv[index]
+    if name not in TRACKERS:
+        print(f"警告: 不明なトラッカー '{name}' です。solutions で検出します。")
+        name = "solutions"
+    return name
+
+
+class HandsResult:
+    """solutions の Hands.process() の戻り値と同じ形の結果 (+ どの画像の結果か)"""
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None, timestamp_ms=None):
+        self.multi_hand_landmarks = multi_hand_landmarks # [NormalizedLandmarkList] (手が無ければ None)
+        self.multi_handedness = multi_handedness # [ClassificationList]
+        self.timestamp_ms = timestamp_ms # この結果の元になった画像を渡した時刻 (まだ結果が無ければ None)
+        # 画像を渡してから結果が届くまでの時間
+        self.delay_ms = None if timestamp_ms is None else time.monotonic_ns() // 1_000_000 - timestamp_ms
+
+
+class LiveStreamHands:
+    """mp.solutions.hands.Hands の代わり。HandLandmarker (LIVE_STREAM) に画像を渡し、推論を待たずに戻る"""
+
+    def __init__(self, max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 model_path=HAND_MODEL_PATH, **unused):
+        # static_image_mode / model_complexity は solutions だけの設定なので無視する
+        from mediapipe.framework.formats import classification_pb2, landmark_pb2
+        from mediapipe.tasks.python import BaseOptions, vision
+        self._landmark_pb2 = landmark_pb2
+        self._classification_pb2 = classification_pb2
+        self.latest = HandsResult() # コールバック (MediaPipe のスレッド) が丸ごと差し替える
+        self.last_timestamp_ms = -1
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_tracking_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result,
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """(MediaPipe のスレッド) Tasks の結果を solutions と同じ形 (protobuf) に直して差し替える"""
+        if not result.hand_landmarks:
+            self.latest = HandsResult(timestamp_ms=timestamp_ms)
+            return
+        landmark_pb2 = self._landmark_pb2
+        classification_pb2 = self._classification_pb2
+        hand_landmarks = [
+            landmark_pb2.NormalizedLandmarkList(landmark=[
+                landmark_pb2.NormalizedLandmark(x=point.x, y=point.y, z=point.z) for point in points
+            ])
+            for points in result.hand_landmarks
+        ]
+        handedness = [
+            classification_pb2.ClassificationList(classification=[
+                classification_pb2.Classification(index=category.index, score=category.score, label=category.category_name)
+                for category in categories
+            ])
+            for categories in result.handedness
+        ]
+        self.latest = HandsResult(hand_landmarks, handedness, timestamp_ms)
+
+    def process(self, image_rgb):
+        """画像 (RGB) を推論に回し、届いている中で最新の結果を返す (推論は待たない)"""
+        timestamp_ms = time.monotonic_ns() // 1_000_000
+        if timestamp_ms <= self.last_timestamp_ms: # 同じ ms に2回呼ばれても時刻は必ず増やす
+            timestamp_ms = self.last_timestamp_ms + 1
+        self.last_timestamp_ms = timestamp_ms
+        self.landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb), timestamp_ms)
+        return self.latest
+
+    def close(self):
+        self.landmarker.close()
+
+
+def create_hands(tracker="solutions", **kwargs):
+    """tracker で選んだ手の検出器 (tasks が使えなければ警告を出して solutions)"""
+    if tracker == "tasks":
+        model_path = kwargs.get("model_path", HAND_MODEL_PATH)
+        if not os.path.exists(model_path):
+            print(f"警告: {model_path} が見つかりません。solutions で検出します。")
+        else:
+            try:
+                return LiveStreamHands(**kwargs)
+            except (ImportError, AttributeError) as e:
+                print(f"警告: MediaPipe Tasks を使えません ({e})。solutions で検出します。")
+    kwargs.pop("model_path", None)
+    return mp.solutions.hands.Hands(**kwargs)
+
+
+if __name__ == "__main__":
+    import cv2
+    import numpy as np
+    from capturedaemon import camera_index_from_argv, open_capture
+
+    FRAMES = 300
+    FPS = 30 # 画像はカメラと同じ間隔で渡す (LIVE_STREAM は渡す間隔で結果の数が変わる)
+    SETTINGS = dict(max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    def percentile(values, p):
+        return float(np.percentile(values, p)) if values else float("nan")
+
+    # 同じ画像を両方に渡すため、先に全部読んでおく (ゲームと同じく左右反転して RGB にする)
+    if "--video" in sys.argv:
+        source = cv2.VideoCapture(sys.argv[sys.argv.index("--video") + 1])
+    else:
+        source = open_capture(camera_index_from_argv())
+    frames = []
+    while len(frames) < FRAMES:
+        success, image = source.read()
+        if not success:
+            break
+        frames.append(cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB))
+    source.release()
+    if not frames:
+        sys.exit("画像を読めませんでした。")
+    print(f"{len(frames)} 枚 ({frames[0].shape[1]}x{frames[0].shape[0]}) を {FPS}fps の間隔で渡す")
+
+    def bench(tracker):
+        """{画像の番号: 手首の座標のリスト} と、process() の時間・結果の遅れ (ms)"""
+        hands = create_hands(tracker, **SETTINGS)
+        if tracker == "tasks" and not isinstance(hands, LiveStreamHands):
+            hands.close()
+            return None
+        call_ms = []
+        latency_ms = []
+        detections = {}
+        sent_at = {} # {timestamp_ms: 画像の番号}
+        seen = None
+        start = time.perf_counter()
+        for frame_number, image in enumerate(frames):
+            # 前の画像から 1/FPS 秒たつまで待つ
+            time.sleep(max(0.0, start + frame_number / FPS - time.perf_counter()))
+            before = time.perf_counter()
+            results = hands.process(image)
+            call_ms.append((time.perf_counter() - before) * 1000)
+            number = frame_number
+            if tracker == "tasks":
+                sent_at[hands.last_timestamp_ms] = frame_number
+                if results.timestamp_ms is None or results.timestamp_ms == seen:
+                    continue # 新しい結果はまだ届いていない
+                seen = results.timestamp_ms
+                number = sent_at[seen] # この結果の元になった画像
+                latency_ms.append(results.delay_ms)
+            else:
+                latency_ms.append(call_ms[-1]) # 結果は process() の中で届く
+            detections[number] = [(points.landmark[0].x, points.landmark[0].y)
+                                  for points in (results.multi_hand_landmarks or [])]
+        elapsed = time.perf_counter() - start
+        hands.close()
+        return detections, call_ms, latency_ms, elapsed
+
+    reports = {tracker: bench(tracker) for tracker in TRACKERS}
+    print(f"{'':>10} {'call ms':>14} {'latency ms':>14} {'results/s':>10} {'hands/result':>13}")
+    for tracker, report in reports.items():
+        if report is None:
+            print(f"{tracker:>10} (使えません)")
+            continue
+        detections, call_ms, latency_ms, elapsed = report
+        hands_found = sum(len(points) for points in detections.values()) / max(1, len(detections))
+        print(f"{tracker:>10} {np.mean(call_ms):>6.2f} p95 {percentile(call_ms, 95):>6.2f}"
+              f" {np.mean(latency_ms):>6.2f} p95 {percentile(latency_ms, 95):>6.2f}"
+              f" {len(detections) / elapsed:>10.1f} {hands_found:>13.2f}")
+    if reports["tasks"] is not None:
+        # 同じ画像の結果どうしで、手首の位置のずれ (画面の幅・高さに対する割合) を比べる
+        legacy, tasks = reports["solutions"][0], reports["tasks"][0]
+        offsets = [min(np.hypot(x - tx, y - ty) for tx, ty in tasks[number])
+                   for number in tasks.keys() & legacy.keys() if tasks[number]
+                   for x, y in legacy[number]]
+        print(f"手首のずれ (同じ画像): 平均 {np.mean(offsets) if offsets else float('nan'):.4f}"
+              f" / {len(offsets)} 個の手")